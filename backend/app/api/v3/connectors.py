@@ -29,6 +29,7 @@ from app.models.system import (
     # Target Tables
     TargetTableListResponse,
 )
+from app.engine import schema_explorer
 from app.engine.v3 import connector_crud, sync_crud
 
 router = APIRouter(prefix="/connectors", tags=["Connectors"])
@@ -157,7 +158,7 @@ def test_existing_connection(
             detail=f"Connection not found: {conn_id}"
         )
     
-    result = connector_crud.test_connection(conn.conn_type, conn.config_json)
+    result = connector_crud.test_connection(conn.conn_type, conn.config_json, conn_id)
     
     # Update connection status
     new_status = "ACTIVE" if result.success else "ERROR"
@@ -170,11 +171,19 @@ def test_existing_connection(
 @router.get("/{conn_id}/explorer", response_model=SourceExplorerResponse)
 def explore_source(
     conn_id: str,
+    schema: Optional[str] = Query(None, description="Schema to list (default: the connection's own)"),
+    search: Optional[str] = Query(None, description="Case-insensitive table name filter"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="Tables per page (default: all)"),
+    refresh: bool = Query(False, description="Re-read the source instead of the cached schema"),
+    include_columns: bool = Query(True),
     session: Session = Depends(get_session)
 ):
     """
     Explore available tables/resources in the source connection.
     Returns list of tables with column information.
+    The table list is cached per connection; refresh=true re-reads it and
+    updates the cached schema of the connection's sync jobs.
     """
     conn = connector_crud.get_connection(session, conn_id)
     if not conn:
@@ -183,8 +192,14 @@ def explore_source(
             detail=f"Connection not found: {conn_id}"
         )
     
-    result = connector_crud.explore_source(conn.conn_type, conn.config_json)
+    result = connector_crud.explore_source(
+        conn.conn_type, conn.config_json, conn_id,
+        schema=schema, search=search, skip=skip, limit=limit,
+        refresh=refresh, include_columns=include_columns
+    )
     result.connection_id = conn_id
+    if refresh and not result.error:
+        schema_explorer.refresh_sync_job_schemas(session, conn, schema)
     return result
 
 
@@ -275,7 +290,10 @@ def create_sync_job(
             source_config=job.source_config,
             target_table=job.target_table,
             sync_mode=job.sync_mode,
+            cursor_column=job.cursor_column,
+            sync_watermark=job.sync_watermark,
             schedule_cron=job.schedule_cron,
+            next_run_at=job.next_run_at,
             is_enabled=job.is_enabled,
             last_run_status=job.last_run_status,
             last_run_at=job.last_run_at,
@@ -320,7 +338,13 @@ def update_sync_job(
     """
     Update sync job definition.
     """
-    job = sync_crud.update_sync_job(session, job_id, data)
+    try:
+        job = sync_crud.update_sync_job(session, job_id, data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -4,7 +4,7 @@ Index Health monitoring and observability.
 """
 from typing import List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session, select, func
 from sqlalchemy import desc
 
@@ -13,8 +13,15 @@ from app.core.logger import logger
 from app.models.observability import (
     IndexJobRun,
     IndexErrorSample,
+    IndexJobCheckpoint,
+    IndexDeadLetter,
+    JobStatus,
+    DeadLetterStatus,
     IndexJobRunRead,
+    IndexJobCheckpointRead,
     IndexErrorSampleRead,
+    IndexDeadLetterRead,
+    DeadLetterReplayRequest,
     ObjectHealthSummary,
     SystemHealthSummary,
     JobHistoryResponse,
@@ -33,12 +40,14 @@ def get_health_summary(session: Session = Depends(get_session)):
     Get overall system health summary.
     Aggregates latest job runs for all object types.
     """
-    # Get latest run for each object_def_id
+    # Get latest finished run for each object_def_id (skip queued/running jobs)
+    active = [JobStatus.QUEUED.value, JobStatus.RUNNING.value]
     subquery = (
         select(
             IndexJobRun.object_def_id,
             func.max(IndexJobRun.start_time).label("latest_time")
         )
+        .where(IndexJobRun.status.notin_(active))
         .group_by(IndexJobRun.object_def_id)
         .subquery()
     )
@@ -50,6 +59,7 @@ def get_health_summary(session: Session = Depends(get_session)):
             (IndexJobRun.object_def_id == subquery.c.object_def_id) &
             (IndexJobRun.start_time == subquery.c.latest_time)
         )
+        .where(IndexJobRun.status.notin_(active))
         .order_by(desc(IndexJobRun.start_time))
     )
     
@@ -199,15 +209,14 @@ def get_job_errors(
 @router.post("/objects/{object_def_id}/reindex")
 def trigger_reindex(
     object_def_id: str,
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session)
 ):
     """
-    Trigger immediate re-indexing for an object type.
-    Finds the latest mapping and starts a new job.
+    Trigger re-indexing for an object type.
+    Finds the latest mapping and queues a job (or returns the already queued one).
     """
     from app.models.context import ObjectMappingDef
-    from app.engine.indexing_worker import run_indexing_job
+    from app.engine.index_scheduler import enqueue_indexing_job
     
     # Find latest published mapping for this object
     stmt = (
@@ -226,15 +235,16 @@ def trigger_reindex(
             detail=f"No published mapping found for object: {object_def_id}"
         )
     
-    # Trigger background indexing
-    background_tasks.add_task(run_indexing_job, mapping.id)
+    # Queue indexing (deduplicated per mapping)
+    job_run_id = enqueue_indexing_job(mapping.id, object_def_id)
     
-    logger.info(f"[Health] Triggered reindex for object: {object_def_id}, mapping: {mapping.id}")
+    logger.info(f"[Health] Queued reindex for object: {object_def_id}, mapping: {mapping.id}, job: {job_run_id}")
     
     return {
-        "message": "Reindex job triggered",
+        "message": "Reindex job queued",
         "object_def_id": object_def_id,
-        "mapping_id": mapping.id
+        "mapping_id": mapping.id,
+        "job_run_id": job_run_id
     }
 
 
@@ -255,3 +265,159 @@ def get_job_run(
         raise HTTPException(status_code=404, detail="Job run not found")
     
     return IndexJobRunRead.model_validate(run)
+
+
+@router.get("/jobs/{run_id}/checkpoints", response_model=List[IndexJobCheckpointRead])
+def get_job_checkpoints(
+    run_id: str,
+    session: Session = Depends(get_session)
+):
+    """Get the per-chunk checkpoints of a job run, every shard (kept until the run succeeds)."""
+    stmt = (
+        select(IndexJobCheckpoint)
+        .where(IndexJobCheckpoint.job_run_id == run_id)
+        .order_by(IndexJobCheckpoint.shard_index, IndexJobCheckpoint.chunk_seq)
+    )
+    checkpoints = session.exec(stmt).all()
+    return [IndexJobCheckpointRead.model_validate(c) for c in checkpoints]
+
+
+@router.post("/jobs/{run_id}/resume")
+def resume_job_run(
+    run_id: str,
+    session: Session = Depends(get_session)
+):
+    """
+    Resume a failed job run from its last fully committed chunk.
+    Only the latest run of a mapping can be resumed.
+    """
+    from app.engine.index_scheduler import resume_indexing_job
+    from app.engine.index_checkpoint import resume_points_by_shard, load_checkpoints
+    
+    run = session.exec(select(IndexJobRun).where(IndexJobRun.id == run_id)).first()
+    if not run:
+        raise HTTPException(status_code=404, detail="Job run not found")
+    
+    if run.status != JobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Only failed job runs can be resumed (status: {run.status})"
+        )
+    
+    newer = session.exec(
+        select(IndexJobRun)
+        .where(IndexJobRun.mapping_id == run.mapping_id)
+        .where(IndexJobRun.created_at > run.created_at)
+        .limit(1)
+    ).first()
+    if newer:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Mapping {run.mapping_id} has a newer job run: {newer.id}"
+        )
+    
+    if not resume_indexing_job(run_id):
+        raise HTTPException(status_code=409, detail="Job run is no longer in FAILED state")
+    
+    points = resume_points_by_shard(load_checkpoints(run_id))
+    chunks_committed = sum(p.next_seq for p in points.values())
+    rows_committed = sum(p.rows_done for p in points.values())
+    
+    logger.info(f"[Health] Resuming job {run_id} after {chunks_committed} chunks ({rows_committed} rows committed)")
+    
+    return {
+        "message": "Job run queued for resume",
+        "job_run_id": run_id,
+        "mapping_id": run.mapping_id,
+        "resume_from_chunk": chunks_committed,
+        "rows_committed": rows_committed,
+        "last_key": points[0].last_key if list(points) == [0] else None,
+        "shards": [
+            {
+                "shard_index": shard,
+                "resume_from_chunk": p.next_seq,
+                "rows_committed": p.rows_done,
+                "last_key": p.last_key,
+            }
+            for shard, p in points.items()
+        ]
+    }
+
+
+# ==========================================
+# Dead Letter Endpoints
+# ==========================================
+
+@router.get("/mappings/{mapping_id}/dead-letters", response_model=List[IndexDeadLetterRead])
+def get_dead_letters(
+    mapping_id: str,
+    status: Optional[str] = DeadLetterStatus.PENDING.value,
+    stage: Optional[str] = None,
+    limit: int = 100,
+    offset: int = 0,
+    session: Session = Depends(get_session)
+):
+    """
+    Get the dead letter rows of a mapping (rows its indexing jobs could not index).
+    Pass an empty status to list entries of any status.
+    """
+    stmt = select(IndexDeadLetter).where(IndexDeadLetter.mapping_id == mapping_id)
+    
+    if status:
+        stmt = stmt.where(IndexDeadLetter.status == status)
+    if stage:
+        stmt = stmt.where(IndexDeadLetter.stage == stage)
+    
+    stmt = stmt.order_by(IndexDeadLetter.created_at, IndexDeadLetter.id).offset(offset).limit(limit)
+    
+    entries = session.exec(stmt).all()
+    return [IndexDeadLetterRead.model_validate(e) for e in entries]
+
+
+@router.post("/mappings/{mapping_id}/dead-letters/replay")
+def replay_mapping_dead_letters(
+    mapping_id: str,
+    request: Optional[DeadLetterReplayRequest] = None,
+    session: Session = Depends(get_session)
+):
+    """
+    Replay pending dead letter rows through the mapping (all, or the given IDs).
+    Queued on the index job scheduler like an indexing job; refused (409) while
+    the mapping has a queued or running job.
+    """
+    from app.engine.index_scheduler import enqueue_replay_job
+    from app.models.context import ObjectMappingDef
+    
+    ids = request.ids if request else None
+    stmt = (
+        select(func.count())
+        .select_from(IndexDeadLetter)
+        .where(IndexDeadLetter.mapping_id == mapping_id)
+        .where(IndexDeadLetter.status == DeadLetterStatus.PENDING.value)
+    )
+    if ids is not None:
+        stmt = stmt.where(IndexDeadLetter.id.in_(ids))
+    pending = session.exec(stmt).one()
+    
+    if not pending:
+        raise HTTPException(status_code=404, detail=f"No pending dead letters for mapping: {mapping_id}")
+    
+    mapping = session.get(ObjectMappingDef, mapping_id)
+    if not mapping:
+        raise HTTPException(status_code=404, detail=f"Mapping not found: {mapping_id}")
+    
+    job_run_id = enqueue_replay_job(mapping_id, mapping.object_def_id, ids)
+    if job_run_id is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Mapping {mapping_id} has a queued or running job; replay after it finishes"
+        )
+    
+    logger.info(f"[Health] Queued replay of {pending} dead letters of mapping {mapping_id} as job {job_run_id}")
+    
+    return {
+        "message": "Dead letter replay queued",
+        "mapping_id": mapping_id,
+        "job_run_id": job_run_id,
+        "pending_rows": pending
+    }
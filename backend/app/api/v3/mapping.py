@@ -3,16 +3,18 @@ Mapping API endpoints for MDP Platform V3.1
 Multimodal data mapping and vector indexing.
 """
 import uuid
-import random
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlmodel import Session
 from sqlalchemy import create_engine, text
 
 from app.core.db import get_session
 from app.core.config import settings
 from app.core.logger import logger
+from app.core.embedding import EMBEDDING_TRANSFORMS, get_encoder
 from app.engine.v3 import mapping_crud
+from app.engine.mapping_plan import get_mapping_plan
+from app.engine.transforms import is_scalar_transform, apply_scalar_transform
 from app.models.context import (
     ObjectMappingDef,
     ObjectMappingDefCreate,
@@ -20,6 +22,7 @@ from app.models.context import (
     ObjectMappingDefRead,
     MappingPreviewRequest,
     MappingPreviewResponse,
+    IndexingCostEstimate,
     ObjectInstanceLineage,
     ObjectInstanceLineageRead,
     LineageLookupResponse,
@@ -144,10 +147,23 @@ def preview_mapping(
     """
     Live preview of mapping transformation.
     Fetches sample rows from source and simulates transforms.
+    
+    With dry_run, also estimates duration and storage of indexing the whole
+    table from a sample of sample_size rows (nothing is written).
     """
     logger.info(f"[Mapping] Preview request for table: {request.source_table_name}")
     
     try:
+        estimate = None
+        if request.dry_run:
+            from app.engine.indexing_worker import estimate_indexing_job
+            estimate = IndexingCostEstimate(**estimate_indexing_job(
+                request.source_table_name,
+                request.mapping_spec,
+                object_def_id=request.object_def_id,
+                sample_size=request.sample_size
+            ))
+        
         # Connect to raw store database
         raw_engine = create_engine(settings.raw_store_database_url)
         
@@ -165,25 +181,31 @@ def preview_mapping(
                 columns=[],
                 data=[],
                 row_count=0,
-                warnings=["Source table is empty"]
+                warnings=["Source table is empty"],
+                estimate=estimate
             )
         
-        # Apply transforms based on mapping_spec
+        # Apply transforms using the compiled plan (shared with the indexing worker)
+        plan = get_mapping_plan(request.mapping_spec)
         transformed_data = []
         warnings = []
         
         for row in rows:
-            transformed_row = _apply_transforms(row, request.mapping_spec, warnings)
+            transformed_row = plan.evaluate_row(
+                row,
+                lambda func_name, value: _apply_transform_function(func_name, value, warnings)
+            )
             transformed_data.append(transformed_row)
         
         # Get output columns from target nodes
-        output_columns = _get_output_columns(request.mapping_spec)
+        output_columns = plan.output_columns
         
         return MappingPreviewResponse(
             columns=output_columns,
             data=transformed_data,
             row_count=len(transformed_data),
-            warnings=warnings if warnings else None
+            warnings=warnings if warnings else None,
+            estimate=estimate
         )
         
     except Exception as e:
@@ -194,21 +216,20 @@ def preview_mapping(
 @router.post("/{mapping_id}/publish", response_model=ObjectMappingDefRead)
 def publish_mapping(
     mapping_id: str,
-    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session)
 ):
     """
-    Publish a mapping and trigger indexing job.
+    Publish a mapping and queue an indexing job.
     """
     mapping = mapping_crud.publish_mapping(session, mapping_id)
     if not mapping:
         raise HTTPException(status_code=404, detail="Mapping not found")
     
-    # Trigger background indexing
-    from app.engine.indexing_worker import run_indexing_job
-    background_tasks.add_task(run_indexing_job, mapping_id)
+    # Queue indexing (deduplicated per mapping, run by the index job scheduler)
+    from app.engine.index_scheduler import enqueue_indexing_job
+    job_run_id = enqueue_indexing_job(mapping_id, mapping.object_def_id)
     
-    logger.info(f"[Mapping] Published and triggered indexing for: {mapping_id}")
+    logger.info(f"[Mapping] Published and queued indexing for: {mapping_id} (job {job_run_id})")
     return mapping
 
 
@@ -216,87 +237,6 @@ def publish_mapping(
 # Transform Helpers
 # ==========================================
 
-def _apply_transforms(
-    row: Dict[str, Any],
-    mapping_spec: Dict[str, Any],
-    warnings: List[str]
-) -> Dict[str, Any]:
-    """
-    Apply transformation logic from mapping_spec to a single row.
-    """
-    nodes = mapping_spec.get("nodes", [])
-    edges = mapping_spec.get("edges", [])
-    
-    # Build node lookup and edge graph
-    node_map = {n["id"]: n for n in nodes}
-    edge_map = {}  # target_id -> source_id
-    for edge in edges:
-        edge_map[edge["target"]] = edge["source"]
-    
-    result = {}
-    
-    # Process each target node
-    for node in nodes:
-        if node.get("type") != "target":
-            continue
-        
-        target_prop = node.get("data", {}).get("property", node.get("property", ""))
-        if not target_prop:
-            continue
-        
-        # Trace back through edges to find source
-        value = _resolve_node_value(node["id"], node_map, edge_map, row, warnings)
-        result[target_prop] = value
-    
-    return result
-
-
-def _resolve_node_value(
-    node_id: str,
-    node_map: Dict[str, Any],
-    edge_map: Dict[str, str],
-    row: Dict[str, Any],
-    warnings: List[str]
-) -> Any:
-    """
-    Recursively resolve the value for a node by tracing edges.
-    """
-    node = node_map.get(node_id)
-    if not node:
-        return None
-    
-    node_type = node.get("type")
-    node_data = node.get("data", {})
-    
-    if node_type == "source":
-        # Source node: get value from row
-        column = node_data.get("column", node.get("column", ""))
-        return row.get(column)
-    
-    elif node_type == "transform":
-        # Transform node: apply function to input
-        func_name = node_data.get("function", node.get("function", ""))
-        
-        # Get input value from connected source
-        source_node_id = edge_map.get(node_id)
-        if not source_node_id:
-            return None
-        
-        input_value = _resolve_node_value(source_node_id, node_map, edge_map, row, warnings)
-        
-        return _apply_transform_function(func_name, input_value, warnings)
-    
-    elif node_type == "target":
-        # Target node: get value from connected node
-        source_node_id = edge_map.get(node_id)
-        if not source_node_id:
-            return None
-        
-        return _resolve_node_value(source_node_id, node_map, edge_map, row, warnings)
-    
-    return None
-
-
 def _apply_transform_function(
     func_name: str,
     input_value: Any,
@@ -305,45 +245,18 @@ def _apply_transform_function(
     """
     Apply a transformation function to an input value.
     """
-    if func_name == "image_embedding_clip":
-        # Mock: Generate random 768-dim vector
-        return [round(random.uniform(-1, 1), 6) for _ in range(768)]
-    
-    elif func_name == "concat":
-        # String concatenation (pass through for single value)
-        return str(input_value) if input_value else ""
+    if func_name in EMBEDDING_TRANSFORMS:
+        matrix, valid = get_encoder(EMBEDDING_TRANSFORMS[func_name]).encode([input_value])
+        return matrix[0].tolist() if valid[0] else None
     
-    elif func_name == "to_uppercase":
-        return str(input_value).upper() if input_value else ""
-    
-    elif func_name == "to_lowercase":
-        return str(input_value).lower() if input_value else ""
-    
-    elif func_name == "format_date":
-        # Pass through for demo
-        return input_value
+    elif is_scalar_transform(func_name):
+        return apply_scalar_transform(func_name, input_value)
     
     else:
         warnings.append(f"Unknown transform function: {func_name}")
         return input_value
 
 
-def _get_output_columns(mapping_spec: Dict[str, Any]) -> List[str]:
-    """
-    Extract output column names from target nodes.
-    """
-    nodes = mapping_spec.get("nodes", [])
-    columns = []
-    
-    for node in nodes:
-        if node.get("type") == "target":
-            prop = node.get("data", {}).get("property", node.get("property", ""))
-            if prop:
-                columns.append(prop)
-    
-    return columns
-
-
 # ==========================================
 # Lineage Query Endpoints
 # ==========================================
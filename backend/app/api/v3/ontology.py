@@ -246,7 +246,13 @@ def update_object_type_version(
     session: Session = Depends(get_session)
 ):
     """Update an object type version."""
-    ver = ontology_crud.update_object_type_ver(session, ver_id, data)
+    try:
+        ver = ontology_crud.update_object_type_ver(session, ver_id, data)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     if not ver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
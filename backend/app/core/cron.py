@@ -0,0 +1,134 @@
+"""
+Cron Expressions - Parse standard 5-field cron schedules
+MDP Platform V3.1 - Multimodal Data Governance
+
+    minute hour day-of-month month day-of-week
+    "*/15 * * * *", "0 2 * * 1-5", "30 6 1,15 * *", "@daily"
+
+Fields accept *, lists (1,15), ranges (1-5), steps (*/15, 10-50/20) and
+month / weekday names (jan, mon). Day-of-week 0 and 7 are both Sunday.
+As in Vixie cron, when both day-of-month and day-of-week are restricted
+a day matching either one fires.
+
+Schedules are evaluated in UTC, like every other timestamp on the platform.
+"""
+from datetime import datetime, timedelta
+from typing import List, Set
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_WEEKDAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+# Give up looking for a matching minute after this many years (e.g. "0 0 30 2 *")
+_MAX_YEARS = 5
+
+
+def _value(token: str, low: int, names: List[str], field: str) -> int:
+    token = token.lower()
+    if token in names:
+        return names.index(token) + low
+    if not token.isdigit():
+        raise ValueError(f"Invalid {field} value: {token!r}")
+    return int(token)
+
+
+def _parse_field(spec: str, low: int, high: int, field: str, names: List[str] = ()) -> Set[int]:
+    values: Set[int] = set()
+    for part in spec.split(","):
+        part, _, step = part.partition("/")
+        if step and (not step.isdigit() or step == "0"):
+            raise ValueError(f"Invalid {field} step: {step!r}")
+
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            first, _, last = part.partition("-")
+            start, end = _value(first, low, names, field), _value(last, low, names, field)
+        else:
+            start = end = _value(part, low, names, field)
+            if step:
+                end = high  # "5/15" = every 15 starting at 5
+
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise ValueError(f"{field} out of range {low}-{high}: {part!r}")
+        values.update(range(start, end + 1, int(step or 1)))
+    return values
+
+
+class CronExpression:
+    """
+    A parsed cron schedule.
+
+    Usage:
+        cron = CronExpression("0 2 * * *")
+        cron.next_after(datetime.utcnow())
+
+    Raises:
+        ValueError: Malformed expression
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression.strip()
+        fields = _MACROS.get(self.expression.lower(), self.expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields, got {len(fields)}: {expression!r}")
+
+        minute, hour, day, month, weekday = fields
+        self.minutes = _parse_field(minute, 0, 59, "minute")
+        self.hours = _parse_field(hour, 0, 23, "hour")
+        self.days = _parse_field(day, 1, 31, "day-of-month")
+        self.months = _parse_field(month, 1, 12, "month", _MONTHS)
+        weekdays = _parse_field(weekday, 0, 7, "day-of-week", _WEEKDAYS)
+        self.weekdays = {d % 7 for d in weekdays}  # 0 = Sunday
+
+        self._any_day = day == "*"
+        self._any_weekday = weekday == "*"
+
+    def __repr__(self) -> str:
+        return f"CronExpression({self.expression!r})"
+
+    def _day_matches(self, moment: datetime) -> bool:
+        in_days = moment.day in self.days
+        in_weekdays = (moment.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_days and in_weekdays
+        return in_days or in_weekdays
+
+    def next_after(self, moment: datetime) -> datetime:
+        """First scheduled minute strictly after moment."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate.year + _MAX_YEARS
+
+        while candidate.year <= limit:
+            if candidate.month not in self.months:
+                year, month = divmod(candidate.month, 12)
+                candidate = candidate.replace(year=candidate.year + year, month=month + 1, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+def validate_cron(expression: str) -> str:
+    """Check that a cron expression parses and fires; returns it stripped."""
+    cron = CronExpression(expression)
+    cron.next_after(datetime(2000, 1, 1))
+    return cron.expression
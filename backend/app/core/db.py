@@ -2,10 +2,14 @@
 Database connection and session management.
 MDP Platform V3.1 - Metadata-Driven Architecture
 """
+import threading
 from contextlib import contextmanager
+from typing import Dict
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine
 from app.core.config import settings
+from app.core.logger import logger
 
 # Synchronous engine for standard operations
 engine = create_engine(settings.database_url, echo=settings.DEBUG)
@@ -43,3 +47,57 @@ def init_db():
     """Initialize database tables."""
     SQLModel.metadata.create_all(engine)
 
+
+# ==========================================
+# Pooled Engine Registry (background workers)
+# ==========================================
+
+_pooled_engines: Dict[str, Engine] = {}
+_pooled_engines_lock = threading.Lock()
+
+
+def get_pooled_engine(url: str) -> Engine:
+    """
+    Get the process-wide pooled engine for a database URL.
+
+    Engines are created once per URL and shared by all callers, so workers
+    reuse pooled connections instead of opening a fresh pool per batch.
+    Do not dispose the returned engine; call dispose_pooled_engines() at
+    shutdown instead.
+    """
+    engine_ = _pooled_engines.get(url)
+    if engine_ is not None:
+        return engine_
+
+    with _pooled_engines_lock:
+        engine_ = _pooled_engines.get(url)
+        if engine_ is None:
+            kwargs = {"pool_pre_ping": True}
+            if not url.startswith("sqlite"):
+                kwargs.update(
+                    pool_size=settings.db_pool_size,
+                    max_overflow=settings.db_pool_max_overflow,
+                    pool_recycle=settings.db_pool_recycle,
+                )
+            engine_ = create_engine(url, **kwargs)
+            _pooled_engines[url] = engine_
+            logger.info(f"[DB] Created pooled engine for {engine_.url.render_as_string(hide_password=True)}")
+        return engine_
+
+
+def init_pooled_engines():
+    """Create the pooled engines used by background workers (app startup)."""
+    for url in (settings.database_url, settings.raw_store_database_url):
+        get_pooled_engine(url)
+
+
+def dispose_pooled_engines():
+    """Dispose all pooled engines and clear the registry (app shutdown)."""
+    with _pooled_engines_lock:
+        engines = list(_pooled_engines.values())
+        _pooled_engines.clear()
+
+    for engine_ in engines:
+        engine_.dispose()
+    if engines:
+        logger.info(f"[DB] Disposed {len(engines)} pooled engines")
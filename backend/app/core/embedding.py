@@ -0,0 +1,204 @@
+"""
+Embedding Encoders - Pluggable batch encoders for vector indexing
+MDP Platform V3.1 - Multimodal Data Governance
+
+Encoders turn a batch of inputs (text or image file paths) into a contiguous
+float32 matrix of shape (n, dimension). Two implementations:
+- HashEncoder: deterministic, dependency-free (tests / demo)
+- LocalModelEncoder: sentence-transformers model running on CPU (production)
+
+Select with settings.embedding_encoder ("hash" or "local").
+"""
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+# Embedding kinds used by mapping transforms
+EMBEDDING_TEXT = "text"
+EMBEDDING_IMAGE = "image"
+
+# Mapping transform -> embedding kind
+EMBEDDING_TRANSFORMS = {
+    "text_embedding": EMBEDDING_TEXT,
+    "image_embedding_clip": EMBEDDING_IMAGE,
+}
+
+
+class EmbeddingEncoder:
+    """Base class for batch embedding encoders."""
+    name: str = "base"
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    def encode(self, inputs: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Encode a batch of inputs.
+
+        Returns:
+            (matrix, valid) - float32 matrix of shape (n, dimension) and a bool
+            mask; rows with valid=False (blank or unreadable input) are zero.
+        """
+        raise NotImplementedError
+
+
+def _is_blank(value: Any) -> bool:
+    if value is None:
+        return True
+    try:
+        if pd.isna(value):
+            return True
+    except (TypeError, ValueError):
+        return False
+    return isinstance(value, str) and value == ""
+
+
+class HashEncoder(EmbeddingEncoder):
+    """
+    Deterministic hash-based encoder.
+
+    The same input always yields the same unit vector, so tests and repeated
+    indexing runs are reproducible. No semantic meaning.
+    """
+    name = "hash"
+
+    def encode(self, inputs: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = np.zeros((len(inputs), self.dimension), dtype=np.float32)
+        valid = np.zeros(len(inputs), dtype=bool)
+
+        for i, value in enumerate(inputs):
+            if _is_blank(value):
+                continue
+            seed = int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little")
+            matrix[i] = np.random.default_rng(seed).standard_normal(self.dimension, dtype=np.float32)
+            valid[i] = True
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix, valid
+
+
+class LocalModelEncoder(EmbeddingEncoder):
+    """
+    sentence-transformers model running locally on CPU.
+
+    Text inputs are encoded directly; image inputs are file paths opened
+    with Pillow (unreadable files are reported as invalid rows).
+    """
+    name = "local"
+
+    def __init__(self, model_name: str, kind: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "sentence-transformers package not installed; "
+                "set EMBEDDING_ENCODER=hash or install it to use local models"
+            ) from e
+
+        logger.info(f"[Embedding] Loading local model '{model_name}' on CPU")
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self._kind = kind
+        # CLIP models do not report a sentence embedding dimension
+        super().__init__(self._model.get_sentence_embedding_dimension() or settings.embedding_dimension)
+
+    def _load_images(self, inputs: List[Any]) -> Tuple[List[Any], np.ndarray]:
+        from PIL import Image
+
+        images = []
+        valid = np.zeros(len(inputs), dtype=bool)
+        for i, path in enumerate(inputs):
+            if _is_blank(path):
+                continue
+            try:
+                with Image.open(str(path)) as img:
+                    images.append(img.convert("RGB"))
+                valid[i] = True
+            except Exception as e:
+                logger.debug(f"[Embedding] Unreadable image {path}: {e}")
+        return images, valid
+
+    def encode(self, inputs: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        matrix = np.zeros((len(inputs), self.dimension), dtype=np.float32)
+
+        if self._kind == EMBEDDING_IMAGE:
+            items, valid = self._load_images(inputs)
+        else:
+            valid = np.array([not _is_blank(v) for v in inputs], dtype=bool)
+            items = [str(v) for v, ok in zip(inputs, valid) if ok]
+
+        if items:
+            encoded = self._model.encode(
+                items,
+                batch_size=settings.embedding_batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+            )
+            matrix[valid] = encoded.astype(np.float32, copy=False)
+
+        return matrix, valid
+
+
+# ==========================================
+# Encoder Registry
+# ==========================================
+
+_encoders: Dict[str, EmbeddingEncoder] = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder(kind: str) -> EmbeddingEncoder:
+    """Get (or lazily create) the configured encoder for an embedding kind."""
+    with _encoders_lock:
+        encoder = _encoders.get(kind)
+        if encoder is not None:
+            return encoder
+
+        if settings.embedding_encoder == "local":
+            model_name = (
+                settings.embedding_image_model if kind == EMBEDDING_IMAGE
+                else settings.embedding_text_model
+            )
+            encoder = LocalModelEncoder(model_name, kind)
+        elif settings.embedding_encoder == "hash":
+            encoder = HashEncoder(settings.embedding_dimension)
+        else:
+            raise ValueError(f"Unknown embedding encoder: {settings.embedding_encoder}")
+
+        _encoders[kind] = encoder
+        return encoder
+
+
+def set_encoder(kind: str, encoder: Optional[EmbeddingEncoder]):
+    """Override the encoder for a kind (None resets to the configured one)."""
+    with _encoders_lock:
+        if encoder is None:
+            _encoders.pop(kind, None)
+        else:
+            _encoders[kind] = encoder
+
+
+def encode_batched(
+    encoder: EmbeddingEncoder,
+    inputs: List[Any],
+    batch_size: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode inputs in micro-batches into one contiguous float32 matrix.
+    """
+    batch_size = batch_size or settings.embedding_batch_size
+    matrix = np.zeros((len(inputs), encoder.dimension), dtype=np.float32)
+    valid = np.zeros(len(inputs), dtype=bool)
+
+    for start in range(0, len(inputs), batch_size):
+        end = start + batch_size
+        matrix[start:end], valid[start:end] = encoder.encode(inputs[start:end])
+
+    return matrix, valid
@@ -0,0 +1,642 @@
+"""
+Quantized Vector Store - Reduced-precision vector collections with re-scoring
+MDP Platform V3.1 - Multimodal Data Governance
+
+ChromaDB keeps every vector as float32 in its in-memory HNSW index, and
+the embedded client has no reduced-precision option. Object types whose
+vector_storage is FLOAT16 or INT8 keep their vectors in a collection of
+this module instead (vector_store routes to it by collection name):
+
+- codes.bin: float16 values, or int8 codes with one float32 scale per
+  vector (x ~= code * scale, scale = max|x| / 127) - 1/2 or 1/4 of float32
+- scales.bin: scale per slot (0 = free slot)
+- rescore.bin: float16 copy of INT8 vectors, read only to re-score search
+  candidates (FLOAT16 collections keep no copy)
+- lists.bin / centroids.npy: IVF index - k-means centroids and the list
+  (nearest centroid) of each slot
+- index.db: instance ID -> slot (SQLite)
+
+Vectors are L2-normalized on write, so cosine similarity is a dot product.
+A search scores the codes of the settings.vector_ivf_nprobe lists nearest
+to the query (every code while the collection is smaller than
+settings.vector_ivf_min_rows). INT8 searches keep top_k * oversample
+candidates and re-score only those rows with their float16 vectors;
+FLOAT16 codes are already float16, so their scan scores are final.
+Distances are cosine distances, as in the Chroma collections.
+
+No float32 copy is kept: re-scoring is float16, not full precision, and
+get() / iter_vectors() return float16-precision vectors. Moving a type
+back to FLOAT32 storage therefore does not restore the original vectors.
+
+Searches take the collection lock only to snapshot it and to map the
+result slots to IDs; the scan runs while writes go on. Writes assign new
+vectors to their list and queue their slots until the inverted lists are
+rebuilt; the centroids are re-trained in a background thread once the
+collection has grown _IVF_RETRAIN_GROWTH times. Like embedded ChromaDB, a
+collection is written by one process at a time.
+"""
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+# Vector storage options (ObjectTypeVer.vector_storage)
+STORAGE_FLOAT32 = "FLOAT32"  # ChromaDB collection, full precision
+STORAGE_FLOAT16 = "FLOAT16"
+STORAGE_INT8 = "INT8"  # Scalar quantization with a per-vector scale
+VECTOR_STORAGES = (STORAGE_FLOAT32, STORAGE_FLOAT16, STORAGE_INT8)
+
+_CODE_DTYPES = {STORAGE_FLOAT16: np.float16, STORAGE_INT8: np.int8}
+
+_INITIAL_CAPACITY = 1024
+_ID_BATCH_SIZE = 500  # IDs per SQLite IN (...) lookup
+
+_IVF_TRAIN_ROWS_PER_LIST = 64  # k-means sample size per list
+_IVF_TRAIN_ITERATIONS = 10
+_IVF_RETRAIN_GROWTH = 4  # Re-train once the collection is this many times its size at training
+_IVF_PENDING_SHARE = 0.1  # Rebuild the inverted lists once this share of slots was written since
+_IVF_MIN_PENDING = 1024
+
+
+def normalize_storage(storage: Optional[str]) -> str:
+    """Validated storage option (None -> FLOAT32)."""
+    value = (storage or STORAGE_FLOAT32).upper()
+    if value not in VECTOR_STORAGES:
+        raise ValueError(f"Unknown vector storage '{storage}', expected one of {VECTOR_STORAGES}")
+    return value
+
+
+def quantize(matrix: np.ndarray, storage: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantize the rows of a float matrix.
+
+    Returns: (codes, scales); dequantize as codes * scales[:, None]
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if storage == STORAGE_FLOAT16:
+        return matrix.astype(np.float16), np.ones(len(matrix), dtype=np.float32)
+    if storage == STORAGE_INT8:
+        scales = np.abs(matrix).max(axis=1) / 127.0 if matrix.size else np.zeros(len(matrix), dtype=np.float32)
+        # Zero vectors keep a non-zero scale (0 marks a free slot)
+        scales = np.maximum(scales, np.finfo(np.float32).tiny).astype(np.float32)
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+    raise ValueError(f"Storage {storage} is not quantized")
+
+
+def dequantize(codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Float32 approximation of quantized rows."""
+    return codes.astype(np.float32) * scales[:, None]
+
+
+def code_bytes(storage: str, dimension: int) -> int:
+    """Bytes scanned per vector of a quantized collection (codes + scale)."""
+    return dimension * np.dtype(_CODE_DTYPES[storage]).itemsize + 4
+
+
+def rescore_bytes(storage: str, dimension: int) -> int:
+    """Bytes of the float16 re-scoring copy per vector (INT8 only)."""
+    return dimension * 2 if storage == STORAGE_INT8 else 0
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+# ==========================================
+# IVF Index
+# ==========================================
+
+def _nearest_lists(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """List (nearest centroid by dot product) of each row."""
+    if len(matrix) == 0:
+        return np.empty(0, dtype=np.int32)
+    return np.argmax(matrix @ centroids.T, axis=1).astype(np.int32)
+
+
+def _train_centroids(sample: np.ndarray, n_lists: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means over normalized rows; empty lists are re-seeded from the sample."""
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(_IVF_TRAIN_ITERATIONS):
+        labels = _nearest_lists(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_lists)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        sums = np.zeros_like(centroids)
+        filled = counts > 0
+        sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+        sums[~filled] = sample[rng.choice(len(sample), int((~filled).sum()))]
+        centroids = _normalize_rows(sums).astype(np.float32)
+    return centroids
+
+
+def _build_inverted(lists: np.ndarray, n_lists: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(slots ordered by list, offset of each list's first slot + end)."""
+    order = np.argsort(lists, kind="stable").astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(lists, minlength=n_lists))]).astype(np.int64)
+    return order, offsets
+
+
+# ==========================================
+# Collection
+# ==========================================
+
+class QuantizedCollection:
+    """
+    One quantized vector collection on disk.
+
+    Args:
+        path: Collection directory
+        storage / dimension: Required to create a new collection; read from
+            the collection otherwise
+    """
+
+    def __init__(self, path: Path, storage: Optional[str] = None, dimension: Optional[int] = None):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self._index_lock = threading.Lock()  # One index build at a time
+
+        is_new = not (self.path / "index.db").exists()
+        if is_new and (storage is None or dimension is None):
+            raise FileNotFoundError(f"Quantized collection not found: {self.path}")
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path / "index.db"), check_same_thread=False)
+        if is_new:
+            with self._db:
+                self._db.execute("CREATE TABLE vectors (id TEXT PRIMARY KEY, slot INTEGER NOT NULL)")
+                self._db.execute("CREATE TABLE free_slots (slot INTEGER PRIMARY KEY)")
+                self._db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._set_meta(storage=normalize_storage(storage), dimension=int(dimension), next_slot=0, capacity=0)
+
+        meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+        self.storage = json.loads(meta["storage"])
+        self.dimension = json.loads(meta["dimension"])
+        self._next_slot = json.loads(meta["next_slot"])
+        self._capacity = json.loads(meta["capacity"])
+        self._ivf_rows = json.loads(meta.get("ivf_rows", "0"))  # Slots in use when the centroids were trained
+        self._open_arrays()
+        self._drop_float32_copy()
+
+        # IVF index: slots written since the inverted lists were built are scanned as pending
+        self._centroids: Optional[np.ndarray] = None
+        self._inverted: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._pending: List[int] = []
+        self._training = False
+        centroids_path = self.path / "centroids.npy"
+        if centroids_path.exists():
+            self._centroids = np.load(centroids_path)
+            self._inverted = _build_inverted(np.array(self._lists[:self._next_slot]), len(self._centroids))
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def _set_meta(self, **values):
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in values.items()]
+            )
+
+    def _open_arrays(self):
+        def open_file(file_name: str, dtype, shape) -> Optional[np.memmap]:
+            file_path = self.path / file_name
+            nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(file_path, "ab") as f:
+                if f.tell() < nbytes:
+                    f.truncate(nbytes)
+            return np.memmap(file_path, dtype=dtype, mode="r+", shape=shape) if nbytes else None
+
+        capacity = self._capacity
+        self._codes = open_file("codes.bin", _CODE_DTYPES[self.storage], (capacity, self.dimension))
+        self._scales = open_file("scales.bin", np.float32, (capacity,))
+        self._lists = open_file("lists.bin", np.int32, (capacity,))
+        self._rescore = None
+        if self.storage == STORAGE_INT8:
+            self._rescore = open_file("rescore.bin", np.float16, (capacity, self.dimension))
+
+    def _drop_float32_copy(self):
+        """Collections written before rescore.bin kept a float32 copy (full.bin); convert it once."""
+        full_path = self.path / "full.bin"
+        if not full_path.exists():
+            return
+        if self._rescore is not None:
+            full = np.memmap(full_path, dtype=np.float32, mode="r", shape=(self._capacity, self.dimension))
+            block_rows = max(1, settings.vector_scan_block_rows)
+            for start in range(0, self._next_slot, block_rows):
+                end = min(self._next_slot, start + block_rows)
+                self._rescore[start:end] = full[start:end]
+            self._rescore.flush()
+            del full
+        full_path.unlink()
+        logger.info(f"[QuantizedVectors] Collection '{self.name}': replaced the float32 copy with float16 re-scoring vectors")
+
+    def _stored_vectors(self) -> Optional[np.ndarray]:
+        """Most precise copy of the vectors: the float16 re-scoring copy, or the FLOAT16 codes."""
+        return self._rescore if self.storage == STORAGE_INT8 else self._codes
+
+    def _flush(self):
+        for array in (self._codes, self._scales, self._lists, self._rescore):
+            if array is not None:
+                array.flush()
+
+    def _grow(self, needed: int):
+        if needed <= self._capacity:
+            return
+        capacity = max(_INITIAL_CAPACITY, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        self._flush()
+        self._codes = self._scales = self._lists = self._rescore = None
+        self._capacity = capacity
+        self._open_arrays()
+        self._set_meta(capacity=capacity)
+
+    def _slots_of(self, ids: List[str]) -> Dict[str, int]:
+        slots = {}
+        for start in range(0, len(ids), _ID_BATCH_SIZE):
+            batch = ids[start:start + _ID_BATCH_SIZE]
+            rows = self._db.execute(
+                f"SELECT id, slot FROM vectors WHERE id IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            slots.update(rows)
+        return slots
+
+    def count(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def upsert(self, ids: List[str], matrix: np.ndarray) -> int:
+        """Insert or replace the vectors of some IDs (row i of matrix is ids[i])."""
+        if not ids:
+            return 0
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.shape != (len(ids), self.dimension):
+            raise ValueError(f"Expected a ({len(ids)}, {self.dimension}) matrix, got {matrix.shape}")
+
+        # Last row of a repeated ID wins
+        rows = {instance_id: i for i, instance_id in enumerate(ids)}
+        ids = list(rows)
+        matrix = _normalize_rows(matrix[list(rows.values())])
+        codes, scales = quantize(matrix, self.storage)
+
+        with self._lock:
+            slots = self._slots_of(ids)
+            new_ids = [instance_id for instance_id in ids if instance_id not in slots]
+            if new_ids:
+                free = [row[0] for row in self._db.execute(
+                    "SELECT slot FROM free_slots ORDER BY slot LIMIT ?", (len(new_ids),)
+                ).fetchall()]
+                fresh = list(range(self._next_slot, self._next_slot + len(new_ids) - len(free)))
+                self._grow(self._next_slot + len(fresh))
+                slots.update(zip(new_ids, free + fresh))
+                self._next_slot += len(fresh)
+
+            targets = np.array([slots[instance_id] for instance_id in ids], dtype=np.int64)
+            self._codes[targets] = codes
+            self._scales[targets] = scales
+            if self._rescore is not None:
+                self._rescore[targets] = matrix
+            if self._centroids is not None:
+                self._lists[targets] = _nearest_lists(matrix, self._centroids)
+            if self._centroids is not None or self._training:
+                self._pending.extend(targets.tolist())
+            self._flush()
+
+            # Vectors are on disk before the IDs point at them
+            with self._db:
+                if new_ids:
+                    self._db.executemany("DELETE FROM free_slots WHERE slot = ?", [(slots[i],) for i in new_ids])
+                    self._db.executemany("INSERT INTO vectors (id, slot) VALUES (?, ?)", [(i, slots[i]) for i in new_ids])
+                self._db.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('next_slot', ?)", (json.dumps(self._next_slot),)
+                )
+        return len(ids)
+
+    def delete(self, ids: List[str]) -> int:
+        """Delete the vectors of some IDs; returns how many existed."""
+        with self._lock:
+            slots = self._slots_of(list(ids))
+            if not slots:
+                return 0
+            with self._db:
+                self._db.executemany("DELETE FROM vectors WHERE id = ?", [(i,) for i in slots])
+                self._db.executemany("INSERT OR IGNORE INTO free_slots (slot) VALUES (?)", [(s,) for s in slots.values()])
+            self._scales[np.array(list(slots.values()), dtype=np.int64)] = 0
+            self._flush()
+            return len(slots)
+
+    def get(self, ids: List[str]) -> Tuple[List[str], np.ndarray]:
+        """Float16-precision vectors of the IDs that exist (normalized)."""
+        with self._lock:
+            slots = self._slots_of(list(ids))
+            found = [instance_id for instance_id in ids if instance_id in slots]
+            if not found:
+                return [], np.empty((0, self.dimension), dtype=np.float32)
+            return found, self._stored_vectors()[[slots[i] for i in found]].astype(np.float32)
+
+    def iter_vectors(self, batch_size: int = 10000) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """All (ids, float16-precision matrix) of the collection, in batches."""
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT id, slot FROM vectors WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+                if not rows:
+                    return
+                matrix = self._stored_vectors()[[slot for _, slot in rows]].astype(np.float32)
+            last_id = rows[-1][0]
+            yield [instance_id for instance_id, _ in rows], matrix
+
+    # ==========================================
+    # IVF Index
+    # ==========================================
+
+    def _index_due(self, used: int) -> bool:
+        """Whether the IVF index should be trained, re-trained or rebuilt (call with the lock held)."""
+        if self._centroids is None:
+            return used >= settings.vector_ivf_min_rows
+        if used >= self._ivf_rows * _IVF_RETRAIN_GROWTH:
+            return True
+        return len(self._pending) > max(_IVF_MIN_PENDING, _IVF_PENDING_SHARE * used)
+
+    def _start_index_build(self):
+        if self._index_lock.locked():
+            return
+        threading.Thread(target=self.build_index, name=f"ivf-{self.name}", daemon=True).start()
+
+    def build_index(self) -> bool:
+        """
+        Train, re-train or rebuild the IVF index if due. Runs beside writes
+        and searches; returns False if nothing was due or a build is running.
+        """
+        if not self._index_lock.acquire(blocking=False):
+            return False
+        try:
+            with self._lock:
+                used = self._next_slot
+                if self._codes is None or not self._index_due(used):
+                    return False
+                retrain = self._centroids is None or used >= self._ivf_rows * _IVF_RETRAIN_GROWTH
+            if retrain:
+                self._train_index()
+            else:
+                self._rebuild_inverted()
+            return True
+        except Exception as e:
+            logger.warning(f"[QuantizedVectors] IVF index build of '{self.name}' failed: {e}")
+            return False
+        finally:
+            self._index_lock.release()
+
+    def _decode(self, codes: np.ndarray, scales: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        return dequantize(codes[slots], np.asarray(scales[slots]))
+
+    def _train_index(self):
+        """k-means over a sample of the codes, then assign every slot to its nearest centroid."""
+        with self._lock:
+            used = self._next_slot
+            codes, scales = self._codes, self._scales
+            self._training = True
+            written_from = len(self._pending)
+
+        live = np.flatnonzero(np.asarray(scales[:used]) > 0)
+        n_lists = settings.vector_ivf_lists or int(np.sqrt(len(live)))
+        n_lists = max(1, min(n_lists, len(live)))
+        rng = np.random.default_rng(0)
+        sample_size = min(len(live), n_lists * _IVF_TRAIN_ROWS_PER_LIST)
+        sample = np.sort(rng.choice(live, sample_size, replace=False))
+        centroids = _train_centroids(_normalize_rows(self._decode(codes, scales, sample)), n_lists)
+
+        lists = np.empty(used, dtype=np.int32)
+        block_rows = max(1, settings.vector_scan_block_rows)
+        for start in range(0, used, block_rows):
+            block = np.arange(start, min(used, start + block_rows))
+            lists[block] = _nearest_lists(self._decode(codes, scales, block), centroids)
+        inverted = _build_inverted(lists, n_lists)
+
+        np.save(self.path / "centroids.tmp.npy", centroids)
+        with self._lock:
+            # Slots written during training were assigned with the old centroids (if any)
+            written = np.unique(np.array(self._pending[written_from:], dtype=np.int64))
+            self._lists[:used] = lists
+            if len(written):
+                self._lists[written] = _nearest_lists(
+                    _normalize_rows(self._decode(self._codes, self._scales, written)), centroids
+                )
+            self._lists.flush()
+            os.replace(self.path / "centroids.tmp.npy", self.path / "centroids.npy")
+            self._centroids, self._inverted = centroids, inverted
+            self._pending = written.tolist()
+            self._ivf_rows = used
+            self._training = False
+            self._set_meta(ivf_rows=used)
+        logger.info(f"[QuantizedVectors] Trained IVF index of '{self.name}': {n_lists} lists over {len(live)} vectors")
+
+    def _rebuild_inverted(self):
+        """Fold the pending slots into the inverted lists."""
+        with self._lock:
+            lists = np.array(self._lists[:self._next_slot])
+            merged = len(self._pending)
+            n_lists = len(self._centroids)
+        inverted = _build_inverted(lists, n_lists)
+        with self._lock:
+            self._inverted = inverted
+            del self._pending[:merged]
+
+    def _probe(self, query: np.ndarray, centroids: np.ndarray, inverted, lists, pending: np.ndarray) -> np.ndarray:
+        """Slots of the nprobe lists nearest to the query, sorted (pending slots included)."""
+        order, offsets = inverted
+        nprobe = max(1, min(settings.vector_ivf_nprobe, len(centroids)))
+        probed = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        parts = [order[offsets[i]:offsets[i + 1]] for i in probed]
+        if len(pending):
+            parts.append(pending[np.isin(np.asarray(lists[pending]), probed)])
+        # A rewritten slot may also sit in its old list until the next rebuild
+        return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def search(self, query_vector, top_k: int = 10, oversample: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Nearest vectors by cosine distance.
+
+        Codes of the probed IVF lists (of every slot below
+        settings.vector_ivf_min_rows) are scored. INT8 collections keep
+        top_k * oversample candidates, which are then re-scored with their
+        float16 vectors; FLOAT16 scan scores need no re-scoring.
+
+        Returns: [(id, distance)] nearest first
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query has dimension {query.shape[0]}, collection has {self.dimension}")
+        norm = np.linalg.norm(query)
+        query = query / norm if norm > 0 else query
+        n_candidates = top_k
+        if self.storage == STORAGE_INT8:
+            n_candidates = max(top_k, top_k * (oversample or settings.vector_rescore_oversample))
+        block_rows = max(1, settings.vector_scan_block_rows)
+
+        with self._lock:
+            used = self._next_slot
+            codes, scales, lists, rescore = self._codes, self._scales, self._lists, self._rescore
+            centroids, inverted = self._centroids, self._inverted
+            pending = np.array(self._pending, dtype=np.int64)
+            if self._index_due(used):
+                self._start_index_build()
+
+        # The scan runs outside the lock; writes go on meanwhile
+        if centroids is None or inverted is None:
+            slots = np.arange(used, dtype=np.int64)
+        else:
+            slots = self._probe(query, centroids, inverted, lists, pending)
+
+        best_scores = np.empty(0, dtype=np.float32)
+        best_slots = np.empty(0, dtype=np.int64)
+        for start in range(0, len(slots), block_rows):
+            block = slots[start:start + block_rows]
+            block_scales = np.asarray(scales[block])
+            scores = (codes[block].astype(np.float32) @ query) * block_scales
+            scores[block_scales == 0] = -np.inf
+            best_scores = np.concatenate([best_scores, scores])
+            best_slots = np.concatenate([best_slots, block])
+            if len(best_scores) > n_candidates:
+                keep = np.argpartition(-best_scores, n_candidates - 1)[:n_candidates]
+                best_scores, best_slots = best_scores[keep], best_slots[keep]
+
+        found = np.isfinite(best_scores)
+        candidates, exact = best_slots[found], best_scores[found]
+        if len(candidates) == 0:
+            return []
+
+        if rescore is not None:
+            # Re-score: float16 vectors for the candidates only
+            candidates = np.sort(candidates)
+            exact = rescore[candidates].astype(np.float32) @ query
+        order = np.argsort(-exact)[:top_k]
+        chosen = [int(s) for s in candidates[order]]
+        slot_ids = {}
+        with self._lock:
+            for start in range(0, len(chosen), _ID_BATCH_SIZE):
+                batch = chosen[start:start + _ID_BATCH_SIZE]
+                slot_ids.update((slot, instance_id) for instance_id, slot in self._db.execute(
+                    f"SELECT id, slot FROM vectors WHERE slot IN ({','.join('?' * len(batch))})", batch
+                ).fetchall())
+
+        return [(slot_ids[slot], float(1.0 - exact[i])) for slot, i in zip(chosen, order) if slot in slot_ids]
+
+    def stats(self) -> Dict[str, object]:
+        count = self.count()
+        return {
+            "row_count": count,
+            "name": self.name,
+            "metadata": {
+                "dimension": self.dimension,
+                "vector_storage": self.storage,
+                "code_bytes": count * code_bytes(self.storage, self.dimension),
+                "rescore_bytes": count * rescore_bytes(self.storage, self.dimension),
+                "full_precision_bytes": count * self.dimension * 4,
+                "ivf_lists": 0 if self._centroids is None else len(self._centroids),
+            },
+        }
+
+    def close(self):
+        with self._index_lock, self._lock:
+            self._flush()
+            self._codes = self._scales = self._lists = self._rescore = None
+            self._db.close()
+
+
+# ==========================================
+# Collection Registry
+# ==========================================
+
+_collections: Dict[str, QuantizedCollection] = {}
+_collections_lock = threading.Lock()
+
+
+def quantized_root() -> Path:
+    return Path(settings.chroma_db_path) / "quantized"
+
+
+def get_quantized_collection(
+    name: str,
+    storage: Optional[str] = None,
+    dimension: Optional[int] = None
+) -> Optional[QuantizedCollection]:
+    """
+    Open a quantized collection; created when storage and dimension are given.
+
+    Returns: None if the collection does not exist (and is not created)
+    """
+    with _collections_lock:
+        collection = _collections.get(name)
+        if collection is not None:
+            return collection
+        path = quantized_root() / name
+        if not (path / "index.db").exists() and storage is None:
+            return None
+        collection = QuantizedCollection(path, storage=storage, dimension=dimension)
+        _collections[name] = collection
+        if storage is not None:
+            logger.info(f"[QuantizedVectors] Collection '{name}' ready ({collection.storage}, dim {collection.dimension})")
+        return collection
+
+
+def drop_quantized_collection(name: str) -> bool:
+    """Delete a quantized collection; False if it did not exist."""
+    with _collections_lock:
+        collection = _collections.pop(name, None)
+        if collection is not None:
+            collection.close()
+        path = quantized_root() / name
+        if not path.exists():
+            return False
+        shutil.rmtree(path)
+        logger.info(f"[QuantizedVectors] Dropped collection '{name}'")
+        return True
+
+
+def convert_quantized_collection(name: str, storage: str) -> QuantizedCollection:
+    """Re-encode a quantized collection with another storage option (from its re-scoring vectors)."""
+    storage = normalize_storage(storage)
+    if storage == STORAGE_FLOAT32:
+        raise ValueError("FLOAT32 vectors are stored in ChromaDB")
+    source = get_quantized_collection(name)
+    if source is None:
+        raise FileNotFoundError(f"Quantized collection not found: {name}")
+
+    path = quantized_root() / name
+    staging_path = quantized_root() / f"{name}.converting"
+    if staging_path.exists():
+        shutil.rmtree(staging_path)
+    staging = QuantizedCollection(staging_path, storage=storage, dimension=source.dimension)
+    for ids, matrix in source.iter_vectors():
+        staging.upsert(ids, matrix)
+    staging.close()
+
+    with _collections_lock:
+        _collections.pop(name, None)
+        source.close()
+        shutil.rmtree(path)
+        staging_path.rename(path)
+    logger.info(f"[QuantizedVectors] Converted collection '{name}' from {source.storage} to {storage}")
+    return get_quantized_collection(name)
+
+
+def list_quantized_collections() -> List[str]:
+    root = quantized_root()
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / "index.db").exists())
@@ -4,15 +4,28 @@ MDP Platform V3.1 - Multimodal Data Governance
 
 Provides serverless vector storage for unstructured data embeddings.
 Migrated from Milvus to ChromaDB for better Windows compatibility.
+
+Object types with a FLOAT16 or INT8 vector_storage keep their vectors in a
+quantized collection (quantized_vectors.py) under the same name; every
+function below routes by collection name.
 """
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
+import numpy as np
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 
 from app.core.logger import logger
 from app.core.config import settings
+from app.core.quantized_vectors import (
+    STORAGE_FLOAT32,
+    drop_quantized_collection,
+    get_quantized_collection,
+    convert_quantized_collection,
+    list_quantized_collections,
+    normalize_storage,
+)
 
 # Initialize ChromaDB client as None (lazy loading)
 chroma_client: Optional[chromadb.PersistentClient] = None
@@ -34,38 +47,93 @@ def get_chroma_client() -> chromadb.PersistentClient:
     return chroma_client
 
 
+def object_collection_name(object_type_id: str) -> str:
+    """Collection name for an object type (ChromaDB requires alphanumeric + underscore)."""
+    return f"obj_{object_type_id.replace('-', '_')}"
+
+
 def ensure_object_collection(
     object_type_id: str, 
-    dimension: int = 768
+    dimension: int = 768,
+    storage: str = STORAGE_FLOAT32
 ) -> str:
     """
     Ensure a vector collection exists for an object type.
     
+    If the object type's vectors are stored with another storage option,
+    they are moved to the new collection first. Quantized collections keep
+    float16 precision at best, so vectors moved back to FLOAT32 stay
+    float16-precision until the object type is re-indexed.
+    
     Args:
         object_type_id: The ontology object type ID (used as collection name prefix)
         dimension: Vector dimension (default 768 for CLIP/BERT embeddings)
+        storage: FLOAT32 (ChromaDB), FLOAT16 or INT8 (quantized collection)
     
     Returns:
         Collection name
     """
+    storage = normalize_storage(storage)
     client = get_chroma_client()
     
-    # Sanitize collection name (ChromaDB requires alphanumeric + underscore)
-    collection_name = f"obj_{object_type_id.replace('-', '_')}"
+    collection_name = object_collection_name(object_type_id)
+    quantized = get_quantized_collection(collection_name)
     
-    # Get or create collection with cosine similarity
-    collection = client.get_or_create_collection(
-        name=collection_name,
-        metadata={"hnsw:space": "cosine", "dimension": dimension}
-    )
+    if storage == STORAGE_FLOAT32:
+        # Get or create collection with cosine similarity
+        collection = client.get_or_create_collection(
+            name=collection_name,
+            metadata={"hnsw:space": "cosine", "dimension": dimension}
+        )
+        if quantized is not None:
+            _move_quantized_to_chroma(quantized, collection)
+    elif quantized is None:
+        quantized = get_quantized_collection(collection_name, storage=storage, dimension=dimension)
+        _move_chroma_to_quantized(client, collection_name, quantized)
+    elif quantized.storage != storage:
+        convert_quantized_collection(collection_name, storage)
     
     logger.debug(f"[VectorStore] Collection '{collection_name}' ready")
     return collection_name
 
 
+def _move_quantized_to_chroma(quantized, collection):
+    """Move the vectors of a quantized collection into a Chroma collection, then drop it."""
+    moved = 0
+    for ids, matrix in quantized.iter_vectors():
+        collection.upsert(ids=ids, embeddings=matrix)
+        moved += len(ids)
+    drop_quantized_collection(quantized.name)
+    logger.warning(
+        f"[VectorStore] Moved {moved} vectors of '{collection.name}' to FLOAT32 storage "
+        f"(float16 precision; re-index to restore full precision)"
+    )
+
+
+def _move_chroma_to_quantized(client, collection_name: str, quantized, batch_size: int = 10000):
+    """Move the vectors of a Chroma collection (if any) into a quantized collection, then drop it."""
+    try:
+        collection = client.get_collection(name=collection_name)
+    except Exception:
+        return
+    
+    moved = 0
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+        if not page["ids"]:
+            break
+        quantized.upsert(page["ids"], np.asarray(page["embeddings"], dtype=np.float32))
+        moved += len(page["ids"])
+        offset += len(page["ids"])
+    client.delete_collection(name=collection_name)
+    logger.info(f"[VectorStore] Moved {moved} vectors of '{collection_name}' to {quantized.storage} storage")
+
+
 def upsert_vectors(
     collection_name: str, 
-    data: List[Dict[str, Any]]
+    data: List[Dict[str, Any]],
+    embeddings: Optional[np.ndarray] = None
 ) -> int:
     """
     Insert or update vectors in a collection.
@@ -74,6 +142,8 @@ def upsert_vectors(
         collection_name: Target collection
         data: List of dicts with 'id' and 'vector' keys
               e.g., [{"id": "uuid-1", "vector": [0.1, 0.2, ...]}]
+        embeddings: Optional float32 matrix (len(data), dimension). When given,
+              row i is the vector of data[i] and items only need 'id'.
     
     Returns:
         Number of vectors upserted
@@ -81,28 +151,41 @@ def upsert_vectors(
     if not data:
         return 0
     
+    if embeddings is not None and len(embeddings) != len(data):
+        raise ValueError("embeddings must have one row per item")
+    
+    quantized = get_quantized_collection(collection_name)
+    if quantized is not None:
+        # Quantized collections hold vectors only (no metadata)
+        if embeddings is None:
+            embeddings = np.asarray([item["vector"] for item in data], dtype=np.float32)
+        count = quantized.upsert([item["id"] for item in data], embeddings)
+        logger.info(f"[VectorStore] Upserted {count} {quantized.storage} vectors to '{collection_name}'")
+        return count
+    
     client = get_chroma_client()
     collection = client.get_or_create_collection(name=collection_name)
     
     # Prepare data for ChromaDB
     ids = []
-    embeddings = []
+    vectors = []
     metadatas = []
     
     for item in data:
-        if "id" not in item or "vector" not in item:
+        if "id" not in item or (embeddings is None and "vector" not in item):
             raise ValueError("Each item must have 'id' and 'vector' keys")
         ids.append(item["id"])
-        embeddings.append(item["vector"])
+        if embeddings is None:
+            vectors.append(item["vector"])
         # Include any additional metadata
         metadata = {k: v for k, v in item.items() if k not in ("id", "vector")}
         metadatas.append(metadata if metadata else {})
     
-    # Upsert to ChromaDB
+    # Upsert to ChromaDB (it rejects empty metadata dicts)
     collection.upsert(
         ids=ids,
-        embeddings=embeddings,
-        metadatas=metadatas
+        embeddings=embeddings if embeddings is not None else vectors,
+        metadatas=metadatas if any(metadatas) else None
     )
     
     logger.info(f"[VectorStore] Upserted {len(ids)} vectors to '{collection_name}'")
@@ -126,7 +209,19 @@ def search_vectors(
     
     Returns:
         List of results with id, distance, and metadata
+    
+    Quantized collections are searched on their codes (INT8 candidates are
+    re-scored with float16 vectors); they have no metadata, so no filter.
     """
+    quantized = get_quantized_collection(collection_name)
+    if quantized is not None:
+        if filter_expr:
+            raise ValueError(f"Collection '{collection_name}' is quantized and does not support metadata filters")
+        return [
+            {"id": doc_id, "distance": distance}
+            for doc_id, distance in quantized.search(query_vector, top_k=top_k)
+        ]
+    
     client = get_chroma_client()
     
     try:
@@ -176,6 +271,12 @@ def delete_vectors(collection_name: str, ids: List[str]) -> int:
     if not ids:
         return 0
     
+    quantized = get_quantized_collection(collection_name)
+    if quantized is not None:
+        deleted = quantized.delete(ids)
+        logger.info(f"[VectorStore] Deleted {deleted} vectors from '{collection_name}'")
+        return deleted
+    
     client = get_chroma_client()
     
     try:
@@ -198,6 +299,9 @@ def drop_collection(collection_name: str) -> bool:
     Returns:
         True if dropped, False if didn't exist
     """
+    if drop_quantized_collection(collection_name):
+        return True
+    
     client = get_chroma_client()
     
     try:
@@ -215,6 +319,10 @@ def get_collection_stats(collection_name: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dict with count, etc. or None if collection doesn't exist
     """
+    quantized = get_quantized_collection(collection_name)
+    if quantized is not None:
+        return quantized.stats()
+    
     client = get_chroma_client()
     
     try:
@@ -237,7 +345,7 @@ def list_collections() -> List[str]:
     """
     client = get_chroma_client()
     collections = client.list_collections()
-    return [c.name for c in collections]
+    return [c.name for c in collections] + list_quantized_collections()
 
 
 # Backward compatibility aliases
@@ -0,0 +1,232 @@
+"""
+Arrow Batches - Columnar chunks for sync jobs
+MDP Platform V3.1 - Multimodal Data Governance
+
+Sync jobs used to pull pandas chunks (one Python object per string cell
+in object columns), rename columns and add _sync_timestamp on the frame,
+and write with to_sql, which turns every row back into a dict. For the
+string-heavy tables we sync that is most of the job's time.
+
+Here the rows fetched from the source cursor are converted once, column
+by column, into a pyarrow.RecordBatch (source_reader build=rows_to_record_batch):
+
+- renaming columns only relabels the schema (the buffers are shared)
+- _sync_timestamp is one constant column appended to the batch
+- the batch is loaded with a single executemany of its columns, which
+  pymysql sends as multi-row INSERT statements, into every target
+  database from the same converted rows (fan_out_record_batch)
+
+Cell values keep the types pandas would have given them: DECIMAL becomes
+float, anything Arrow cannot hold as a plain column (mixed types, TIME,
+JSON objects) is stored as its string form. Target tables get the same
+column types to_sql would have created.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import pyarrow as pa
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    inspect as sa_inspect,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeEngine
+
+from app.core.logger import logger
+from app.engine.bulk_writer import delete_by_keys
+
+
+SYNC_TIMESTAMP_COLUMN = "_sync_timestamp"
+
+
+def _is_plain(data_type: pa.DataType) -> bool:
+    """Types loaded as they are (everything else is stored as text)."""
+    return (
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_boolean(data_type)
+        or pa.types.is_timestamp(data_type)
+        or pa.types.is_date(data_type)
+        or pa.types.is_string(data_type)
+        or pa.types.is_large_string(data_type)
+        or pa.types.is_binary(data_type)
+        or pa.types.is_large_binary(data_type)
+        or pa.types.is_null(data_type)
+    )
+
+
+def _column_array(values: List[Any]) -> pa.Array:
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        array = None
+
+    if array is not None and pa.types.is_decimal(array.type):
+        # Same as read_sql(coerce_float=True)
+        return array.cast(pa.float64())
+    if array is not None and _is_plain(array.type):
+        return array
+    return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def rows_to_record_batch(rows: List[Any], columns: List[str]) -> pa.RecordBatch:
+    """Record batch of fetched cursor rows (source_reader chunk builder)."""
+    if not rows:
+        return pa.RecordBatch.from_arrays([pa.array([], type=pa.null()) for _ in columns], names=columns)
+    return pa.RecordBatch.from_arrays([_column_array(list(values)) for values in zip(*rows)], names=columns)
+
+
+def standardize_batch(batch: pa.RecordBatch, sync_timestamp: Optional[datetime] = None) -> pa.RecordBatch:
+    """
+    Lowercase the column names and append _sync_timestamp.
+
+    The source columns are not copied.
+    """
+    timestamp = pa.scalar(sync_timestamp or datetime.utcnow(), type=pa.timestamp("us"))
+    names = [name.lower() for name in batch.schema.names]
+    return pa.RecordBatch.from_arrays(
+        list(batch.columns) + [pa.repeat(timestamp, batch.num_rows)],
+        names=names + [SYNC_TIMESTAMP_COLUMN],
+    )
+
+
+# ==========================================
+# Loading
+# ==========================================
+
+def arrow_sql_types(schema: pa.Schema) -> Dict[str, TypeEngine]:
+    """SQL column types for a batch schema (the types to_sql would have chosen)."""
+    types = {}
+    for field in schema:
+        data_type = field.type
+        if pa.types.is_integer(data_type):
+            types[field.name] = BigInteger()
+        elif pa.types.is_floating(data_type):
+            types[field.name] = Float(precision=53)
+        elif pa.types.is_boolean(data_type):
+            types[field.name] = Boolean()
+        elif pa.types.is_timestamp(data_type):
+            types[field.name] = DateTime()
+        elif pa.types.is_date(data_type):
+            types[field.name] = Date()
+        elif pa.types.is_binary(data_type) or pa.types.is_large_binary(data_type):
+            types[field.name] = LargeBinary()
+        else:
+            types[field.name] = Text()
+    return types
+
+
+def create_table_for_batch(
+    engine: Engine,
+    table_name: str,
+    batch: pa.RecordBatch,
+    replace: bool = False,
+    key_column: Optional[str] = None
+):
+    """
+    Create table_name with the batch's columns (dropped first if replace, kept if it exists otherwise).
+
+    key_column becomes the primary key, so later batches can be upserted.
+    """
+    sql_types = arrow_sql_types(batch.schema)
+    if key_column and isinstance(sql_types.get(key_column), Text):
+        sql_types[key_column] = String(255)  # MySQL keys need a length
+    table = Table(
+        table_name,
+        MetaData(),
+        *[Column(name, sql_type, primary_key=(name == key_column)) for name, sql_type in sql_types.items()],
+    )
+    if replace:
+        table.drop(engine, checkfirst=True)
+    elif sa_inspect(engine).has_table(table_name):
+        return
+    table.create(engine)
+    logger.info(f"[ArrowBatches] Created table {table_name} ({batch.num_columns} columns)")
+
+
+def _insert_statement(dialect, table_name: str, columns: List[str], key_column: Optional[str] = None) -> str:
+    """
+    Multi-row INSERT for executemany; with key_column, rows replace those with the same key
+    (INSERT ... ON DUPLICATE KEY UPDATE on MySQL, ON CONFLICT DO UPDATE on SQLite / PostgreSQL).
+    """
+    preparer = dialect.identifier_preparer
+    marker = "?" if dialect.paramstyle == "qmark" else "%s"
+    sql = (
+        f"INSERT INTO {preparer.quote(table_name)} ({', '.join(preparer.quote(name) for name in columns)}) "
+        f"VALUES ({', '.join([marker] * len(columns))})"
+    )
+    if not key_column:
+        return sql
+
+    updates = [preparer.quote(name) for name in columns if name != key_column]
+    if dialect.name == "mysql":
+        if not updates:
+            return sql.replace("INSERT", "INSERT IGNORE", 1)
+        return sql + " ON DUPLICATE KEY UPDATE " + ", ".join(f"{name} = VALUES({name})" for name in updates)
+    if dialect.name in ("sqlite", "postgresql"):
+        conflict = f" ON CONFLICT ({preparer.quote(key_column)}) DO "
+        if not updates:
+            return sql + conflict + "NOTHING"
+        return sql + conflict + "UPDATE SET " + ", ".join(f"{name} = excluded.{name}" for name in updates)
+    raise ValueError(f"Upsert not supported for dialect: {dialect.name}")
+
+
+def _batch_rows(batch: pa.RecordBatch) -> List[tuple]:
+    return list(zip(*(column.to_pylist() for column in batch.columns)))
+
+
+def _is_keyed(engine: Engine, table_name: str, key_column: str) -> bool:
+    pk = sa_inspect(engine).get_pk_constraint(table_name).get("constrained_columns") or []
+    return pk == [key_column]
+
+
+def insert_record_batch(conn, table_name: str, batch: pa.RecordBatch) -> int:
+    """
+    Insert the rows of a batch (one executemany over its columns).
+
+    Returns: Number of rows inserted
+    """
+    if batch.num_rows == 0:
+        return 0
+    conn.exec_driver_sql(_insert_statement(conn.dialect, table_name, batch.schema.names), _batch_rows(batch))
+    return batch.num_rows
+
+
+def fan_out_record_batch(
+    engines: Sequence[Engine],
+    table_name: str,
+    batch: pa.RecordBatch,
+    key_column: Optional[str] = None
+) -> int:
+    """
+    Insert the rows of a batch into the same table of several databases.
+
+    The rows are converted once and written to each engine in turn (one
+    transaction per engine), so a second target costs one more write, not
+    a re-read of the first. With key_column, rows replace existing rows
+    with the same key: upserted when the table is keyed on it, otherwise
+    those rows are deleted first.
+
+    Returns: Number of rows written per target
+    """
+    if batch.num_rows == 0:
+        return 0
+    rows = _batch_rows(batch)
+    keys = batch.column(key_column).to_pylist() if key_column else None
+    for engine in engines:
+        upsert_key = key_column if key_column and _is_keyed(engine, table_name, key_column) else None
+        with engine.begin() as conn:
+            if key_column and not upsert_key:
+                delete_by_keys(conn, table_name, key_column, keys)
+            conn.exec_driver_sql(_insert_statement(conn.dialect, table_name, batch.schema.names, upsert_key), rows)
+    return batch.num_rows
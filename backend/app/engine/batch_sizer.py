@@ -0,0 +1,147 @@
+"""
+Adaptive Batch Sizer - Chunk size control for indexing jobs
+MDP Platform V3.1 - Multimodal Data Governance
+
+A fixed chunk size is wrong for most tables: wide rows with 768-dim vectors
+blow memory at 1000 rows, while narrow tables spend most of their time on
+round trips. The sizer measures, per chunk:
+
+- latency of every pipeline stage (transform and each sink), per row
+- memory of the prepared chunk (source frame, scalar frame, vectors), per row
+
+and picks the next chunk size so that the slowest stage takes about the
+target latency and a chunk stays under the memory ceiling. Costs are
+smoothed (EWMA); the size may shrink at once but grows at most 2x per
+adjustment, and always stays within [min_size, max_size].
+
+The reader asks next_size() before every read, so a change takes effect
+after the chunks already prefetched.
+"""
+import threading
+from typing import Any, Dict, List, Optional
+
+LIMIT_LATENCY = "latency"
+LIMIT_MEMORY = "memory"
+
+# Chunk sizes kept for the job's metrics (the first ones)
+_MAX_RECORDED_SIZES = 100
+
+
+class AdaptiveBatchSizer:
+    """
+    Chooses chunk sizes from measured per-row costs.
+
+    Args:
+        initial_size: Size of the first chunk
+        min_size / max_size: Bounds of any chosen size (equal bounds = fixed size)
+        target_latency_ms: Target time of the slowest stage per chunk
+        memory_limit_bytes: Ceiling of the prepared chunk's memory
+        smoothing: EWMA weight of the newest measurement
+        max_growth: Largest factor the size may grow by per adjustment
+        tolerance: Relative change below which the size is kept (avoids churn)
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        min_size: int,
+        max_size: int,
+        target_latency_ms: float,
+        memory_limit_bytes: float,
+        smoothing: float = 0.5,
+        max_growth: float = 2.0,
+        tolerance: float = 0.1
+    ):
+        self.min_size = max(1, min(min_size, max_size))
+        self.max_size = max(self.min_size, max_size)
+        self.target_latency_ms = target_latency_ms
+        self.memory_limit_bytes = memory_limit_bytes
+        self.smoothing = smoothing
+        self.max_growth = max_growth
+        self.tolerance = tolerance
+
+        self.initial_size = self._clamp(initial_size)
+        self._size = self.initial_size
+        self._issued = self.initial_size  # Size of the last chunk handed out
+        self._stage_row_ms: Dict[str, float] = {}
+        self._row_bytes: Optional[float] = None
+        self._limited_by: Optional[str] = None
+        self._adjustments = 0
+        self._sizes: List[int] = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_fixed(self) -> bool:
+        return self.min_size == self.max_size
+
+    def _clamp(self, size: float) -> int:
+        return int(max(self.min_size, min(self.max_size, size)))
+
+    def _smooth(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return previous + self.smoothing * (value - previous)
+
+    def next_size(self) -> int:
+        """Size of the next chunk to read."""
+        with self._lock:
+            if len(self._sizes) < _MAX_RECORDED_SIZES:
+                self._sizes.append(self._size)
+            self._issued = self._size
+            return self._size
+
+    def record_stage(self, stage: str, rows: int, elapsed_ms: float):
+        """Record how long one stage took for a chunk of rows."""
+        if rows <= 0:
+            return
+        with self._lock:
+            self._stage_row_ms[stage] = self._smooth(self._stage_row_ms.get(stage), elapsed_ms / rows)
+            self._adjust()
+
+    def record_memory(self, rows: int, nbytes: int):
+        """Record the memory held by a prepared chunk of rows."""
+        if rows <= 0:
+            return
+        with self._lock:
+            self._row_bytes = self._smooth(self._row_bytes, nbytes / rows)
+            self._adjust()
+
+    def _adjust(self):
+        if self.is_fixed:
+            return
+
+        candidates = {}
+        slowest_row_ms = max(self._stage_row_ms.values(), default=0)
+        if slowest_row_ms > 0 and self.target_latency_ms > 0:
+            candidates[LIMIT_LATENCY] = self.target_latency_ms / slowest_row_ms
+        if self._row_bytes and self.memory_limit_bytes > 0:
+            candidates[LIMIT_MEMORY] = self.memory_limit_bytes / self._row_bytes
+        if not candidates:
+            return
+
+        limited_by = min(candidates, key=candidates.get)
+        # Several measurements arrive per chunk: bound growth against the last chunk read
+        desired = min(candidates[limited_by], self._issued * self.max_growth)
+        size = self._clamp(desired)
+        if abs(size - self._size) <= self.tolerance * self._size:
+            return
+
+        self._size = size
+        self._limited_by = limited_by
+        self._adjustments += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """Chosen sizes and measured costs (JSON-serializable, for metrics_json)."""
+        with self._lock:
+            return {
+                "adaptive": not self.is_fixed,
+                "initial_size": self.initial_size,
+                "final_size": self._size,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "adjustments": self._adjustments,
+                "limited_by": self._limited_by,
+                "sizes": list(self._sizes),
+                "stage_row_ms": {k: round(v, 4) for k, v in self._stage_row_ms.items()},
+                "row_bytes": round(self._row_bytes, 1) if self._row_bytes is not None else None,
+            }
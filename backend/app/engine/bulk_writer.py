@@ -0,0 +1,404 @@
+"""
+Bulk Writer - Idempotent bulk writes of DataFrames to SQL tables
+MDP Platform V3.1 - Multimodal Data Governance
+
+Writers that may be retried (indexing sinks, resumed chunks) must not
+create duplicates, so rows are upserted by a key column instead of
+appended:
+
+- MySQL: INSERT ... ON DUPLICATE KEY UPDATE (one multi-row statement)
+- SQLite / PostgreSQL: INSERT ... ON CONFLICT (key) DO UPDATE
+
+Tables are created with the key as PRIMARY KEY so the upsert has a
+conflict target. Legacy tables created by plain to_sql (no key) get one
+added when possible; otherwise callers fall back to delete + insert.
+
+Column types come from the caller (e.g. ontology property data types via
+property_sql_types) instead of pandas type guessing; columns missing from
+an existing table are added. On MySQL, rows can also be bulk loaded with
+LOAD DATA LOCAL INFILE ... REPLACE (method="load_data"), which falls back
+to multi-row upserts if the server or client does not allow it.
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    String,
+    Text,
+    bindparam,
+    inspect as sa_inspect,
+    text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.types import TypeEngine
+
+from app.core.logger import logger
+
+
+# Write methods (settings.scalar_write_method)
+WRITE_METHOD_MULTI = "multi"
+WRITE_METHOD_LOAD_DATA = "load_data"
+
+# Ontology property data type -> SQL column type (anything else is stored as TEXT)
+PROPERTY_SQL_TYPES: Dict[str, TypeEngine] = {
+    "STRING": Text(),
+    "TEXT": Text(),
+    "INT": BigInteger(),
+    "INTEGER": BigInteger(),
+    "LONG": BigInteger(),
+    "DOUBLE": Float(precision=53),
+    "NUMBER": Float(precision=53),
+    "FLOAT": Float(precision=53),
+    "BOOLEAN": Boolean(),
+    "DATETIME": DateTime(),
+    "TIMESTAMP": DateTime(),
+    "DATE": Date(),
+}
+
+_TRUE_VALUES = {"true", "1", "yes", "y", "t"}
+_FALSE_VALUES = {"false", "0", "no", "n", "f"}
+
+# Tables already verified to have the key column as primary key
+_keyed_tables: Set[str] = set()
+_keyed_tables_lock = threading.Lock()
+
+# Known columns per table (new DataFrame columns are added with ALTER TABLE)
+_table_columns: Dict[str, Set[str]] = {}
+
+# Set once LOAD DATA LOCAL INFILE has been refused (then multi-row upserts are used)
+_load_data_unavailable = False
+
+
+# ==========================================
+# Column Types
+# ==========================================
+
+def property_sql_types(data_types: Dict[str, Optional[str]]) -> Dict[str, TypeEngine]:
+    """SQL column types for properties, from their ontology data types."""
+    return {
+        name: PROPERTY_SQL_TYPES.get(str(data_type or "").upper(), Text())
+        for name, data_type in data_types.items()
+    }
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        return None
+    return bool(value)
+
+
+def _to_text(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+def coerce_to_sql_types(df: pd.DataFrame, dtype: Dict[str, TypeEngine]) -> pd.DataFrame:
+    """
+    Convert DataFrame columns to their declared SQL types.
+
+    Values that cannot be converted become NULL (logged per column), so a
+    bad value never fails the whole bulk statement.
+    """
+    df = df.copy()
+    for column, sql_type in dtype.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        present = series.notna()
+
+        if isinstance(sql_type, Integer):
+            converted = pd.to_numeric(series, errors="coerce")
+            whole = converted.notna() & (converted % 1 == 0)
+            converted = converted.where(whole).astype("Int64")
+        elif isinstance(sql_type, Float):
+            converted = pd.to_numeric(series, errors="coerce").astype("float64")
+        elif isinstance(sql_type, Boolean):
+            converted = series.map(_to_bool).astype(object)
+        elif isinstance(sql_type, (DateTime, Date)):
+            converted = series if pd.api.types.is_datetime64_any_dtype(series) else \
+                pd.to_datetime(series, errors="coerce", format="mixed")
+            if isinstance(sql_type, Date) and not isinstance(sql_type, DateTime):
+                converted = converted.dt.date.where(converted.notna(), None)
+        else:
+            df[column] = series.map(_to_text)
+            continue
+
+        lost = int((present & converted.isna()).sum())
+        if lost:
+            logger.warning(f"[BulkWriter] {lost} values of '{column}' are not {sql_type} and were written as NULL")
+        df[column] = converted
+
+    return df
+
+
+def upsert_method(key_column: str):
+    """
+    pandas to_sql(method=...) callable that upserts rows by key_column.
+
+    Usage: df.to_sql(table, conn, if_exists="append", index=False,
+                     method=upsert_method("id"))
+    """
+    def upsert(pd_table, conn, keys: List[str], data_iter) -> int:
+        rows = [dict(zip(keys, row)) for row in data_iter]
+        if not rows:
+            return 0
+
+        update_columns = [k for k in keys if k != key_column]
+        dialect = conn.dialect.name
+
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
+            stmt = insert(pd_table.table).values(rows)
+            if update_columns:
+                stmt = stmt.on_duplicate_key_update({k: stmt.inserted[k] for k in update_columns})
+            else:
+                stmt = stmt.prefix_with("IGNORE")
+        elif dialect in ("sqlite", "postgresql"):
+            if dialect == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(pd_table.table).values(rows)
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[key_column],
+                    set_={k: stmt.excluded[k] for k in update_columns},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[key_column])
+        else:
+            raise ValueError(f"Upsert not supported for dialect: {dialect}")
+
+        conn.execute(stmt)
+        return len(rows)
+
+    return upsert
+
+
+def ensure_keyed_table(
+    engine: Engine,
+    table_name: str,
+    df: pd.DataFrame,
+    key_column: str,
+    dtype: Optional[Dict[str, Any]] = None
+) -> bool:
+    """
+    Make sure table_name exists with key_column as its primary key.
+
+    Missing tables are created from df's columns (dtype overrides column
+    types; the key defaults to VARCHAR(36)). Existing tables without a
+    primary key get one if their data allows it.
+
+    Returns: True if the table is keyed (upserts are safe)
+    """
+    if table_name in _keyed_tables:
+        return True
+
+    dtype = {key_column: String(36), **(dtype or {})}
+
+    with _keyed_tables_lock:
+        if table_name in _keyed_tables:
+            return True
+
+        if not sa_inspect(engine).has_table(table_name):
+            try:
+                with engine.begin() as conn:
+                    ddl = pd.io.sql.get_schema(df.head(0), table_name, keys=key_column, con=conn, dtype=dtype)
+                    conn.execute(text(ddl))
+                logger.info(f"[BulkWriter] Created table {table_name} keyed on '{key_column}'")
+                _keyed_tables.add(table_name)
+                return True
+            except Exception:
+                # Another process may have created it meanwhile
+                if not sa_inspect(engine).has_table(table_name):
+                    raise
+
+        pk_columns = sa_inspect(engine).get_pk_constraint(table_name).get("constrained_columns") or []
+        if pk_columns == [key_column]:
+            _keyed_tables.add(table_name)
+            return True
+        if pk_columns:
+            logger.warning(f"[BulkWriter] {table_name} is keyed on {pk_columns}, not '{key_column}'")
+            return False
+
+        # Legacy table from plain to_sql: try to add the key (fails on duplicates)
+        if engine.dialect.name != "mysql":
+            return False
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE `{table_name}` MODIFY `{key_column}` VARCHAR(36) NOT NULL, "
+                    f"ADD PRIMARY KEY (`{key_column}`)"
+                ))
+            logger.info(f"[BulkWriter] Added primary key '{key_column}' to legacy table {table_name}")
+            _keyed_tables.add(table_name)
+            return True
+        except Exception as e:
+            logger.warning(f"[BulkWriter] Cannot key legacy table {table_name} on '{key_column}': {e}")
+            return False
+
+
+def ensure_columns(
+    engine: Engine,
+    table_name: str,
+    df: pd.DataFrame,
+    dtype: Optional[Dict[str, TypeEngine]] = None
+):
+    """Add DataFrame columns missing from an existing table (typed from dtype, else TEXT)."""
+    known = _table_columns.get(table_name)
+    if known is not None and known.issuperset(df.columns):
+        return
+
+    with _keyed_tables_lock:
+        existing = {c["name"] for c in sa_inspect(engine).get_columns(table_name)}
+        missing = [c for c in df.columns if c not in existing]
+        if missing:
+            preparer = engine.dialect.identifier_preparer
+            with engine.begin() as conn:
+                for column in missing:
+                    sql_type = (dtype or {}).get(column, Text()).compile(dialect=engine.dialect)
+                    conn.execute(text(
+                        f"ALTER TABLE {preparer.quote(table_name)} ADD COLUMN {preparer.quote(column)} {sql_type}"
+                    ))
+            logger.info(f"[BulkWriter] Added columns {missing} to {table_name}")
+        _table_columns[table_name] = existing | set(missing)
+
+
+def delete_by_keys(conn, table_name: str, key_column: str, keys: List[Any], batch_size: int = 1000) -> int:
+    """DELETE rows whose key_column is in keys (batched IN lists)."""
+    preparer = conn.dialect.identifier_preparer
+    stmt = text(
+        f"DELETE FROM {preparer.quote(table_name)} WHERE {preparer.quote(key_column)} IN :keys"
+    ).bindparams(bindparam("keys", expanding=True))
+
+    deleted = 0
+    for start in range(0, len(keys), batch_size):
+        deleted += conn.execute(stmt, {"keys": keys[start:start + batch_size]}).rowcount
+    return deleted
+
+
+def _load_data_value(value: Any) -> Any:
+    """Value as LOAD DATA reads it with ESCAPED BY '\\\\' (booleans as 1/0)."""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+    return value
+
+
+def load_data_replace(conn, table_name: str, df: pd.DataFrame):
+    """
+    Bulk load df with MySQL LOAD DATA LOCAL INFILE ... REPLACE (upsert by key).
+
+    The rows are spooled to a CSV file in /dev/shm when available (memory
+    backed), since the client reads LOCAL INFILE data by file name. Needs
+    local_infile enabled on the server and in the connection URL
+    (?local_infile=1).
+    """
+    out = df.copy()
+    for column in out.columns:
+        series = out[column]
+        if series.dtype == object or pd.api.types.is_string_dtype(series) or series.dtype == bool:
+            out[column] = pd.Series([_load_data_value(v) for v in series], index=series.index, dtype=object)
+
+    spool_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    handle, path = tempfile.mkstemp(suffix=".csv", prefix="mdp_load_", dir=spool_dir)
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8", newline="") as f:
+            out.to_csv(
+                f, index=False, header=False, na_rep="\\N", lineterminator="\n",
+                date_format="%Y-%m-%d %H:%M:%S.%f"
+            )
+
+        preparer = conn.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(c) for c in df.columns)
+        conn.execute(text(
+            f"LOAD DATA LOCAL INFILE :path REPLACE INTO TABLE {preparer.quote(table_name)} "
+            f"CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '\\\\' "
+            f"LINES TERMINATED BY '\\n' ({columns})"
+        ), {"path": path})
+    finally:
+        os.remove(path)
+
+
+def upsert_dataframe(
+    engine: Engine,
+    table_name: str,
+    df: pd.DataFrame,
+    key_column: str,
+    dtype: Optional[Dict[str, TypeEngine]] = None,
+    rows_per_statement: Optional[int] = None,
+    method: str = WRITE_METHOD_MULTI
+) -> int:
+    """
+    Idempotently write df to table_name, keyed on key_column.
+
+    Uses a bulk upsert when the table is keyed; for legacy unkeyed tables,
+    deletes the incoming keys and inserts in one transaction.
+
+    Args:
+        dtype: Column SQL types; values are coerced to them and new tables /
+            columns are created with them
+        rows_per_statement: Rows per multi-row INSERT (None = all in one)
+        method: "multi" (INSERT ... ON DUPLICATE KEY UPDATE) or "load_data"
+            (MySQL LOAD DATA LOCAL INFILE ... REPLACE)
+
+    Returns: Number of rows written
+    """
+    global _load_data_unavailable
+
+    if df.empty:
+        return 0
+
+    if dtype:
+        dtype = {column: sql_type for column, sql_type in dtype.items() if column in df.columns}
+        df = coerce_to_sql_types(df, dtype)
+
+    keyed = ensure_keyed_table(engine, table_name, df, key_column, dtype=dtype)
+    ensure_columns(engine, table_name, df, dtype=dtype)
+
+    use_load_data = (
+        keyed
+        and method == WRITE_METHOD_LOAD_DATA
+        and engine.dialect.name == "mysql"
+        and not _load_data_unavailable
+    )
+    if use_load_data:
+        try:
+            with engine.begin() as conn:
+                load_data_replace(conn, table_name, df)
+            return len(df)
+        except Exception as e:
+            _load_data_unavailable = True
+            logger.warning(f"[BulkWriter] LOAD DATA LOCAL INFILE unavailable, using multi-row upserts: {e}")
+
+    with engine.begin() as conn:
+        if keyed:
+            df.to_sql(
+                table_name, conn, if_exists="append", index=False,
+                chunksize=rows_per_statement, method=upsert_method(key_column)
+            )
+        else:
+            delete_by_keys(conn, table_name, key_column, df[key_column].tolist())
+            df.to_sql(table_name, conn, if_exists="append", index=False, chunksize=rows_per_statement, method="multi")
+
+    return len(df)
@@ -0,0 +1,326 @@
+"""
+Index Checkpoints - Per-chunk progress of indexing jobs
+MDP Platform V3.1 - Multimodal Data Governance
+
+Every chunk an indexing job reads gets a row in sys_index_job_checkpoint:
+its read sequence number, the highest source PK it contains, and a
+per-sink commit marker (rows written) as each sink finishes it. A chunk is
+committed once every sink has written it.
+
+When a job is run again under the same job_run_id (resume API, or a job
+requeued after a restart), it continues after the last chunk of the
+longest fully committed prefix. Later chunks may have been partially
+written, which is harmless because every sink upserts by instance ID.
+
+Sharded runs (INDEXING_PROCESS_SHARDS > 1) keep their checkpoints under
+the same job_run_id, one sequence per shard_index. The shards' key ranges
+are saved on the run (sys_index_job_run.shard_ranges) and reused on
+resume, so a table that changed in between is split the same way again.
+
+Watermarks are stored as formatted strings together with their type
+(INT / FLOAT / DATETIME / STRING) and compared as typed values, so an
+integer watermark column does not go backwards ("9" > "10").
+"""
+import json
+import numbers
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import get_pooled_engine
+from app.core.logger import logger
+
+
+# Watermark types (sys_index_job_checkpoint.watermark_type)
+WATERMARK_INT = "INT"
+WATERMARK_FLOAT = "FLOAT"
+WATERMARK_DATETIME = "DATETIME"
+WATERMARK_STRING = "STRING"
+
+
+def watermark_type_of(value: Any) -> str:
+    """Type of a raw watermark column value."""
+    if isinstance(value, bool):
+        return WATERMARK_STRING
+    if isinstance(value, numbers.Integral):
+        return WATERMARK_INT
+    if isinstance(value, numbers.Real):
+        return WATERMARK_FLOAT
+    if isinstance(value, datetime):
+        return WATERMARK_DATETIME
+    return WATERMARK_STRING
+
+
+def typed_watermark(watermark: str, watermark_type: Optional[str] = None) -> Any:
+    """
+    Comparable value of a formatted watermark.
+
+    Rows saved without a type (before it was recorded) are read as a number
+    when they parse as one.
+    """
+    if watermark_type == WATERMARK_INT:
+        return int(watermark)
+    if watermark_type == WATERMARK_FLOAT:
+        return float(watermark)
+    if watermark_type == WATERMARK_DATETIME:
+        return datetime.fromisoformat(watermark)
+    if watermark_type == WATERMARK_STRING:
+        return watermark
+    for parse in (int, float):
+        try:
+            return parse(watermark)
+        except ValueError:
+            pass
+    return watermark
+
+
+def max_watermark(watermarks: Iterable[Tuple[Optional[str], Optional[str]]]) -> Optional[Tuple[str, Optional[str]]]:
+    """Highest of (watermark, watermark_type) pairs by typed value; None if there are none."""
+    candidates = [w for w in watermarks if w[0] is not None]
+    if not candidates:
+        return None
+    try:
+        return max(candidates, key=lambda w: typed_watermark(*w))
+    except (TypeError, ValueError):
+        # Mixed or unparsable legacy values
+        return max(candidates, key=lambda w: w[0])
+
+
+@dataclass
+class ResumePoint:
+    """Where a job continues, from its committed checkpoints."""
+    next_seq: int = 0                   # Sequence number of the first chunk to read
+    last_key: Optional[str] = None      # Read source rows with PK > last_key (keyset)
+    rows_done: int = 0                  # Rows covered by committed chunks (offset if no key)
+    max_watermark: Optional[str] = None
+    watermark_type: Optional[str] = None
+    sink_counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def is_resume(self) -> bool:
+        return self.next_seq > 0
+
+
+def resume_point_from(checkpoints: List[Dict[str, Any]]) -> ResumePoint:
+    """
+    Fold the checkpoint rows of one shard into a resume point.
+
+    Only the contiguous run of committed chunks from sequence 0 counts; the
+    first gap or uncommitted chunk ends it.
+    """
+    point = ResumePoint()
+    watermarks = []
+    for checkpoint in sorted(checkpoints, key=lambda c: c["chunk_seq"]):
+        if checkpoint["chunk_seq"] != point.next_seq or not checkpoint["is_committed"]:
+            break
+        point.next_seq += 1
+        point.rows_done += checkpoint["row_count"] or 0
+        if checkpoint["last_key"] is not None:
+            point.last_key = checkpoint["last_key"]
+        watermarks.append((checkpoint.get("max_watermark"), checkpoint.get("watermark_type")))
+        for sink, count in (checkpoint["sink_counts"] or {}).items():
+            point.sink_counts[sink] = point.sink_counts.get(sink, 0) + int(count)
+
+    latest = max_watermark(watermarks)
+    if latest:
+        point.max_watermark, point.watermark_type = latest
+    return point
+
+
+def resume_points_by_shard(checkpoints: List[Dict[str, Any]]) -> Dict[int, ResumePoint]:
+    """Resume point of every shard that has checkpoints (unsharded runs: shard 0)."""
+    by_shard: Dict[int, List[Dict[str, Any]]] = {}
+    for checkpoint in checkpoints:
+        by_shard.setdefault(checkpoint.get("shard_index") or 0, []).append(checkpoint)
+    return {shard: resume_point_from(rows) for shard, rows in sorted(by_shard.items())}
+
+
+class CheckpointTracker:
+    """
+    Collects per-sink commit markers for the chunks of one job run.
+
+    register() is called when a chunk is read, commit() after each sink
+    wrote it. Each change is persisted through save(checkpoint_dict); a
+    failed save only costs resumability, so it is logged, not raised.
+    """
+
+    def __init__(
+        self,
+        job_run_id: str,
+        sinks: List[str],
+        save: Optional[Callable[[Dict[str, Any]], None]] = None,
+        shard_index: int = 0
+    ):
+        self.job_run_id = job_run_id
+        self.shard_index = shard_index
+        self.sinks = set(sinks)
+        self._save = save or save_checkpoint
+        self._chunks: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        chunk_seq: int,
+        last_key: Any,
+        row_count: int,
+        max_watermark: Optional[str] = None,
+        watermark_type: Optional[str] = None
+    ):
+        """Record a chunk as read (not yet written anywhere)."""
+        with self._lock:
+            self._chunks[chunk_seq] = {
+                "job_run_id": self.job_run_id,
+                "shard_index": self.shard_index,
+                "chunk_seq": chunk_seq,
+                "last_key": None if last_key is None else str(last_key),
+                "row_count": row_count,
+                "max_watermark": max_watermark,
+                "watermark_type": watermark_type,
+                "sink_counts": {},
+                "is_committed": False,
+            }
+
+    def commit(self, chunk_seq: int, sink: str, rows_written: int):
+        """Mark a chunk as written by one sink."""
+        with self._lock:
+            checkpoint = self._chunks[chunk_seq]
+            checkpoint["sink_counts"][sink] = int(rows_written or 0)
+            self._persist(checkpoint)
+
+    def complete(self, chunk_seq: int):
+        """Mark a chunk with nothing to write (e.g. every row failed) as committed."""
+        with self._lock:
+            self._persist(self._chunks[chunk_seq], force=True)
+
+    def _persist(self, checkpoint: Dict[str, Any], force: bool = False):
+        checkpoint["is_committed"] = force or self.sinks.issubset(checkpoint["sink_counts"])
+        try:
+            self._save(checkpoint)
+        except Exception as e:
+            logger.warning(
+                f"[IndexCheckpoint] Failed to save chunk {checkpoint['chunk_seq']} of {self.job_run_id} "
+                f"shard {self.shard_index}: {e}"
+            )
+        if checkpoint["is_committed"]:
+            # Fully committed chunks are not touched again
+            self._chunks.pop(checkpoint["chunk_seq"], None)
+
+
+# ==========================================
+# Persistence (sys_index_job_checkpoint)
+# ==========================================
+
+def save_checkpoint(checkpoint: Dict[str, Any]):
+    """Upsert one checkpoint row."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO sys_index_job_checkpoint
+            (job_run_id, shard_index, chunk_seq, last_key, row_count, max_watermark, watermark_type,
+             sink_counts, is_committed, updated_at)
+            VALUES
+            (:job_run_id, :shard_index, :chunk_seq, :last_key, :row_count, :max_watermark, :watermark_type,
+             :sink_counts, :is_committed, :updated_at)
+            ON DUPLICATE KEY UPDATE
+                last_key = VALUES(last_key),
+                row_count = VALUES(row_count),
+                max_watermark = VALUES(max_watermark),
+                watermark_type = VALUES(watermark_type),
+                sink_counts = VALUES(sink_counts),
+                is_committed = VALUES(is_committed),
+                updated_at = VALUES(updated_at)
+        """), {
+            **checkpoint,
+            "shard_index": checkpoint.get("shard_index") or 0,
+            "watermark_type": checkpoint.get("watermark_type"),
+            "sink_counts": json.dumps(checkpoint["sink_counts"]),
+            "updated_at": datetime.utcnow(),
+        })
+
+
+def load_checkpoints(job_run_id: str, shard_index: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Checkpoint rows of a job run (one shard, or all), in shard and chunk order."""
+    engine = get_pooled_engine(settings.database_url)
+    shard_filter = "" if shard_index is None else "AND shard_index = :shard_index"
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"""
+            SELECT shard_index, chunk_seq, last_key, row_count, max_watermark, watermark_type,
+                   sink_counts, is_committed
+            FROM sys_index_job_checkpoint
+            WHERE job_run_id = :job_run_id {shard_filter}
+            ORDER BY shard_index, chunk_seq
+        """), {"job_run_id": job_run_id, "shard_index": shard_index}).mappings().all()
+
+    checkpoints = []
+    for row in rows:
+        checkpoint = dict(row)
+        if isinstance(checkpoint["sink_counts"], str):
+            checkpoint["sink_counts"] = json.loads(checkpoint["sink_counts"])
+        checkpoint["is_committed"] = bool(checkpoint["is_committed"])
+        checkpoints.append(checkpoint)
+    return checkpoints
+
+
+def prepare_resume(job_run_id: str, shard_index: int = 0) -> ResumePoint:
+    """
+    Resume point of a job run (shard); drops checkpoints past it.
+
+    The dropped chunks are re-read (and re-numbered) by this run. If the
+    checkpoints cannot be read, the job starts from the beginning.
+    """
+    try:
+        point = resume_point_from(load_checkpoints(job_run_id, shard_index))
+
+        engine = get_pooled_engine(settings.database_url)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                DELETE FROM sys_index_job_checkpoint
+                WHERE job_run_id = :job_run_id AND shard_index = :shard_index AND chunk_seq >= :next_seq
+            """), {"job_run_id": job_run_id, "shard_index": shard_index, "next_seq": point.next_seq})
+    except Exception as e:
+        logger.warning(f"[IndexCheckpoint] Cannot load checkpoints of {job_run_id}, starting over: {e}")
+        return ResumePoint()
+
+    if point.is_resume:
+        logger.info(
+            f"[IndexCheckpoint] Job {job_run_id} shard {shard_index} resumes at chunk {point.next_seq} "
+            f"({point.rows_done} rows committed, last key {point.last_key})"
+        )
+    return point
+
+
+def clear_checkpoints(job_run_id: str):
+    """Remove the checkpoints of a finished job run (every shard)."""
+    try:
+        engine = get_pooled_engine(settings.database_url)
+        with engine.begin() as conn:
+            conn.execute(text("DELETE FROM sys_index_job_checkpoint WHERE job_run_id = :job_run_id"),
+                         {"job_run_id": job_run_id})
+    except Exception as e:
+        logger.warning(f"[IndexCheckpoint] Failed to clear checkpoints of {job_run_id}: {e}")
+
+
+def save_shard_ranges(job_run_id: str, key_ranges: List[Tuple[Any, Any]]):
+    """Remember how a run's table was split, so a resume reuses the same shards."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE sys_index_job_run SET shard_ranges = :ranges WHERE id = :id"), {
+            "id": job_run_id,
+            "ranges": json.dumps([list(key_range) for key_range in key_ranges], default=str),
+        })
+
+
+def load_shard_ranges(job_run_id: str) -> Optional[List[Tuple[Any, Any]]]:
+    """Key ranges a run was split into (None if it was not sharded)."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        ranges = conn.execute(
+            text("SELECT shard_ranges FROM sys_index_job_run WHERE id = :id"), {"id": job_run_id}
+        ).scalar()
+    if isinstance(ranges, str):
+        ranges = json.loads(ranges)
+    return [tuple(key_range) for key_range in ranges] if ranges else None
@@ -0,0 +1,287 @@
+"""
+Index Dead Letters - Durable store of source rows an indexing job could not index
+MDP Platform V3.1 - Multimodal Data Governance
+
+Error samples (sys_index_error_sample) keep at most 100 messages per job
+and none of the rows themselves. Every row that fails a transform, or
+whose embedding could not be computed, is also written to
+sys_index_dead_letter with its raw source payload, the failing stage and
+the error. Rows are keyed by (mapping, source row ID), so a row failing
+again in a later run updates its entry instead of adding one.
+
+Once the cause is fixed, the pending rows of a mapping are replayed
+through the compiled mapping (indexing_worker.replay_dead_letters) without
+re-reading the source table. Replayed rows are upserted like any other
+run, and their entries are marked REPLAYED.
+
+A later run that indexes a row cleanly marks its pending entry RESOLVED
+once the row is written (resolve_dead_letters), so a replay never
+overwrites newer data with the stale stored payload.
+
+Payloads are stored as JSON: numbers, strings and booleans round-trip,
+dates come back as ISO strings.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from app.core.config import settings
+from app.core.db import get_pooled_engine
+from app.core.logger import logger
+from app.models.observability import DeadLetterStatus
+
+
+# Failing stages
+STAGE_TRANSFORM = "transform"  # Row dropped: a mapping transform raised
+STAGE_EMBEDDING = "embedding"  # Row indexed without its vector
+
+_DEAD_LETTER_NAMESPACE = uuid.UUID("0b8f7c8e-3f57-4c52-9d0e-6c1f2b7a9e41")
+
+# Rows per statement when looking up / updating entries
+_BATCH_SIZE = 500
+
+
+@dataclass
+class RowFailure:
+    """Why one source row of a chunk failed."""
+    stage: str
+    category: str
+    message: str
+
+
+def dead_letter_id(mapping_id: str, source_row_id: Any) -> str:
+    """Deterministic entry ID: one entry per mapping and source row."""
+    return str(uuid.uuid5(_DEAD_LETTER_NAMESPACE, f"{mapping_id}:{source_row_id}"))
+
+
+def build_dead_letters(
+    df: pd.DataFrame,
+    row_ids: pd.Series,
+    failures: Dict[Any, RowFailure]
+) -> List[Dict[str, Any]]:
+    """
+    Dead letter records of the failed rows of a chunk.
+
+    Args:
+        df: Source chunk
+        row_ids: Source row ID per row of df (same index)
+        failures: Index label of df -> why the row failed
+
+    Returns: [{"source_row_id", "stage", "error_category", "error_message", "row_payload"}]
+    """
+    labels = [label for label in failures if label in df.index]
+    if not labels:
+        return []
+
+    payloads = json.loads(df.loc[labels].to_json(orient="records", date_format="iso", default_handler=str))
+    return [
+        {
+            "source_row_id": str(row_ids[label]),
+            "stage": failures[label].stage,
+            "error_category": failures[label].category,
+            "error_message": failures[label].message[:2000],
+            "row_payload": payload,
+        }
+        for label, payload in zip(labels, payloads)
+    ]
+
+
+def dead_letter_frame(entries: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Source rows of dead letter entries, as a chunk to index again."""
+    return pd.DataFrame([entry["row_payload"] for entry in entries])
+
+
+# ==========================================
+# Persistence (sys_index_dead_letter)
+# ==========================================
+
+def save_dead_letters(
+    mapping_id: str,
+    object_def_id: str,
+    source_table: str,
+    job_run_id: Optional[str],
+    dead_letters: List[Dict[str, Any]]
+):
+    """
+    Upsert dead letter entries (back to PENDING, attempts + 1 if they exist).
+
+    A failed save loses the rows for replay only, so it is logged, not raised.
+    """
+    if not dead_letters:
+        return
+
+    now = datetime.utcnow()
+    rows = {}
+    for dead_letter in dead_letters:
+        entry_id = dead_letter_id(mapping_id, dead_letter["source_row_id"])
+        rows[entry_id] = {
+            **dead_letter,
+            "id": entry_id,
+            "mapping_id": mapping_id,
+            "object_def_id": object_def_id,
+            "source_table": source_table,
+            "job_run_id": job_run_id,
+            "row_payload": json.dumps(dead_letter["row_payload"]),
+            "status": DeadLetterStatus.PENDING.value,
+            "updated_at": now,
+        }
+
+    try:
+        engine = get_pooled_engine(settings.database_url)
+        with engine.begin() as conn:
+            existing = set()
+            ids = list(rows)
+            for start in range(0, len(ids), _BATCH_SIZE):
+                existing.update(conn.execute(
+                    text("SELECT id FROM sys_index_dead_letter WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+                    {"ids": ids[start:start + _BATCH_SIZE]}
+                ).scalars())
+
+            updates = [row for entry_id, row in rows.items() if entry_id in existing]
+            inserts = [{**row, "created_at": now} for entry_id, row in rows.items() if entry_id not in existing]
+            if updates:
+                conn.execute(text("""
+                    UPDATE sys_index_dead_letter
+                    SET job_run_id = :job_run_id, stage = :stage, error_category = :error_category,
+                        error_message = :error_message, row_payload = :row_payload, status = :status,
+                        attempts = attempts + 1, updated_at = :updated_at
+                    WHERE id = :id
+                """), updates)
+            if inserts:
+                conn.execute(text("""
+                    INSERT INTO sys_index_dead_letter
+                    (id, mapping_id, object_def_id, source_table, source_row_id, job_run_id, stage,
+                     error_category, error_message, row_payload, status, attempts, created_at, updated_at)
+                    VALUES
+                    (:id, :mapping_id, :object_def_id, :source_table, :source_row_id, :job_run_id, :stage,
+                     :error_category, :error_message, :row_payload, :status, 1, :created_at, :updated_at)
+                """), inserts)
+    except Exception as e:
+        logger.warning(f"[IndexDeadLetter] Failed to save {len(rows)} dead letters of mapping {mapping_id}: {e}")
+
+
+def load_dead_letters(
+    mapping_id: str,
+    status: Optional[str] = DeadLetterStatus.PENDING.value,
+    job_run_id: Optional[str] = None,
+    ids: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Dead letter entries of a mapping, oldest first (payload decoded).
+
+    Args:
+        status: Only entries with this status (None = any)
+        job_run_id: Only entries that last failed in this run
+        ids: Only these entries
+    """
+    sql = """
+        SELECT id, mapping_id, object_def_id, source_table, source_row_id, job_run_id, stage,
+               error_category, error_message, row_payload, status, attempts, created_at, updated_at
+        FROM sys_index_dead_letter
+        WHERE mapping_id = :mapping_id
+    """
+    params: Dict[str, Any] = {"mapping_id": mapping_id}
+    if status:
+        sql += " AND status = :status"
+        params["status"] = status
+    if job_run_id:
+        sql += " AND job_run_id = :job_run_id"
+        params["job_run_id"] = job_run_id
+    if ids is not None:
+        sql += " AND id IN :ids"
+        params["ids"] = ids
+    sql += " ORDER BY created_at, id"
+    if limit is not None:
+        sql += " LIMIT :limit OFFSET :offset"
+        params.update(limit=limit, offset=offset)
+
+    stmt = text(sql)
+    if ids is not None:
+        if not ids:
+            return []
+        stmt = stmt.bindparams(bindparam("ids", expanding=True))
+
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(stmt, params).mappings().all()
+
+    entries = []
+    for row in rows:
+        entry = dict(row)
+        if isinstance(entry["row_payload"], str):
+            entry["row_payload"] = json.loads(entry["row_payload"])
+        entries.append(entry)
+    return entries
+
+
+def has_pending_dead_letters(mapping_id: str) -> bool:
+    """Whether a mapping has dead letter entries waiting for a replay."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        return conn.execute(
+            text("SELECT 1 FROM sys_index_dead_letter WHERE mapping_id = :mapping_id AND status = :status LIMIT 1"),
+            {"mapping_id": mapping_id, "status": DeadLetterStatus.PENDING.value}
+        ).first() is not None
+
+
+def resolve_dead_letters(mapping_id: str, source_row_ids: List[str]) -> int:
+    """
+    Mark the pending entries of rows a run has now indexed as RESOLVED.
+
+    Like save_dead_letters, a failure is logged, not raised.
+
+    Returns: Number of entries resolved
+    """
+    entry_ids = list({dead_letter_id(mapping_id, row_id) for row_id in source_row_ids})
+    if not entry_ids:
+        return 0
+
+    stmt = text("""
+        UPDATE sys_index_dead_letter
+        SET status = :resolved, updated_at = :updated_at
+        WHERE id IN :ids AND status = :pending
+    """).bindparams(bindparam("ids", expanding=True))
+    resolved = 0
+    try:
+        engine = get_pooled_engine(settings.database_url)
+        with engine.begin() as conn:
+            for start in range(0, len(entry_ids), _BATCH_SIZE):
+                resolved += conn.execute(stmt, {
+                    "resolved": DeadLetterStatus.RESOLVED.value,
+                    "pending": DeadLetterStatus.PENDING.value,
+                    "updated_at": datetime.utcnow(),
+                    "ids": entry_ids[start:start + _BATCH_SIZE],
+                }).rowcount
+    except Exception as e:
+        logger.warning(f"[IndexDeadLetter] Failed to resolve dead letters of mapping {mapping_id}: {e}")
+        return 0
+    if resolved:
+        logger.info(f"[IndexDeadLetter] Resolved {resolved} dead letters of mapping {mapping_id} indexed by a later run")
+    return resolved
+
+
+def mark_replayed(entry_ids: List[str]):
+    """Mark dead letter entries as replayed."""
+    if not entry_ids:
+        return
+
+    engine = get_pooled_engine(settings.database_url)
+    stmt = text("""
+        UPDATE sys_index_dead_letter
+        SET status = :status, updated_at = :updated_at
+        WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    with engine.begin() as conn:
+        for start in range(0, len(entry_ids), _BATCH_SIZE):
+            conn.execute(stmt, {
+                "status": DeadLetterStatus.REPLAYED.value,
+                "updated_at": datetime.utcnow(),
+                "ids": entry_ids[start:start + _BATCH_SIZE],
+            })
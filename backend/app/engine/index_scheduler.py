@@ -0,0 +1,485 @@
+"""
+Index Job Scheduler - Persistent, deduplicated indexing job queue
+MDP Platform V3.1 - Multimodal Data Governance
+
+Indexing jobs are no longer started straight from API requests. They are
+queued as QUEUED rows in sys_index_job_run and a dispatcher thread claims
+them oldest-first onto a bounded job pool:
+
+- Dedupe: at most one QUEUED and one RUNNING job per mapping
+- Dead letter replays (job_kind REPLAY) go through the same queue, so
+  they never run next to another job of their mapping
+- At most settings.index_scheduler_max_jobs jobs run at once
+- Each job uses its mapping's index_workers transform workers
+- Sink writes are capped globally per store (sink_slot), so side-by-side
+  reindexes share MySQL / ChromaDB / Elasticsearch instead of flooding them
+
+Every API replica runs a scheduler, but only the holder of the
+'index_scheduler' lease in sys_scheduler_lock claims queued jobs. Each
+scheduler heartbeats the jobs it runs (owner_id / heartbeat_at); RUNNING
+rows whose heartbeat is older than settings.index_scheduler_stale_seconds
+belong to a stopped process and are requeued by the leader. A requeued or
+resumed run keeps its job_run_id, so it continues from its chunk
+checkpoints (index_checkpoint.py).
+"""
+import json
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.db import get_pooled_engine
+from app.core.logger import logger
+from app.models.observability import JobStatus
+
+
+# Stores with a global write concurrency cap
+STORE_MYSQL = "mysql"
+STORE_CHROMA = "chroma"
+STORE_ES = "elasticsearch"
+
+# Lease name in sys_scheduler_lock
+DISPATCH_LOCK_NAME = "index_scheduler"
+
+# sys_index_job_run.job_kind
+JOB_KIND_INDEX = "INDEX"    # Index the mapping's source table
+JOB_KIND_REPLAY = "REPLAY"  # Replay pending dead letters (job_params.dead_letter_ids, None = all)
+
+
+# ==========================================
+# Per-Store Concurrency Caps
+# ==========================================
+
+_sink_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_sink_semaphores_lock = threading.Lock()
+
+
+def _store_limit(store: str) -> int:
+    limits = {
+        STORE_MYSQL: settings.index_sink_concurrency_mysql,
+        STORE_CHROMA: settings.index_sink_concurrency_chroma,
+        STORE_ES: settings.index_sink_concurrency_es,
+    }
+    return max(1, limits.get(store, 1))
+
+
+@contextmanager
+def sink_slot(store: str):
+    """
+    Hold one of the process-wide write slots for a store.
+
+    Shared by all running indexing jobs, so the total number of concurrent
+    writes per store stays bounded no matter how many jobs run.
+    """
+    with _sink_semaphores_lock:
+        semaphore = _sink_semaphores.get(store)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(_store_limit(store))
+            _sink_semaphores[store] = semaphore
+
+    with semaphore:
+        yield
+
+
+# ==========================================
+# Persistent Queue (sys_index_job_run)
+# ==========================================
+
+_enqueue_lock = threading.Lock()
+
+
+def enqueue_indexing_job(mapping_id: str, object_def_id: str) -> str:
+    """
+    Queue an indexing job for a mapping.
+
+    If the mapping already has a queued job, that job's ID is returned and no
+    new row is created. A mapping with a running job can still get one queued
+    job, which picks up changes made after the running job started.
+
+    Returns: job_run_id of the queued job
+    """
+    engine = get_pooled_engine(settings.database_url)
+
+    with _enqueue_lock, engine.begin() as conn:
+        existing = conn.execute(text("""
+            SELECT id FROM sys_index_job_run
+            WHERE mapping_id = :mapping_id AND status = :status AND job_kind = :kind
+            ORDER BY created_at
+            LIMIT 1
+        """), {"mapping_id": mapping_id, "status": JobStatus.QUEUED.value, "kind": JOB_KIND_INDEX}).first()
+
+        if existing:
+            job_run_id = existing[0]
+            logger.info(f"[IndexScheduler] Mapping {mapping_id} already queued as {job_run_id}")
+        else:
+            job_run_id = _insert_queued_job(conn, mapping_id, object_def_id, JOB_KIND_INDEX)
+            logger.info(f"[IndexScheduler] Queued job {job_run_id} for mapping {mapping_id}")
+
+    _wake_scheduler()
+    return job_run_id
+
+
+def enqueue_replay_job(
+    mapping_id: str,
+    object_def_id: str,
+    dead_letter_ids: Optional[List[str]] = None
+) -> Optional[str]:
+    """
+    Queue a dead letter replay for a mapping.
+
+    Returns: job_run_id of the replay, or None if the mapping already has a
+        queued or running job (replay it once that has finished)
+    """
+    engine = get_pooled_engine(settings.database_url)
+
+    with _enqueue_lock, engine.begin() as conn:
+        busy = conn.execute(text("""
+            SELECT id FROM sys_index_job_run
+            WHERE mapping_id = :mapping_id AND status IN (:queued, :running)
+            LIMIT 1
+        """), {
+            "mapping_id": mapping_id,
+            "queued": JobStatus.QUEUED.value,
+            "running": JobStatus.RUNNING.value,
+        }).first()
+        if busy:
+            logger.info(f"[IndexScheduler] Mapping {mapping_id} has job {busy[0]} queued or running, replay refused")
+            return None
+
+        job_run_id = _insert_queued_job(
+            conn, mapping_id, object_def_id, JOB_KIND_REPLAY, {"dead_letter_ids": dead_letter_ids}
+        )
+        logger.info(f"[IndexScheduler] Queued dead letter replay {job_run_id} for mapping {mapping_id}")
+
+    _wake_scheduler()
+    return job_run_id
+
+
+def _insert_queued_job(
+    conn,
+    mapping_id: str,
+    object_def_id: str,
+    job_kind: str,
+    job_params: Optional[Dict[str, Any]] = None
+) -> str:
+    job_run_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    conn.execute(text("""
+        INSERT INTO sys_index_job_run
+        (id, mapping_id, object_def_id, start_time, status,
+         rows_processed, rows_indexed, metrics_json, job_kind, job_params, created_at)
+        VALUES
+        (:id, :mapping_id, :object_def_id, :start_time, :status,
+         0, 0, '{}', :job_kind, :job_params, :created_at)
+    """), {
+        "id": job_run_id,
+        "mapping_id": mapping_id,
+        "object_def_id": object_def_id,
+        "start_time": now,
+        "status": JobStatus.QUEUED.value,
+        "job_kind": job_kind,
+        "job_params": None if job_params is None else json.dumps(job_params),
+        "created_at": now,
+    })
+    return job_run_id
+
+
+def _wake_scheduler():
+    if settings.index_scheduler_enabled:
+        get_index_scheduler().start()
+        get_index_scheduler().wake()
+
+
+def resume_indexing_job(job_run_id: str) -> bool:
+    """
+    Put a FAILED job run back in the queue under the same ID.
+
+    The run then continues from its last committed chunk checkpoint.
+
+    Returns: False if the run is not FAILED (or does not exist)
+    """
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            UPDATE sys_index_job_run
+            SET status = :queued, end_time = NULL
+            WHERE id = :id AND status = :failed
+        """), {"id": job_run_id, "queued": JobStatus.QUEUED.value, "failed": JobStatus.FAILED.value})
+
+    if result.rowcount != 1:
+        return False
+
+    logger.info(f"[IndexScheduler] Requeued failed job {job_run_id} for resume")
+    _wake_scheduler()
+    return True
+
+
+def _list_ready_jobs(limit: int) -> List[Tuple[str, str, str, Optional[Dict[str, Any]]]]:
+    """Oldest queued jobs whose mapping has no running job: [(job_run_id, mapping_id, job_kind, job_params)]."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT q.id, q.mapping_id, q.job_kind, q.job_params
+            FROM sys_index_job_run q
+            WHERE q.status = :queued
+            AND NOT EXISTS (
+                SELECT 1 FROM sys_index_job_run r
+                WHERE r.mapping_id = q.mapping_id AND r.status = :running
+            )
+            ORDER BY q.created_at
+            LIMIT :limit
+        """), {
+            "queued": JobStatus.QUEUED.value,
+            "running": JobStatus.RUNNING.value,
+            "limit": limit,
+        }).fetchall()
+    return [
+        (row[0], row[1], row[2] or JOB_KIND_INDEX, json.loads(row[3]) if isinstance(row[3], str) else row[3])
+        for row in rows
+    ]
+
+
+def _claim_job(job_run_id: str, owner_id: Optional[str] = None) -> bool:
+    """Atomically move a job from QUEUED to RUNNING. False if someone else got it."""
+    engine = get_pooled_engine(settings.database_url)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            UPDATE sys_index_job_run
+            SET status = :running, start_time = :now, owner_id = :owner, heartbeat_at = :now
+            WHERE id = :id AND status = :queued
+        """), {
+            "id": job_run_id,
+            "now": now,
+            "owner": owner_id,
+            "running": JobStatus.RUNNING.value,
+            "queued": JobStatus.QUEUED.value,
+        })
+    return result.rowcount == 1
+
+
+def _heartbeat_jobs(owner_id: str, job_run_ids: List[str]):
+    """Mark the jobs this scheduler is running as alive."""
+    if not job_run_ids:
+        return
+    engine = get_pooled_engine(settings.database_url)
+    placeholders = ", ".join(f":id{i}" for i in range(len(job_run_ids)))
+    params = {f"id{i}": job_run_id for i, job_run_id in enumerate(job_run_ids)}
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+            UPDATE sys_index_job_run
+            SET heartbeat_at = :now
+            WHERE id IN ({placeholders}) AND owner_id = :owner AND status = :running
+        """), {**params, "now": datetime.utcnow(), "owner": owner_id, "running": JobStatus.RUNNING.value})
+
+
+def _requeue_stale_jobs(stale_before: datetime) -> int:
+    """
+    Put RUNNING jobs without a heartbeat since stale_before back in the queue.
+
+    Their scheduler stopped or crashed; jobs of live schedulers keep heartbeating
+    and are left alone. Rows from before heartbeats existed fall back to start_time.
+    """
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            UPDATE sys_index_job_run
+            SET status = :queued, owner_id = NULL, heartbeat_at = NULL
+            WHERE status = :running AND COALESCE(heartbeat_at, start_time) < :stale_before
+        """), {
+            "queued": JobStatus.QUEUED.value,
+            "running": JobStatus.RUNNING.value,
+            "stale_before": stale_before,
+        })
+    return result.rowcount
+
+
+def _acquire_dispatch_lease(owner_id: str, lease_seconds: float) -> bool:
+    """Take or renew the dispatcher lease (shared with the sync scheduler's lock table)."""
+    from app.engine.sync_scheduler import acquire_leadership
+
+    return acquire_leadership(owner_id, lease_seconds, name=DISPATCH_LOCK_NAME)
+
+
+def _release_dispatch_lease(owner_id: str):
+    from app.engine.sync_scheduler import release_leadership
+
+    release_leadership(owner_id, name=DISPATCH_LOCK_NAME)
+
+
+# ==========================================
+# Scheduler
+# ==========================================
+
+class IndexJobScheduler:
+    """Dispatcher thread + bounded job pool over the persistent queue."""
+
+    def __init__(
+        self,
+        max_jobs: int,
+        poll_interval: float,
+        lease_seconds: float = 60.0,
+        stale_seconds: float = 300.0,
+        owner_id: Optional[str] = None
+    ):
+        self.max_jobs = max(1, max_jobs)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.stale_seconds = stale_seconds
+        self.owner_id = owner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+
+        self._running: Dict[str, str] = {}  # job_run_id -> mapping_id
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running_jobs(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._running)
+
+    def start(self):
+        """Start the dispatcher (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._pool = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="index-job")
+            self._thread = threading.Thread(target=self._loop, name="index-scheduler", daemon=True)
+
+        self._thread.start()
+        logger.info(f"[IndexScheduler] Started as {self.owner_id} (max_jobs={self.max_jobs})")
+
+    def stop(self, wait: bool = False):
+        """Stop dispatching; running jobs finish unless the process exits."""
+        with self._lock:
+            thread, pool = self._thread, self._pool
+            self._thread, self._pool = None, None
+        if thread is None:
+            return
+
+        self._stop.set()
+        self._wake.set()
+        thread.join()
+        pool.shutdown(wait=wait, cancel_futures=True)
+        if self.is_leader:
+            try:
+                _release_dispatch_lease(self.owner_id)
+            except Exception as e:
+                logger.warning(f"[IndexScheduler] Failed to release dispatch lease: {e}")
+            self.is_leader = False
+        logger.info("[IndexScheduler] Stopped")
+
+    def wake(self):
+        """Check the queue now instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"[IndexScheduler] Dispatch failed: {e}")
+                logger.error(traceback.format_exc())
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def tick(self):
+        """Heartbeat own jobs; as leader, requeue stale jobs and dispatch queued ones."""
+        _heartbeat_jobs(self.owner_id, list(self.running_jobs))
+
+        leader = _acquire_dispatch_lease(self.owner_id, self.lease_seconds)
+        if leader != self.is_leader:
+            logger.info(f"[IndexScheduler] {self.owner_id} {'became' if leader else 'is no longer'} the dispatcher")
+            self.is_leader = leader
+        if not leader:
+            return
+
+        requeued = _requeue_stale_jobs(datetime.utcnow() - timedelta(seconds=self.stale_seconds))
+        if requeued:
+            logger.warning(f"[IndexScheduler] Requeued {requeued} RUNNING jobs without a heartbeat")
+        self._dispatch()
+
+    def _dispatch(self):
+        with self._lock:
+            free = self.max_jobs - len(self._running)
+            running_mappings = set(self._running.values())
+        if free <= 0:
+            return
+
+        for job_run_id, mapping_id, job_kind, job_params in _list_ready_jobs(limit=free + len(running_mappings)):
+            if free <= 0 or self._stop.is_set():
+                break
+            if mapping_id in running_mappings or not _claim_job(job_run_id, self.owner_id):
+                continue
+
+            with self._lock:
+                self._running[job_run_id] = mapping_id
+                pool = self._pool
+            running_mappings.add(mapping_id)
+            free -= 1
+
+            logger.info(f"[IndexScheduler] Dispatching {job_kind} job {job_run_id} for mapping {mapping_id}")
+            pool.submit(self._run_job, job_run_id, mapping_id, job_kind, job_params)
+
+    def _run_job(
+        self,
+        job_run_id: str,
+        mapping_id: str,
+        job_kind: str = JOB_KIND_INDEX,
+        job_params: Optional[Dict[str, Any]] = None
+    ):
+        from app.engine.indexing_worker import replay_dead_letters, run_indexing_job
+
+        try:
+            if job_kind == JOB_KIND_REPLAY:
+                replay_dead_letters(mapping_id, (job_params or {}).get("dead_letter_ids"), job_run_id)
+            else:
+                run_indexing_job(mapping_id, job_run_id=job_run_id)
+        except Exception as e:
+            logger.error(f"[IndexScheduler] Job {job_run_id} crashed: {e}")
+        finally:
+            with self._lock:
+                self._running.pop(job_run_id, None)
+            self._wake.set()
+
+
+_scheduler: Optional[IndexJobScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_index_scheduler() -> IndexJobScheduler:
+    """Get the process-wide scheduler (created on first use, not started)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = IndexJobScheduler(
+                max_jobs=settings.index_scheduler_max_jobs,
+                poll_interval=settings.index_scheduler_poll_interval,
+                lease_seconds=settings.index_scheduler_lease_seconds,
+                stale_seconds=settings.index_scheduler_stale_seconds,
+            )
+        return _scheduler
+
+
+def start_index_scheduler():
+    """Start the scheduler at app startup (if enabled)."""
+    if settings.index_scheduler_enabled:
+        get_index_scheduler().start()
+
+
+def stop_index_scheduler():
+    """Stop the scheduler at app shutdown."""
+    if _scheduler is not None:
+        _scheduler.stop()
@@ -0,0 +1,378 @@
+"""
+Indexing Pipeline - Bounded producer/consumer pipeline for Triple Write
+MDP Platform V3.1 - Multimodal Data Governance
+
+Overlaps the stages of an indexing job instead of running them one after
+another per chunk:
+
+    reader thread -> [read queue] -> transform pool -> [sink queues] -> sink workers
+
+- Reader: pre-fetches source chunks into a bounded queue
+- Transform pool: prepares chunks concurrently; results are emitted in
+  source order with a bounded number of chunks in flight
+- Sinks: one worker thread per store (MySQL, ChromaDB, lineage, ES), each
+  with its own bounded queue
+
+Every queue is bounded, so a slow stage applies backpressure upstream
+instead of buffering the whole table in memory. The first stage to raise
+stops the pipeline; the error is reported on the result.
+
+Sinks given a SinkPolicy are isolated instead: a failed write is retried
+with exponential backoff, and if it still fails the item is parked in
+that sink's replay queue and the sink moves on. After repeated failures a
+sink's circuit opens and items are parked without trying, so a store that
+is down does not hold the others back. Parked writes are replayed once the
+stream is done; those that still fail are reported on the result. Every
+write attempt sequence ends in a SinkOutcome passed to on_sink_outcome.
+"""
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.core.logger import logger
+
+
+# End-of-stream marker passed through the queues
+_DONE = object()
+
+# How often blocked queue operations re-check the stop flag (seconds)
+_POLL_INTERVAL = 0.1
+
+STAGE_READ = "read"
+STAGE_TRANSFORM = "transform"
+
+# Sink outcome statuses
+OUTCOME_SUCCESS = "SUCCESS"
+OUTCOME_PARKED = "PARKED"  # Failed after retries (or circuit open), queued for replay
+OUTCOME_REPLAYED = "REPLAYED"  # Parked, then written by the replay
+OUTCOME_FAILED = "FAILED"  # Parked and the replay failed too
+
+
+@dataclass
+class SinkPolicy:
+    """Retry / isolation settings of one sink."""
+    max_attempts: int = 3
+    backoff_seconds: float = 0.5  # Delay before the 2nd attempt, doubled per attempt
+    backoff_max_seconds: float = 10.0
+    replay_queue_size: int = 20  # Parked items kept for replay
+    required: bool = True  # Full replay queue: fail the pipeline (True) or drop the oldest item (False)
+    circuit_threshold: int = 3  # Consecutive parked items that open the circuit
+    circuit_cooldown_seconds: float = 30.0  # Open circuit parks items without trying for this long
+
+    def backoff(self, attempt: int) -> float:
+        """Delay after the given failed attempt (1-based)."""
+        return min(self.backoff_max_seconds, self.backoff_seconds * (2 ** (attempt - 1)))
+
+
+@dataclass
+class SinkOutcome:
+    """How writing one item to one sink went."""
+    sink: str
+    status: str
+    attempts: int
+    latency_ms: float  # Time of all attempts, backoff included
+    count: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class PipelineResult:
+    """Outcome of a pipeline run."""
+    chunks_read: int = 0
+    chunks_transformed: int = 0
+    sink_counts: Dict[str, int] = field(default_factory=dict)  # sink -> sum of returned counts
+    stage_busy_ms: Dict[str, float] = field(default_factory=dict)  # stage -> time spent working
+    wall_ms: float = 0
+    failed_writes: Dict[str, List[Tuple[Any, str]]] = field(default_factory=dict)  # sink -> [(item, error)] not replayed
+    dropped_writes: Dict[str, int] = field(default_factory=dict)  # sink -> items dropped from a full replay queue
+    failed_stage: Optional[str] = None
+    error: Optional[BaseException] = None
+    error_trace: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class IndexingPipeline:
+    """
+    Bounded reader -> transform -> per-sink pipeline.
+
+    Args:
+        transform: Callable(chunk) -> prepared item, or None to skip the chunk
+        sinks: Ordered mapping of sink name -> Callable(item) -> int count
+        transform_workers: Size of the transform thread pool
+        prefetch_chunks: Capacity of the read queue
+        sink_queue_size: Capacity of each sink queue
+        sink_policies: Sink name -> SinkPolicy; sinks without one stop the
+            pipeline on their first error
+        on_sink_outcome: Callable(item, SinkOutcome), called from sink threads
+    """
+
+    def __init__(
+        self,
+        transform: Callable[[Any], Any],
+        sinks: Dict[str, Callable[[Any], int]],
+        transform_workers: int = 2,
+        prefetch_chunks: int = 2,
+        sink_queue_size: int = 2,
+        sink_policies: Optional[Dict[str, SinkPolicy]] = None,
+        on_sink_outcome: Optional[Callable[[Any, SinkOutcome], None]] = None
+    ):
+        self.transform = transform
+        self.sinks = sinks
+        self.transform_workers = max(1, transform_workers)
+        self.prefetch_chunks = max(1, prefetch_chunks)
+        self.sink_queue_size = max(1, sink_queue_size)
+        self.sink_policies = sink_policies or {}
+        self.on_sink_outcome = on_sink_outcome
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._result = PipelineResult()
+
+    # ------------------------------------------
+    # Queue helpers (never block past a stop)
+    # ------------------------------------------
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q: queue.Queue) -> Any:
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, stage: str, exc: BaseException):
+        with self._lock:
+            if self._result.error is None:
+                self._result.failed_stage = stage
+                self._result.error = exc
+                self._result.error_trace = traceback.format_exc()
+        logger.error(f"[IndexingPipeline] Stage '{stage}' failed: {exc}")
+        self._stop.set()
+
+    def _add_busy(self, stage: str, started: float):
+        elapsed_ms = (time.time() - started) * 1000
+        with self._lock:
+            busy = self._result.stage_busy_ms
+            busy[stage] = busy.get(stage, 0) + elapsed_ms
+
+    # ------------------------------------------
+    # Stages
+    # ------------------------------------------
+
+    def _read(self, chunks: Iterable[Any], read_q: queue.Queue):
+        try:
+            iterator = iter(chunks)
+            while not self._stop.is_set():
+                started = time.time()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                self._add_busy(STAGE_READ, started)
+
+                if not self._put(read_q, chunk):
+                    return
+                with self._lock:
+                    self._result.chunks_read += 1
+        except Exception as e:
+            self._fail(STAGE_READ, e)
+        finally:
+            self._put(read_q, _DONE)
+
+    def _run_transform(self, chunk: Any) -> Any:
+        started = time.time()
+        try:
+            return self.transform(chunk)
+        finally:
+            self._add_busy(STAGE_TRANSFORM, started)
+
+    def _sink_worker(self, name: str, write: Callable[[Any], int], sink_q: queue.Queue):
+        policy = self.sink_policies.get(name)
+        parked: List[Tuple[Any, str]] = []
+        consecutive_parked = 0
+        circuit_open_until = 0.0
+
+        while True:
+            item = self._get(sink_q)
+            if item is _DONE:
+                break
+
+            if policy is None:
+                started = time.time()
+                try:
+                    count = write(item) or 0
+                except Exception as e:
+                    self._fail(name, e)
+                    return
+                self._add_busy(name, started)
+                self._add_count(name, count)
+                continue
+
+            if time.time() < circuit_open_until:
+                outcome = SinkOutcome(name, OUTCOME_PARKED, 0, 0, error="circuit open")
+            else:
+                outcome = self._write_with_retry(name, write, item, policy)
+
+            if outcome.status == OUTCOME_SUCCESS:
+                consecutive_parked = 0
+            else:
+                parked.append((item, outcome.error))
+                consecutive_parked += 1
+                if consecutive_parked >= policy.circuit_threshold and time.time() >= circuit_open_until:
+                    circuit_open_until = time.time() + policy.circuit_cooldown_seconds
+                    logger.warning(
+                        f"[IndexingPipeline] Sink '{name}' failed {consecutive_parked} items in a row, "
+                        f"parking writes for {policy.circuit_cooldown_seconds}s"
+                    )
+            self._report(item, outcome)
+
+            if len(parked) > policy.replay_queue_size:
+                if policy.required:
+                    self._fail(name, RuntimeError(
+                        f"Sink '{name}' has {len(parked)} parked writes (replay queue full); last error: {outcome.error}"
+                    ))
+                    return
+                dropped, error = parked.pop(0)
+                with self._lock:
+                    self._result.dropped_writes[name] = self._result.dropped_writes.get(name, 0) + 1
+                self._report(dropped, SinkOutcome(name, OUTCOME_FAILED, 0, 0, error=f"replay queue full: {error}"))
+
+        if policy is not None and parked and not self._stop.is_set():
+            self._replay(name, write, parked, policy)
+
+    def _write_with_retry(self, name: str, write: Callable[[Any], int], item: Any, policy: SinkPolicy) -> SinkOutcome:
+        started = time.time()
+        error = None
+        for attempt in range(1, max(1, policy.max_attempts) + 1):
+            attempt_started = time.time()
+            try:
+                count = write(item) or 0
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"[IndexingPipeline] Sink '{name}' attempt {attempt}/{policy.max_attempts} failed: {e}")
+                if attempt < policy.max_attempts and self._stop.wait(policy.backoff(attempt)):
+                    break
+                continue
+            self._add_busy(name, attempt_started)
+            self._add_count(name, count)
+            return SinkOutcome(name, OUTCOME_SUCCESS, attempt, (time.time() - started) * 1000, count=count)
+        return SinkOutcome(name, OUTCOME_PARKED, attempt, (time.time() - started) * 1000, error=error)
+
+    def _replay(self, name: str, write: Callable[[Any], int], parked: List[Tuple[Any, str]], policy: SinkPolicy):
+        """Retry the parked writes of a sink once the stream is done."""
+        logger.info(f"[IndexingPipeline] Replaying {len(parked)} parked writes of sink '{name}'")
+        failed = []
+        for item, _ in parked:
+            if self._stop.is_set():
+                failed.append((item, "pipeline stopped"))
+                continue
+            outcome = self._write_with_retry(name, write, item, policy)
+            outcome.status = OUTCOME_REPLAYED if outcome.status == OUTCOME_SUCCESS else OUTCOME_FAILED
+            if outcome.status == OUTCOME_FAILED:
+                failed.append((item, outcome.error))
+            self._report(item, outcome)
+
+        if failed:
+            logger.error(f"[IndexingPipeline] Sink '{name}': {len(failed)} writes failed after replay")
+            with self._lock:
+                self._result.failed_writes[name] = failed
+
+    def _add_count(self, name: str, count: int):
+        with self._lock:
+            counts = self._result.sink_counts
+            counts[name] = counts.get(name, 0) + count
+
+    def _report(self, item: Any, outcome: SinkOutcome):
+        if self.on_sink_outcome is None:
+            return
+        try:
+            self.on_sink_outcome(item, outcome)
+        except Exception as e:
+            logger.warning(f"[IndexingPipeline] Sink outcome callback failed: {e}")
+
+    def _emit(self, item: Any, sink_queues: Dict[str, queue.Queue]):
+        if item is None:
+            return
+        with self._lock:
+            self._result.chunks_transformed += 1
+        for sink_q in sink_queues.values():
+            if not self._put(sink_q, item):
+                return
+
+    # ------------------------------------------
+    # Run
+    # ------------------------------------------
+
+    def run(self, chunks: Iterable[Any]) -> PipelineResult:
+        """Run the pipeline to completion (or first failure) over chunks."""
+        started = time.time()
+        self._result.sink_counts = {name: 0 for name in self.sinks}
+
+        read_q: queue.Queue = queue.Queue(maxsize=self.prefetch_chunks)
+        sink_queues = {name: queue.Queue(maxsize=self.sink_queue_size) for name in self.sinks}
+
+        reader = threading.Thread(
+            target=self._read, args=(chunks, read_q), name="index-reader", daemon=True
+        )
+        sink_threads = [
+            threading.Thread(
+                target=self._sink_worker, args=(name, write, sink_queues[name]),
+                name=f"index-sink-{name}", daemon=True
+            )
+            for name, write in self.sinks.items()
+        ]
+
+        reader.start()
+        for t in sink_threads:
+            t.start()
+
+        # Dispatch: read queue -> transform pool -> sink queues (in source order)
+        with ThreadPoolExecutor(
+            max_workers=self.transform_workers, thread_name_prefix="index-transform"
+        ) as pool:
+            in_flight = deque()
+            try:
+                while True:
+                    chunk = self._get(read_q)
+                    if chunk is _DONE:
+                        break
+                    in_flight.append(pool.submit(self._run_transform, chunk))
+                    while len(in_flight) > self.transform_workers:
+                        self._emit(in_flight.popleft().result(), sink_queues)
+
+                while in_flight and not self._stop.is_set():
+                    self._emit(in_flight.popleft().result(), sink_queues)
+            except Exception as e:
+                self._fail(STAGE_TRANSFORM, e)
+            finally:
+                for future in in_flight:
+                    future.cancel()
+
+        for sink_q in sink_queues.values():
+            self._put(sink_q, _DONE)
+        for t in sink_threads:
+            t.join()
+
+        # Unblock the reader if it is waiting on a full queue
+        self._stop.set()
+        reader.join()
+
+        self._result.wall_ms = (time.time() - started) * 1000
+        return self._result
@@ -11,24 +11,134 @@ Handles batch processing of mapping definitions:
    - Search props -> Elasticsearch (full-text search)
 4. Write lineage records for traceability (vector -> source file)
 5. Record job runs and metrics for observability
+
+Steps 1-4 run as an overlapping pipeline (see indexing_pipeline.py): while
+one chunk is being written, the next ones are already read and transformed.
+With INDEXING_PROCESS_SHARDS > 1, large tables with a primary key are split
+into PK ranges and each range runs that pipeline in its own process, so
+transforms use more than one core. Vector writes from the shards are
+funnelled through the parent process (embedded ChromaDB is single-process).
+Sink write caps (sink_slot) apply per process.
+
+Instance IDs are deterministic: uuid5(object_def_id, source row PK), so a
+retried or resumed chunk produces the same IDs and every store is upserted
+by them (MySQL via INSERT ... ON DUPLICATE KEY UPDATE, Chroma upsert, ES
+index by _id). Rows indexed before under a random ID keep the instance_id
+recorded in ctx_object_instance_lineage.
+
+Each chunk is checkpointed as the sinks commit it (index_checkpoint.py); a
+job run again under the same job_run_id continues after its last fully
+committed chunk instead of starting over. In INCREMENTAL mode only rows whose watermark column
+(default _sync_timestamp) is at or above the mapping's index_watermark are read.
+
+Rows that fail a transform (or get no embedding) are kept with their raw
+payload in sys_index_dead_letter (index_dead_letter.py) and can be replayed
+through the mapping once the cause is fixed (replay_dead_letters). A row a
+later run indexes cleanly resolves its entry once MySQL has it.
 """
+import json
 import uuid
-import random
+import threading
 import traceback
 import time
-from typing import Dict, Any, List, Optional
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text, bindparam, inspect as sa_inspect
 
 from app.core.config import settings
 from app.core.logger import logger
-from app.core.db import get_session_context
-from app.core.vector_store import ensure_object_collection, upsert_vectors
+from app.core.db import get_session_context, get_pooled_engine
+from app.core.vector_store import ensure_object_collection, object_collection_name, upsert_vectors, delete_vectors
+from app.core.quantized_vectors import STORAGE_FLOAT32, code_bytes, rescore_bytes
+from app.core.embedding import EMBEDDING_TRANSFORMS, EMBEDDING_IMAGE, get_encoder, encode_batched
 from app.engine.v3 import mapping_crud
 from app.engine.es_indexer import bulk_index_object_instances, build_es_document
+from app.engine.object_type_cache import get_object_type_info
+from app.engine.mapping_plan import MappingPlan, get_mapping_plan
+from app.engine.indexing_pipeline import (
+    IndexingPipeline,
+    SinkOutcome,
+    SinkPolicy,
+    OUTCOME_SUCCESS,
+    STAGE_READ,
+    STAGE_TRANSFORM,
+)
+from app.engine.batch_sizer import AdaptiveBatchSizer
+from app.engine.source_reader import (
+    read_table_chunks,
+    get_keyset_column,
+    skip_rows,
+    key_range_filter,
+    key_range_boundaries,
+)
+from app.engine.index_checkpoint import (
+    CheckpointTracker,
+    ResumePoint,
+    clear_checkpoints,
+    load_checkpoints,
+    load_shard_ranges,
+    max_watermark,
+    prepare_resume,
+    save_shard_ranges,
+    watermark_type_of,
+)
+from app.engine.index_dead_letter import (
+    RowFailure,
+    STAGE_TRANSFORM as DEAD_STAGE_TRANSFORM,
+    STAGE_EMBEDDING as DEAD_STAGE_EMBEDDING,
+    build_dead_letters,
+    dead_letter_frame,
+    has_pending_dead_letters,
+    load_dead_letters,
+    mark_replayed,
+    resolve_dead_letters,
+    save_dead_letters,
+)
+from app.engine.bulk_writer import upsert_dataframe, upsert_method, property_sql_types, coerce_to_sql_types
+from app.engine.index_scheduler import STORE_MYSQL, STORE_CHROMA, STORE_ES, sink_slot
+from app.engine.transforms import (
+    is_scalar_transform,
+    apply_scalar_transform,
+    apply_column_transform,
+    blank_mask,
+)
+
+
+# Sink names (one pipeline worker each)
+SINK_SCALAR = "mysql"
+SINK_VECTOR = "chroma"
+SINK_LINEAGE = "lineage"
+SINK_ES = "elasticsearch"
+
+# Sinks whose failed writes do not fail the job (it ends PARTIAL_SUCCESS)
+OPTIONAL_SINKS = {SINK_ES}
+
+# Sink failures listed in a job's metrics
+MAX_SINK_FAILURES = 100
+
+# Index modes (ObjectMappingDef.index_mode)
+INDEX_MODE_FULL = "FULL"
+INDEX_MODE_INCREMENTAL = "INCREMENTAL"
+
+# Watermark column added to every synced table by sync_worker
+DEFAULT_WATERMARK_COLUMN = "_sync_timestamp"
+
+# Namespace for deterministic instance/lineage IDs (never change: IDs are persisted)
+INSTANCE_ID_NAMESPACE = uuid.UUID("6f1c2a4e-3b7d-5e89-a0c1-d2e3f4a5b6c7")
+
+# Store whose global write cap each sink counts against
+SINK_STORES = {
+    SINK_SCALAR: STORE_MYSQL,
+    SINK_VECTOR: STORE_CHROMA,
+    SINK_LINEAGE: STORE_MYSQL,
+    SINK_ES: STORE_ES,
+}
 
 
 # ==========================================
@@ -37,7 +147,7 @@ from app.engine.es_indexer import bulk_index_object_instances, build_es_document
 
 @dataclass
 class MetricsCollector:
-    """Collects metrics during indexing job execution."""
+    """Collects metrics during indexing job execution (thread-safe)."""
     pk_collisions: int = 0
     ai_latency_total_ms: float = 0
     ai_inference_count: int = 0
@@ -45,23 +155,104 @@ class MetricsCollector:
     vector_dim_mismatch: int = 0
     corrupt_media_files: int = 0
     transform_errors: int = 0
+    stage_busy_ms: Dict[str, float] = field(default_factory=dict)
+    wall_ms: float = 0
+    batch_sizing: List[Dict[str, Any]] = field(default_factory=list)  # One summary per indexed key range
+    sink_outcomes: Dict[str, Dict[str, float]] = field(default_factory=dict)  # sink -> outcome counters
+    sink_failures: List[Dict[str, Any]] = field(default_factory=list)  # Chunks a sink did not write at first
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     
     def record_ai_latency(self, latency_ms: float):
         """Record AI inference latency."""
-        self.ai_latency_total_ms += latency_ms
-        self.ai_inference_count += 1
+        with self._lock:
+            self.ai_latency_total_ms += latency_ms
+            self.ai_inference_count += 1
+    
+    def record_ai_batch(self, latency_ms: float, count: int):
+        """Record latency of a batched inference call covering count inputs."""
+        if count <= 0:
+            return
+        with self._lock:
+            self.ai_latency_total_ms += latency_ms
+            self.ai_inference_count += count
     
     def record_pk_collision(self):
         """Record a primary key collision."""
-        self.pk_collisions += 1
+        with self._lock:
+            self.pk_collisions += 1
     
     def record_corrupt_media(self):
         """Record a corrupt media file."""
-        self.corrupt_media_files += 1
+        with self._lock:
+            self.corrupt_media_files += 1
     
     def record_transform_error(self):
         """Record a transformation error."""
-        self.transform_errors += 1
+        with self._lock:
+            self.transform_errors += 1
+    
+    def record_pipeline_timing(self, stage_busy_ms: Dict[str, float], wall_ms: float):
+        """Record per-stage busy time and wall time of the indexing pipeline."""
+        with self._lock:
+            for stage, ms in stage_busy_ms.items():
+                self.stage_busy_ms[stage] = self.stage_busy_ms.get(stage, 0) + ms
+            self.wall_ms += wall_ms
+    
+    def record_batch_sizing(self, summary: Dict[str, Any]):
+        """Record the chunk sizes chosen for a key range (AdaptiveBatchSizer.summary)."""
+        with self._lock:
+            self.batch_sizing.append(summary)
+    
+    def record_sink_outcome(self, chunk_seq: int, outcome: SinkOutcome):
+        """Record how writing one chunk to one sink went."""
+        with self._lock:
+            counters = self.sink_outcomes.setdefault(outcome.sink, {"attempts": 0, "max_latency_ms": 0})
+            counters[outcome.status] = counters.get(outcome.status, 0) + 1
+            counters["attempts"] += outcome.attempts
+            counters["max_latency_ms"] = max(counters["max_latency_ms"], round(outcome.latency_ms, 2))
+            if outcome.status != OUTCOME_SUCCESS or outcome.attempts > 1:
+                if outcome.status == OUTCOME_SUCCESS:
+                    counters["retried"] = counters.get("retried", 0) + 1
+                if len(self.sink_failures) < MAX_SINK_FAILURES:
+                    self.sink_failures.append({
+                        "sink": outcome.sink,
+                        "chunk_seq": chunk_seq,
+                        "status": outcome.status,
+                        "attempts": outcome.attempts,
+                        "error": (outcome.error or "")[:500] or None,
+                    })
+    
+    def merge(self, other: "MetricsCollector"):
+        """Add the counts of another collector (e.g. from a shard process)."""
+        with self._lock:
+            self.pk_collisions += other.pk_collisions
+            self.ai_latency_total_ms += other.ai_latency_total_ms
+            self.ai_inference_count += other.ai_inference_count
+            self.ai_low_confidence_count += other.ai_low_confidence_count
+            self.vector_dim_mismatch += other.vector_dim_mismatch
+            self.corrupt_media_files += other.corrupt_media_files
+            self.transform_errors += other.transform_errors
+            for stage, ms in other.stage_busy_ms.items():
+                self.stage_busy_ms[stage] = self.stage_busy_ms.get(stage, 0) + ms
+            self.wall_ms = max(self.wall_ms, other.wall_ms)
+            self.batch_sizing.extend(other.batch_sizing)
+            for sink, other_counters in other.sink_outcomes.items():
+                counters = self.sink_outcomes.setdefault(sink, {"attempts": 0, "max_latency_ms": 0})
+                for key, value in other_counters.items():
+                    if key == "max_latency_ms":
+                        counters[key] = max(counters[key], value)
+                    else:
+                        counters[key] = counters.get(key, 0) + value
+            self.sink_failures.extend(other.sink_failures[:max(0, MAX_SINK_FAILURES - len(self.sink_failures))])
+    
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert metrics to JSON-serializable dict."""
@@ -77,14 +268,20 @@ class MetricsCollector:
             "vector_dim_mismatch": self.vector_dim_mismatch,
             "corrupt_media_files": self.corrupt_media_files,
             "transform_errors": self.transform_errors,
+            "stage_busy_ms": {k: round(v, 2) for k, v in self.stage_busy_ms.items()},
+            "wall_ms": round(self.wall_ms, 2),
+            "batch_sizing": self.batch_sizing,
+            "sink_outcomes": self.sink_outcomes,
+            "sink_failures": self.sink_failures,
         }
 
 
 @dataclass
 class ErrorSampler:
-    """Samples errors for debugging (Dead Letter Queue)."""
+    """Samples errors for debugging (Dead Letter Queue). Thread-safe."""
     max_samples: int = 100
     samples: List[Dict[str, Any]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     
     def add_error(
         self,
@@ -94,36 +291,54 @@ class ErrorSampler:
         stack_trace: Optional[str] = None
     ):
         """Add an error sample if under limit."""
-        if len(self.samples) >= self.max_samples:
-            return
-        
-        self.samples.append({
-            "id": str(uuid.uuid4()),
-            "raw_row_id": raw_row_id,
-            "error_category": category,
-            "error_message": message[:2000],  # Truncate long messages
-            "stack_trace": stack_trace[:5000] if stack_trace else None,
-        })
+        with self._lock:
+            if len(self.samples) >= self.max_samples:
+                return
+            
+            self.samples.append({
+                "id": str(uuid.uuid4()),
+                "raw_row_id": raw_row_id,
+                "error_category": category,
+                "error_message": message[:2000],  # Truncate long messages
+                "stack_trace": stack_trace[:5000] if stack_trace else None,
+            })
     
     def get_samples(self) -> List[Dict[str, Any]]:
         """Get collected error samples."""
         return self.samples
+    
+    def merge(self, other: "ErrorSampler"):
+        """Take samples of another sampler (e.g. from a shard process) up to the limit."""
+        with self._lock:
+            room = max(0, self.max_samples - len(self.samples))
+            self.samples.extend(other.samples[:room])
+    
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
 
 # ==========================================
 # Main Indexing Job
 # ==========================================
 
-def run_indexing_job(mapping_id: str):
+def run_indexing_job(mapping_id: str, job_run_id: Optional[str] = None):
     """
     Execute indexing job for a published mapping.
     
-    This function runs as a background task after mapping publish.
+    Normally run by the index job scheduler, which passes the ID of the
+    queued sys_index_job_run row; that row is updated with the outcome.
+    Without job_run_id a new run record is created.
     Records job run and metrics for observability.
     """
     logger.info(f"[IndexingWorker] Starting job for mapping: {mapping_id}")
     
-    job_run_id = str(uuid.uuid4())
+    job_run_id = job_run_id or str(uuid.uuid4())
     start_time = datetime.utcnow()
     metrics = MetricsCollector()
     error_sampler = ErrorSampler(max_samples=100)
@@ -149,8 +364,8 @@ def run_indexing_job(mapping_id: str):
                 status = "FAILED"
                 return
             
-            # Execute indexing
-            result = _process_mapping(mapping, metrics, error_sampler)
+            # Execute indexing (resumes from checkpoints of this job run, if any)
+            result = _process_mapping(mapping, metrics, error_sampler, job_run_id=job_run_id)
             
             rows_processed = result.get("total_rows", 0)
             rows_indexed = result.get("rows_indexed", 0)
@@ -158,7 +373,7 @@ def run_indexing_job(mapping_id: str):
             # Determine final status
             if result.get("status") == "FAILED":
                 status = "FAILED"
-            elif rows_indexed < rows_processed:
+            elif result.get("status") == "PARTIAL_SUCCESS" or rows_indexed < rows_processed:
                 status = "PARTIAL_SUCCESS"
             else:
                 status = "SUCCESS"
@@ -197,536 +412,1067 @@ def run_indexing_job(mapping_id: str):
             _record_error_samples(job_run_id, error_sampler.get_samples())
 
 
+@dataclass
+class IndexTask:
+    """What to index: one key range of a mapping's source table (picklable, sent to shard processes)."""
+    mapping_id: str
+    object_def_id: str
+    source_table: str
+    mapping_spec: Dict[str, Any]
+    index_mode: str = INDEX_MODE_FULL
+    transform_workers: int = 1
+    watermark_column: Optional[str] = None
+    since: Optional[str] = None
+    pk_column: Optional[str] = None
+    key_range: Tuple[Any, Any] = (None, None)  # lower < pk <= upper; None = open
+    checkpoint_id: Optional[str] = None  # Job run whose checkpoints this range uses (None = no checkpoints)
+    shard_index: int = 0  # Checkpoint sequence of this range within the run
+    job_run_id: Optional[str] = None  # Recorded on dead letters
+    object_type_api_name: Optional[str] = None
+    object_type_display_name: Optional[str] = None
+    property_configs: List[Dict[str, Any]] = field(default_factory=list)
+    property_types: Dict[str, str] = field(default_factory=dict)  # Property api_name -> data type
+    vector_storage: str = STORAGE_FLOAT32  # Object type's vector storage option
+
+
 def _process_mapping(
     mapping,
     metrics: MetricsCollector,
-    error_sampler: ErrorSampler
+    error_sampler: ErrorSampler,
+    job_run_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Process a single mapping definition with Triple Write support.
     
+    Chunks flow through an IndexingPipeline: a reader thread pre-fetches
+    chunks, a transform pool prepares them, and each store has its own
+    sink worker, so reads, transforms and writes overlap.
+    
+    With INDEXING_PROCESS_SHARDS > 1, large keyed tables are split into PK
+    ranges indexed by separate processes (see _process_shards).
+    
+    With a job_run_id, chunks are checkpointed and the job resumes after
+    the last fully committed chunk of an earlier attempt.
+    
     Returns: Statistics dict with row counts
     """
     mapping_id = mapping.id
+    logger.info(f"[IndexingWorker] Processing table: {mapping.source_table_name} -> {mapping.object_def_id}")
+    
+    task = _make_index_task(mapping)
+    task.job_run_id = job_run_id
+    raw_engine = get_pooled_engine(settings.raw_store_database_url)
+    
+    key_ranges = _plan_key_ranges(raw_engine, task, job_run_id)
+    task.checkpoint_id = job_run_id
+    if len(key_ranges) > 1:
+        stats = _process_shards(
+            [replace(task, key_range=r, shard_index=i) for i, r in enumerate(key_ranges)],
+            metrics,
+            error_sampler
+        )
+    else:
+        stats = _index_range(task, metrics, error_sampler)
+    
+    if stats["status"] == "FAILED":
+        return stats
+    
+    # Advance the watermark only after every chunk reached every store
+    if stats.get("failed_sinks"):
+        logger.warning(f"[IndexingWorker] Sinks {stats['failed_sinks']} missed chunks, watermark not advanced")
+    elif stats.get("watermark"):
+        _save_watermark(mapping_id, stats["watermark"])
+    
+    if job_run_id:
+        clear_checkpoints(job_run_id)
+    
+    return stats
+
+
+def _make_index_task(mapping) -> IndexTask:
+    """Index task of a whole mapping: object type info, watermark and source key resolved."""
+    mapping_id = mapping.id
     source_table = mapping.source_table_name
-    mapping_spec = mapping.mapping_spec
     object_def_id = mapping.object_def_id
     
-    logger.info(f"[IndexingWorker] Processing table: {source_table} -> {object_def_id}")
-    
-    # Identify file path columns for lineage (columns that contain file paths)
-    file_path_columns = _identify_file_path_columns(mapping_spec)
+    task = IndexTask(
+        mapping_id=mapping_id,
+        object_def_id=object_def_id,
+        source_table=source_table,
+        mapping_spec=mapping.mapping_spec,
+        index_mode=getattr(mapping, "index_mode", None) or INDEX_MODE_FULL,
+        transform_workers=getattr(mapping, "index_workers", None) or settings.indexing_transform_workers,
+    )
     
     # Get object type info and property configs for ES indexing
-    object_type_api_name = None
-    object_type_display_name = None
-    property_configs = []
-    
     try:
         object_type_info = _get_object_type_info(object_def_id)
         if object_type_info:
-            object_type_api_name = object_type_info.get("api_name")
-            object_type_display_name = object_type_info.get("display_name")
-            property_configs = object_type_info.get("property_configs", [])
-            logger.info(f"[IndexingWorker] Object type: {object_type_api_name}, {len(property_configs)} properties with search flags")
+            task.object_type_api_name = object_type_info.get("api_name")
+            task.object_type_display_name = object_type_info.get("display_name")
+            task.property_configs = object_type_info.get("property_configs", [])
+            task.property_types = object_type_info.get("property_types", {})
+            task.vector_storage = object_type_info.get("vector_storage") or STORAGE_FLOAT32
+            logger.info(f"[IndexingWorker] Object type: {task.object_type_api_name}, {len(task.property_configs)} properties with search flags")
     except Exception as e:
         logger.warning(f"[IndexingWorker] Failed to get object type info for ES indexing: {e}")
     
-    # Connect to raw store
-    raw_engine = create_engine(settings.raw_store_database_url)
+    # Read from raw store (shared pooled engine)
+    raw_engine = get_pooled_engine(settings.raw_store_database_url)
+    
+    watermark_column = getattr(mapping, "watermark_column", None) or DEFAULT_WATERMARK_COLUMN
+    if _source_has_column(raw_engine, source_table, watermark_column):
+        task.watermark_column = watermark_column
+    elif task.index_mode == INDEX_MODE_INCREMENTAL:
+        logger.warning(f"[IndexingWorker] Watermark column '{watermark_column}' not in {source_table}, running full pass")
+    
+    if task.index_mode == INDEX_MODE_INCREMENTAL and task.watermark_column:
+        task.since = getattr(mapping, "index_watermark", None)
+    logger.info(f"[IndexingWorker] Mode: {task.index_mode}, watermark: {task.watermark_column} > {task.since}")
+    
+    # Instance IDs derive from the source primary key (heuristic if the table has none)
+    task.pk_column = get_keyset_column(raw_engine, source_table)
+    
+    return task
+
+
+def _index_range(
+    task: IndexTask,
+    metrics: MetricsCollector,
+    error_sampler: ErrorSampler,
+    vector_writer: Optional[Callable[[List[str], Optional[np.ndarray], List[str]], int]] = None,
+    source_chunks: Optional[Iterable[pd.DataFrame]] = None,
+    replay: bool = False
+) -> Dict[str, Any]:
+    """
+    Run the indexing pipeline over one key range of the source table.
+    
+    Args:
+        vector_writer: Writes (ids, matrix, stale_ids) to the vector store;
+            defaults to writing ChromaDB from this process
+        source_chunks: Chunks to index instead of reading the source table
+            (dead letter replay); no filter, resume or checkpoints apply
+        replay: The chunks are dead letter payloads; their entries are
+            marked by the caller instead of resolved per chunk
+    
+    Returns: Statistics dict; "watermark" is the highest watermark seen (not saved)
+    """
+    object_def_id = task.object_def_id
+    plan = get_mapping_plan(task.mapping_spec, task.mapping_id)
+    scalar_dtype = property_sql_types(task.property_types)
+    raw_engine = get_pooled_engine(settings.raw_store_database_url)
+    
+    where, params = _build_source_filter(task.watermark_column, task.since)
+    if task.pk_column and task.key_range != (None, None):
+        range_where, range_params = key_range_filter(raw_engine, task.pk_column, *task.key_range)
+        where = f"({where}) AND {range_where}" if where else range_where
+        params = {**(params or {}), **range_params}
+    
+    resume = prepare_resume(task.checkpoint_id, task.shard_index) if task.checkpoint_id else ResumePoint()
+    tracker: Optional[CheckpointTracker] = None
+    sizer = _make_batch_sizer()
+    
+    rows_read: List[int] = []
+    chunk_watermarks: List[Any] = []
     
-    # Read source data in batches
-    batch_size = 1000
-    total_rows = 0
-    total_indexed = 0
-    total_vectors = 0
-    total_lineage = 0
+    # Rows indexed cleanly supersede their pending dead letters (a replay would write stale payloads)
+    resolves_dead_letters = not replay and has_pending_dead_letters(task.mapping_id)
     
-    query = f"SELECT * FROM {source_table}"
+    def write_scalar(batch: PreparedBatch) -> int:
+        written = _write_scalar_data(batch.scalar_df, object_def_id, dtype=scalar_dtype)
+        if resolves_dead_letters:
+            resolve_dead_letters(task.mapping_id, batch.indexed_row_ids)
+        return written
     
+    def transform(chunk) -> Optional[PreparedBatch]:
+        chunk_seq, chunk_df = chunk
+        rows_read.append(len(chunk_df))
+        chunk_watermark = chunk_watermark_type = None
+        if task.watermark_column and not chunk_df.empty:
+            chunk_watermarks.append(chunk_df[task.watermark_column].max())
+            if not _is_null(chunk_watermarks[-1]):
+                chunk_watermark = _format_watermark(chunk_watermarks[-1])
+                chunk_watermark_type = watermark_type_of(chunk_watermarks[-1])
+        if tracker:
+            last_key = _format_watermark(chunk_df[task.pk_column].max()) if task.pk_column and not chunk_df.empty else None
+            tracker.register(chunk_seq, last_key, len(chunk_df), chunk_watermark, chunk_watermark_type)
+        
+        started = time.perf_counter()
+        batch = _prepare_batch(
+            df=chunk_df,
+            plan=plan,
+            object_def_id=object_def_id,
+            mapping_id=task.mapping_id,
+            source_table=task.source_table,
+            metrics=metrics,
+            error_sampler=error_sampler,
+            pk_column=task.pk_column
+        )
+        sizer.record_stage(STAGE_TRANSFORM, len(chunk_df), (time.perf_counter() - started) * 1000)
+        if batch is None:
+            if tracker:
+                tracker.complete(chunk_seq)
+            return None
+        batch.chunk_seq = chunk_seq
+        batch.row_count = len(chunk_df)
+        if batch.dead_letters:
+            save_dead_letters(task.mapping_id, object_def_id, task.source_table, task.job_run_id, batch.dead_letters)
+        sizer.record_memory(len(chunk_df), _batch_memory_bytes(chunk_df, batch))
+        return batch
+    
+    if vector_writer is None:
+        def vector_writer(ids, matrix, stale_ids):
+            return _write_vector_data(ids, matrix, object_def_id, stale_ids=stale_ids, storage=task.vector_storage)[0]
+    
+    sinks = {
+        SINK_SCALAR: write_scalar,
+        SINK_VECTOR: lambda batch: vector_writer(batch.vector_ids, batch.vector_matrix, batch.stale_vector_ids),
+        SINK_LINEAGE: lambda batch: _write_lineage_data(batch.lineage_df, replace_ids=batch.existing_ids),
+    }
+    if task.property_configs and task.object_type_api_name:
+        sinks[SINK_ES] = lambda batch: _write_es_data(
+            batch.scalar_df,
+            object_type_api_name=task.object_type_api_name,
+            object_type_display_name=task.object_type_display_name,
+            property_configs=task.property_configs
+        )
+    
+    # Sink latency feeds the batch sizer (measured inside the slot: waiting for it is not batch cost)
+    sinks = {name: _with_batch_timing(sizer, name, write) for name, write in sinks.items()}
+    
+    # Every sink write holds a slot of its store's global concurrency cap
+    sinks = {name: _with_sink_slot(SINK_STORES[name], write) for name, write in sinks.items()}
+    
+    if task.checkpoint_id:
+        tracker = CheckpointTracker(task.checkpoint_id, list(sinks), shard_index=task.shard_index)
+        sinks = {name: _with_checkpoint(tracker, name, write) for name, write in sinks.items()}
+    
+    pipeline = IndexingPipeline(
+        transform=transform,
+        sinks=sinks,
+        transform_workers=task.transform_workers,
+        prefetch_chunks=settings.indexing_prefetch_chunks,
+        sink_queue_size=settings.indexing_sink_queue_size,
+        sink_policies={name: _sink_policy(name) for name in sinks},
+        on_sink_outcome=lambda batch, outcome: metrics.record_sink_outcome(batch.chunk_seq, outcome)
+    )
+    
+    if source_chunks is not None:
+        chunks = (chunk for chunk in source_chunks)
+    else:
+        # Bounded-memory read (keyset pagination or server-side cursor), sized per chunk
+        chunks = read_table_chunks(
+            raw_engine, task.source_table, chunk_size=sizer.next_size,
+            where=where, params=params, key_column=task.pk_column,
+            start_after=resume.last_key if task.pk_column else None
+        )
+    if resume.is_resume and not task.pk_column:
+        # No key to seek to: skip the committed rows of the (unordered) stream
+        chunks = skip_rows(chunks, resume.rows_done)
     try:
-        for chunk_df in pd.read_sql(query, raw_engine, chunksize=batch_size):
-            rows_processed, rows_indexed, vectors_indexed, lineage_written = _process_batch(
-                df=chunk_df, 
-                mapping_spec=mapping_spec, 
-                object_def_id=object_def_id,
-                mapping_id=mapping_id,
-                source_table=source_table,
-                file_path_columns=file_path_columns,
-                metrics=metrics,
-                error_sampler=error_sampler,
-                # ES indexing parameters
-                object_type_api_name=object_type_api_name,
-                object_type_display_name=object_type_display_name,
-                property_configs=property_configs
+        result = pipeline.run(enumerate(chunks, start=resume.next_seq))
+    finally:
+        # Return the streaming connection to the pool even if the pipeline stopped early
+        chunks.close()
+    
+    metrics.record_pipeline_timing(result.stage_busy_ms, result.wall_ms)
+    sizing = sizer.summary()
+    sizing["key_range"] = [None if k is None else str(k) for k in task.key_range]
+    metrics.record_batch_sizing(sizing)
+    
+    def sink_total(name: str) -> int:
+        return resume.sink_counts.get(name, 0) + result.sink_counts.get(name, 0)
+    
+    stats = {
+        "total_rows": resume.rows_done + sum(rows_read),
+        "rows_indexed": sink_total(SINK_SCALAR),
+        "total_vectors": sink_total(SINK_VECTOR),
+        "total_lineage": sink_total(SINK_LINEAGE),
+        "index_mode": task.index_mode,
+        "status": "SUCCESS",
+    }
+    if resume.is_resume:
+        stats["resumed_from_chunk"] = resume.next_seq
+    
+    failed_sinks = sorted(set(result.failed_writes) | set(result.dropped_writes))
+    for sink in failed_sinks:
+        failed = result.failed_writes.get(sink, [])
+        chunk_seqs = [batch.chunk_seq for batch, _ in failed]
+        error_sampler.add_error(
+            raw_row_id="N/A",
+            category="SYSTEM",
+            message=(
+                f"Sink '{sink}' did not write {len(failed) + result.dropped_writes.get(sink, 0)} chunks "
+                f"after retries and replay (chunks {chunk_seqs}): {failed[-1][1] if failed else 'replay queue full'}"
             )
-            total_rows += rows_processed
-            total_indexed += rows_indexed
-            total_vectors += vectors_indexed
-            total_lineage += lineage_written
-            
-            logger.info(f"[IndexingWorker] Processed batch: {rows_processed} rows, {rows_indexed} indexed, {vectors_indexed} vectors")
+        )
+    if failed_sinks:
+        stats["failed_sinks"] = failed_sinks
+        stats["status"] = "FAILED" if set(failed_sinks) - OPTIONAL_SINKS else "PARTIAL_SUCCESS"
     
-    except Exception as e:
-        logger.error(f"[IndexingWorker] Processing failed: {e}")
+    if not result.ok:
+        logger.error(f"[IndexingWorker] Processing failed in stage '{result.failed_stage}': {result.error}")
         error_sampler.add_error(
             raw_row_id="N/A",
             category="SYSTEM",
-            message=f"Batch processing failed: {str(e)}",
-            stack_trace=traceback.format_exc()
+            message=f"Batch processing failed ({result.failed_stage}): {str(result.error)}",
+            stack_trace=result.error_trace
         )
-        return {
-            "total_rows": total_rows,
-            "rows_indexed": total_indexed,
-            "total_vectors": total_vectors,
-            "total_lineage": total_lineage,
-            "status": "FAILED"
-        }
-    finally:
-        raw_engine.dispose()
+        stats["status"] = "FAILED"
+        return stats
+    if stats["status"] == "FAILED":
+        logger.error(f"[IndexingWorker] Sinks {failed_sinks} failed after retries and replay")
+        return stats
     
-    return {
-        "total_rows": total_rows,
-        "rows_indexed": total_indexed,
-        "total_vectors": total_vectors,
-        "total_lineage": total_lineage,
-        "status": "SUCCESS"
-    }
+    watermarks = [w for w in chunk_watermarks if not _is_null(w)]
+    if watermarks:
+        highest = max(watermarks)
+        stats["watermark"], stats["watermark_type"] = _format_watermark(highest), watermark_type_of(highest)
+    latest = max_watermark([
+        (stats.get("watermark"), stats.get("watermark_type")),
+        (resume.max_watermark, resume.watermark_type),
+    ])
+    if latest:
+        stats["watermark"], stats["watermark_type"] = latest
+    
+    return stats
 
 
-def _identify_file_path_columns(mapping_spec: Dict[str, Any]) -> List[str]:
+# ==========================================
+# Process-Pool Sharding
+# ==========================================
+
+def _plan_key_ranges(engine, task: IndexTask, job_run_id: Optional[str] = None) -> List[Tuple[Any, Any]]:
     """
-    Identify source columns that contain file paths (for lineage tracking).
+    PK ranges to index in parallel processes ([(None, None)] = one in-process run).
     
-    Looks for columns connected to image/file embedding transforms.
+    A resumed run keeps the split of its earlier attempt (saved on the run),
+    so each shard's checkpoints still describe the same key range.
     """
-    nodes = mapping_spec.get("nodes", [])
-    edges = mapping_spec.get("edges", [])
+    if not task.pk_column:
+        return [(None, None)]
+    if job_run_id:
+        try:
+            saved = load_shard_ranges(job_run_id)
+            if saved:
+                logger.info(f"[IndexingWorker] Job {job_run_id} resumes with its {len(saved)} saved shard ranges")
+                return saved
+            if load_checkpoints(job_run_id):
+                return [(None, None)]  # Earlier attempt ran in-process
+        except Exception as e:
+            logger.warning(f"[IndexingWorker] Cannot load shard ranges of {job_run_id}: {e}")
+    if settings.indexing_process_shards <= 1:
+        return [(None, None)]
     
-    node_map = {n["id"]: n for n in nodes}
-    # Build reverse edge map: source -> targets
-    source_to_targets = {}
-    for edge in edges:
-        src = edge["source"]
-        if src not in source_to_targets:
-            source_to_targets[src] = []
-        source_to_targets[src].append(edge["target"])
+    where, params = _build_source_filter(task.watermark_column, task.since)
+    try:
+        boundaries = key_range_boundaries(
+            engine, task.source_table, task.pk_column, settings.indexing_process_shards,
+            where=where, params=params, min_rows_per_part=settings.indexing_min_shard_rows
+        )
+    except Exception as e:
+        logger.warning(f"[IndexingWorker] Cannot split {task.source_table} into key ranges, indexing in-process: {e}")
+        return [(None, None)]
     
-    file_columns = []
+    bounds = [None] + boundaries + [None]
+    key_ranges = list(zip(bounds[:-1], bounds[1:]))
+    if job_run_id and len(key_ranges) > 1:
+        try:
+            save_shard_ranges(job_run_id, key_ranges)
+        except Exception as e:
+            # Unsaved ranges could not be matched to the shard checkpoints on resume
+            logger.warning(f"[IndexingWorker] Cannot save shard ranges of {job_run_id}, indexing in-process: {e}")
+            return [(None, None)]
+    return key_ranges
+
+
+def _process_shards(
+    tasks: List[IndexTask],
+    metrics: MetricsCollector,
+    error_sampler: ErrorSampler
+) -> Dict[str, Any]:
+    """
+    Index key ranges in a process pool and aggregate their results.
     
-    for node in nodes:
-        if node.get("type") != "source":
-            continue
-        
-        column = node.get("data", {}).get("column", node.get("column", ""))
-        if not column:
-            continue
+    Each shard process runs its own pipeline (read, transform, MySQL /
+    lineage / ES writes). Vector writes are sent back to this process and
+    written here, because the embedded ChromaDB client must not be written
+    from several processes. Shards keep going when another one fails.
+    """
+    started = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    logger.info(f"[IndexingWorker] Indexing {tasks[0].source_table} in {len(tasks)} shard processes")
+    
+    stats = {
+        "total_rows": 0,
+        "rows_indexed": 0,
+        "total_vectors": 0,
+        "total_lineage": 0,
+        "index_mode": tasks[0].index_mode,
+        "status": "SUCCESS",
+        "shards": len(tasks),
+    }
+    watermarks = []
+    
+    with context.Manager() as manager:
+        vector_requests = manager.Queue(maxsize=max(1, settings.indexing_sink_queue_size) * len(tasks))
+        vector_replies = [manager.Queue() for _ in tasks]
+        vector_thread = threading.Thread(
+            target=_serve_vector_writes,
+            args=(vector_requests, vector_replies, tasks[0].object_def_id, tasks[0].vector_storage),
+            name="index-vector-proxy",
+            daemon=True
+        )
+        vector_thread.start()
         
-        # Check if this source connects to a file-related transform
-        target_ids = source_to_targets.get(node["id"], [])
-        for tid in target_ids:
-            target_node = node_map.get(tid)
-            if target_node and target_node.get("type") == "transform":
-                func = target_node.get("data", {}).get("function", "")
-                if func in ("image_embedding_clip", "file_embedding"):
-                    file_columns.append(column)
-                    break
+        try:
+            with ProcessPoolExecutor(max_workers=len(tasks), mp_context=context) as pool:
+                futures = [
+                    pool.submit(_run_index_shard, task, shard, vector_requests, vector_replies[shard])
+                    for shard, task in enumerate(tasks)
+                ]
+                for shard, future in enumerate(futures):
+                    try:
+                        shard_stats, shard_metrics, shard_errors = future.result()
+                    except Exception as e:
+                        logger.error(f"[IndexingWorker] Shard {shard} crashed: {e}")
+                        error_sampler.add_error(
+                            raw_row_id="N/A",
+                            category="SYSTEM",
+                            message=f"Shard {shard} {tasks[shard].key_range} crashed: {e}",
+                            stack_trace=traceback.format_exc()
+                        )
+                        stats["status"] = "FAILED"
+                        continue
+                    
+                    metrics.merge(shard_metrics)
+                    error_sampler.merge(shard_errors)
+                    for key in ("total_rows", "rows_indexed", "total_vectors", "total_lineage"):
+                        stats[key] += shard_stats.get(key, 0)
+                    if shard_stats.get("status") == "FAILED":
+                        stats["status"] = "FAILED"
+                    elif shard_stats.get("status") == "PARTIAL_SUCCESS" and stats["status"] == "SUCCESS":
+                        stats["status"] = "PARTIAL_SUCCESS"
+                    if shard_stats.get("failed_sinks"):
+                        stats["failed_sinks"] = sorted(set(stats.get("failed_sinks", [])) | set(shard_stats["failed_sinks"]))
+                    if shard_stats.get("watermark"):
+                        watermarks.append((shard_stats["watermark"], shard_stats.get("watermark_type")))
+        finally:
+            vector_requests.put(None)
+            vector_thread.join()
+    
+    latest = max_watermark(watermarks)
+    if latest:
+        stats["watermark"], stats["watermark_type"] = latest
+    
+    # Shard pipelines overlapped: report real elapsed time, not their sum
+    metrics.wall_ms = (time.perf_counter() - started) * 1000
+    return stats
+
+
+def _run_index_shard(task: IndexTask, shard: int, vector_requests, vector_reply) -> tuple:
+    """
+    Shard process entry point: index one key range.
+    
+    Returns: (stats, MetricsCollector, ErrorSampler) of this shard
+    """
+    metrics = MetricsCollector()
+    error_sampler = ErrorSampler()
+    
+    def vector_writer(ids, matrix, stale_ids):
+        vector_requests.put((shard, ids, matrix, stale_ids))
+        ok, value = vector_reply.get()
+        if not ok:
+            raise RuntimeError(f"Vector write failed in parent process: {value}")
+        return value
+    
+    stats = _index_range(task, metrics, error_sampler, vector_writer=vector_writer)
+    return stats, metrics, error_sampler
+
+
+def _serve_vector_writes(vector_requests, vector_replies, object_def_id: str, storage: str = STORAGE_FLOAT32):
+    """Write the shards' vector batches to ChromaDB until a None request arrives."""
+    while True:
+        request = vector_requests.get()
+        if request is None:
+            return
+        shard, ids, matrix, stale_ids = request
+        try:
+            with sink_slot(STORE_CHROMA):
+                count = _write_vector_data(ids, matrix, object_def_id, stale_ids=stale_ids, storage=storage)[0]
+            vector_replies[shard].put((True, count))
+        except Exception as e:
+            vector_replies[shard].put((False, str(e)))
+
+
+def _build_source_filter(
+    watermark_column: Optional[str],
+    since: Optional[str]
+) -> tuple:
+    """
+    WHERE condition for the source rows to index: none, or rows at or above
+    the watermark.
     
-    return file_columns
+    _sync_timestamp has whole seconds and is stamped per sync batch, so a
+    batch committed after a run read an earlier one of the same second
+    shares its timestamp. The boundary is read again (IDs are deterministic
+    and every sink upserts) rather than skipping that batch for good.
+    """
+    if watermark_column and since is not None:
+        return f"`{watermark_column}` >= :since", {"since": since}
+    return None, None
+
+
+def _source_has_column(engine, source_table: str, column: str) -> bool:
+    try:
+        return any(c["name"] == column for c in sa_inspect(engine).get_columns(source_table))
+    except Exception as e:
+        logger.warning(f"[IndexingWorker] Could not inspect {source_table}: {e}")
+        return False
+
+
+def _is_null(value: Any) -> bool:
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _format_watermark(value: Any) -> str:
+    """Watermark as a string MySQL compares correctly against the column."""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if isinstance(value, (np.integer, np.floating)):
+        return str(value.item())
+    return str(value)
+
+
+def _save_watermark(mapping_id: str, watermark: str):
+    """Persist the highest indexed watermark on the mapping."""
+    try:
+        engine = get_pooled_engine(settings.database_url)
+        with engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE ctx_object_mapping_def SET index_watermark = :watermark WHERE id = :id
+            """), {"watermark": watermark, "id": mapping_id})
+        logger.info(f"[IndexingWorker] Watermark for mapping {mapping_id} advanced to {watermark}")
+    except Exception as e:
+        logger.error(f"[IndexingWorker] Failed to save watermark: {e}")
+
+
+def _with_checkpoint(tracker: CheckpointTracker, sink_name: str, write):
+    """Wrap a sink write so the chunk's commit marker is recorded after it."""
+    def checkpointed(batch):
+        count = write(batch)
+        tracker.commit(batch.chunk_seq, sink_name, count)
+        return count
+    return checkpointed
+
+
+def _sink_policy(sink_name: str) -> SinkPolicy:
+    """Retry / isolation policy of a sink from settings."""
+    return SinkPolicy(
+        max_attempts=settings.index_sink_max_attempts,
+        backoff_seconds=settings.index_sink_retry_backoff,
+        backoff_max_seconds=settings.index_sink_retry_backoff_max,
+        replay_queue_size=settings.index_sink_replay_queue_size,
+        circuit_threshold=settings.index_sink_circuit_threshold,
+        circuit_cooldown_seconds=settings.index_sink_circuit_cooldown,
+        required=sink_name not in OPTIONAL_SINKS,
+    )
+
+
+def _with_batch_timing(sizer: AdaptiveBatchSizer, sink_name: str, write):
+    """Wrap a sink write so its latency is reported to the batch sizer."""
+    def timed(batch):
+        started = time.perf_counter()
+        count = write(batch)
+        sizer.record_stage(sink_name, batch.row_count, (time.perf_counter() - started) * 1000)
+        return count
+    return timed
+
+
+def _make_batch_sizer() -> AdaptiveBatchSizer:
+    """Chunk sizer from settings (fixed at indexing_chunk_size when adaptive sizing is off)."""
+    if not settings.indexing_adaptive_batching:
+        size = settings.indexing_chunk_size
+        return AdaptiveBatchSizer(size, size, size, 0, 0)
+    return AdaptiveBatchSizer(
+        initial_size=settings.indexing_chunk_size,
+        min_size=settings.indexing_min_chunk_size,
+        max_size=settings.indexing_max_chunk_size,
+        target_latency_ms=settings.indexing_target_chunk_ms,
+        memory_limit_bytes=settings.indexing_chunk_memory_mb * 1024 * 1024,
+    )
 
 
-def _process_batch(
+def _batch_memory_bytes(chunk_df: pd.DataFrame, batch: "PreparedBatch") -> int:
+    """Memory held by a source chunk and its prepared batch."""
+    nbytes = int(chunk_df.memory_usage(deep=True).sum())
+    nbytes += int(batch.scalar_df.memory_usage(deep=True).sum())
+    nbytes += int(batch.lineage_df.memory_usage(deep=True).sum())
+    if batch.vector_matrix is not None:
+        nbytes += int(batch.vector_matrix.nbytes)
+    return nbytes
+
+
+def _with_sink_slot(store: str, write):
+    """Wrap a sink write so it runs inside the store's global write slot."""
+    def limited(batch):
+        with sink_slot(store):
+            return write(batch)
+    return limited
+
+
+# ==========================================
+# Batch Preparation (transform stage)
+# ==========================================
+
+@dataclass
+class PreparedBatch:
+    """A transformed chunk, ready to be written by the sink workers."""
+    scalar_df: pd.DataFrame
+    lineage_df: pd.DataFrame
+    vector_ids: List[str] = field(default_factory=list)
+    vector_matrix: Optional[np.ndarray] = None
+    existing_ids: List[str] = field(default_factory=list)  # Instance IDs indexed by an earlier run
+    stale_vector_ids: List[str] = field(default_factory=list)  # Existing instances that lost their vector
+    chunk_seq: int = 0  # Read order of the source chunk (checkpointing)
+    row_count: int = 0  # Source rows of the chunk (batch sizing)
+    dead_letters: List[Dict[str, Any]] = field(default_factory=list)  # Failed rows with their payload
+    indexed_row_ids: List[str] = field(default_factory=list)  # Source row IDs indexed without a failure
+
+
+def _prepare_batch(
     df: pd.DataFrame,
-    mapping_spec: Dict[str, Any],
+    plan: MappingPlan,
     object_def_id: str,
     mapping_id: str,
     source_table: str,
-    file_path_columns: List[str],
     metrics: MetricsCollector,
     error_sampler: ErrorSampler,
-    object_type_api_name: str = None,
-    object_type_display_name: str = None,
-    property_configs: List[Dict[str, Any]] = None
-) -> tuple:
+    pk_column: Optional[str] = None
+) -> Optional[PreparedBatch]:
     """
-    Process a batch of rows with Triple Write support.
+    Transform a chunk into the records each store needs.
     
-    Returns: (rows_processed, rows_indexed, vectors_indexed, lineage_written)
-    """
-    nodes = mapping_spec.get("nodes", [])
-    edges = mapping_spec.get("edges", [])
+    Transforms run column-at-a-time over the whole chunk; only transforms
+    without a vectorized implementation fall back to row-wise calls.
     
-    # Build node lookup and edge graph
-    node_map = {n["id"]: n for n in nodes}
-    edge_map = {}
-    for edge in edges:
-        edge_map[edge["target"]] = edge["source"]
+    Args:
+        pk_column: Source primary key column (detected heuristically if None)
     
-    # Identify vector properties
-    vector_props = _identify_vector_properties(nodes, edge_map, node_map)
+    Returns: PreparedBatch, or None for an empty chunk
+    """
+    if df.empty:
+        return None
     
-    scalar_records = []
-    vector_records = []
-    lineage_records = []
-    rows_with_errors = 0
+    vector_props = plan.vector_properties
     
     # Determine the primary key column for source rows
-    pk_column = None
-    for col in ["id", "ID", "pk", "primary_key", "_id"]:
-        if col in df.columns:
-            pk_column = col
-            break
-    if pk_column is None and len(df.columns) > 0:
-        pk_column = df.columns[0]
-    
-    for idx, row in df.iterrows():
-        row_dict = row.to_dict()
-        source_row_id = str(row_dict.get(pk_column, idx)) if pk_column else str(idx)
-        
-        try:
-            # Generate unique ID for this object instance
-            instance_id = str(uuid.uuid4())
-            
-            # Get file path for lineage (if any)
-            source_file_path = None
-            for col in file_path_columns:
-                if col in row_dict and row_dict[col]:
-                    source_file_path = str(row_dict[col])
-                    break
-            
-            # Transform row (with timing for AI operations)
-            transformed = _transform_row(row_dict, nodes, edge_map, node_map, metrics, error_sampler, source_row_id)
-            
-            # Separate scalar and vector properties
-            scalar_data = {"id": instance_id, "object_def_id": object_def_id}
-            vector_data = {"id": instance_id}
-            has_vector = False
-            
-            for prop, value in transformed.items():
-                if prop in vector_props:
-                    if value is not None:
-                        vector_data["vector"] = value
-                        has_vector = True
-                else:
-                    scalar_data[prop] = value
-            
-            scalar_records.append(scalar_data)
-            
-            if has_vector:
-                vector_records.append(vector_data)
-            
-            # Create lineage record for traceability
-            lineage_records.append({
-                "id": str(uuid.uuid4()),
-                "object_def_id": object_def_id,
-                "instance_id": instance_id,
-                "mapping_id": mapping_id,
-                "source_table": source_table,
-                "source_row_id": source_row_id,
-                "source_file_path": source_file_path,
-                "vector_collection": f"obj_type_{object_def_id.replace('-', '_')}" if has_vector else None
-            })
-            
-        except Exception as e:
-            rows_with_errors += 1
-            metrics.record_transform_error()
+    if not pk_column or pk_column not in df.columns:
+        pk_column = _detect_pk_column(df)
+    row_ids = df[pk_column].map(str) if pk_column else pd.Series(df.index.map(str), index=df.index)
+    
+    # Rows sharing a PK would map to one instance: keep the last one
+    duplicated = row_ids.duplicated(keep="last")
+    if duplicated.any():
+        for row_id in row_ids[duplicated]:
+            metrics.record_pk_collision()
             error_sampler.add_error(
-                raw_row_id=source_row_id,
+                raw_row_id=row_id,
                 category="SEMANTIC",
-                message=f"Row transformation failed: {str(e)}",
-                stack_trace=traceback.format_exc()
+                message=f"Duplicate source key '{row_id}' in column '{pk_column}', earlier row skipped"
             )
+        df = df[~duplicated]
+        row_ids = row_ids[~duplicated]
     
-    # Write scalar data to MySQL (obj_instance_store)
-    _write_scalar_data(scalar_records, object_def_id)
+    # Transform the whole chunk (rows failing a transform are dropped, and dead-lettered)
+    row_failures: Dict[Any, RowFailure] = {}
+    transformed = _transform_frame(df, plan, row_ids, metrics, error_sampler, row_failures)
+    dead_letters = build_dead_letters(df, row_ids, row_failures)
+    dropped = [idx for idx, failure in row_failures.items() if failure.stage == DEAD_STAGE_TRANSFORM]
+    if dropped:
+        ok_mask = ~df.index.isin(dropped)
+        df = df[ok_mask]
+        row_ids = row_ids[ok_mask]
+        transformed = transformed[ok_mask]
     
-    # Write vector data to ChromaDB
-    vectors_indexed = 0
-    vector_collection = None
-    if vector_records:
-        vectors_indexed, vector_collection = _write_vector_data(vector_records, object_def_id)
-        
-        # Update lineage records with actual collection name
-        if vector_collection:
-            for rec in lineage_records:
-                if rec["vector_collection"]:
-                    rec["vector_collection"] = vector_collection
-    
-    # Write lineage records
-    lineage_written = _write_lineage_data(lineage_records)
-    
-    # Write to Elasticsearch (Triple Write - Step 3)
-    es_indexed = 0
-    if property_configs and object_type_api_name:
-        try:
-            # Build ES documents from scalar records
-            es_objects = []
-            for rec in scalar_records:
-                es_objects.append({
-                    "id": rec["id"],
-                    **{k: v for k, v in rec.items() if k not in ("id", "object_def_id")}
-                })
-            
-            es_indexed = bulk_index_object_instances(
-                objects=es_objects,
-                object_type_api_name=object_type_api_name,
-                object_type_display_name=object_type_display_name or object_type_api_name,
-                property_configs=property_configs,
-                title_property=None,  # Will be detected from is_title flag
-                project_id=None
-            )
-            logger.info(f"[IndexingWorker] Indexed {es_indexed} objects to Elasticsearch")
-        except Exception as e:
-            logger.error(f"[IndexingWorker] ES indexing failed: {e}")
+    # Reuse instance IDs of rows indexed before; new rows get a deterministic ID
+    known_ids = _lookup_instance_ids(object_def_id, source_table, row_ids.unique().tolist())
+    instance_ids = row_ids.map(known_ids).astype(object)
+    is_existing = instance_ids.notna()
+    new_mask = ~is_existing
+    instance_ids[new_mask] = [make_instance_id(object_def_id, row_id) for row_id in row_ids[new_mask]]
+    
+    # Separate scalar and vector properties (last non-null vector wins)
+    scalar_df = pd.DataFrame({"id": instance_ids, "object_def_id": object_def_id}, index=transformed.index)
+    vectors = pd.Series([None] * len(transformed), index=transformed.index, dtype=object)
+    for prop in transformed.columns:
+        if prop in vector_props:
+            column = transformed[prop]
+            vectors = column.where(column.notna(), vectors)
+        else:
+            scalar_df[prop] = transformed[prop]
+    
+    has_vector = vectors.notna()
+    vector_ids = instance_ids[has_vector].tolist()
+    vector_matrix = np.stack(vectors[has_vector].tolist()).astype(np.float32, copy=False) if vector_ids else None
     
-    rows_indexed = len(scalar_records) - rows_with_errors
-    return len(df), rows_indexed, vectors_indexed, lineage_written
+    # Lineage records for traceability
+    lineage_df = pd.DataFrame({
+        "id": [_make_lineage_id(mapping_id, instance_id) for instance_id in instance_ids],
+        "object_def_id": object_def_id,
+        "instance_id": instance_ids,
+        "mapping_id": mapping_id,
+        "source_table": source_table,
+        "source_row_id": row_ids,
+        "source_file_path": _first_file_path(df, plan.file_path_columns),
+        "vector_collection": None,
+    }, index=transformed.index)
+    lineage_df["vector_collection"] = lineage_df["vector_collection"].astype(object)
+    lineage_df.loc[has_vector, "vector_collection"] = object_collection_name(object_def_id)
+    
+    return PreparedBatch(
+        scalar_df=scalar_df,
+        lineage_df=lineage_df,
+        vector_ids=vector_ids,
+        vector_matrix=vector_matrix,
+        existing_ids=instance_ids[is_existing].tolist(),
+        stale_vector_ids=instance_ids[is_existing & ~has_vector].tolist(),
+        dead_letters=dead_letters,
+        indexed_row_ids=row_ids[~row_ids.index.isin(list(row_failures))].tolist(),
+    )
 
 
-def _identify_vector_properties(
-    nodes: List[Dict],
-    edge_map: Dict[str, str],
-    node_map: Dict[str, Dict]
-) -> set:
-    """
-    Identify which target properties will contain vectors.
+def make_instance_id(object_def_id: str, source_row_id: Any) -> str:
+    """Deterministic instance ID for a source row: uuid5 of (object_def_id, row PK)."""
+    return str(uuid.uuid5(INSTANCE_ID_NAMESPACE, f"{object_def_id}:{source_row_id}"))
+
+
+def _make_lineage_id(mapping_id: str, instance_id: str) -> str:
+    """Deterministic lineage record ID (one record per mapping and instance)."""
+    return str(uuid.uuid5(INSTANCE_ID_NAMESPACE, f"lineage:{mapping_id}:{instance_id}"))
+
+
+def _lookup_instance_ids(
+    object_def_id: str,
+    source_table: str,
+    source_row_ids: List[str]
+) -> Dict[str, str]:
     """
-    vector_props = set()
+    Map source row IDs to the instance IDs they were indexed under before.
     
-    for node in nodes:
-        if node.get("type") != "target":
-            continue
-        
-        prop = node.get("data", {}).get("property", node.get("property", ""))
-        if not prop:
-            continue
-        
-        # Check if this target is connected to a vector transform
-        source_id = edge_map.get(node["id"])
-        if source_id:
-            source_node = node_map.get(source_id)
-            if source_node and source_node.get("type") == "transform":
-                func = source_node.get("data", {}).get("function", "")
-                if func in ("image_embedding_clip", "text_embedding"):
-                    vector_props.add(prop)
-    
-    return vector_props
-
-
-def _transform_row(
-    row: Dict[str, Any],
-    nodes: List[Dict],
-    edge_map: Dict[str, str],
-    node_map: Dict[str, Dict],
-    metrics: MetricsCollector,
-    error_sampler: ErrorSampler,
-    source_row_id: str
-) -> Dict[str, Any]:
-    """
-    Apply transformations to a single row.
+    Reads ctx_object_instance_lineage; rows never indexed are absent. If a
+    row has several lineage records (legacy duplicate runs), the oldest wins.
     """
-    result = {}
+    if not source_row_ids:
+        return {}
     
-    for node in nodes:
-        if node.get("type") != "target":
-            continue
-        
-        prop = node.get("data", {}).get("property", node.get("property", ""))
-        if not prop:
-            continue
-        
-        value = _resolve_value(node["id"], edge_map, node_map, row, metrics, error_sampler, source_row_id)
-        result[prop] = value
+    engine = get_pooled_engine(settings.database_url)
+    stmt = text("""
+        SELECT source_row_id, instance_id
+        FROM ctx_object_instance_lineage
+        WHERE object_def_id = :object_def_id
+        AND source_table = :source_table
+        AND source_row_id IN :row_ids
+        ORDER BY created_at DESC
+    """).bindparams(bindparam("row_ids", expanding=True))
+    
+    with engine.connect() as conn:
+        rows = conn.execute(stmt, {
+            "object_def_id": object_def_id,
+            "source_table": source_table,
+            "row_ids": source_row_ids,
+        }).fetchall()
     
-    return result
+    # Newest first, so the oldest record overwrites
+    return {row[0]: row[1] for row in rows}
+
+
+def _detect_pk_column(df: pd.DataFrame) -> Optional[str]:
+    """Determine the primary key column for source rows."""
+    for col in ["id", "ID", "pk", "primary_key", "_id"]:
+        if col in df.columns:
+            return col
+    if len(df.columns) > 0:
+        return df.columns[0]
+    return None
 
 
-def _resolve_value(
-    node_id: str,
-    edge_map: Dict[str, str],
-    node_map: Dict[str, Dict],
-    row: Dict[str, Any],
+def _first_file_path(df: pd.DataFrame, file_path_columns: List[str]) -> pd.Series:
+    """Per row, the first non-blank value among the file path columns."""
+    paths = pd.Series([None] * len(df), index=df.index, dtype=object)
+    for col in reversed(file_path_columns):
+        if col in df.columns:
+            values = df[col]
+            paths = values.map(str).astype(object).where(~blank_mask(values), paths)
+    return paths
+
+
+def _transform_frame(
+    df: pd.DataFrame,
+    plan: MappingPlan,
+    row_ids: pd.Series,
     metrics: MetricsCollector,
     error_sampler: ErrorSampler,
-    source_row_id: str
-) -> Any:
-    """
-    Recursively resolve value for a node.
+    row_failures: Dict[Any, RowFailure]
+) -> pd.DataFrame:
     """
-    node = node_map.get(node_id)
-    if not node:
-        return None
-    
-    node_type = node.get("type")
-    node_data = node.get("data", {})
-    
-    if node_type == "source":
-        column = node_data.get("column", node.get("column", ""))
-        return row.get(column)
-    
-    elif node_type == "transform":
-        func_name = node_data.get("function", node.get("function", ""))
-        source_id = edge_map.get(node_id)
-        
-        if not source_id:
-            return None
-        
-        input_value = _resolve_value(source_id, edge_map, node_map, row, metrics, error_sampler, source_row_id)
-        return _apply_transform(func_name, input_value, metrics, error_sampler, source_row_id)
+    Apply the compiled mapping plan column-at-a-time to a chunk.
     
-    elif node_type == "target":
-        source_id = edge_map.get(node_id)
-        if not source_id:
-            return None
-        return _resolve_value(source_id, edge_map, node_map, row, metrics, error_sampler, source_row_id)
+    Scalar transforms run as vectorized Series operations, embeddings run
+    through the batched encoder stage, and anything else falls back to
+    row-wise _apply_transform.
+    Rows whose transform raised or whose embedding failed are added to
+    row_failures (by index label).
+    """
+    def apply_column(func_name: str, series: pd.Series) -> pd.Series:
+        if func_name in EMBEDDING_TRANSFORMS:
+            return _apply_embedding_column(func_name, series, row_ids, metrics, error_sampler, row_failures)
+        if is_scalar_transform(func_name):
+            try:
+                return apply_column_transform(func_name, series)
+            except Exception as e:
+                logger.debug(f"[IndexingWorker] Vectorized {func_name} failed, falling back to row-wise: {e}")
+        return _apply_transform_rowwise(func_name, series, row_ids, metrics, error_sampler, row_failures)
     
-    return None
+    return plan.evaluate_frame(df, apply_column)
 
 
-def _apply_transform(
+def _apply_transform_rowwise(
     func_name: str,
-    input_value: Any,
+    series: pd.Series,
+    row_ids: pd.Series,
     metrics: MetricsCollector,
     error_sampler: ErrorSampler,
-    source_row_id: str
-) -> Any:
+    row_failures: Dict[Any, RowFailure]
+) -> pd.Series:
     """
-    Apply transformation function with timing and error handling.
+    Row-wise fallback for transforms without a columnar implementation.
     """
-    if func_name == "image_embedding_clip":
-        # Simulate AI inference with timing
-        start_time = time.time()
-        
+    values = []
+    for idx, value, source_row_id in zip(series.index, series.tolist(), row_ids.tolist()):
         try:
-            # Simulate corrupt media detection (random for demo)
-            if random.random() < 0.01:  # 1% chance of corrupt file
-                metrics.record_corrupt_media()
-                error_sampler.add_error(
-                    raw_row_id=source_row_id,
-                    category="MEDIA_IO",
-                    message=f"Corrupt or unreadable media file: {input_value}"
-                )
-                return None
-            
-            # Mock: Generate random 768-dim vector
-            # In production, use actual CLIP model
-            result = [round(random.uniform(-1, 1), 6) for _ in range(768)]
-            
-            # Record latency
-            latency_ms = (time.time() - start_time) * 1000
-            # Add simulated AI latency (50-300ms)
-            latency_ms += random.uniform(50, 300)
-            metrics.record_ai_latency(latency_ms)
-            
-            return result
-            
+            values.append(_apply_transform(func_name, value, metrics, error_sampler, source_row_id))
         except Exception as e:
+            values.append(None)
+            failure = row_failures.get(idx)
+            if failure is not None and failure.stage == DEAD_STAGE_TRANSFORM:
+                continue
+            row_failures[idx] = RowFailure(DEAD_STAGE_TRANSFORM, "SEMANTIC", f"{func_name}: {e}")
             metrics.record_transform_error()
             error_sampler.add_error(
                 raw_row_id=source_row_id,
-                category="AI_INFERENCE",
-                message=f"Image embedding failed: {str(e)}",
+                category="SEMANTIC",
+                message=f"Row transformation failed: {str(e)}",
                 stack_trace=traceback.format_exc()
             )
-            return None
     
-    elif func_name == "text_embedding":
-        start_time = time.time()
-        
-        try:
-            # Mock: Generate random 768-dim vector
-            result = [round(random.uniform(-1, 1), 6) for _ in range(768)]
-            
-            latency_ms = (time.time() - start_time) * 1000
-            latency_ms += random.uniform(20, 100)  # Text is faster than image
-            metrics.record_ai_latency(latency_ms)
-            
-            return result
-            
-        except Exception as e:
-            metrics.record_transform_error()
+    return pd.Series(values, index=series.index, dtype=object)
+
+
+def _apply_embedding_column(
+    func_name: str,
+    series: pd.Series,
+    row_ids: pd.Series,
+    metrics: MetricsCollector,
+    error_sampler: ErrorSampler,
+    row_failures: Dict[Any, RowFailure]
+) -> pd.Series:
+    """
+    Batched embedding stage for a whole column.
+    
+    All inputs of the chunk go to the encoder in micro-batches and come back
+    as one contiguous float32 matrix; the returned Series holds row views of
+    that matrix (None where the input was blank or unreadable).
+    Rows left without a vector by a failure are added to row_failures.
+    """
+    kind = EMBEDDING_TRANSFORMS[func_name]
+    start_time = time.time()
+    
+    try:
+        matrix, valid = encode_batched(get_encoder(kind), series.tolist())
+    except Exception as e:
+        metrics.record_transform_error()
+        error_sampler.add_error(
+            raw_row_id=str(row_ids.iloc[0]) if len(row_ids) else "N/A",
+            category="AI_INFERENCE",
+            message=f"{kind.capitalize()} embedding failed for {len(series)} rows: {str(e)}",
+            stack_trace=traceback.format_exc()
+        )
+        failure = RowFailure(DEAD_STAGE_EMBEDDING, "AI_INFERENCE", f"{kind.capitalize()} embedding failed: {e}")
+        for idx in series.index[~blank_mask(series).to_numpy()]:
+            row_failures.setdefault(idx, failure)
+        return pd.Series([None] * len(series), index=series.index, dtype=object)
+    
+    metrics.record_ai_batch((time.time() - start_time) * 1000, int(valid.sum()))
+    
+    # Non-blank image paths the encoder could not read
+    if kind == EMBEDDING_IMAGE:
+        unreadable = ~valid & ~blank_mask(series).to_numpy()
+        for idx, source_row_id, path in zip(series.index[unreadable], row_ids[unreadable], series[unreadable]):
+            metrics.record_corrupt_media()
             error_sampler.add_error(
                 raw_row_id=source_row_id,
-                category="AI_INFERENCE",
-                message=f"Text embedding failed: {str(e)}"
+                category="MEDIA_IO",
+                message=f"Corrupt or unreadable media file: {path}"
             )
-            return None
+            row_failures.setdefault(idx, RowFailure(DEAD_STAGE_EMBEDDING, "MEDIA_IO", f"Corrupt or unreadable media file: {path}"))
     
-    elif func_name == "concat":
-        return str(input_value) if input_value else ""
-    
-    elif func_name == "to_uppercase":
-        return str(input_value).upper() if input_value else ""
-    
-    elif func_name == "to_lowercase":
-        return str(input_value).lower() if input_value else ""
+    vectors = pd.Series(list(matrix), index=series.index, dtype=object)
+    return vectors.where(valid, None)
+
+
+def _apply_transform(
+    func_name: str,
+    input_value: Any,
+    metrics: MetricsCollector,
+    error_sampler: ErrorSampler,
+    source_row_id: str
+) -> Any:
+    """
+    Apply a transformation function to a single value (row-wise fallback).
     
-    elif func_name == "format_date":
-        return input_value
+    Embedding transforms never reach here; they run batched in
+    _apply_embedding_column.
+    """
+    if is_scalar_transform(func_name):
+        return apply_scalar_transform(func_name, input_value)
     
     return input_value
 
 
-def _write_scalar_data(records: List[Dict], object_def_id: str):
+def _write_scalar_data(
+    df: pd.DataFrame,
+    object_def_id: str,
+    dtype: Optional[Dict[str, Any]] = None
+) -> int:
     """
     Write scalar properties to MySQL instance store.
+    
+    Rows are upserted by instance ID in bulk (multi-row INSERT ... ON
+    DUPLICATE KEY UPDATE, or LOAD DATA LOCAL INFILE ... REPLACE), so
+    rewriting a chunk never duplicates instances.
+    
+    Args:
+        dtype: Column SQL types from the object type's property data types
+            (used for the table DDL and to coerce values)
     """
-    if not records:
-        return
+    if df.empty:
+        return 0
     
     table_name = f"obj_instance_{object_def_id.replace('-', '_')}"
     
-    df = pd.DataFrame(records)
-    
-    engine = create_engine(settings.raw_store_database_url)
-    df.to_sql(table_name, engine, if_exists="append", index=False)
-    engine.dispose()
+    engine = get_pooled_engine(settings.raw_store_database_url)
+    upsert_dataframe(
+        engine, table_name, df, "id",
+        dtype=dtype,
+        rows_per_statement=settings.scalar_write_rows_per_statement,
+        method=settings.scalar_write_method
+    )
     
-    logger.info(f"[IndexingWorker] Wrote {len(records)} scalar records to {table_name}")
+    logger.info(f"[IndexingWorker] Wrote {len(df)} scalar records to {table_name}")
+    return len(df)
 
 
-def _write_vector_data(records: List[Dict], object_def_id: str) -> tuple:
+def _write_vector_data(
+    ids: List[str],
+    matrix: np.ndarray,
+    object_def_id: str,
+    stale_ids: Optional[List[str]] = None,
+    storage: str = STORAGE_FLOAT32
+) -> tuple:
     """
-    Write vector properties to ChromaDB.
+    Write vector properties to ChromaDB (upsert by instance ID).
+    
+    Args:
+        ids: Instance IDs, one per matrix row
+        matrix: Contiguous float32 matrix of shape (len(ids), dimension)
+        stale_ids: Existing instances whose vector is now empty (deleted)
+        storage: Vector storage option of the object type (FLOAT16 / INT8
+            collections are quantized, see quantized_vectors.py)
     
     Returns: (count, collection_name)
     """
-    if not records:
-        return 0, None
+    if stale_ids:
+        try:
+            delete_vectors(object_collection_name(object_def_id), stale_ids)
+        except Exception as e:
+            logger.warning(f"[IndexingWorker] Stale vector cleanup failed: {e}")
     
-    try:
-        collection_name = ensure_object_collection(object_def_id, dimension=768)
-        count = upsert_vectors(collection_name, records)
-        
-        logger.info(f"[IndexingWorker] Indexed {count} vectors to {collection_name}")
-        return count, collection_name
-        
-    except Exception as e:
-        logger.error(f"[IndexingWorker] Vector write failed: {e}")
+    if not ids:
         return 0, None
+    
+    collection_name = ensure_object_collection(object_def_id, dimension=matrix.shape[1], storage=storage)
+    count = upsert_vectors(collection_name, [{"id": i} for i in ids], embeddings=matrix)
+    
+    logger.info(f"[IndexingWorker] Indexed {count} vectors to {collection_name}")
+    return count, collection_name
 
 
-def _write_lineage_data(records: List[Dict]) -> int:
+def _write_lineage_data(df: pd.DataFrame, replace_ids: Optional[List[str]] = None) -> int:
     """
     Write lineage records to MySQL for traceability.
+    
+    Records are upserted by their deterministic ID. Legacy records of
+    instances in replace_ids (written under random IDs) are removed first.
     """
-    if not records:
+    if df.empty:
         return 0
     
-    try:
-        df = pd.DataFrame(records)
-        
-        engine = create_engine(settings.database_url)
-        df.to_sql("ctx_object_instance_lineage", engine, if_exists="append", index=False)
-        engine.dispose()
-        
-        logger.info(f"[IndexingWorker] Wrote {len(records)} lineage records")
-        return len(records)
-        
-    except Exception as e:
-        logger.error(f"[IndexingWorker] Lineage write failed: {e}")
-        logger.error(traceback.format_exc())
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        if replace_ids:
+            conn.execute(
+                text("""
+                    DELETE FROM ctx_object_instance_lineage
+                    WHERE instance_id IN :instance_ids AND id NOT IN :keep_ids
+                """).bindparams(bindparam("instance_ids", expanding=True), bindparam("keep_ids", expanding=True)),
+                {"instance_ids": replace_ids, "keep_ids": df["id"].tolist()}
+            )
+        df.to_sql(
+            "ctx_object_instance_lineage", conn, if_exists="append", index=False,
+            method=upsert_method("id")
+        )
+    
+    logger.info(f"[IndexingWorker] Wrote {len(df)} lineage records")
+    return len(df)
+
+
+def _write_es_data(
+    scalar_df: pd.DataFrame,
+    object_type_api_name: str,
+    object_type_display_name: Optional[str],
+    property_configs: List[Dict[str, Any]]
+) -> int:
+    """
+    Write object instances to Elasticsearch (Triple Write - Step 3).
+    
+    Raises if not every document was indexed, so the pipeline retries the
+    chunk (documents are indexed by instance ID, so retries are idempotent).
+    """
+    if scalar_df.empty:
         return 0
+    
+    # Build ES documents from scalar records
+    es_objects = scalar_df.drop(columns=["object_def_id"]).to_dict(orient="records")
+    
+    es_indexed = bulk_index_object_instances(
+        objects=es_objects,
+        object_type_api_name=object_type_api_name,
+        object_type_display_name=object_type_display_name or object_type_api_name,
+        property_configs=property_configs,
+        title_property=None,  # Will be detected from is_title flag
+        project_id=None
+    )
+    if es_indexed < len(es_objects):
+        raise RuntimeError(f"Elasticsearch indexed {es_indexed} of {len(es_objects)} objects")
+    
+    logger.info(f"[IndexingWorker] Indexed {es_indexed} objects to Elasticsearch")
+    return es_indexed
 
 
 # ==========================================
@@ -737,72 +1483,284 @@ def _get_object_type_info(object_def_id: str) -> Optional[Dict[str, Any]]:
     """
     Get object type info and property configurations for ES indexing.
     
-    Returns dict with:
-        - api_name: Object type API name
-        - display_name: Object type display name
-        - property_configs: List of property configs with search flags
+    Served from the versioned object type cache; see
+    object_type_cache.get_object_type_info for the returned fields.
     """
+    return get_object_type_info(object_def_id)
+
+
+# ==========================================
+# Dead Letter Replay
+# ==========================================
+
+def replay_dead_letters(
+    mapping_id: str,
+    dead_letter_ids: Optional[List[str]] = None,
+    job_run_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Index the pending dead letter rows of a mapping again.
+    
+    The stored payloads go through the mapping's compiled plan and every
+    sink like a normal chunk, without reading the source table. Rows that
+    index cleanly are marked REPLAYED; rows failing again stay PENDING with
+    their new error. The replay is recorded as a job run.
+    
+    Args:
+        dead_letter_ids: Entries to replay (default: every pending entry)
+    
+    Returns: Statistics dict, with "replayed" and "still_failing" row counts
+    """
+    logger.info(f"[IndexingWorker] Replaying dead letters of mapping: {mapping_id}")
+    
+    job_run_id = job_run_id or str(uuid.uuid4())
+    start_time = datetime.utcnow()
+    metrics = MetricsCollector()
+    error_sampler = ErrorSampler(max_samples=100)
+    
+    object_def_id = None
+    stats: Dict[str, Any] = {"total_rows": 0, "rows_indexed": 0, "status": "FAILED"}
+    replayed_ids: List[str] = []
+    
+    def chunks():
+        # Pages stay stable: entries failing again are updated in place
+        offset = 0
+        while True:
+            entries = load_dead_letters(
+                mapping_id, ids=dead_letter_ids, limit=settings.indexing_chunk_size, offset=offset
+            )
+            if not entries:
+                return
+            offset += len(entries)
+            replayed_ids.extend(entry["id"] for entry in entries)
+            yield dead_letter_frame(entries)
+    
     try:
-        engine = create_engine(settings.database_url)
-        
-        with engine.connect() as conn:
-            # Get object type info
-            obj_result = conn.execute(text("""
-                SELECT 
-                    otd.api_name,
-                    otv.display_name
-                FROM meta_object_type_def otd
-                LEFT JOIN meta_object_type_ver otv ON otd.current_version_id = otv.id
-                WHERE otd.id = :def_id
-            """), {"def_id": object_def_id})
-            
-            obj_row = obj_result.fetchone()
-            if not obj_row:
-                return None
-            
-            api_name, display_name = obj_row
-            
-            # Get property configs with search flags
-            props_result = conn.execute(text("""
-                SELECT 
-                    spd.api_name AS property_api_name,
-                    spd.display_name AS property_display_name,
-                    spd.data_type,
-                    ovp.is_searchable,
-                    ovp.is_filterable,
-                    ovp.is_sortable,
-                    ovp.is_title
-                FROM rel_object_ver_property ovp
-                JOIN meta_shared_property_def spd ON ovp.property_def_id = spd.id
-                JOIN meta_object_type_ver otv ON ovp.object_ver_id = otv.id
-                JOIN meta_object_type_def otd ON otv.def_id = otd.id
-                WHERE otd.id = :def_id
-                AND (ovp.is_searchable = 1 OR ovp.is_filterable = 1 OR ovp.is_sortable = 1 OR ovp.is_title = 1)
-            """), {"def_id": object_def_id})
+        with get_session_context() as session:
+            mapping = mapping_crud.get_mapping(session, mapping_id)
+            if not mapping:
+                raise ValueError(f"Mapping not found: {mapping_id}")
+            if mapping.status != "PUBLISHED":
+                raise ValueError(f"Mapping not published: {mapping_id}")
             
-            property_configs = []
-            for row in props_result:
-                property_configs.append({
-                    "api_name": row[0],
-                    "display_name": row[1],
-                    "data_type": row[2],
-                    "is_searchable": bool(row[3]),
-                    "is_filterable": bool(row[4]),
-                    "is_sortable": bool(row[5]),
-                    "is_title": bool(row[6]),
-                })
+            object_def_id = mapping.object_def_id
+            task = _make_index_task(mapping)
+            task.job_run_id = job_run_id
+            stats = _index_range(task, metrics, error_sampler, source_chunks=chunks(), replay=True)
         
-        engine.dispose()
+        # Rows failing again were re-saved under this run's ID
+        if stats["status"] != "FAILED":
+            still_failing = {entry["id"] for entry in load_dead_letters(mapping_id, job_run_id=job_run_id)}
+            mark_replayed([entry_id for entry_id in replayed_ids if entry_id not in still_failing])
+            stats["replayed"] = len(replayed_ids) - len(still_failing)
+            stats["still_failing"] = len(still_failing)
+            if still_failing and stats["status"] == "SUCCESS":
+                stats["status"] = "PARTIAL_SUCCESS"
         
-        return {
-            "api_name": api_name,
-            "display_name": display_name or api_name,
-            "property_configs": property_configs
-        }
+        logger.info(f"[IndexingWorker] Dead letter replay of {mapping_id}: {stats}")
         
     except Exception as e:
-        logger.error(f"[IndexingWorker] Failed to get object type info: {e}")
-        return None
+        logger.error(f"[IndexingWorker] Dead letter replay failed for {mapping_id}: {e}")
+        logger.error(traceback.format_exc())
+        stats["status"] = "FAILED"
+        error_sampler.add_error(
+            raw_row_id="N/A",
+            category="SYSTEM",
+            message=str(e),
+            stack_trace=traceback.format_exc()
+        )
+    
+    finally:
+        job_metrics = metrics.to_dict()
+        job_metrics["dead_letter_replay"] = {
+            "rows": len(replayed_ids),
+            "replayed": stats.get("replayed", 0),
+            "still_failing": stats.get("still_failing", 0),
+        }
+        _record_job_run(
+            job_run_id=job_run_id,
+            mapping_id=mapping_id,
+            object_def_id=object_def_id or "unknown",
+            start_time=start_time,
+            end_time=datetime.utcnow(),
+            status=stats["status"],
+            rows_processed=stats.get("total_rows", 0),
+            rows_indexed=stats.get("rows_indexed", 0),
+            metrics=job_metrics
+        )
+        if error_sampler.samples:
+            _record_error_samples(job_run_id, error_sampler.get_samples())
+    
+    return stats
+
+
+# ==========================================
+# Dry Run / Cost Estimation
+# ==========================================
+
+# Storage overheads added to the measured payload (bytes, approximate)
+_MYSQL_ROW_OVERHEAD = 24  # InnoDB record header, transaction and rollback pointers
+_VECTOR_INDEX_OVERHEAD = 128  # HNSW neighbour links per vector (M=16)
+_DRY_RUN_WARMUP_ROWS = 10  # Rows transformed untimed first (encoder model load)
+
+
+def estimate_indexing_job(
+    source_table: str,
+    mapping_spec: Dict[str, Any],
+    object_def_id: Optional[str] = None,
+    sample_size: int = 1000
+) -> Dict[str, Any]:
+    """
+    Dry run: estimate how long indexing a source table takes and what it stores.
+    
+    Reads the first sample_size rows, runs the compiled transforms and the ES
+    document builder on them without writing anywhere, and extrapolates
+    rows/sec per stage and storage per record to the table's COUNT(*).
+    Sink writes are not run, so the duration is a lower bound.
+    
+    Args:
+        object_def_id: Target object type; enables ES document sizing and
+            typed MySQL row sizes (its property configs and data types)
+    
+    Returns: Estimate dict (see IndexingCostEstimate)
+    """
+    raw_engine = get_pooled_engine(settings.raw_store_database_url)
+    plan = get_mapping_plan(mapping_spec)
+    warnings = ["Sink writes are not run in a dry run; the duration excludes them"]
+    
+    with raw_engine.connect() as conn:
+        total_rows = conn.execute(text(f"SELECT COUNT(*) FROM {source_table}")).scalar() or 0
+    pk_column = get_keyset_column(raw_engine, source_table)
+    
+    started = time.perf_counter()
+    chunks = read_table_chunks(raw_engine, source_table, chunk_size=sample_size, key_column=pk_column)
+    try:
+        sample = next(chunks, None)
+    finally:
+        chunks.close()
+    read_sec = time.perf_counter() - started
+    
+    estimate: Dict[str, Any] = {
+        "sample_rows": 0,
+        "total_rows": total_rows,
+        "failed_sample_rows": 0,
+        "stage_rows_per_sec": {},
+        "bottleneck_stage": None,
+        "estimated_duration_seconds": 0.0,
+        "mysql_row_bytes": 0.0,
+        "mysql_bytes": 0,
+        "lineage_bytes": 0,
+        "vector_count": 0,
+        "vector_dimension": 0,
+        "vector_bytes": 0,
+        "es_document_bytes": 0.0,
+        "es_bytes": 0,
+        "total_bytes": 0,
+        "warnings": warnings,
+    }
+    if sample is None or sample.empty:
+        warnings.append("Source table is empty")
+        return estimate
+    
+    sample_rows = len(sample)
+    scale = total_rows / sample_rows
+    estimate["sample_rows"] = sample_rows
+    stage_rps = {STAGE_READ: sample_rows / max(read_sec, 1e-9)}
+    
+    object_type_info = _get_object_type_info(object_def_id) if object_def_id else None
+    if object_def_id and object_type_info is None:
+        warnings.append(f"Object type {object_def_id} not found; ES documents and typed columns not estimated")
+    owner_id = object_def_id or "dry-run"
+    
+    def prepare(df: pd.DataFrame, metrics: MetricsCollector, error_sampler: ErrorSampler):
+        return _prepare_batch(
+            df=df, plan=plan, object_def_id=owner_id, mapping_id="dry-run", source_table=source_table,
+            metrics=metrics, error_sampler=error_sampler, pk_column=pk_column
+        )
+    
+    prepare(sample.head(_DRY_RUN_WARMUP_ROWS), MetricsCollector(), ErrorSampler())
+    
+    metrics = MetricsCollector()
+    started = time.perf_counter()
+    batch = prepare(sample, metrics, ErrorSampler())
+    stage_rps[STAGE_TRANSFORM] = sample_rows / max(time.perf_counter() - started, 1e-9)
+    
+    output_rows = len(batch.scalar_df) if batch is not None else 0
+    estimate["failed_sample_rows"] = sample_rows - output_rows
+    if metrics.pk_collisions:
+        warnings.append(f"{metrics.pk_collisions} duplicate source keys in the sample")
+    if batch is None or output_rows == 0:
+        warnings.append("No sample row survived the transforms")
+    else:
+        dtype = property_sql_types(object_type_info["property_types"]) if object_type_info else {}
+        scalar_df = coerce_to_sql_types(batch.scalar_df, {k: v for k, v in dtype.items() if k in batch.scalar_df.columns})
+        estimate["mysql_row_bytes"] = round(_avg_row_bytes(scalar_df) + _MYSQL_ROW_OVERHEAD, 1)
+        estimate["mysql_bytes"] = int(estimate["mysql_row_bytes"] * output_rows * scale)
+        estimate["lineage_bytes"] = int((_avg_row_bytes(batch.lineage_df) + _MYSQL_ROW_OVERHEAD) * output_rows * scale)
+        
+        if batch.vector_matrix is not None:
+            dimension = batch.vector_matrix.shape[1]
+            vector_count = int(len(batch.vector_ids) * scale)
+            estimate["vector_dimension"] = dimension
+            estimate["vector_count"] = vector_count
+            storage = (object_type_info or {}).get("vector_storage") or STORAGE_FLOAT32
+            if storage == STORAGE_FLOAT32:
+                vector_row_bytes = batch.vector_matrix.itemsize * dimension + _VECTOR_INDEX_OVERHEAD
+            else:
+                # Codes and scale, the float16 re-scoring copy (INT8) and the IVF list
+                vector_row_bytes = code_bytes(storage, dimension) + rescore_bytes(storage, dimension) + 4
+            estimate["vector_bytes"] = vector_count * (vector_row_bytes + 36)
+        
+        if object_type_info and object_type_info["property_configs"]:
+            records = batch.scalar_df.drop(columns=["object_def_id"]).to_dict(orient="records")
+            started = time.perf_counter()
+            docs = [
+                build_es_document(
+                    instance_id=record["id"],
+                    object_type_api_name=object_type_info["api_name"],
+                    object_type_display_name=object_type_info["display_name"],
+                    row_data=record,
+                    property_configs=object_type_info["property_configs"],
+                )
+                for record in records
+            ]
+            stage_rps["es_document"] = len(docs) / max(time.perf_counter() - started, 1e-9)
+            doc_bytes = sum(len(json.dumps(doc, default=str).encode("utf-8")) for doc in docs) / len(docs)
+            estimate["es_document_bytes"] = round(doc_bytes, 1)
+            estimate["es_bytes"] = int(doc_bytes * output_rows * scale)
+    
+    # Stages overlap in the pipeline: the slowest one sets the pace
+    bottleneck = min(stage_rps, key=stage_rps.get)
+    estimate["stage_rows_per_sec"] = {stage: round(rps, 1) for stage, rps in stage_rps.items()}
+    estimate["bottleneck_stage"] = bottleneck
+    estimate["estimated_duration_seconds"] = round(total_rows / stage_rps[bottleneck], 3)
+    estimate["total_bytes"] = estimate["mysql_bytes"] + estimate["lineage_bytes"] + estimate["vector_bytes"] + estimate["es_bytes"]
+    
+    logger.info(
+        f"[IndexingWorker] Dry run of {source_table}: {total_rows} rows, "
+        f"~{estimate['estimated_duration_seconds']}s ({bottleneck}-bound), ~{estimate['total_bytes']} bytes"
+    )
+    return estimate
+
+
+def _avg_row_bytes(df: pd.DataFrame) -> float:
+    """Average payload of a row: fixed-width columns by item size, others by UTF-8 length."""
+    if df.empty:
+        return 0.0
+    
+    total = 0
+    for column in df.columns:
+        values = df[column]
+        itemsize = getattr(values.dtype, "itemsize", None)
+        if values.dtype.kind in "biufmM" and itemsize:
+            total += int(values.notna().sum()) * itemsize
+        else:
+            total += int(values.map(
+                lambda v: 0 if _is_null(v) else len(
+                    (json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v)).encode("utf-8")
+                )
+            ).sum())
+    return total / len(df)
 
 
 # ==========================================
@@ -822,9 +1780,11 @@ def _record_job_run(
 ):
     """
     Record job run to sys_index_job_run table.
+    
+    Upserts, so a run queued by the index job scheduler is completed in place.
     """
     try:
-        engine = create_engine(settings.database_url)
+        engine = get_pooled_engine(settings.database_url)
         
         with engine.connect() as conn:
             conn.execute(text("""
@@ -834,6 +1794,14 @@ def _record_job_run(
                 VALUES 
                 (:id, :mapping_id, :object_def_id, :start_time, :end_time, :status,
                  :rows_processed, :rows_indexed, :metrics_json, :created_at)
+                ON DUPLICATE KEY UPDATE
+                    object_def_id = VALUES(object_def_id),
+                    start_time = VALUES(start_time),
+                    end_time = VALUES(end_time),
+                    status = VALUES(status),
+                    rows_processed = VALUES(rows_processed),
+                    rows_indexed = VALUES(rows_indexed),
+                    metrics_json = VALUES(metrics_json)
             """), {
                 "id": job_run_id,
                 "mapping_id": mapping_id,
@@ -843,12 +1811,11 @@ def _record_job_run(
                 "status": status,
                 "rows_processed": rows_processed,
                 "rows_indexed": rows_indexed,
-                "metrics_json": str(metrics).replace("'", '"'),  # Convert to JSON string
+                "metrics_json": _metrics_json(metrics),
                 "created_at": datetime.utcnow()
             })
             conn.commit()
         
-        engine.dispose()
         logger.info(f"[IndexingWorker] Recorded job run: {job_run_id}, status={status}")
         
     except Exception as e:
@@ -856,6 +1823,11 @@ def _record_job_run(
         logger.error(traceback.format_exc())
 
 
+def _metrics_json(metrics: Dict[str, Any]) -> str:
+    """Job metrics as JSON for sys_index_job_run.metrics_json (None, booleans, numpy values)."""
+    return json.dumps(metrics, default=str)
+
+
 def _record_error_samples(job_run_id: str, samples: List[Dict[str, Any]]):
     """
     Record error samples to sys_index_error_sample table.
@@ -871,9 +1843,8 @@ def _record_error_samples(job_run_id: str, samples: List[Dict[str, Any]]):
         
         df = pd.DataFrame(samples)
         
-        engine = create_engine(settings.database_url)
+        engine = get_pooled_engine(settings.database_url)
         df.to_sql("sys_index_error_sample", engine, if_exists="append", index=False)
-        engine.dispose()
         
         logger.info(f"[IndexingWorker] Recorded {len(samples)} error samples")
         
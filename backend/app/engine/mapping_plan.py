@@ -0,0 +1,290 @@
+"""
+Mapping Plan Compiler - Flat execution plan for mapping specs
+MDP Platform V3.1 - Multimodal Data Governance
+
+A mapping_spec is a React Flow graph (source -> transform -> target nodes).
+Walking that graph recursively for every target of every row is expensive,
+so the spec is compiled once into a topologically ordered list of steps:
+
+1. Column reads (source nodes)
+2. Transform calls (transform nodes), each reading a previously computed slot
+
+Target properties then simply point at a slot. Compiled plans are cached
+per mapping_id + spec hash and shared by the indexing worker and the
+mapping preview endpoint.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple, Set, Callable
+
+import pandas as pd
+
+
+# Transforms producing vectors (target properties fed by them go to ChromaDB)
+VECTOR_TRANSFORMS = ("image_embedding_clip", "text_embedding")
+
+# Transforms reading file paths (source columns feeding them are tracked in lineage)
+FILE_TRANSFORMS = ("image_embedding_clip", "file_embedding")
+
+STEP_COLUMN = "column"
+STEP_TRANSFORM = "transform"
+
+# Max number of compiled plans kept in memory
+PLAN_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    """A single step of a compiled mapping plan."""
+    slot: int
+    op: str  # column, transform
+    column: Optional[str] = None
+    function: Optional[str] = None
+    input_slot: Optional[int] = None  # None -> transform has no input edge
+
+
+@dataclass
+class MappingPlan:
+    """Compiled, topologically ordered execution plan for a mapping_spec."""
+    spec_hash: str
+    steps: List[PlanStep] = field(default_factory=list)
+    targets: List[Tuple[str, Optional[int]]] = field(default_factory=list)  # (property, slot)
+    vector_properties: Set[str] = field(default_factory=set)
+    file_path_columns: List[str] = field(default_factory=list)
+
+    @property
+    def slot_count(self) -> int:
+        return len(self.steps)
+
+    @property
+    def output_columns(self) -> List[str]:
+        """Target property names in spec order."""
+        return [prop for prop, _ in self.targets]
+
+    def evaluate_row(
+        self,
+        row: Dict[str, Any],
+        apply_transform: Callable[[str, Any], Any]
+    ) -> Dict[str, Any]:
+        """
+        Execute the plan against a single row.
+
+        Args:
+            row: Source row (column -> value)
+            apply_transform: Callable(func_name, input_value) -> output value
+
+        Returns:
+            Dict of target property -> value
+        """
+        values: List[Any] = [None] * len(self.steps)
+
+        for step in self.steps:
+            if step.op == STEP_COLUMN:
+                values[step.slot] = row.get(step.column)
+            elif step.input_slot is not None:
+                values[step.slot] = apply_transform(step.function, values[step.input_slot])
+
+        return {
+            prop: values[slot] if slot is not None else None
+            for prop, slot in self.targets
+        }
+
+    def evaluate_frame(
+        self,
+        df: pd.DataFrame,
+        apply_column: Callable[[str, pd.Series], pd.Series]
+    ) -> pd.DataFrame:
+        """
+        Execute the plan column-at-a-time against a whole chunk.
+
+        Args:
+            df: Source chunk
+            apply_column: Callable(func_name, input_series) -> output series
+                (same index as the input)
+
+        Returns:
+            DataFrame with one column per target property, aligned to df.index
+        """
+        columns: List[Optional[pd.Series]] = [None] * len(self.steps)
+
+        def null_column() -> pd.Series:
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+        for step in self.steps:
+            if step.op == STEP_COLUMN:
+                columns[step.slot] = df[step.column] if step.column in df.columns else null_column()
+            elif step.input_slot is not None:
+                columns[step.slot] = apply_column(step.function, columns[step.input_slot])
+
+        output: Dict[str, pd.Series] = {}
+        for prop, slot in self.targets:
+            column = columns[slot] if slot is not None else None
+            output[prop] = column if column is not None else null_column()
+
+        return pd.DataFrame(output, index=df.index)
+
+
+# ==========================================
+# Compilation
+# ==========================================
+
+def compute_spec_hash(mapping_spec: Dict[str, Any]) -> str:
+    """Stable hash of a mapping_spec (key order independent)."""
+    payload = json.dumps(mapping_spec or {}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _node_column(node: Dict[str, Any]) -> str:
+    return node.get("data", {}).get("column", node.get("column", ""))
+
+
+def _node_function(node: Dict[str, Any]) -> str:
+    return node.get("data", {}).get("function", node.get("function", ""))
+
+
+def _node_property(node: Dict[str, Any]) -> str:
+    return node.get("data", {}).get("property", node.get("property", ""))
+
+
+def compile_mapping_spec(mapping_spec: Dict[str, Any]) -> MappingPlan:
+    """
+    Compile a React Flow mapping_spec into a flat MappingPlan.
+
+    Each node is resolved once (shared upstream nodes are computed once per
+    row). Raises ValueError if the graph contains a cycle.
+    """
+    mapping_spec = mapping_spec or {}
+    nodes = mapping_spec.get("nodes", [])
+    edges = mapping_spec.get("edges", [])
+
+    node_map = {n["id"]: n for n in nodes}
+    edge_map: Dict[str, str] = {}  # target_id -> source_id
+    source_to_targets: Dict[str, List[str]] = {}
+    for edge in edges:
+        edge_map[edge["target"]] = edge["source"]
+        source_to_targets.setdefault(edge["source"], []).append(edge["target"])
+
+    plan = MappingPlan(spec_hash=compute_spec_hash(mapping_spec))
+    resolved: Dict[str, Optional[int]] = {}
+    visiting: Set[str] = set()
+
+    def resolve(node_id: str) -> Optional[int]:
+        if node_id in resolved:
+            return resolved[node_id]
+        if node_id in visiting:
+            raise ValueError(f"Mapping spec contains a cycle at node: {node_id}")
+
+        node = node_map.get(node_id)
+        if not node:
+            return None
+
+        visiting.add(node_id)
+        node_type = node.get("type")
+        slot: Optional[int] = None
+
+        if node_type == "source":
+            slot = len(plan.steps)
+            plan.steps.append(PlanStep(slot=slot, op=STEP_COLUMN, column=_node_column(node)))
+
+        elif node_type == "transform":
+            source_id = edge_map.get(node_id)
+            if source_id:
+                input_slot = resolve(source_id)
+                slot = len(plan.steps)
+                plan.steps.append(PlanStep(
+                    slot=slot,
+                    op=STEP_TRANSFORM,
+                    function=_node_function(node),
+                    input_slot=input_slot,
+                ))
+
+        elif node_type == "target":
+            source_id = edge_map.get(node_id)
+            if source_id:
+                slot = resolve(source_id)
+
+        visiting.discard(node_id)
+        resolved[node_id] = slot
+        return slot
+
+    for node in nodes:
+        if node.get("type") != "target":
+            continue
+
+        prop = _node_property(node)
+        if not prop:
+            continue
+
+        plan.targets.append((prop, resolve(node["id"])))
+
+        # Vector property: target fed directly by an embedding transform
+        upstream = node_map.get(edge_map.get(node["id"], ""))
+        if upstream and upstream.get("type") == "transform" and _node_function(upstream) in VECTOR_TRANSFORMS:
+            plan.vector_properties.add(prop)
+
+    # File path columns: sources connected to a file-reading transform
+    for node in nodes:
+        if node.get("type") != "source":
+            continue
+
+        column = _node_column(node)
+        if not column:
+            continue
+
+        for tid in source_to_targets.get(node["id"], []):
+            target_node = node_map.get(tid)
+            if target_node and target_node.get("type") == "transform" and _node_function(target_node) in FILE_TRANSFORMS:
+                plan.file_path_columns.append(column)
+                break
+
+    return plan
+
+
+# ==========================================
+# Plan Cache
+# ==========================================
+
+_plan_cache: "OrderedDict[Tuple[str, str], MappingPlan]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def get_mapping_plan(
+    mapping_spec: Dict[str, Any],
+    mapping_id: Optional[str] = None
+) -> MappingPlan:
+    """
+    Get the compiled plan for a mapping_spec (cached per mapping_id + spec hash).
+
+    Editing a mapping changes its spec hash, so stale plans are never reused;
+    they simply age out of the LRU.
+    """
+    key = (mapping_id or "", compute_spec_hash(mapping_spec))
+
+    with _plan_cache_lock:
+        plan = _plan_cache.get(key)
+        if plan is not None:
+            _plan_cache.move_to_end(key)
+            return plan
+
+    plan = compile_mapping_spec(mapping_spec)
+
+    with _plan_cache_lock:
+        _plan_cache[key] = plan
+        _plan_cache.move_to_end(key)
+        while len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+
+    return plan
+
+
+def clear_plan_cache(mapping_id: Optional[str] = None):
+    """Drop cached plans (all, or only those of one mapping)."""
+    with _plan_cache_lock:
+        if mapping_id is None:
+            _plan_cache.clear()
+            return
+        for key in [k for k in _plan_cache if k[0] == mapping_id]:
+            del _plan_cache[key]
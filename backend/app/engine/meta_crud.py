@@ -354,6 +354,7 @@ def update_object_type(
                 unbind_property_from_object_ver,
                 update_object_type_ver,
             )
+            from app.engine.object_type_cache import invalidate_object_type
             from app.models.ontology import (
                 SharedPropertyDef,
                 ObjectVerPropertyCreate,
@@ -430,6 +431,7 @@ def update_object_type(
             
             # 确保所有属性更新都已提交
             session.commit()
+            invalidate_object_type(object_def_id=obj_id)
             
             full = get_object_type_full(session, obj_id)
             if full:
@@ -550,6 +552,7 @@ def delete_object_type(session: Session, obj_id: str) -> bool:
                 delete_project_object_binding,
             )
             from app.engine.v3.mapping_crud import list_mappings, delete_mapping
+            from app.engine.object_type_cache import invalidate_object_type
             
             obj_def = get_object_type_def(session, obj_id)
             if not obj_def:
@@ -592,6 +595,7 @@ def delete_object_type(session: Session, obj_id: str) -> bool:
                 session.delete(obj_def)
                 session.commit()
             
+            invalidate_object_type(object_def_id=obj_id)
             logger.info(f"ObjectType (V3) deleted successfully: {obj_id}")
             return True
         
@@ -0,0 +1,242 @@
+"""
+Object Type Metadata Cache - Versioned, in-process cache of object type info
+MDP Platform V3.1 - Multimodal Data Governance
+
+Indexing jobs, ES document building and facet resolution all need the same
+object type metadata: api/display name, the search flags of its properties
+and the data type of every property. Loading it is a multi-table join, so
+it is cached per object type, together with the version it was read from.
+
+Each entry holds the info of an object type's current version, tagged with
+that version's id so edits to a version can drop it. Entries expire after
+settings.object_type_cache_ttl seconds, which bounds staleness when another
+process edits the ontology. Edits made through ontology_crud invalidate the
+affected entries right away.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.quantized_vectors import STORAGE_FLOAT32
+from app.core.db import get_pooled_engine
+from app.core.logger import logger
+
+
+@dataclass
+class _CacheEntry:
+    version_id: Optional[str]
+    info: Dict[str, Any]
+    expires_at: float
+
+
+_cache: Dict[str, _CacheEntry] = {}  # object_def_id -> entry for its current version
+_api_names: Dict[str, str] = {}  # api_name -> object_def_id
+_cache_lock = threading.Lock()
+
+
+def get_object_type_info(object_def_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Object type info of the current version of an object type (cached).
+
+    Returns dict with:
+        - object_def_id / version_id
+        - api_name: Object type API name
+        - display_name: Object type display name
+        - property_configs: List of property configs with search flags
+        - property_types: Data type of every property of the current version
+        - vector_storage: FLOAT32, FLOAT16 or INT8
+    Returns None if the object type does not exist or cannot be loaded.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(object_def_id)
+        if entry is not None and entry.expires_at > now:
+            return entry.info
+
+    try:
+        info = load_object_type_info(object_def_id)
+    except Exception as e:
+        logger.error(f"[ObjectTypeCache] Failed to load object type {object_def_id}: {e}")
+        return None
+    if info is None:
+        return None
+
+    with _cache_lock:
+        _cache[object_def_id] = _CacheEntry(
+            version_id=info["version_id"],
+            info=info,
+            expires_at=now + settings.object_type_cache_ttl,
+        )
+        _api_names[info["api_name"]] = object_def_id
+    return info
+
+
+def get_object_type_info_by_api_name(api_name: str) -> Optional[Dict[str, Any]]:
+    """Same as get_object_type_info, looked up by object type api_name."""
+    with _cache_lock:
+        object_def_id = _api_names.get(api_name)
+
+    if object_def_id is None:
+        try:
+            engine = get_pooled_engine(settings.database_url)
+            with engine.connect() as conn:
+                object_def_id = conn.execute(
+                    text("SELECT id FROM meta_object_type_def WHERE api_name = :api_name"),
+                    {"api_name": api_name}
+                ).scalar()
+        except Exception as e:
+            logger.error(f"[ObjectTypeCache] Failed to resolve object type '{api_name}': {e}")
+            return None
+        if object_def_id is None:
+            return None
+
+    info = get_object_type_info(object_def_id)
+    if info is not None and info["api_name"] != api_name:
+        # Renamed since it was cached
+        with _cache_lock:
+            _api_names.pop(api_name, None)
+        return None
+    return info
+
+
+def invalidate_object_type(
+    object_def_id: Optional[str] = None,
+    object_ver_id: Optional[str] = None
+):
+    """
+    Drop cached object type info.
+
+    Pass object_def_id to drop one object type, object_ver_id to drop
+    whichever object type is cached at that version; with neither, the
+    whole cache is cleared (e.g. a shared property used by many types changed).
+    """
+    with _cache_lock:
+        if object_def_id is None and object_ver_id is None:
+            _cache.clear()
+            _api_names.clear()
+            return
+        for def_id in [
+            d for d, e in _cache.items()
+            if d == object_def_id or (object_ver_id is not None and e.version_id == object_ver_id)
+        ]:
+            del _cache[def_id]
+        for api_name in [a for a, d in _api_names.items() if d == object_def_id]:
+            del _api_names[api_name]
+
+
+def cached_versions() -> List[Tuple[str, Optional[str]]]:
+    """(object_def_id, version_id) of the live cache entries."""
+    now = time.monotonic()
+    with _cache_lock:
+        return [(d, e.version_id) for d, e in _cache.items() if e.expires_at > now]
+
+
+def resolve_facet_fields(object_types: Optional[List[str]] = None) -> Dict[str, str]:
+    """
+    ES facet fields of the filterable properties of some object types.
+
+    Args:
+        object_types: Object type api_names; all object types if omitted
+
+    Returns:
+        Dict of facet field -> property display name
+    """
+    if object_types:
+        infos = [get_object_type_info_by_api_name(api_name) for api_name in object_types]
+    else:
+        try:
+            engine = get_pooled_engine(settings.database_url)
+            with engine.connect() as conn:
+                def_ids = conn.execute(text("SELECT id FROM meta_object_type_def")).scalars().all()
+        except Exception as e:
+            logger.error(f"[ObjectTypeCache] Failed to list object types: {e}")
+            return {}
+        infos = [get_object_type_info(def_id) for def_id in def_ids]
+
+    fields: Dict[str, str] = {}
+    for info in infos:
+        if info is None:
+            continue
+        for config in info["property_configs"]:
+            if config["is_filterable"] and config["api_name"]:
+                fields.setdefault(f"properties.{config['api_name']}_kwd", config["display_name"] or config["api_name"])
+    return fields
+
+
+# ==========================================
+# Loading
+# ==========================================
+
+def load_object_type_info(object_def_id: str) -> Optional[Dict[str, Any]]:
+    """Load object type info from the metadata database (uncached)."""
+    engine = get_pooled_engine(settings.database_url)
+
+    with engine.connect() as conn:
+        obj_row = conn.execute(text("""
+            SELECT
+                otd.api_name,
+                otv.display_name,
+                otd.current_version_id,
+                otv.vector_storage
+            FROM meta_object_type_def otd
+            LEFT JOIN meta_object_type_ver otv ON otd.current_version_id = otv.id
+            WHERE otd.id = :def_id
+        """), {"def_id": object_def_id}).fetchone()
+
+        if not obj_row:
+            return None
+
+        api_name, display_name, version_id, vector_storage = obj_row
+
+        # Property configs with search flags of the current version
+        props_result = conn.execute(text("""
+            SELECT
+                spd.api_name AS property_api_name,
+                spd.display_name AS property_display_name,
+                spd.data_type,
+                ovp.is_searchable,
+                ovp.is_filterable,
+                ovp.is_sortable,
+                ovp.is_title
+            FROM rel_object_ver_property ovp
+            JOIN meta_shared_property_def spd ON ovp.property_def_id = spd.id
+            WHERE ovp.object_ver_id = :ver_id
+            AND (ovp.is_searchable = 1 OR ovp.is_filterable = 1 OR ovp.is_sortable = 1 OR ovp.is_title = 1)
+        """), {"ver_id": version_id})
+
+        property_configs = []
+        for row in props_result:
+            property_configs.append({
+                "api_name": row[0],
+                "display_name": row[1],
+                "data_type": row[2],
+                "is_searchable": bool(row[3]),
+                "is_filterable": bool(row[4]),
+                "is_sortable": bool(row[5]),
+                "is_title": bool(row[6]),
+            })
+
+        # Data types of all properties (shared or local) of the current version
+        types_result = conn.execute(text("""
+            SELECT
+                COALESCE(spd.api_name, ovp.local_api_name) AS property_api_name,
+                COALESCE(spd.data_type, ovp.local_data_type) AS data_type
+            FROM rel_object_ver_property ovp
+            LEFT JOIN meta_shared_property_def spd ON ovp.property_def_id = spd.id
+            WHERE ovp.object_ver_id = :ver_id
+        """), {"ver_id": version_id})
+        property_types = {row[0]: row[1] for row in types_result if row[0]}
+
+    return {
+        "object_def_id": object_def_id,
+        "version_id": version_id,
+        "api_name": api_name,
+        "display_name": display_name or api_name,
+        "property_configs": property_configs,
+        "property_types": property_types,
+        "vector_storage": vector_storage or STORAGE_FLOAT32,
+    }
@@ -0,0 +1,291 @@
+"""
+Schema Explorer - Cached table / column listing of source databases
+MDP Platform V3.1 - Multimodal Data Governance
+
+The source explorer used to call inspector.get_columns table by table (one
+round trip each) on every page load, so a source with thousands of tables
+took minutes to open. Now:
+
+- All columns of one schema come from a single information_schema.columns
+  query (sqlite_master + pragma_table_info on SQLite); other dialects fall
+  back to the inspector
+- The result is cached per (Connection.id, config hash, schema) for
+  settings.source_schema_cache_ttl seconds; refresh=True re-reads it, and
+  editing / deleting the connection drops it. Schemas are loaded one at a
+  time, when first explored. Expired schemas are dropped as others are
+  cached, and at most settings.source_schema_cache_max_entries are kept
+- Callers page and filter the cached table list (filter_tables)
+- A single table's columns are answered from the cache, else from the
+  SyncJobDef.cached_schema of a job syncing that table, before the source
+  is queried (get_table_columns)
+
+Column types are the source's own type names (e.g. MySQL COLUMN_TYPE
+"VARCHAR(100)", "INT UNSIGNED"), upper-cased.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.engine.source_pools import config_hash, get_source_engine
+from app.models.system import Connection, SyncJobDef
+
+
+SchemaKey = Tuple[str, str, str]  # (connection_id or "", config hash, schema or "")
+
+_MYSQL_COLUMNS = """
+    SELECT c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_TYPE, c.IS_NULLABLE
+    FROM information_schema.COLUMNS c
+    JOIN information_schema.TABLES t
+      ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+    WHERE c.TABLE_SCHEMA = COALESCE(:schema, DATABASE()) AND t.TABLE_TYPE = 'BASE TABLE'
+    ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+"""
+
+_POSTGRES_COLUMNS = """
+    SELECT c.table_name, c.column_name,
+           CASE WHEN c.character_maximum_length IS NULL THEN c.data_type
+                ELSE c.data_type || '(' || c.character_maximum_length || ')' END,
+           c.is_nullable
+    FROM information_schema.columns c
+    JOIN information_schema.tables t
+      ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+    WHERE c.table_schema = COALESCE(CAST(:schema AS TEXT), current_schema()) AND t.table_type = 'BASE TABLE'
+    ORDER BY c.table_name, c.ordinal_position
+"""
+
+_SQLITE_COLUMNS = """
+    SELECT m.name, p.name, p.type, CASE WHEN p."notnull" = 0 THEN 'YES' ELSE 'NO' END
+    FROM sqlite_master m
+    JOIN pragma_table_info(m.name) p
+    WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+    ORDER BY m.name, p.cid
+"""
+
+_POSTGRES_SCHEMAS = """
+    SELECT schema_name FROM information_schema.schemata
+    WHERE schema_name NOT IN ('information_schema', 'pg_catalog') AND schema_name NOT LIKE 'pg_toast%'
+    ORDER BY schema_name
+"""
+
+
+@dataclass
+class SourceSchema:
+    """Tables and columns of one source schema, as cached."""
+    tables: Dict[str, List[Dict[str, Any]]]  # table name -> [{"name", "type", "nullable"}]
+    schemas: Optional[List[str]] = None  # Other schemas of the source (PostgreSQL)
+    fetched_at: datetime = field(default_factory=datetime.utcnow)
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+# ==========================================
+# Fetching
+# ==========================================
+
+def fetch_source_schema(engine: Engine, schema: Optional[str] = None) -> SourceSchema:
+    """
+    Read every table and column of a schema (default: the connection's own)
+    in one query.
+    """
+    dialect = engine.dialect.name
+    queries = {"mysql": _MYSQL_COLUMNS, "postgresql": _POSTGRES_COLUMNS, "sqlite": _SQLITE_COLUMNS}
+    if dialect not in queries:
+        return _inspect_source_schema(engine, schema)
+
+    tables: Dict[str, List[Dict[str, Any]]] = {}
+    schemas = None
+    with engine.connect() as conn:
+        params = {} if dialect == "sqlite" else {"schema": schema}
+        for table, column, column_type, nullable in conn.execute(text(queries[dialect]), params):
+            tables.setdefault(table, []).append({
+                "name": column,
+                "type": str(column_type or "").upper(),
+                "nullable": str(nullable).upper() == "YES",
+            })
+        if dialect == "postgresql":
+            schemas = [row[0] for row in conn.execute(text(_POSTGRES_SCHEMAS))]
+
+    logger.info(f"[SchemaExplorer] Read {len(tables)} tables of {schema or 'default schema'} in one query")
+    return SourceSchema(tables=tables, schemas=schemas)
+
+
+def _inspect_source_schema(engine: Engine, schema: Optional[str] = None) -> SourceSchema:
+    """Table-by-table inspector fallback for dialects without a one-query listing."""
+    inspector = sa_inspect(engine)
+    tables = {
+        table: [
+            {"name": col["name"], "type": str(col["type"]), "nullable": col.get("nullable", True)}
+            for col in inspector.get_columns(table, schema=schema)
+        ]
+        for table in inspector.get_table_names(schema=schema)
+    }
+    return SourceSchema(tables=tables)
+
+
+# ==========================================
+# Cache
+# ==========================================
+
+_cache: Dict[SchemaKey, SourceSchema] = {}
+_cache_lock = threading.Lock()
+_load_locks: Dict[SchemaKey, threading.Lock] = {}
+
+
+def _store(key: SchemaKey, source_schema: SourceSchema):
+    """Cache a loaded schema, dropping expired ones and the oldest beyond the cap (call with _cache_lock held)."""
+    _cache[key] = source_schema
+    now = time.monotonic()
+    expired = [k for k, cached in _cache.items() if now - cached.loaded_at >= settings.source_schema_cache_ttl]
+    for k in expired:
+        _cache.pop(k)
+    overflow = len(_cache) - max(1, settings.source_schema_cache_max_entries)
+    if overflow > 0:
+        for k in sorted(_cache, key=lambda k: _cache[k].loaded_at)[:overflow]:
+            _cache.pop(k)
+    # Load locks of schemas no longer cached, unless a load is running
+    for k in [k for k, lock in _load_locks.items() if k not in _cache and not lock.locked()]:
+        _load_locks.pop(k)
+
+
+def _cache_key(conn_type: str, config: Dict[str, Any], connection_id: Optional[str], schema: Optional[str]) -> SchemaKey:
+    return (connection_id or "", config_hash(conn_type, config), schema or "")
+
+
+def get_source_schema(
+    engine: Engine,
+    conn_type: str,
+    config: Dict[str, Any],
+    connection_id: Optional[str] = None,
+    schema: Optional[str] = None,
+    refresh: bool = False
+) -> SourceSchema:
+    """
+    Cached tables and columns of a source schema.
+
+    Args:
+        engine: Source engine (source_pools)
+        refresh: Re-read the source even if the cached copy is fresh
+    """
+    key = _cache_key(conn_type, config, connection_id, schema)
+    requested = time.monotonic()
+    with _cache_lock:
+        cached = _cache.get(key)
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+    if cached and not refresh and requested - cached.loaded_at < settings.source_schema_cache_ttl:
+        return cached
+
+    # One load per schema at a time; callers that waited take the copy loaded meanwhile
+    with load_lock:
+        with _cache_lock:
+            current = _cache.get(key)
+        if current is not None and current.loaded_at >= requested:
+            return current
+        source_schema = fetch_source_schema(engine, schema)
+        with _cache_lock:
+            _store(key, source_schema)
+    return source_schema
+
+
+def peek_source_schema(
+    conn_type: str,
+    config: Dict[str, Any],
+    connection_id: Optional[str] = None,
+    schema: Optional[str] = None
+) -> Optional[SourceSchema]:
+    """Cached schema if still fresh, without touching the source."""
+    with _cache_lock:
+        cached = _cache.get(_cache_key(conn_type, config, connection_id, schema))
+    if cached and time.monotonic() - cached.loaded_at < settings.source_schema_cache_ttl:
+        return cached
+    return None
+
+
+def invalidate_schema_cache(connection_id: str) -> int:
+    """Drop the cached schemas of a connection (config changed or deleted)."""
+    with _cache_lock:
+        keys = [key for key in _cache if key[0] == connection_id]
+        for key in keys:
+            _cache.pop(key, None)
+            _load_locks.pop(key, None)
+    return len(keys)
+
+
+def filter_tables(
+    source_schema: SourceSchema,
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None
+) -> Tuple[List[str], int]:
+    """
+    Page of table names, sorted, optionally filtered by a case-insensitive substring.
+
+    Returns: (names on the page, number of matching tables)
+    """
+    names = sorted(source_schema.tables)
+    if search:
+        needle = search.lower()
+        names = [name for name in names if needle in name.lower()]
+    end = None if limit is None else skip + limit
+    return names[skip:end], len(names)
+
+
+# ==========================================
+# Single Table (sync job creation)
+# ==========================================
+
+def _job_reads(job: SyncJobDef, table: Optional[str], schema: Optional[str]) -> bool:
+    source_config = job.source_config or {}
+    return source_config.get("table") == table and source_config.get("schema") == schema
+
+
+def get_table_columns(
+    session: Session,
+    conn: Connection,
+    table: str,
+    schema: Optional[str] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Columns of one source table: from the explorer cache, else from the
+    cached_schema of a sync job reading that table, else by loading the
+    schema (one query). None if the table does not exist.
+    """
+    cached = peek_source_schema(conn.conn_type, conn.config_json, conn.id, schema)
+    if cached is not None:
+        return cached.tables.get(table)
+
+    jobs = session.exec(select(SyncJobDef).where(SyncJobDef.connection_id == conn.id)).all()
+    for job in jobs:
+        if _job_reads(job, table, schema) and (job.cached_schema or {}).get("columns"):
+            logger.debug(f"[SchemaExplorer] Using cached schema of sync job {job.id} for {table}")
+            return job.cached_schema["columns"]
+
+    engine = get_source_engine(conn.conn_type, conn.config_json, conn.id)
+    return get_source_schema(engine, conn.conn_type, conn.config_json, conn.id, schema).tables.get(table)
+
+
+def refresh_sync_job_schemas(session: Session, conn: Connection, schema: Optional[str] = None) -> int:
+    """Update the cached_schema of a connection's sync jobs from its freshly explored schema."""
+    source_schema = peek_source_schema(conn.conn_type, conn.config_json, conn.id, schema)
+    if source_schema is None:
+        return 0
+
+    jobs = session.exec(select(SyncJobDef).where(SyncJobDef.connection_id == conn.id)).all()
+    updated = 0
+    for job in jobs:
+        table = (job.source_config or {}).get("table")
+        columns = source_schema.tables.get(table) if _job_reads(job, table, schema) else None
+        if columns is not None and (job.cached_schema or {}).get("columns") != columns:
+            job.cached_schema = {"columns": columns}
+            session.add(job)
+            updated += 1
+    if updated:
+        session.commit()
+        logger.info(f"[SchemaExplorer] Updated cached schema of {updated} sync jobs of connection {conn.id}")
+    return updated
@@ -0,0 +1,238 @@
+"""
+Source Pools - Registry of connection pools to source databases
+MDP Platform V3.1 - Multimodal Data Governance
+
+Testing a connection, exploring it, previewing a sync and running one
+used to build a fresh SQLAlchemy engine from Connection.config_json and
+dispose it right after, so every click in the UI paid for a new TCP /
+TLS handshake and login to the remote source.
+
+Engines are now kept per (Connection.id, hash of conn_type + config):
+
+- Editing a connection changes the hash, so the old pool is never reused;
+  update_connection / delete_connection also dispose it right away
+- Pools unused for settings.source_pool_idle_seconds are disposed by a
+  background janitor (pools with checked-out connections are never evicted)
+- At most settings.source_pool_max_pools pools are kept; the least recently
+  used idle one is disposed to make room
+
+Unsaved configs (POST /connectors/test) are pooled under no connection ID
+and simply age out.
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+PoolKey = Tuple[str, str]  # (connection_id or "", config hash)
+
+
+def config_hash(conn_type: str, config: Dict[str, Any]) -> str:
+    """Stable hash of a connection's type and config (key order does not matter)."""
+    payload = json.dumps({"conn_type": conn_type, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _PoolEntry:
+    engine: Engine
+    connection_id: Optional[str]
+    conn_type: str
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+    def in_use(self) -> bool:
+        checkedout = getattr(self.engine.pool, "checkedout", None)
+        return bool(checkedout and checkedout())
+
+
+class SourcePoolRegistry:
+    """
+    Process-wide engines for source connections.
+
+    Usage:
+        engine = registry.get(conn.conn_type, conn.config_json, connection_id=conn.id)
+        with engine.connect() as c: ...
+        # never dispose the returned engine; registry.invalidate(conn.id) instead
+    """
+
+    def __init__(self, max_pools: int, idle_seconds: float):
+        self.max_pools = max(1, max_pools)
+        self.idle_seconds = idle_seconds
+
+        self._entries: Dict[PoolKey, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._janitor: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, conn_type: str, config: Dict[str, Any], connection_id: Optional[str] = None) -> Engine:
+        """The pooled engine for a connection config (created on first use)."""
+        key = (connection_id or "", config_hash(conn_type, config))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.last_used = time.monotonic()
+                return entry.engine
+
+            entry = _PoolEntry(_create_source_engine(conn_type, config), connection_id, conn_type)
+            self._entries[key] = entry
+            evicted = self._evict_over_limit()
+            self._start_janitor()
+
+        logger.info(f"[SourcePools] Created pool for {conn_type} connection {connection_id or '(unsaved)'}")
+        _dispose(evicted)
+        return entry.engine
+
+    def discard(self, conn_type: str, config: Dict[str, Any], connection_id: Optional[str] = None):
+        """Dispose the pool of one config (e.g. after a failed connection test)."""
+        with self._lock:
+            entry = self._entries.pop((connection_id or "", config_hash(conn_type, config)), None)
+        _dispose([entry] if entry else [])
+
+    def invalidate(self, connection_id: str) -> int:
+        """Dispose every pool of a connection (its config changed or it was deleted)."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.connection_id == connection_id]
+            entries = [self._entries.pop(key) for key in keys]
+        _dispose(entries)
+        if entries:
+            logger.info(f"[SourcePools] Disposed {len(entries)} pools of connection {connection_id}")
+        return len(entries)
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Dispose pools unused for idle_seconds that have no checked-out connection."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items()
+                if now - entry.last_used >= self.idle_seconds and not entry.in_use()
+            ]
+            entries = [self._entries.pop(key) for key in keys]
+        _dispose(entries)
+        if entries:
+            logger.info(f"[SourcePools] Evicted {len(entries)} idle pools")
+        return len(entries)
+
+    def dispose_all(self):
+        """Dispose every pool and stop the janitor (app shutdown)."""
+        self._stop.set()
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            janitor, self._janitor = self._janitor, None
+        if janitor is not None:
+            janitor.join()
+        _dispose(entries)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """One row per pool: connection, type, age, idle time, checked-out connections."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.values())
+        return [
+            {
+                "connection_id": entry.connection_id,
+                "conn_type": entry.conn_type,
+                "age_seconds": round(now - entry.created_at, 1),
+                "idle_seconds": round(now - entry.last_used, 1),
+                "checked_out": entry.engine.pool.checkedout() if hasattr(entry.engine.pool, "checkedout") else 0,
+            }
+            for entry in entries
+        ]
+
+    def _evict_over_limit(self) -> List[_PoolEntry]:
+        """Least recently used idle pools beyond max_pools (caller holds the lock)."""
+        evicted = []
+        candidates = sorted(
+            (item for item in self._entries.items() if not item[1].in_use()), key=lambda item: item[1].last_used
+        )
+        for key, entry in candidates:
+            if len(self._entries) <= self.max_pools:
+                break
+            evicted.append(self._entries.pop(key))
+        if len(self._entries) > self.max_pools:
+            logger.warning(f"[SourcePools] {len(self._entries)} pools in use (max {self.max_pools})")
+        return evicted
+
+    def _start_janitor(self):
+        """Start the idle eviction thread on first use (caller holds the lock)."""
+        if self._janitor is not None or self.idle_seconds <= 0:
+            return
+        self._stop.clear()
+        self._janitor = threading.Thread(target=self._janitor_loop, name="source-pool-janitor", daemon=True)
+        self._janitor.start()
+
+    def _janitor_loop(self):
+        interval = max(1.0, self.idle_seconds / 2)
+        while not self._stop.wait(interval):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                logger.error(f"[SourcePools] Idle eviction failed: {e}")
+
+
+def _create_source_engine(conn_type: str, config: Dict[str, Any]) -> Engine:
+    from app.engine.v3.connector_crud import _build_connection_string
+
+    return create_engine(
+        _build_connection_string(conn_type, config),
+        pool_pre_ping=True,
+        pool_size=max(settings.source_pool_size, settings.sync_extract_slices),  # One connection per extract slice
+        max_overflow=settings.source_pool_max_overflow,
+        pool_recycle=settings.source_pool_recycle,
+    )
+
+
+def _dispose(entries: List[_PoolEntry]):
+    for entry in entries:
+        try:
+            entry.engine.dispose()
+        except Exception as e:
+            logger.warning(f"[SourcePools] Failed to dispose pool of {entry.connection_id}: {e}")
+
+
+_registry: Optional[SourcePoolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_source_pools() -> SourcePoolRegistry:
+    """Get the process-wide registry (created on first use)."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SourcePoolRegistry(
+                max_pools=settings.source_pool_max_pools,
+                idle_seconds=settings.source_pool_idle_seconds,
+            )
+        return _registry
+
+
+def get_source_engine(conn_type: str, config: Dict[str, Any], connection_id: Optional[str] = None) -> Engine:
+    """Pooled engine for a source connection; do not dispose it."""
+    return get_source_pools().get(conn_type, config, connection_id)
+
+
+def invalidate_source_pools(connection_id: str) -> int:
+    """Dispose the pools of a connection whose config changed or that was deleted."""
+    if _registry is None:
+        return 0
+    return _registry.invalidate(connection_id)
+
+
+def dispose_source_pools():
+    """Dispose all source pools at app shutdown."""
+    if _registry is not None:
+        _registry.dispose_all()
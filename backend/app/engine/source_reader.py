@@ -0,0 +1,294 @@
+"""
+Source Reader - Bounded-memory chunked reads from SQL tables
+MDP Platform V3.1 - Multimodal Data Governance
+
+pd.read_sql(..., chunksize=n) over pymysql uses a buffered cursor, so the
+whole result set is pulled into client memory before the first chunk is
+returned. This module reads with bounded memory instead:
+
+- Keyset pagination: tables with a single-column primary key are read as
+  repeated "WHERE pk > :last ORDER BY pk LIMIT n" queries. No long-lived
+  cursor, and each page is an index range scan.
+- Server-side cursor: everything else (tables without a usable key, custom
+  queries) is streamed with stream_results (SSCursor on MySQL).
+
+Both yield pandas DataFrame chunks of at most chunk_size rows. chunk_size
+may also be a callable returning the size of the next chunk (adaptive
+sizing, see batch_sizer). A different chunk type can be built from the
+fetched rows with build (e.g. Arrow record batches, see arrow_batches).
+"""
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import pandas as pd
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.logger import logger
+
+ChunkSize = Union[int, Callable[[], int]]
+ChunkBuilder = Callable[[List[Any], List[str]], Any]  # (rows, column names) -> chunk
+
+
+def _to_frame(rows: List[Any], columns: List[str]) -> pd.DataFrame:
+    # coerce_float matches pd.read_sql (DECIMAL -> float)
+    return pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+
+def _next_size(chunk_size: ChunkSize) -> int:
+    return max(1, int(chunk_size() if callable(chunk_size) else chunk_size))
+
+
+def _split_table_name(table: str) -> Tuple[Optional[str], str]:
+    if "." in table:
+        schema, name = table.split(".", 1)
+        return schema, name
+    return None, table
+
+
+def get_keyset_column(engine: Engine, table: str) -> Optional[str]:
+    """Single-column primary key of a table, or None if it has none (or a composite one)."""
+    schema, name = _split_table_name(table)
+    try:
+        pk = sa_inspect(engine).get_pk_constraint(name, schema=schema)
+    except Exception as e:
+        logger.debug(f"[SourceReader] Could not read primary key of {table}: {e}")
+        return None
+
+    columns = pk.get("constrained_columns") or []
+    return columns[0] if len(columns) == 1 else None
+
+
+def stream_query(
+    engine: Engine,
+    query: Union[str, TextClause],
+    params: Optional[Dict[str, Any]] = None,
+    chunk_size: ChunkSize = 10000,
+    build: ChunkBuilder = _to_frame
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a query through a server-side cursor in DataFrame chunks.
+
+    The connection is held until the generator is exhausted or closed.
+    """
+    if isinstance(query, str):
+        query = text(query)
+
+    size = _next_size(chunk_size)
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, max_row_buffer=size)
+        result = conn.execute(query, params or {})
+        columns = list(result.keys())
+        while True:
+            rows = result.fetchmany(size)
+            if not rows:
+                return
+            yield build(rows, columns)
+            size = _next_size(chunk_size)
+
+
+def keyset_chunks(
+    engine: Engine,
+    table: str,
+    key_column: str,
+    chunk_size: ChunkSize = 10000,
+    where: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    start_after: Optional[Any] = None,
+    build: ChunkBuilder = _to_frame
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a table in key order, one LIMIT page per chunk.
+
+    Args:
+        key_column: Unique, orderable column (normally the primary key)
+        where: Optional extra SQL condition (bind parameters in params)
+        start_after: Only read rows with key_column > start_after (resume)
+    """
+    key = engine.dialect.identifier_preparer.quote(key_column)
+    params = dict(params or {})
+    last_key = start_after
+
+    while True:
+        size = _next_size(chunk_size)
+        conditions = [f"({where})"] if where else []
+        if last_key is not None:
+            conditions.append(f"{key} > :_keyset_last")
+            params["_keyset_last"] = last_key
+
+        sql = f"SELECT * FROM {table}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {key} LIMIT {size}"
+
+        with engine.connect() as conn:
+            result = conn.execute(text(sql), params)
+            columns = list(result.keys())
+            rows = result.fetchall()
+
+        if not rows:
+            return
+
+        yield build(rows, columns)
+
+        if len(rows) < size:
+            return
+        last_key = rows[-1][columns.index(key_column)]
+
+
+def read_table_chunks(
+    engine: Engine,
+    table: str,
+    chunk_size: ChunkSize = 10000,
+    where: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    key_column: Optional[str] = None,
+    start_after: Optional[Any] = None,
+    build: ChunkBuilder = _to_frame
+) -> Iterator[pd.DataFrame]:
+    """
+    Read a whole table (optionally filtered) with bounded memory.
+
+    Uses keyset pagination when the table has a single-column primary key
+    (or key_column is given), otherwise a server-side cursor.
+    start_after (keyset only) skips rows up to and including that key.
+    """
+    key_column = key_column or get_keyset_column(engine, table)
+    size_label = "adaptive" if callable(chunk_size) else chunk_size
+
+    if key_column:
+        logger.info(f"[SourceReader] Reading {table} by keyset on '{key_column}' ({size_label} rows/page)")
+        return keyset_chunks(
+            engine, table, key_column, chunk_size, where=where, params=params, start_after=start_after, build=build
+        )
+
+    logger.info(f"[SourceReader] Streaming {table} through a server-side cursor ({size_label} rows/chunk)")
+    sql = f"SELECT * FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+    return stream_query(engine, sql, params=params, chunk_size=chunk_size, build=build)
+
+
+def key_range_filter(
+    engine: Engine,
+    key_column: str,
+    lower: Optional[Any] = None,
+    upper: Optional[Any] = None
+) -> Tuple[Optional[str], Dict[str, Any]]:
+    """WHERE condition for lower < key_column <= upper (either bound may be None = open)."""
+    key = engine.dialect.identifier_preparer.quote(key_column)
+    conditions, params = [], {}
+    if lower is not None:
+        conditions.append(f"{key} > :_range_lower")
+        params["_range_lower"] = lower
+    if upper is not None:
+        conditions.append(f"{key} <= :_range_upper")
+        params["_range_upper"] = upper
+    return (" AND ".join(conditions) or None), params
+
+
+def key_range_boundaries(
+    engine: Engine,
+    table: str,
+    key_column: str,
+    parts: int,
+    where: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    min_rows_per_part: int = 1
+) -> List[Any]:
+    """
+    Keys that split a table into up to `parts` key ranges of similar size.
+
+    Each boundary is found with one ORDER BY key LIMIT 1 OFFSET n query (an
+    index scan on the primary key). Fewer parts are used when the table has
+    less than min_rows_per_part rows per part.
+
+    Returns: Sorted upper bounds of every range but the last (empty = one range)
+    """
+    key = engine.dialect.identifier_preparer.quote(key_column)
+    condition = f" WHERE {where}" if where else ""
+
+    with engine.connect() as conn:
+        total = conn.execute(text(f"SELECT COUNT(*) FROM {table}{condition}"), params or {}).scalar() or 0
+        parts = min(parts, total // max(1, min_rows_per_part))
+        if parts <= 1:
+            return []
+
+        boundaries = []
+        for i in range(1, parts):
+            offset = i * total // parts - 1
+            boundary = conn.execute(
+                text(f"SELECT {key} FROM {table}{condition} ORDER BY {key} LIMIT 1 OFFSET {int(offset)}"),
+                params or {}
+            ).scalar()
+            if boundary is not None and (not boundaries or boundary > boundaries[-1]):
+                boundaries.append(boundary)
+
+    return boundaries
+
+
+def split_range_boundaries(
+    engine: Engine,
+    table: str,
+    split_column: str,
+    parts: int,
+    where: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    min_rows_per_part: int = 1
+) -> List[Any]:
+    """
+    Values that split a column's MIN..MAX range into up to `parts` equal-width slices.
+
+    One MIN/MAX query (an index lookup when split_column is indexed), no
+    COUNT(*). Integer columns use fewer slices when the range is narrower
+    than min_rows_per_part per slice (dense keys, e.g. auto-increment).
+    Columns that are neither numeric nor datetime are split by row count
+    instead (key_range_boundaries).
+
+    Returns: Sorted upper bounds of every slice but the last (empty = one slice),
+        for key_range_filter
+    """
+    if parts <= 1:
+        return []
+
+    column = engine.dialect.identifier_preparer.quote(split_column)
+    condition = f" WHERE {where}" if where else ""
+    with engine.connect() as conn:
+        low, high = conn.execute(text(f"SELECT MIN({column}), MAX({column}) FROM {table}{condition}"), params or {}).one()
+    if low is None or high is None or low == high:
+        return []
+
+    if isinstance(low, int) and isinstance(high, int):
+        parts = min(parts, max(1, (high - low + 1) // max(1, min_rows_per_part)))
+        boundaries = [low + (high - low) * i // parts for i in range(1, parts)]
+    elif isinstance(low, (int, float)) and isinstance(high, (int, float)):
+        boundaries = [low + (high - low) * i / parts for i in range(1, parts)]
+    elif isinstance(low, datetime) and isinstance(high, datetime):
+        boundaries = [low + (high - low) * i / parts for i in range(1, parts)]
+    else:
+        return key_range_boundaries(engine, table, split_column, parts, where, params, min_rows_per_part)
+
+    return sorted(set(b for b in boundaries if low <= b < high))
+
+
+def skip_rows(chunks: Iterator[pd.DataFrame], count: int) -> Iterator[pd.DataFrame]:
+    """
+    Drop the first count rows of a chunk stream (resume without a key).
+
+    The skipped rows are still read from the source, so this only saves the
+    downstream work. Only meaningful if the source order is stable.
+    """
+    try:
+        for chunk in chunks:
+            if count >= len(chunk):
+                count -= len(chunk)
+                continue
+            if count:
+                chunk = chunk.iloc[count:]
+                count = 0
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
@@ -0,0 +1,441 @@
+"""
+Sync Scheduler - Fires sync job and pipeline cron schedules
+MDP Platform V3.1 - Multimodal Data Governance
+
+SyncJobDef.schedule_cron and PipelineDef.sync_schedule used to be stored
+only; every run was started by hand. A scheduler thread in each API
+replica now checks the schedules every settings.sync_scheduler_poll_interval
+seconds, but only the replica holding the leader lease (a row in
+sys_scheduler_lock, renewed every tick) fires them:
+
+- Each schedule's next fire time is kept in next_run_at / next_sync_at,
+  plus a random jitter of up to settings.sync_schedule_jitter_seconds
+- Missed fire times (replica down, no leader) are coalesced: RUN_ONCE
+  fires one catch-up run, SKIP only fires runs at most
+  settings.sync_schedule_misfire_grace_seconds late
+- A due sync job waits while it is still running, or while its connection
+  already has settings.sync_max_concurrent_per_connection running syncs
+  (manual runs included)
+
+Sync jobs run through sync_worker.run_sync_job with a run log
+triggered_by=SCHEDULE. A pipeline has no runner of its own: a scheduled
+MATERIALIZED / MEDIA_EXTRACT pipeline queues indexing jobs for the
+published mappings of its object type (index_scheduler); VIRTUAL
+pipelines hold no copy and are skipped.
+
+Schedules are evaluated in UTC (see app.core.cron).
+"""
+import os
+import random
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.cron import CronExpression
+from app.core.db import get_pooled_engine
+from app.core.logger import logger
+
+
+SCHEDULER_LOCK_NAME = "sync_scheduler"
+TRIGGERED_BY_SCHEDULE = "SCHEDULE"
+
+# Missed-run policies
+MISSED_RUN_ONCE = "RUN_ONCE"
+MISSED_SKIP = "SKIP"
+
+# Schedule decisions
+DECISION_WAIT = "WAIT"
+DECISION_FIRE = "FIRE"
+DECISION_SKIP = "SKIP"
+
+
+# ==========================================
+# Schedule Arithmetic
+# ==========================================
+
+def next_fire_time(cron: CronExpression, after: datetime, jitter_seconds: float = 0.0) -> datetime:
+    """Next fire time of a schedule after a moment, delayed by a random jitter."""
+    jitter = timedelta(seconds=random.uniform(0, max(0.0, jitter_seconds)))
+    return (cron.next_after(after) + jitter).replace(microsecond=0)
+
+
+def fire_decision(
+    next_run_at: Optional[datetime],
+    now: datetime,
+    missed_policy: str = MISSED_RUN_ONCE,
+    grace_seconds: float = 0.0
+) -> str:
+    """
+    What to do with a schedule whose next fire time is next_run_at.
+
+    Returns: DECISION_WAIT (not due, or never planned), DECISION_FIRE, or
+        DECISION_SKIP (missed by more than the grace period under SKIP)
+    """
+    if next_run_at is None or next_run_at > now:
+        return DECISION_WAIT
+    if missed_policy.upper() == MISSED_SKIP and (now - next_run_at).total_seconds() > grace_seconds:
+        return DECISION_SKIP
+    return DECISION_FIRE
+
+
+# ==========================================
+# Leader Lease (sys_scheduler_lock)
+# ==========================================
+
+def acquire_leadership(owner_id: str, lease_seconds: float, name: str = SCHEDULER_LOCK_NAME) -> bool:
+    """
+    Take or renew the leader lease of a scheduler.
+
+    Succeeds if owner_id already holds the lease, the lease has expired, or
+    no lease row exists yet. Renewing extends the lease by lease_seconds.
+    """
+    engine = get_pooled_engine(settings.database_url)
+    now = datetime.utcnow()
+    params = {"name": name, "owner": owner_id, "now": now, "expires": now + timedelta(seconds=lease_seconds)}
+
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            UPDATE sys_scheduler_lock
+            SET acquired_at = CASE WHEN owner_id = :owner THEN acquired_at ELSE :now END,
+                owner_id = :owner, expires_at = :expires
+            WHERE name = :name AND (owner_id = :owner OR expires_at < :now)
+        """), params)
+    if result.rowcount == 1:
+        return True
+
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO sys_scheduler_lock (name, owner_id, acquired_at, expires_at)
+                VALUES (:name, :owner, :now, :expires)
+            """), params)
+        return True
+    except IntegrityError:
+        return False  # Held by another replica
+
+
+def release_leadership(owner_id: str, name: str = SCHEDULER_LOCK_NAME):
+    """Give up the lease (if held), so another replica takes over without waiting for it to expire."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE sys_scheduler_lock SET expires_at = :now
+            WHERE name = :name AND owner_id = :owner
+        """), {"name": name, "owner": owner_id, "now": datetime.utcnow()})
+
+
+# ==========================================
+# Schedule Rows
+# ==========================================
+
+def _list_scheduled_jobs() -> List[Dict[str, Any]]:
+    """Enabled sync jobs with a schedule, next fire time first."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT id, name, connection_id, schedule_cron, next_run_at
+            FROM sys_sync_job_def
+            WHERE is_enabled = :enabled AND schedule_cron IS NOT NULL AND schedule_cron <> ''
+            ORDER BY next_run_at
+        """).columns(next_run_at=DateTime), {"enabled": True}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def _list_scheduled_pipelines() -> List[Dict[str, Any]]:
+    """Active pipelines with a sync schedule."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT id, mode, object_ver_id, sync_schedule, next_sync_at
+            FROM sys_pipeline_def
+            WHERE is_active = :active AND sync_schedule IS NOT NULL AND sync_schedule <> ''
+        """).columns(next_sync_at=DateTime), {"active": True}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def _set_next_job_run(job_id: str, next_run_at: datetime):
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE sys_sync_job_def SET next_run_at = :next WHERE id = :id"),
+                     {"id": job_id, "next": next_run_at})
+
+
+def _set_next_pipeline_sync(pipeline_id: str, next_sync_at: datetime):
+    engine = get_pooled_engine(settings.database_url)
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE sys_pipeline_def SET next_sync_at = :next WHERE id = :id"),
+                     {"id": pipeline_id, "next": next_sync_at})
+
+
+def _create_scheduled_run(job_id: str, next_run_at: datetime) -> str:
+    """
+    Advance a job's next fire time and create its RUNNING run log (one transaction).
+
+    Returns: run log ID
+    """
+    engine = get_pooled_engine(settings.database_url)
+    run_log_id = str(uuid.uuid4())
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE sys_sync_job_def SET next_run_at = :next WHERE id = :id"),
+                     {"id": job_id, "next": next_run_at})
+        conn.execute(text("""
+            INSERT INTO sys_sync_run_log (id, job_id, start_time, status, triggered_by)
+            VALUES (:id, :job_id, :start_time, 'RUNNING', :triggered_by)
+        """), {
+            "id": run_log_id,
+            "job_id": job_id,
+            "start_time": datetime.utcnow(),
+            "triggered_by": TRIGGERED_BY_SCHEDULE,
+        })
+    return run_log_id
+
+
+def _running_syncs(now: datetime) -> Tuple[Set[str], Dict[str, int]]:
+    """Sync jobs with a RUNNING run log, and running syncs per connection."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT l.job_id, j.connection_id
+            FROM sys_sync_run_log l
+            JOIN sys_sync_job_def j ON j.id = l.job_id
+            WHERE l.status = 'RUNNING' AND l.start_time >= :since
+        """), {"since": now - timedelta(hours=settings.sync_run_stale_hours)}).fetchall()
+
+    per_connection: Dict[str, int] = {}
+    for _, connection_id in rows:
+        per_connection[connection_id] = per_connection.get(connection_id, 0) + 1
+    return {row[0] for row in rows}, per_connection
+
+
+def _published_mappings(object_ver_id: str) -> List[Tuple[str, str]]:
+    """Published mappings of a pipeline's object type: [(mapping_id, object_def_id)]."""
+    engine = get_pooled_engine(settings.database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT m.id, v.def_id
+            FROM meta_object_type_ver v
+            JOIN ctx_object_mapping_def m ON m.object_def_id = v.def_id
+            WHERE v.id = :object_ver_id AND m.status = 'PUBLISHED'
+        """), {"object_ver_id": object_ver_id}).fetchall()
+    return [(row[0], row[1]) for row in rows]
+
+
+# ==========================================
+# Scheduler
+# ==========================================
+
+class SyncScheduler:
+    """Leader-elected timer thread that fires due schedules onto a bounded run pool."""
+
+    def __init__(self, poll_interval: float, lease_seconds: float, max_jobs: int, owner_id: Optional[str] = None):
+        self.poll_interval = poll_interval
+        self.lease_seconds = max(lease_seconds, 2 * poll_interval)
+        self.max_jobs = max(1, max_jobs)
+        self.owner_id = owner_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.is_leader = False
+        self._running: Set[str] = set()  # job_ids running in this process
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def running_jobs(self) -> Set[str]:
+        with self._lock:
+            return set(self._running)
+
+    def start(self):
+        """Start the timer thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._pool = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="sync-job")
+            self._thread = threading.Thread(target=self._loop, name="sync-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"[SyncScheduler] Started as {self.owner_id}")
+
+    def stop(self, wait: bool = False):
+        """Stop firing schedules and hand the lease over; running syncs finish unless the process exits."""
+        with self._lock:
+            thread, pool = self._thread, self._pool
+            self._thread, self._pool = None, None
+        if thread is None:
+            return
+
+        self._stop.set()
+        thread.join()
+        pool.shutdown(wait=wait, cancel_futures=True)
+        if self.is_leader:
+            try:
+                release_leadership(self.owner_id)
+            except Exception as e:
+                logger.warning(f"[SyncScheduler] Failed to release leader lease: {e}")
+            self.is_leader = False
+        logger.info("[SyncScheduler] Stopped")
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"[SyncScheduler] Tick failed: {e}")
+                logger.error(traceback.format_exc())
+            self._stop.wait(self.poll_interval)
+
+    def tick(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Renew the lease and, as leader, fire the schedules due at now.
+
+        Returns: IDs of the sync jobs and pipelines fired
+        """
+        leader = acquire_leadership(self.owner_id, self.lease_seconds)
+        if leader != self.is_leader:
+            logger.info(f"[SyncScheduler] {self.owner_id} {'became' if leader else 'is no longer'} the leader")
+            self.is_leader = leader
+        if not leader:
+            return []
+
+        now = now or datetime.utcnow()
+        return self._fire_sync_jobs(now) + self._fire_pipelines(now)
+
+    def _due(
+        self,
+        item_id: str,
+        schedule: str,
+        next_run_at: Optional[datetime],
+        now: datetime,
+        plan: Callable[[str, datetime], None]
+    ) -> Optional[CronExpression]:
+        """
+        The schedule of a due item, or None. Items never planned, or whose
+        missed run is skipped, get their next fire time through plan(item_id, next).
+        """
+        try:
+            cron = CronExpression(schedule)
+        except ValueError as e:
+            logger.warning(f"[SyncScheduler] Ignoring schedule of {item_id}: {e}")
+            return None
+
+        decision = fire_decision(
+            next_run_at, now, settings.sync_schedule_missed_policy, settings.sync_schedule_misfire_grace_seconds
+        )
+        if decision == DECISION_FIRE:
+            return cron
+
+        if decision == DECISION_SKIP:
+            logger.warning(f"[SyncScheduler] Skipping missed run of {item_id} due at {next_run_at}")
+        if decision == DECISION_SKIP or next_run_at is None:
+            plan(item_id, next_fire_time(cron, now, settings.sync_schedule_jitter_seconds))
+        return None
+
+    def _fire_sync_jobs(self, now: datetime) -> List[str]:
+        jobs = _list_scheduled_jobs()
+        running_jobs, per_connection = _running_syncs(now)
+        fired = []
+
+        for job in jobs:
+            job_id, connection_id = job["id"], job["connection_id"]
+            cron = self._due(job_id, job["schedule_cron"], job["next_run_at"], now, _set_next_job_run)
+            if cron is None:
+                continue
+
+            # A busy job stays due until the job / connection is free (SKIP drops it once too late)
+            with self._lock:
+                busy = job_id in self._running or len(self._running) >= self.max_jobs
+            if busy or job_id in running_jobs or (
+                per_connection.get(connection_id, 0) >= settings.sync_max_concurrent_per_connection
+            ):
+                logger.debug(f"[SyncScheduler] Deferring job {job_id}: job or connection busy")
+                continue
+
+            # Missed fire times coalesce into this one run
+            next_run_at = next_fire_time(cron, now, settings.sync_schedule_jitter_seconds)
+            run_log_id = _create_scheduled_run(job_id, next_run_at)
+            per_connection[connection_id] = per_connection.get(connection_id, 0) + 1
+            with self._lock:
+                self._running.add(job_id)
+                pool = self._pool
+
+            logger.info(f"[SyncScheduler] Firing job {job['name']} ({job_id}), next run at {next_run_at}")
+            if pool is not None:
+                pool.submit(self._run_job, job_id, run_log_id)
+            else:
+                self._run_job(job_id, run_log_id)  # Not started (tick called directly)
+            fired.append(job_id)
+        return fired
+
+    def _run_job(self, job_id: str, run_log_id: str):
+        from app.engine.sync_worker import run_sync_job
+
+        try:
+            run_sync_job(job_id, run_log_id)
+        except Exception as e:
+            logger.error(f"[SyncScheduler] Job {job_id} crashed: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(job_id)
+
+    def _fire_pipelines(self, now: datetime) -> List[str]:
+        from app.engine.index_scheduler import enqueue_indexing_job
+
+        fired = []
+        for pipeline in _list_scheduled_pipelines():
+            pipeline_id = pipeline["id"]
+            cron = self._due(
+                pipeline_id, pipeline["sync_schedule"], pipeline["next_sync_at"], now, _set_next_pipeline_sync
+            )
+            if cron is None:
+                continue
+            _set_next_pipeline_sync(pipeline_id, next_fire_time(cron, now, settings.sync_schedule_jitter_seconds))
+            fired.append(pipeline_id)
+
+            if pipeline["mode"] == "VIRTUAL":
+                logger.info(f"[SyncScheduler] Pipeline {pipeline_id} is VIRTUAL, nothing to materialize")
+                continue
+            try:
+                mappings = _published_mappings(pipeline["object_ver_id"])
+                for mapping_id, object_def_id in mappings:
+                    enqueue_indexing_job(mapping_id, object_def_id)
+                logger.info(f"[SyncScheduler] Fired pipeline {pipeline_id}: queued {len(mappings)} indexing jobs")
+            except Exception as e:
+                logger.error(f"[SyncScheduler] Pipeline {pipeline_id} failed to queue: {e}")
+        return fired
+
+
+_scheduler: Optional[SyncScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_sync_scheduler() -> SyncScheduler:
+    """Get the process-wide scheduler (created on first use, not started)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SyncScheduler(
+                poll_interval=settings.sync_scheduler_poll_interval,
+                lease_seconds=settings.sync_scheduler_lease_seconds,
+                max_jobs=settings.sync_scheduler_max_jobs,
+            )
+        return _scheduler
+
+
+def start_sync_scheduler():
+    """Start the scheduler at app startup (if enabled)."""
+    if settings.sync_scheduler_enabled:
+        get_sync_scheduler().start()
+
+
+def stop_sync_scheduler():
+    """Stop the scheduler at app shutdown."""
+    if _scheduler is not None:
+        _scheduler.stop()
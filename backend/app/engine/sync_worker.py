@@ -1,12 +1,18 @@
 """
 Sync Worker - ETL Engine for MDP Platform V3.1
 Handles data synchronization from external sources to mdp_raw_store.
+
+Synced rows also land in ontology_raw_data: every batch is written to both
+databases, or, when they share a MySQL server, copied there on the server
+after the load.
 """
+import time
 import traceback
-from typing import Optional, Dict, Any
 from datetime import datetime
+from typing import Optional, Callable, Dict, Any, List, Sequence
 
 import pandas as pd
+import pyarrow.compute as pc
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
 
@@ -14,6 +20,16 @@ from app.core.config import settings
 from app.core.logger import logger
 from app.core.db import get_session_context
 from app.engine.v3 import connector_crud, sync_crud
+from app.engine.source_reader import get_keyset_column, read_table_chunks, stream_query
+from app.engine.partitioned_reader import PartitionedReader, plan_slices
+from app.engine.source_pools import get_source_engine
+from app.engine.arrow_batches import (
+    SYNC_TIMESTAMP_COLUMN,
+    create_table_for_batch,
+    fan_out_record_batch,
+    rows_to_record_batch,
+    standardize_batch,
+)
 
 
 def _get_raw_store_engine() -> Engine:
@@ -26,80 +42,96 @@ def _get_ontology_raw_data_engine() -> Engine:
     return create_engine(settings.ontology_raw_data_url, pool_pre_ping=True)
 
 
-def _copy_to_ontology_raw_data(
-    target_table: str,
+# ==========================================
+# Ontology Raw Data Mirror
+# ==========================================
+
+def _same_database_server(engine: Engine, other: Engine) -> bool:
+    """Whether two MySQL engines reach the same server as the same user (cross-database SQL works)."""
+    url, other_url = engine.url, other.url
+    if url.get_backend_name() != "mysql" or other_url.get_backend_name() != "mysql":
+        return False
+    return (
+        (url.host or "localhost", url.port or 3306, url.username)
+        == (other_url.host or "localhost", other_url.port or 3306, other_url.username)
+    )
+
+
+def _copy_on_server(
+    raw_store_engine: Engine,
+    target_database: str,
+    table_name: str,
     sync_mode: str,
-    chunk_size: int = 10000
-) -> int:
+    since: datetime
+):
     """
-    Copy data from mdp_raw_store to ontology_raw_data.
+    Copy a synced table from mdp_raw_store to another database of the same MySQL server.
     
-    Args:
-        target_table: Table name (same in both databases)
-        sync_mode: FULL_OVERWRITE or INCREMENTAL
-        chunk_size: Batch size for reading
-        
-    Returns:
-        Number of rows copied
+    The rows never leave the server:
+    - FULL_OVERWRITE: CREATE TABLE ... LIKE + INSERT ... SELECT into a new
+      table, then an atomic RENAME swap (readers never see a partial table)
+    - other modes: REPLACE ... SELECT of the rows synced by this run
+      (_sync_timestamp >= since)
     """
-    raw_store_engine = _get_raw_store_engine()
-    ontology_engine = _get_ontology_raw_data_engine()
-    
-    logger.info(f"[SyncWorker] Copying {target_table} from mdp_raw_store to ontology_raw_data...")
-    
-    total_rows = 0
-    first_chunk = True
+    preparer = raw_store_engine.dialect.identifier_preparer
+    source_database = raw_store_engine.url.database
+    source = f"{preparer.quote(source_database)}.{preparer.quote(table_name)}"
+    target = f"{preparer.quote(target_database)}.{preparer.quote(table_name)}"
+    staging = f"{preparer.quote(target_database)}.{preparer.quote(table_name + '__sync_new')}"
+    retired = f"{preparer.quote(target_database)}.{preparer.quote(table_name + '__sync_old')}"
     
-    try:
-        # Read from mdp_raw_store in chunks
-        for chunk_df in pd.read_sql(f"SELECT * FROM {target_table}", raw_store_engine, chunksize=chunk_size):
-            # Determine write mode
-            if first_chunk:
-                if_exists = "replace" if sync_mode == "FULL_OVERWRITE" else "append"
-                first_chunk = False
-            else:
-                if_exists = "append"
-            
-            # Write to ontology_raw_data
-            chunk_df.to_sql(
-                name=target_table,
-                con=ontology_engine,
-                if_exists=if_exists,
-                index=False
-            )
-            
-            total_rows += len(chunk_df)
-            logger.info(f"[SyncWorker] Copied {total_rows} rows to ontology_raw_data.{target_table}")
+    with raw_store_engine.begin() as conn:
+        columns = ", ".join(preparer.quote(row[0]) for row in conn.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_schema = :db AND table_name = :table ORDER BY ordinal_position"
+        ), {"db": source_database, "table": table_name}))
+        target_exists = conn.execute(text(
+            "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = :db AND table_name = :table"
+        ), {"db": target_database, "table": table_name}).scalar()
         
-        logger.info(f"[SyncWorker] Successfully copied {total_rows} rows to ontology_raw_data.{target_table}")
-        
-    finally:
-        raw_store_engine.dispose()
-        ontology_engine.dispose()
+        if sync_mode == "FULL_OVERWRITE":
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+            conn.execute(text(f"CREATE TABLE {staging} LIKE {source}"))
+            conn.execute(text(f"INSERT INTO {staging} ({columns}) SELECT {columns} FROM {source}"))
+            if target_exists:
+                conn.execute(text(f"RENAME TABLE {target} TO {retired}, {staging} TO {target}"))
+                conn.execute(text(f"DROP TABLE {retired}"))
+            else:
+                conn.execute(text(f"RENAME TABLE {staging} TO {target}"))
+        else:
+            if not target_exists:
+                conn.execute(text(f"CREATE TABLE {target} LIKE {source}"))
+            # DATETIME columns keep whole seconds
+            conn.execute(text(
+                f"REPLACE INTO {target} ({columns}) SELECT {columns} FROM {source} "
+                f"WHERE {preparer.quote(SYNC_TIMESTAMP_COLUMN)} >= :since"
+            ), {"since": since.replace(microsecond=0)})
     
-    return total_rows
-
+    logger.info(f"[SyncWorker] Copied {table_name} to {target_database} on the database server ({sync_mode})")
 
-def _get_source_engine(conn_type: str, config: Dict[str, Any]) -> Engine:
-    """Get SQLAlchemy engine for source database."""
-    conn_string = connector_crud._build_connection_string(conn_type, config)
-    return create_engine(conn_string, pool_pre_ping=True)
 
-
-def _standardize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+def _get_source_engine(conn_type: str, config: Dict[str, Any], connection_id: Optional[str] = None) -> Engine:
     """
-    Standardize dataframe columns and add metadata.
-    
-    - Lowercase column names
-    - Add _sync_timestamp column
+    Get the pooled engine for a source database (one pooled connection per extract slice).
+
+    Shared through source_pools, do not dispose it.
     """
-    # Lowercase column names
-    df.columns = [col.lower() for col in df.columns]
-    
-    # Add sync timestamp
-    df['_sync_timestamp'] = datetime.utcnow()
-    
-    return df
+    return get_source_engine(conn_type, config, connection_id)
+
+
+def _format_watermark(value: Any) -> str:
+    """Cursor value as a string the source compares correctly against the column."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return str(value)
+
+
+def _column_index(batch, column: str) -> int:
+    """Position of a column in a batch (names compared case-insensitively)."""
+    names = [name.lower() for name in batch.schema.names]
+    if column.lower() not in names:
+        raise ValueError(f"Cursor column '{column}' not in source columns {batch.schema.names}")
+    return names.index(column.lower())
 
 
 def _sync_mysql_table(
@@ -108,60 +140,158 @@ def _sync_mysql_table(
     source_config: Dict[str, Any],
     target_table: str,
     sync_mode: str,
-    chunk_size: int = 10000
-) -> int:
+    chunk_size: int = 10000,
+    mirror_engines: Sequence[Engine] = (),
+    cursor_column: Optional[str] = None,
+    since: Optional[str] = None,
+    on_progress: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+) -> Dict[str, Any]:
     """
     Sync data from MySQL/Postgres table to raw store.
     
-    Returns: Number of rows synced
+    Rows are streamed as Arrow record batches from the source cursor to the
+    target (see arrow_batches), without pandas frames in between. Each
+    batch is also written to the same table of every mirror engine (e.g.
+    ontology_raw_data), so no database is re-read to copy it.
+    
+    INCREMENTAL reads only rows whose cursor column (default: the source
+    primary key) is above `since`, the job's watermark, and upserts them by
+    the source key (source_config "key_column", default: the table's
+    primary key). Its first run (no watermark) loads and re-creates the
+    table like FULL_OVERWRITE, keyed on the source key.
+    
+    Tables are extracted in parallel slices of a split column
+    (source_config "split_column", default: the source key) over
+    source_config "slices" (default settings.sync_extract_slices) pooled
+    connections, see partitioned_reader. on_progress receives the rows
+    loaded per slice every settings.sync_progress_interval seconds and at
+    the end.
+    
+    Returns: {"rows", "bytes" (Arrow buffer size), "watermark" (highest
+        cursor value read, not saved), "replaced" (table re-created),
+        "slices" (number of slices read)}
     """
     source_table = source_config.get("table")
     source_schema = source_config.get("schema")
     source_query = source_config.get("query")
+    qualified_table = f"{source_schema}.{source_table}" if source_schema else source_table
     
-    if source_query:
-        # Custom SQL query
-        query = source_query
-    elif source_schema:
-        query = f"SELECT * FROM {source_schema}.{source_table}"
+    key_column = source_config.get("key_column")
+    if not key_column and not source_query:
+        key_column = get_keyset_column(source_engine, qualified_table)
+    
+    incremental = sync_mode == "INCREMENTAL"
+    if incremental:
+        cursor_column = cursor_column or key_column
+        if not cursor_column:
+            logger.warning(f"[SyncWorker] INCREMENTAL sync of {target_table} has no cursor column, reading all rows")
+        if not key_column:
+            logger.warning(f"[SyncWorker] INCREMENTAL sync of {target_table} has no source key, rows are appended")
     else:
-        query = f"SELECT * FROM {source_table}"
+        cursor_column = since = None
+    replace = sync_mode == "FULL_OVERWRITE" or (incremental and since is None)
     
-    logger.info(f"[SyncWorker] Extracting data with query: {query[:100]}...")
+    where, params = None, {}
+    if cursor_column and since is not None:
+        where = f"{source_engine.dialect.identifier_preparer.quote(cursor_column)} > :_sync_since"
+        params = {"_sync_since": since}
     
-    total_rows = 0
-    first_chunk = True
+    # Large tables are read as parallel value-range slices of the split column
+    split_column = source_config.get("split_column") or key_column
+    parts = int(source_config.get("slices") or settings.sync_extract_slices)
+    if not source_query and split_column and parts > 1:
+        slices = plan_slices(
+            source_engine, qualified_table, split_column, parts, where=where, params=params,
+            min_rows_per_slice=settings.sync_min_slice_rows, include_nulls=(split_column != key_column)
+        )
+    else:
+        slices = [{"slice": 0, "lower": None, "upper": None, "where": where, "params": params}]
     
-    # Read in chunks for memory safety
-    for chunk_df in pd.read_sql(query, source_engine, chunksize=chunk_size):
-        # Transform
-        chunk_df = _standardize_dataframe(chunk_df)
-        
-        # Determine write mode
-        if first_chunk:
-            if sync_mode == "FULL_OVERWRITE":
-                # Drop and recreate table
-                if_exists = "replace"
-            else:
-                # Append mode
-                if_exists = "append"
-            first_chunk = False
-        else:
-            # Always append subsequent chunks
-            if_exists = "append"
-        
-        # Load to target
-        chunk_df.to_sql(
-            name=target_table,
-            con=target_engine,
-            if_exists=if_exists,
-            index=False
+    # Slices of a non-key column, and watermark reads on a non-key cursor, are
+    # read in one pass over that column's index instead of keyset pages
+    indexed_column = split_column if len(slices) > 1 else (cursor_column if where else key_column)
+    
+    def read_slice(slice_: Dict[str, Any]):
+        if source_query:
+            # Custom SQL query (streamed through a server-side cursor)
+            query = f"SELECT * FROM ({source_query}) AS subq WHERE {where}" if where else source_query
+            return stream_query(source_engine, query, params=params, chunk_size=chunk_size, build=rows_to_record_batch)
+        if indexed_column != key_column:
+            return stream_query(
+                source_engine, f"SELECT * FROM {qualified_table} WHERE {slice_['where']}",
+                params=slice_["params"], chunk_size=chunk_size, build=rows_to_record_batch
+            )
+        return read_table_chunks(
+            source_engine, qualified_table, chunk_size=chunk_size, where=slice_["where"],
+            params=slice_["params"], key_column=key_column, build=rows_to_record_batch
         )
-        
-        total_rows += len(chunk_df)
-        logger.info(f"[SyncWorker] Loaded {total_rows} rows to {target_table}")
     
-    return total_rows
+    if source_query:
+        logger.info(f"[SyncWorker] Extracting data with query: {source_query[:100]}...")
+    elif len(slices) > 1:
+        logger.info(f"[SyncWorker] Extracting {qualified_table} in {len(slices)} parallel slices of '{split_column}'")
+    else:
+        logger.info(f"[SyncWorker] Extracting data from table: {qualified_table}" + (f" ({where})" if where else ""))
+    reader = PartitionedReader(slices, read_slice)
+    
+    target_key = key_column.lower() if key_column else None
+    upsert_key = target_key if incremental and not replace else None
+    stats = {"rows": 0, "bytes": 0, "watermark": None, "replaced": replace, "slices": len(slices)}
+    watermark = None
+    first_chunk = True
+    last_report = time.monotonic()
+    
+    # Read Arrow record batches of every slice into one loader (keyset pages or server-side cursors)
+    try:
+        for _, batch in reader:
+            if cursor_column and batch.num_rows:
+                chunk_max = pc.max(batch.column(_column_index(batch, cursor_column))).as_py()
+                if chunk_max is not None and (watermark is None or chunk_max > watermark):
+                    watermark = chunk_max
+            
+            # Transform (relabels the schema, appends _sync_timestamp)
+            batch = standardize_batch(batch)
+            
+            engines = [target_engine, *mirror_engines]
+            if first_chunk:
+                # FULL_OVERWRITE (and a first INCREMENTAL run) recreates the table, otherwise append
+                for engine in engines:
+                    create_table_for_batch(engine, target_table, batch, replace=replace, key_column=target_key)
+                first_chunk = False
+            
+            # Load to target (and mirrors) from the same batch
+            fan_out_record_batch(engines, target_table, batch, key_column=upsert_key)
+            
+            stats["rows"] += batch.num_rows
+            stats["bytes"] += batch.nbytes
+            logger.info(f"[SyncWorker] Loaded {stats['rows']} rows to {target_table}")
+            
+            if on_progress and time.monotonic() - last_report >= settings.sync_progress_interval:
+                last_report = time.monotonic()
+                on_progress(reader.progress())
+    finally:
+        if on_progress:
+            on_progress(reader.progress())
+    
+    if watermark is not None:
+        stats["watermark"] = _format_watermark(watermark)
+    return stats
+
+
+def _throughput(rows: int, nbytes: int, seconds: float) -> str:
+    seconds = max(seconds, 1e-9)
+    return f"{rows / seconds:.0f} rows/s, {nbytes / seconds / 1e6:.2f} MB/s"
+
+
+def _run_log_progress_writer(run_log_id: str) -> Callable[[List[Dict]], None]:
+    """on_progress callback that stores per-slice progress in the run log."""
+    def write(progress: List[Dict]):
+        try:
+            with get_session_context() as session:
+                sync_crud.update_run_log_progress(session, run_log_id, progress)
+        except Exception as e:
+            logger.warning(f"[SyncWorker] Failed to record slice progress for {run_log_id}: {e}")
+    return write
 
 
 def run_sync_job(job_id: str, run_log_id: str):
@@ -174,6 +304,9 @@ def run_sync_job(job_id: str, run_log_id: str):
     logger.info(f"[SyncWorker] Starting job {job_id}, log {run_log_id}")
     
     rows_affected = 0
+    bytes_affected = None
+    load_seconds = None
+    watermark = None
     error_message = None
     status = "SUCCESS"
     
@@ -193,19 +326,39 @@ def run_sync_job(job_id: str, run_log_id: str):
             
             # Get engines
             target_engine = _get_raw_store_engine()
+            ontology_engine = _get_ontology_raw_data_engine()
+            
+            # ontology_raw_data is filled from the synced batches; on the same
+            # server as mdp_raw_store it is copied there after the load instead
+            on_server = _same_database_server(target_engine, ontology_engine)
+            mirror_engines = [] if on_server else [ontology_engine]
+            if on_server and target_engine.url.database == ontology_engine.url.database:
+                on_server = False  # Same database: nothing to copy
             
             if conn.conn_type in ("MYSQL", "POSTGRES"):
-                source_engine = _get_source_engine(conn.conn_type, conn.config_json)
+                source_engine = _get_source_engine(conn.conn_type, conn.config_json, conn.id)
                 
-                rows_affected = _sync_mysql_table(
+                run_started = datetime.utcnow()
+                started = time.perf_counter()
+                sync_stats = _sync_mysql_table(
                     source_engine=source_engine,
                     target_engine=target_engine,
                     source_config=job.source_config,
                     target_table=job.target_table,
                     sync_mode=job.sync_mode,
+                    mirror_engines=mirror_engines,
+                    cursor_column=job.cursor_column,
+                    since=job.sync_watermark,
+                    on_progress=_run_log_progress_writer(run_log_id),
                 )
-                
-                source_engine.dispose()
+                rows_affected, bytes_affected = sync_stats["rows"], sync_stats["bytes"]
+                watermark = sync_stats["watermark"]
+                if on_server and rows_affected:
+                    copy_mode = "FULL_OVERWRITE" if sync_stats["replaced"] else job.sync_mode
+                    _copy_on_server(
+                        target_engine, ontology_engine.url.database, job.target_table, copy_mode, run_started
+                    )
+                load_seconds = time.perf_counter() - started
                 
             elif conn.conn_type == "S3":
                 # TODO: Implement S3 sync with boto3 + pandas
@@ -223,25 +376,23 @@ def run_sync_job(job_id: str, run_log_id: str):
                 raise ValueError(f"Unsupported connection type: {conn.conn_type}")
             
             target_engine.dispose()
+            ontology_engine.dispose()
             
-            logger.info(f"[SyncWorker] Job {job_id} phase 1 completed. Rows synced to mdp_raw_store: {rows_affected}")
-            
-            # Phase 2: Copy data from mdp_raw_store to ontology_raw_data
-            logger.info(f"[SyncWorker] Starting phase 2: Copy to ontology_raw_data...")
-            rows_copied = _copy_to_ontology_raw_data(
-                target_table=job.target_table,
-                sync_mode=job.sync_mode
+            logger.info(
+                f"[SyncWorker] Job {job_id} completed. Rows synced to mdp_raw_store and ontology_raw_data: "
+                f"{rows_affected} ({_throughput(rows_affected, bytes_affected, load_seconds)})"
             )
-            logger.info(f"[SyncWorker] Job {job_id} phase 2 completed. Rows copied to ontology_raw_data: {rows_copied}")
-            
-            logger.info(f"[SyncWorker] Job {job_id} fully completed. Total rows: {rows_affected}")
             
     except Exception as e:
         status = "FAILED"
         error_message = f"{str(e)}\n{traceback.format_exc()}"
         logger.error(f"[SyncWorker] Job {job_id} failed: {e}")
     
-    # Update run log
+    # Update run log (throughput of the extract + load phase)
+    rows_per_sec = bytes_per_sec = None
+    if load_seconds:
+        rows_per_sec = round(rows_affected / load_seconds, 1)
+        bytes_per_sec = round(bytes_affected / load_seconds, 1)
     try:
         with get_session_context() as session:
             sync_crud.complete_run_log(
@@ -249,7 +400,10 @@ def run_sync_job(job_id: str, run_log_id: str):
                 run_log_id,
                 status=status,
                 rows_affected=rows_affected,
-                message=error_message
+                message=error_message,
+                bytes_affected=bytes_affected,
+                rows_per_sec=rows_per_sec,
+                bytes_per_sec=bytes_per_sec
             )
             
             # Update job status
@@ -257,7 +411,8 @@ def run_sync_job(job_id: str, run_log_id: str):
                 session,
                 job_id,
                 status=status,
-                rows_synced=rows_affected if status == "SUCCESS" else None
+                rows_synced=rows_affected if status == "SUCCESS" else None,
+                sync_watermark=watermark if status == "SUCCESS" else None
             )
     except Exception as e:
         logger.error(f"[SyncWorker] Failed to update run log: {e}")
@@ -267,7 +422,8 @@ def preview_sync_data(
     conn_type: str,
     config: Dict[str, Any],
     source_config: Dict[str, Any],
-    limit: int = 100
+    limit: int = 100,
+    connection_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Preview data from source without syncing.
@@ -276,7 +432,7 @@ def preview_sync_data(
     """
     try:
         if conn_type in ("MYSQL", "POSTGRES"):
-            engine = _get_source_engine(conn_type, config)
+            engine = _get_source_engine(conn_type, config, connection_id)
             
             source_table = source_config.get("table")
             source_query = source_config.get("query")
@@ -297,8 +453,6 @@ def preview_sync_data(
             with engine.connect() as conn:
                 total_rows = conn.execute(text(count_query)).scalar()
             
-            engine.dispose()
-            
             return {
                 "columns": list(df.columns),
                 "data": df.to_dict(orient="records"),
@@ -0,0 +1,93 @@
+"""
+Scalar Mapping Transforms - Row-wise and columnar implementations
+MDP Platform V3.1 - Multimodal Data Governance
+
+Scalar transforms (concat, to_uppercase, to_lowercase, format_date) have two
+equivalent implementations:
+- apply_scalar_transform: one value at a time (preview, row-wise fallback)
+- apply_column_transform: a whole pandas Series at once (indexing worker)
+
+Blank inputs (None, NaN, "", 0, False) map to "" for string transforms.
+"""
+from typing import Any
+
+import pandas as pd
+
+
+# Transforms with a vectorized (column-at-a-time) implementation
+SCALAR_TRANSFORMS = ("concat", "to_uppercase", "to_lowercase", "format_date")
+
+
+def is_scalar_transform(func_name: str) -> bool:
+    """Check if a transform can run column-at-a-time."""
+    return func_name in SCALAR_TRANSFORMS
+
+
+def _is_blank(value: Any) -> bool:
+    """Row-wise blank check matching blank_mask."""
+    if value is None:
+        return True
+    try:
+        if pd.isna(value):
+            return True
+    except (TypeError, ValueError):
+        # Array-like values are never blank
+        return False
+    return not value
+
+
+def blank_mask(series: pd.Series) -> pd.Series:
+    """Columnar blank check (nulls, empty strings, zero, False)."""
+    return series.isna() | series.isin(["", 0, False])
+
+
+def _to_str(series: pd.Series) -> pd.Series:
+    """Convert a Series to strings the same way str() would per value."""
+    if pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+        return series.map(str)
+    return series.astype(str)
+
+
+def apply_scalar_transform(func_name: str, value: Any) -> Any:
+    """
+    Apply a scalar transform to a single value.
+
+    Unknown transforms pass the value through unchanged.
+    """
+    if func_name == "concat":
+        # String concatenation (pass through for single value)
+        return "" if _is_blank(value) else str(value)
+
+    elif func_name == "to_uppercase":
+        return "" if _is_blank(value) else str(value).upper()
+
+    elif func_name == "to_lowercase":
+        return "" if _is_blank(value) else str(value).lower()
+
+    elif func_name == "format_date":
+        # Pass through for demo
+        return value
+
+    return value
+
+
+def apply_column_transform(func_name: str, series: pd.Series) -> pd.Series:
+    """
+    Apply a scalar transform to a whole column as vectorized Series ops.
+
+    Raises ValueError for transforms without a columnar implementation;
+    callers should check is_scalar_transform() first.
+    """
+    if func_name == "format_date":
+        return series
+
+    if func_name == "concat":
+        result = _to_str(series)
+    elif func_name == "to_uppercase":
+        result = _to_str(series).str.upper()
+    elif func_name == "to_lowercase":
+        result = _to_str(series).str.lower()
+    else:
+        raise ValueError(f"No columnar implementation for transform: {func_name}")
+
+    return result.where(~blank_mask(series), "")
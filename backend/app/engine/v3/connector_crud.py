@@ -6,11 +6,13 @@ import time
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from sqlmodel import Session, select
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.core.logger import logger
+from app.engine.schema_explorer import filter_tables, get_source_schema, invalidate_schema_cache
+from app.engine.source_pools import get_source_engine, get_source_pools, invalidate_source_pools
 from app.models.system import (
     Connection,
     ConnectionCreate,
@@ -95,6 +97,11 @@ def update_connection(
     session.add(conn)
     session.commit()
     session.refresh(conn)
+    
+    # Pools and schemas read with the old config (credentials, host) are not reused
+    if "config_json" in update_data or "conn_type" in update_data:
+        invalidate_source_pools(conn_id)
+        invalidate_schema_cache(conn_id)
     logger.info(f"[Connector] Updated connection: {conn_id}")
     return conn
 
@@ -107,6 +114,8 @@ def delete_connection(session: Session, conn_id: str) -> bool:
     
     session.delete(conn)
     session.commit()
+    invalidate_source_pools(conn_id)
+    invalidate_schema_cache(conn_id)
     logger.info(f"[Connector] Deleted connection: {conn_id}")
     return True
 
@@ -158,25 +167,36 @@ def _build_connection_string(conn_type: str, config: Dict[str, Any]) -> str:
         raise ValueError(f"Unsupported connection type for SQL: {conn_type}")
 
 
-def _create_engine_for_config(conn_type: str, config: Dict[str, Any]) -> Engine:
-    """Create SQLAlchemy engine for given config."""
-    conn_string = _build_connection_string(conn_type, config)
-    return create_engine(conn_string, pool_pre_ping=True)
+def _create_engine_for_config(
+    conn_type: str,
+    config: Dict[str, Any],
+    connection_id: Optional[str] = None
+) -> Engine:
+    """Pooled SQLAlchemy engine for given config (shared, do not dispose)."""
+    return get_source_engine(conn_type, config, connection_id)
 
 
-def test_connection(conn_type: str, config: Dict[str, Any]) -> ConnectionTestResponse:
+def test_connection(
+    conn_type: str,
+    config: Dict[str, Any],
+    connection_id: Optional[str] = None
+) -> ConnectionTestResponse:
     """
-    Test connection without saving.
+    Test connection (saved, or without saving when connection_id is None).
     Returns success/fail with latency.
     """
     start_time = time.time()
     
     try:
         if conn_type in ("MYSQL", "POSTGRES"):
-            engine = _create_engine_for_config(conn_type, config)
-            with engine.connect() as connection:
-                connection.execute(text("SELECT 1"))
-            engine.dispose()
+            engine = _create_engine_for_config(conn_type, config, connection_id)
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception:
+                # Do not keep a pool for a config that does not connect
+                get_source_pools().discard(conn_type, config, connection_id)
+                raise
             
         elif conn_type == "S3":
             # S3 connection test would use boto3
@@ -243,9 +263,23 @@ def test_connection(conn_type: str, config: Dict[str, Any]) -> ConnectionTestRes
 # Source Explorer
 # ==========================================
 
-def explore_source(conn_type: str, config: Dict[str, Any]) -> SourceExplorerResponse:
+def explore_source(
+    conn_type: str,
+    config: Dict[str, Any],
+    connection_id: Optional[str] = None,
+    schema: Optional[str] = None,
+    search: Optional[str] = None,
+    skip: int = 0,
+    limit: Optional[int] = None,
+    refresh: bool = False,
+    include_columns: bool = True
+) -> SourceExplorerResponse:
     """
     Explore available tables/resources in the source.
+    
+    Tables of a schema are read in one query and cached (see schema_explorer);
+    search filters table names (case-insensitive), skip/limit page them and
+    total is the number of matching tables.
     """
     response = SourceExplorerResponse(
         connection_id="",  # Will be set by caller
@@ -255,37 +289,22 @@ def explore_source(conn_type: str, config: Dict[str, Any]) -> SourceExplorerResp
     
     try:
         if conn_type in ("MYSQL", "POSTGRES"):
-            engine = _create_engine_for_config(conn_type, config)
-            
-            from sqlalchemy import inspect
-            inspector = inspect(engine)
+            engine = _create_engine_for_config(conn_type, config, connection_id)
+            source_schema = get_source_schema(engine, conn_type, config, connection_id, schema, refresh=refresh)
             
-            # Get schemas (for Postgres) or use default
             if conn_type == "POSTGRES":
-                schemas = inspector.get_schema_names()
-                response.schemas = [s for s in schemas if s not in ('information_schema', 'pg_catalog')]
+                response.schemas = source_schema.schemas
             
-            # Get table names
-            table_names = inspector.get_table_names()
-            
-            for table_name in table_names:
-                # Get columns
-                columns = inspector.get_columns(table_name)
-                col_info = [
-                    {
-                        "name": col["name"],
-                        "type": str(col["type"]),
-                        "nullable": col.get("nullable", True)
-                    }
-                    for col in columns
-                ]
-                
-                response.tables.append(SourceTableInfo(
-                    name=table_name,
-                    columns=col_info
-                ))
-            
-            engine.dispose()
+            names, response.total = filter_tables(source_schema, search, skip, limit)
+            response.tables = [
+                SourceTableInfo(
+                    name=name,
+                    schema_name=schema,
+                    columns=source_schema.tables[name] if include_columns else None
+                )
+                for name in names
+            ]
+            response.cached_at = source_schema.fetched_at
             
         elif conn_type == "S3":
             # TODO: List S3 buckets/prefixes using boto3
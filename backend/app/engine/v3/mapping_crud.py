@@ -33,6 +33,9 @@ def create_mapping(session: Session, data: ObjectMappingDefCreate) -> ObjectMapp
         source_table_name=data.source_table_name,
         mapping_spec=data.mapping_spec,
         status="DRAFT",
+        index_workers=data.index_workers,
+        index_mode=data.index_mode,
+        watermark_column=data.watermark_column,
     )
     session.add(mapping)
     session.commit()
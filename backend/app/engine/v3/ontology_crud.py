@@ -9,6 +9,8 @@ from sqlmodel import Session, select, desc
 from sqlalchemy.exc import IntegrityError
 
 from app.core.logger import logger
+from app.core.quantized_vectors import normalize_storage
+from app.engine.object_type_cache import invalidate_object_type
 from app.models.ontology import (
     # ORM Models
     SharedPropertyDef,
@@ -148,6 +150,8 @@ def update_shared_property(
         session.add(db_obj)
         session.commit()
         session.refresh(db_obj)
+        # Shared properties may be bound to any object type
+        invalidate_object_type()
         logger.info(f"[V3] SharedProperty updated: {prop_id}")
         return db_obj
     except IntegrityError as e:
@@ -241,6 +245,7 @@ def create_object_type_ver(
             enable_global_search=data.enable_global_search,
             enable_geo_index=data.enable_geo_index,
             enable_vector_index=data.enable_vector_index,
+            vector_storage=normalize_storage(data.vector_storage),
             cache_ttl_seconds=data.cache_ttl_seconds,
             created_at=datetime.utcnow(),
         )
@@ -255,6 +260,7 @@ def create_object_type_ver(
                 obj_def.current_version_id = db_obj.id
                 session.add(obj_def)
                 session.commit()
+                invalidate_object_type(object_def_id=data.def_id)
         
         logger.info(f"[V3] ObjectTypeVer created: {db_obj.id}")
         return db_obj
@@ -289,6 +295,8 @@ def update_object_type_ver(
     
     try:
         update_data = data.model_dump(exclude_unset=True)
+        if update_data.get("vector_storage") is not None:
+            update_data["vector_storage"] = normalize_storage(update_data["vector_storage"])
         for field, value in update_data.items():
             if value is not None:
                 setattr(db_obj, field, value)
@@ -296,6 +304,7 @@ def update_object_type_ver(
         session.add(db_obj)
         session.commit()
         session.refresh(db_obj)
+        invalidate_object_type(object_def_id=db_obj.def_id, object_ver_id=ver_id)
         logger.info(f"[V3] ObjectTypeVer updated: {ver_id}")
         return db_obj
     except IntegrityError as e:
@@ -492,6 +501,7 @@ def bind_property_to_object_ver(
         session.add(db_obj)
         session.commit()
         session.refresh(db_obj)
+        invalidate_object_type(object_ver_id=object_ver_id)
         logger.info(f"[V3] Property bound: {db_obj.id}")
         return db_obj
     except IntegrityError as e:
@@ -570,6 +580,7 @@ def unbind_property_from_object_ver(
     try:
         session.delete(db_obj)
         session.commit()
+        invalidate_object_type(object_ver_id=db_obj.object_ver_id)
         logger.info(f"[V3] Property unbound: {binding_id}")
         return True
     except Exception as e:
@@ -9,6 +9,7 @@ from sqlalchemy import create_engine, text, inspect
 
 from app.core.logger import logger
 from app.core.config import settings
+from app.core.cron import validate_cron
 from app.models.system import (
     Connection,
     SyncJobDef,
@@ -23,7 +24,8 @@ from app.models.system import (
     TargetTableInfo,
     TargetTableListResponse,
 )
-from app.engine.v3 import mapping_crud, connector_crud
+from app.engine.schema_explorer import get_table_columns
+from app.engine.v3 import mapping_crud
 
 
 # ==========================================
@@ -56,7 +58,12 @@ def create_sync_job(
         - mapping_exists: bool - Whether a mapping exists for this connection
         - mapping_table_mismatch: Optional[str] - Existing mapping's table name if different
         - table_exists: bool - Whether target_table exists in raw_store
+    
+    Raises:
+        ValueError: Invalid schedule_cron
     """
+    schedule_cron = validate_cron(data.schedule_cron) if data.schedule_cron else None
+    
     warnings: Dict[str, Any] = {
         "mapping_exists": False,
         "mapping_table_mismatch": None,
@@ -91,26 +98,13 @@ def create_sync_job(
         conn = session.get(Connection, data.connection_id)
         if conn and "table" in data.source_config:
             source_table_name = data.source_config["table"]
-            # Explore source to get table schema
-            explorer_result = connector_crud.explore_source(conn.conn_type, conn.config_json)
-            # Find the table in explorer results
-            for table_info in explorer_result.tables:
-                if table_info.name == source_table_name:
-                    # Convert columns to schema format
-                    cached_schema = {
-                        "columns": [
-                            {
-                                "name": col["name"],
-                                "type": col["type"],
-                                "nullable": col.get("nullable", True)
-                            }
-                            for col in (table_info.columns or [])
-                        ]
-                    }
-                    logger.info(f"[SyncJob] Cached schema for source table {source_table_name}: {len(cached_schema['columns'])} columns")
-                    break
+            # Explorer cache, another job's cached schema, or one schema query
+            columns = get_table_columns(session, conn, source_table_name, data.source_config.get("schema"))
+            if columns is not None:
+                cached_schema = {"columns": columns}
+                logger.info(f"[SyncJob] Cached schema for source table {source_table_name}: {len(columns)} columns")
             if not cached_schema:
-                logger.warning(f"[SyncJob] Source table {source_table_name} not found in explorer results")
+                logger.warning(f"[SyncJob] Source table {source_table_name} not found in source")
     except Exception as e:
         logger.warning(f"[SyncJob] Failed to get source table schema: {e}")
         # Continue without schema - can be updated later
@@ -122,7 +116,8 @@ def create_sync_job(
         source_config=data.source_config,
         target_table=data.target_table,
         sync_mode=data.sync_mode,
-        schedule_cron=data.schedule_cron,
+        cursor_column=data.cursor_column,
+        schedule_cron=schedule_cron,
         is_enabled=data.is_enabled,
         cached_schema=cached_schema,
     )
@@ -157,7 +152,10 @@ def get_sync_job_with_connection(
         source_config=job.source_config,
         target_table=job.target_table,
         sync_mode=job.sync_mode,
+        cursor_column=job.cursor_column,
+        sync_watermark=job.sync_watermark,
         schedule_cron=job.schedule_cron,
+        next_run_at=job.next_run_at,
         is_enabled=job.is_enabled,
         last_run_status=job.last_run_status,
         last_run_at=job.last_run_at,
@@ -202,7 +200,10 @@ def list_sync_jobs_with_connection(
             source_config=job.source_config,
             target_table=job.target_table,
             sync_mode=job.sync_mode,
+            cursor_column=job.cursor_column,
+            sync_watermark=job.sync_watermark,
             schedule_cron=job.schedule_cron,
+            next_run_at=job.next_run_at,
             is_enabled=job.is_enabled,
             last_run_status=job.last_run_status,
             last_run_at=job.last_run_at,
@@ -222,12 +223,35 @@ def update_sync_job(
     job_id: str,
     data: SyncJobDefUpdate
 ) -> Optional[SyncJobDef]:
-    """Update sync job definition."""
+    """
+    Update sync job definition.
+    
+    Raises:
+        ValueError: Invalid schedule_cron
+    """
     job = session.get(SyncJobDef, job_id)
     if not job:
         return None
     
     update_data = data.model_dump(exclude_unset=True)
+    if "schedule_cron" in update_data:
+        update_data["schedule_cron"] = validate_cron(update_data["schedule_cron"]) if update_data["schedule_cron"] else None
+    
+    # A new schedule (or re-enabled job) starts from its next fire time, not from missed ones
+    reschedule = update_data.get("schedule_cron", job.schedule_cron) != job.schedule_cron or (
+        update_data.get("is_enabled") and not job.is_enabled
+    )
+    if reschedule:
+        update_data["next_run_at"] = None
+    
+    # The watermark only holds for the cursor column and target it was read into
+    resync = any(
+        key in update_data and update_data[key] != getattr(job, key)
+        for key in ("cursor_column", "target_table", "source_config")
+    )
+    if resync and "sync_watermark" not in update_data:
+        update_data["sync_watermark"] = None
+    
     for key, value in update_data.items():
         setattr(job, key, value)
     
@@ -255,9 +279,10 @@ def update_job_run_status(
     session: Session,
     job_id: str,
     status: str,
-    rows_synced: Optional[int] = None
+    rows_synced: Optional[int] = None,
+    sync_watermark: Optional[str] = None
 ) -> Optional[SyncJobDef]:
-    """Update job after a run completes."""
+    """Update job after a run completes (and advance its INCREMENTAL watermark)."""
     job = session.get(SyncJobDef, job_id)
     if not job:
         return None
@@ -266,6 +291,8 @@ def update_job_run_status(
     job.last_run_at = datetime.utcnow()
     if rows_synced is not None:
         job.rows_synced = rows_synced
+    if sync_watermark is not None:
+        job.sync_watermark = sync_watermark
     job.updated_at = datetime.utcnow()
     
     session.add(job)
@@ -337,6 +364,10 @@ def list_run_logs_with_job(
             end_time=log.end_time,
             duration_ms=log.duration_ms,
             rows_affected=log.rows_affected,
+            bytes_affected=log.bytes_affected,
+            rows_per_sec=log.rows_per_sec,
+            bytes_per_sec=log.bytes_per_sec,
+            slice_progress=log.slice_progress,
             status=log.status,
             message=log.message,
             triggered_by=log.triggered_by,
@@ -347,14 +378,34 @@ def list_run_logs_with_job(
     return results
 
 
+def update_run_log_progress(
+    session: Session,
+    log_id: str,
+    slice_progress: List[Dict[str, Any]]
+) -> Optional[SyncRunLog]:
+    """Record the rows loaded per extract slice of a running sync."""
+    log = session.get(SyncRunLog, log_id)
+    if not log:
+        return None
+    
+    log.slice_progress = slice_progress
+    log.rows_affected = sum(s.get("rows", 0) for s in slice_progress)
+    session.add(log)
+    session.commit()
+    return log
+
+
 def complete_run_log(
     session: Session,
     log_id: str,
     status: str,
     rows_affected: Optional[int] = None,
-    message: Optional[str] = None
+    message: Optional[str] = None,
+    bytes_affected: Optional[int] = None,
+    rows_per_sec: Optional[float] = None,
+    bytes_per_sec: Optional[float] = None
 ) -> Optional[SyncRunLog]:
-    """Complete a run log entry."""
+    """Complete a run log entry (with the run's throughput, if measured)."""
     log = session.get(SyncRunLog, log_id)
     if not log:
         return None
@@ -363,6 +414,9 @@ def complete_run_log(
     log.duration_ms = int((log.end_time - log.start_time).total_seconds() * 1000)
     log.status = status
     log.rows_affected = rows_affected
+    log.bytes_affected = bytes_affected
+    log.rows_per_sec = rows_per_sec
+    log.bytes_per_sec = bytes_per_sec
     log.message = message
     
     session.add(log)
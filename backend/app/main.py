@@ -2,6 +2,7 @@
 FastAPI application entry point.
 """
 import traceback
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,6 +13,27 @@ from app.api.v3 import router as v3_router
 from app.core.middleware import LoggingMiddleware
 from app.core.logger import logger
 from app.core.config import settings
+from app.core.db import init_pooled_engines, dispose_pooled_engines
+from app.engine.index_scheduler import start_index_scheduler, stop_index_scheduler
+from app.engine.sync_scheduler import start_sync_scheduler, stop_sync_scheduler
+from app.engine.source_pools import dispose_source_pools
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup / shutdown hooks."""
+    try:
+        init_pooled_engines()
+    except Exception as e:
+        logger.warning(f"Failed to initialize pooled engines: {e}")
+    start_index_scheduler()
+    start_sync_scheduler()
+    yield
+    stop_sync_scheduler()
+    stop_index_scheduler()
+    dispose_source_pools()
+    dispose_pooled_engines()
+
 
 app = FastAPI(
     title="MDP Platform API",
@@ -35,6 +57,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware (allow all origins for demo purposes)
@@ -84,6 +84,10 @@ class ObjectMappingDef(SQLModel, table=True):
     source_table_name: str = Field(max_length=100)  # Table in mdp_raw_store
     mapping_spec: Dict[str, Any] = Field(sa_column=Column(JSON))  # React Flow nodes & edges
     status: str = Field(default="DRAFT", max_length=20)  # DRAFT, PUBLISHED, ARCHIVED
+    index_workers: Optional[int] = None  # Concurrent transform workers per indexing job (None = default)
+    index_mode: str = Field(default="FULL", max_length=20)  # FULL, INCREMENTAL
+    watermark_column: Optional[str] = Field(default=None, max_length=100)  # None = _sync_timestamp
+    index_watermark: Optional[str] = Field(default=None, max_length=64)  # Highest watermark indexed so far
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
@@ -118,6 +122,9 @@ class ObjectMappingDefCreate(SQLModel):
     source_connection_id: str = Field(max_length=36)
     source_table_name: str = Field(max_length=100)
     mapping_spec: Dict[str, Any]
+    index_workers: Optional[int] = Field(default=None, ge=1)
+    index_mode: str = Field(default="FULL", max_length=20)
+    watermark_column: Optional[str] = Field(default=None, max_length=100)
 
 
 class ObjectMappingDefUpdate(SQLModel):
@@ -125,6 +132,10 @@ class ObjectMappingDefUpdate(SQLModel):
     source_table_name: Optional[str] = Field(default=None, max_length=100)
     mapping_spec: Optional[Dict[str, Any]] = None
     status: Optional[str] = Field(default=None, max_length=20)
+    index_workers: Optional[int] = Field(default=None, ge=1)
+    index_mode: Optional[str] = Field(default=None, max_length=20)
+    watermark_column: Optional[str] = Field(default=None, max_length=100)
+    index_watermark: Optional[str] = Field(default=None, max_length=64)  # Set to null to force a full pass
 
 
 class ObjectMappingDefRead(SQLModel):
@@ -135,6 +146,10 @@ class ObjectMappingDefRead(SQLModel):
     source_table_name: str
     mapping_spec: Dict[str, Any]
     status: str
+    index_workers: Optional[int] = None
+    index_mode: str = "FULL"
+    watermark_column: Optional[str] = None
+    index_watermark: Optional[str] = None
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
 
@@ -192,6 +207,29 @@ class MappingPreviewRequest(SQLModel):
     source_table_name: str = Field(max_length=100)
     mapping_spec: Dict[str, Any]
     limit: int = Field(default=5, ge=1, le=100)
+    dry_run: bool = False  # Also estimate cost of indexing the whole table
+    sample_size: int = Field(default=1000, ge=1, le=100000)  # Rows sampled by the dry run
+    object_def_id: Optional[str] = Field(default=None, max_length=36)  # Target type (ES / column sizing)
+
+
+class IndexingCostEstimate(SQLModel):
+    """DTO for the dry-run estimate of an indexing job (extrapolated from a sample)."""
+    sample_rows: int
+    total_rows: int
+    failed_sample_rows: int = 0
+    stage_rows_per_sec: Dict[str, float] = {}  # read / transform / es_document
+    bottleneck_stage: Optional[str] = None
+    estimated_duration_seconds: float = 0
+    mysql_row_bytes: float = 0
+    mysql_bytes: int = 0
+    lineage_bytes: int = 0
+    vector_count: int = 0
+    vector_dimension: int = 0
+    vector_bytes: int = 0
+    es_document_bytes: float = 0
+    es_bytes: int = 0
+    total_bytes: int = 0
+    warnings: list[str] = []
 
 
 class MappingPreviewResponse(SQLModel):
@@ -200,6 +238,7 @@ class MappingPreviewResponse(SQLModel):
     data: list[Dict[str, Any]]
     row_count: int
     warnings: Optional[list[str]] = None
+    estimate: Optional[IndexingCostEstimate] = None  # Set for dry runs
 
 
 # ==========================================
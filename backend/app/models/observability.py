@@ -1,6 +1,6 @@
 """
 Observability Models for MDP Platform V3.1
-Tables: sys_index_job_run, sys_index_error_sample
+Tables: sys_index_job_run, sys_index_error_sample, sys_index_job_checkpoint, sys_index_dead_letter
 Purpose: Monitor indexing pipeline health and capture errors
 """
 import uuid
@@ -15,11 +15,19 @@ from sqlmodel import SQLModel, Field, Column, JSON
 # ==========================================
 
 class JobStatus(str, Enum):
+    QUEUED = "QUEUED"               # Waiting in the index job scheduler queue
+    RUNNING = "RUNNING"
     SUCCESS = "SUCCESS"
     PARTIAL_SUCCESS = "PARTIAL_SUCCESS"
     FAILED = "FAILED"
 
 
+class DeadLetterStatus(str, Enum):
+    PENDING = "PENDING"             # Waiting for a replay
+    REPLAYED = "REPLAYED"           # Indexed by a replay
+    RESOLVED = "RESOLVED"           # Indexed cleanly by a later run (nothing to replay)
+
+
 class ErrorCategory(str, Enum):
     SEMANTIC = "SEMANTIC"           # PK collisions, data type mismatch
     AI_INFERENCE = "AI_INFERENCE"   # Model errors, low confidence
@@ -45,6 +53,11 @@ class IndexJobRun(SQLModel, table=True):
     rows_indexed: int = Field(default=0)
     metrics_json: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    owner_id: Optional[str] = Field(default=None, max_length=100)  # Scheduler running the job (host:pid:token)
+    heartbeat_at: Optional[datetime] = None  # Last sign of life of a RUNNING job
+    shard_ranges: Optional[List[Any]] = Field(default=None, sa_column=Column(JSON))  # [[lower, upper], ...] of a sharded run
+    job_kind: str = Field(default="INDEX", max_length=20, sa_column_kwargs={"server_default": "INDEX"})  # INDEX or REPLAY (dead letters)
+    job_params: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))  # REPLAY: {"dead_letter_ids": [...] or null}
 
 
 class IndexErrorSample(SQLModel, table=True):
@@ -60,6 +73,42 @@ class IndexErrorSample(SQLModel, table=True):
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
 
+class IndexJobCheckpoint(SQLModel, table=True):
+    """Per-chunk progress of an indexing job (resume point after a failure)."""
+    __tablename__ = "sys_index_job_checkpoint"
+    
+    job_run_id: str = Field(primary_key=True, max_length=36)
+    shard_index: int = Field(default=0, primary_key=True)  # Key range of a sharded run (0 = unsharded)
+    chunk_seq: int = Field(primary_key=True)  # Read order within the shard, 0-based
+    last_key: Optional[str] = Field(default=None, max_length=255)  # Highest source PK in the chunk
+    row_count: int = Field(default=0)
+    max_watermark: Optional[str] = Field(default=None, max_length=64)
+    watermark_type: Optional[str] = Field(default=None, max_length=16)  # INT / FLOAT / DATETIME / STRING
+    sink_counts: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))  # Sink -> rows written
+    is_committed: bool = Field(default=False)  # Every sink wrote the chunk
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
+class IndexDeadLetter(SQLModel, table=True):
+    """Source row an indexing job could not index, kept for replay."""
+    __tablename__ = "sys_index_dead_letter"
+    
+    id: str = Field(primary_key=True, max_length=36)  # uuid5 of (mapping_id, source_row_id)
+    mapping_id: str = Field(max_length=36, index=True)
+    object_def_id: str = Field(max_length=36)
+    source_table: str = Field(max_length=255)
+    source_row_id: str = Field(max_length=255)
+    job_run_id: Optional[str] = Field(default=None, max_length=36)  # Last run the row failed in
+    stage: str = Field(max_length=20)  # transform, embedding
+    error_category: str = Field(max_length=20)
+    error_message: str = Field(max_length=2000)
+    row_payload: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))  # Raw source row
+    status: str = Field(default=DeadLetterStatus.PENDING.value, max_length=20)
+    attempts: int = Field(default=1)  # Runs the row failed in
+    created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
+
+
 # ==========================================
 # DTOs - Index Job Run
 # ==========================================
@@ -88,6 +137,20 @@ class IndexJobRunRead(SQLModel):
     created_at: Optional[datetime]
 
 
+class IndexJobCheckpointRead(SQLModel):
+    """DTO for reading a job checkpoint."""
+    job_run_id: str
+    shard_index: int = 0
+    chunk_seq: int
+    last_key: Optional[str]
+    row_count: int
+    max_watermark: Optional[str]
+    watermark_type: Optional[str] = None
+    sink_counts: Dict[str, Any]
+    is_committed: bool
+    updated_at: Optional[datetime]
+
+
 # ==========================================
 # DTOs - Index Error Sample
 # ==========================================
@@ -112,6 +175,33 @@ class IndexErrorSampleRead(SQLModel):
     created_at: Optional[datetime]
 
 
+# ==========================================
+# DTOs - Index Dead Letter
+# ==========================================
+
+class IndexDeadLetterRead(SQLModel):
+    """DTO for reading a dead letter entry."""
+    id: str
+    mapping_id: str
+    object_def_id: str
+    source_table: str
+    source_row_id: str
+    job_run_id: Optional[str]
+    stage: str
+    error_category: str
+    error_message: str
+    row_payload: Dict[str, Any]
+    status: str
+    attempts: int
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+class DeadLetterReplayRequest(SQLModel):
+    """DTO for replaying dead letters (all pending entries if ids is omitted)."""
+    ids: Optional[List[str]] = None
+
+
 # ==========================================
 # DTOs - Health Summary
 # ==========================================
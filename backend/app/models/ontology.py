@@ -65,6 +65,7 @@ class ObjectTypeVer(SQLModel, table=True):
     enable_global_search: bool = Field(default=False)
     enable_geo_index: bool = Field(default=False)
     enable_vector_index: bool = Field(default=False)
+    vector_storage: str = Field(default="FLOAT32", max_length=20)  # FLOAT32, FLOAT16, INT8
     cache_ttl_seconds: int = Field(default=0)
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
 
@@ -212,6 +213,7 @@ class ObjectTypeVerCreate(SQLModel):
     enable_global_search: bool = False
     enable_geo_index: bool = False
     enable_vector_index: bool = False
+    vector_storage: str = Field(default="FLOAT32", max_length=20)
     cache_ttl_seconds: int = 0
 
 
@@ -225,6 +227,7 @@ class ObjectTypeVerUpdate(SQLModel):
     enable_global_search: Optional[bool] = None
     enable_geo_index: Optional[bool] = None
     enable_vector_index: Optional[bool] = None
+    vector_storage: Optional[str] = Field(default=None, max_length=20)
     cache_ttl_seconds: Optional[int] = None
 
 
@@ -241,6 +244,7 @@ class ObjectTypeVerRead(SQLModel):
     enable_global_search: bool
     enable_geo_index: bool
     enable_vector_index: bool
+    vector_storage: str = "FLOAT32"
     cache_ttl_seconds: int
     created_at: Optional[datetime]
 
@@ -32,6 +32,7 @@ class PipelineDef(SQLModel, table=True):
     transform_rules: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
     filter_predicate: Optional[str] = None  # SQL WHERE clause
     sync_schedule: Optional[str] = Field(default=None, max_length=50)  # Cron expression
+    next_sync_at: Optional[datetime] = Field(default=None)  # Next scheduled sync (UTC, jitter included)
     media_process_config: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
     is_active: bool = Field(default=True)
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
@@ -91,6 +92,7 @@ class PipelineDefRead(SQLModel):
     transform_rules: Optional[Dict[str, Any]]
     filter_predicate: Optional[str]
     sync_schedule: Optional[str]
+    next_sync_at: Optional[datetime] = None
     media_process_config: Optional[Dict[str, Any]]
     is_active: bool
     created_at: Optional[datetime]
@@ -196,7 +196,10 @@ class SyncJobDef(SQLModel, table=True):
     source_config: Dict[str, Any] = Field(sa_column=Column(JSON))  # {"table": "users"} or {"topic": "events"}
     target_table: str = Field(max_length=100)  # Table name in mdp_raw_store, e.g., raw_conn1_users
     sync_mode: str = Field(default="FULL_OVERWRITE", max_length=50)  # FULL_OVERWRITE, INCREMENTAL
+    cursor_column: Optional[str] = Field(default=None, max_length=100)  # INCREMENTAL cursor (NULL = source primary key)
+    sync_watermark: Optional[str] = Field(default=None, max_length=64)  # Highest cursor value synced so far
     schedule_cron: Optional[str] = Field(default=None, max_length=100)  # e.g., "0 0 * * *"
+    next_run_at: Optional[datetime] = Field(default=None)  # Next scheduled run (UTC, jitter included)
     is_enabled: bool = Field(default=True)
     last_run_status: Optional[str] = Field(default=None, max_length=20)  # SUCCESS, FAILED, RUNNING
     last_run_at: Optional[datetime] = Field(default=None)
@@ -217,6 +220,7 @@ class SyncJobDefCreate(SQLModel):
     source_config: Dict[str, Any]
     target_table: str = Field(max_length=100)
     sync_mode: str = Field(default="FULL_OVERWRITE", max_length=50)
+    cursor_column: Optional[str] = Field(default=None, max_length=100)
     schedule_cron: Optional[str] = Field(default=None, max_length=100)
     is_enabled: bool = True
 
@@ -227,6 +231,8 @@ class SyncJobDefUpdate(SQLModel):
     source_config: Optional[Dict[str, Any]] = None
     target_table: Optional[str] = Field(default=None, max_length=100)
     sync_mode: Optional[str] = Field(default=None, max_length=50)
+    cursor_column: Optional[str] = Field(default=None, max_length=100)
+    sync_watermark: Optional[str] = Field(default=None, max_length=64)  # Set to null to re-sync everything
     schedule_cron: Optional[str] = None
     is_enabled: Optional[bool] = None
 
@@ -239,7 +245,10 @@ class SyncJobDefRead(SQLModel):
     source_config: Dict[str, Any]
     target_table: str
     sync_mode: str
+    cursor_column: Optional[str] = None
+    sync_watermark: Optional[str] = None
     schedule_cron: Optional[str]
+    next_run_at: Optional[datetime] = None
     is_enabled: bool
     last_run_status: Optional[str]
     last_run_at: Optional[datetime]
@@ -284,6 +293,10 @@ class SyncRunLog(SQLModel, table=True):
     end_time: Optional[datetime] = Field(default=None)
     duration_ms: Optional[int] = Field(default=None)
     rows_affected: Optional[int] = Field(default=None)
+    bytes_affected: Optional[int] = Field(default=None)  # Bytes loaded (Arrow buffer size)
+    rows_per_sec: Optional[float] = Field(default=None)  # Extract + load throughput
+    bytes_per_sec: Optional[float] = Field(default=None)
+    slice_progress: Optional[List[Dict[str, Any]]] = Field(default=None, sa_column=Column(JSON))  # Rows loaded per extract slice
     status: str = Field(default="RUNNING", max_length=20)  # RUNNING, SUCCESS, FAILED
     message: Optional[str] = Field(default=None)  # Error trace or success summary
     triggered_by: str = Field(default="MANUAL", max_length=50)  # MANUAL, SCHEDULE, API
@@ -307,6 +320,10 @@ class SyncRunLogRead(SQLModel):
     end_time: Optional[datetime]
     duration_ms: Optional[int]
     rows_affected: Optional[int]
+    bytes_affected: Optional[int] = None
+    rows_per_sec: Optional[float] = None
+    bytes_per_sec: Optional[float] = None
+    slice_progress: Optional[List[Dict[str, Any]]] = None
     status: str
     message: Optional[str]
     triggered_by: str
@@ -318,6 +335,27 @@ class SyncRunLogWithJob(SyncRunLogRead):
     connection_name: Optional[str] = None
 
 
+# ==========================================
+# ORM Models - Scheduler Lock
+# ==========================================
+
+class SchedulerLock(SQLModel, table=True):
+    """Leader lease of a scheduler (one row per scheduler).
+    
+    The API replica holding an unexpired lease fires the schedules; it
+    renews the lease on every tick and any replica may take it over once
+    it has expired.
+    
+    Maps to table: sys_scheduler_lock
+    """
+    __tablename__ = "sys_scheduler_lock"
+    
+    name: str = Field(primary_key=True, max_length=50)
+    owner_id: str = Field(max_length=100)  # host:pid:token of the leader
+    acquired_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+
 # ==========================================
 # DTOs - Source Explorer
 # ==========================================
@@ -336,6 +374,8 @@ class SourceExplorerResponse(SQLModel):
     conn_type: str
     tables: List[SourceTableInfo] = []
     schemas: Optional[List[str]] = None
+    total: Optional[int] = None  # Tables matching the search (before skip/limit)
+    cached_at: Optional[datetime] = None  # When the table list was read from the source
     error: Optional[str] = None
 
 
@@ -21,6 +21,7 @@ from app.core.elastic_store import (
     get_object_facets,
     ensure_objects_index,
 )
+from app.engine.object_type_cache import resolve_facet_fields
 
 # Lazy import for vector_store to avoid startup errors if chromadb is not installed
 _search_vectors = None
@@ -279,24 +280,24 @@ def get_available_facets(
     # Get standard facets
     field_names = ["object_type"]
     
-    # TODO: Get dynamic facet fields from database based on is_filterable flag
-    # For now, use some common fields
-    common_facets = [
-        "properties.status_kwd",
-        "properties.type_kwd",
-        "properties.classification_kwd",
-    ]
-    field_names.extend(common_facets)
+    # Filterable properties of the requested object types (cached metadata)
+    property_facets = resolve_facet_fields(object_types)
+    if not property_facets:
+        # No metadata available, fall back to some common fields
+        property_facets = {
+            "properties.status_kwd": "status",
+            "properties.type_kwd": "type",
+            "properties.classification_kwd": "classification",
+        }
+    field_names.extend(property_facets)
     
     # Query ES for facet values
     facet_data = get_object_facets(field_names)
     
     facets = []
     for field, buckets in facet_data.items():
-        display_name = field
-        if field.startswith("properties.") and field.endswith("_kwd"):
-            display_name = field[11:-4]
-        elif field == "object_type":
+        display_name = property_facets.get(field, field)
+        if field == "object_type":
             display_name = "对象类型"
         
         facets.append(Facet(
@@ -0,0 +1,23 @@
+-- =============================================
+-- Migration: Incremental Indexing
+-- MDP Platform V3.1 - Multimodal Mapping Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Index only source rows changed since the last run.
+--   index_mode:       FULL (every row) or INCREMENTAL (rows above the watermark)
+--   watermark_column: Source column compared against the watermark (NULL = _sync_timestamp)
+--   index_watermark:  Highest watermark value indexed so far
+-- Instance IDs are reused via ctx_object_instance_lineage (source_table, source_row_id).
+-- =============================================
+
+ALTER TABLE ctx_object_mapping_def
+ADD COLUMN index_mode VARCHAR(20) NOT NULL DEFAULT 'FULL' COMMENT '索引模式: FULL, INCREMENTAL';
+
+ALTER TABLE ctx_object_mapping_def
+ADD COLUMN watermark_column VARCHAR(100) DEFAULT NULL COMMENT '增量水位列 (NULL=_sync_timestamp)';
+
+ALTER TABLE ctx_object_mapping_def
+ADD COLUMN index_watermark VARCHAR(64) DEFAULT NULL COMMENT '已索引的最高水位值';
+
+-- Stable instance ID lookup per object type
+CREATE INDEX idx_lineage_object_source ON ctx_object_instance_lineage (object_def_id, source_table, source_row_id);
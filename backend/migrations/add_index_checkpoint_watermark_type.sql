@@ -0,0 +1,12 @@
+-- =============================================
+-- Migration: Index Checkpoint Watermark Type
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Checkpoint watermarks are compared as typed values on resume,
+--          so integer watermark columns do not go backwards ("9" > "10").
+--          NULL (rows saved before): read as a number when they parse as one.
+-- =============================================
+
+ALTER TABLE sys_index_job_checkpoint
+ADD COLUMN watermark_type VARCHAR(16) DEFAULT NULL COMMENT '水位值类型 (INT/FLOAT/DATETIME/STRING)';
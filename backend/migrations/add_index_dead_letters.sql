@@ -0,0 +1,36 @@
+-- =============================================
+-- Migration: Index Dead Letters
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Keep every source row an indexing job could not index (failed
+--          transform or embedding) with its raw payload, so it can be
+--          replayed through the mapping once the cause is fixed
+--          (POST /health/mappings/{mapping_id}/dead-letters/replay).
+-- =============================================
+
+-- =============================================
+-- Table: sys_index_dead_letter (索引死信行)
+-- 每个映射的每个源行一条：原始行数据、失败阶段与错误
+-- =============================================
+CREATE TABLE IF NOT EXISTS sys_index_dead_letter (
+    id VARCHAR(36) NOT NULL COMMENT '死信ID (映射ID+源行ID 的 uuid5)',
+    mapping_id VARCHAR(36) NOT NULL COMMENT '映射ID',
+    object_def_id VARCHAR(36) NOT NULL COMMENT '对象类型ID',
+    source_table VARCHAR(255) NOT NULL COMMENT '源表',
+    source_row_id VARCHAR(255) NOT NULL COMMENT '源行主键',
+    job_run_id VARCHAR(36) DEFAULT NULL COMMENT '最近一次失败的作业运行ID',
+    stage VARCHAR(20) NOT NULL COMMENT '失败阶段: transform, embedding',
+    error_category VARCHAR(20) NOT NULL COMMENT '错误类别',
+    error_message VARCHAR(2000) NOT NULL COMMENT '错误信息',
+    row_payload JSON COMMENT '原始源行数据',
+    status VARCHAR(20) NOT NULL DEFAULT 'PENDING' COMMENT '状态: PENDING, REPLAYED',
+    attempts INT NOT NULL DEFAULT 1 COMMENT '失败次数',
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (id),
+    INDEX idx_dead_letter_mapping_status (mapping_id, status, created_at),
+    INDEX idx_dead_letter_job_run (job_run_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='索引死信队列 - 失败行重放';
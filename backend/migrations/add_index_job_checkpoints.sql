@@ -0,0 +1,27 @@
+-- =============================================
+-- Migration: Index Job Checkpoints
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Per-chunk progress of indexing jobs, so a failed or interrupted
+--          run resumes after its last fully committed chunk
+--          (POST /health/jobs/{run_id}/resume).
+-- =============================================
+
+-- =============================================
+-- Table: sys_index_job_checkpoint (作业分块检查点)
+-- 每个分块一行：最大主键、各写入端提交标记
+-- =============================================
+CREATE TABLE IF NOT EXISTS sys_index_job_checkpoint (
+    job_run_id VARCHAR(36) NOT NULL COMMENT '作业运行ID',
+    chunk_seq INT NOT NULL COMMENT '分块序号 (读取顺序, 从0开始)',
+    last_key VARCHAR(255) DEFAULT NULL COMMENT '分块内最大源主键 (断点续跑起点)',
+    row_count INT NOT NULL DEFAULT 0 COMMENT '分块源行数',
+    max_watermark VARCHAR(64) DEFAULT NULL COMMENT '分块内最大水位值',
+    sink_counts JSON COMMENT '各写入端写入行数 (提交标记)',
+    is_committed TINYINT(1) NOT NULL DEFAULT 0 COMMENT '所有写入端均已提交',
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (job_run_id, chunk_seq)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='索引作业分块检查点 - 断点续跑';
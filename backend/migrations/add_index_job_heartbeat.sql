@@ -0,0 +1,15 @@
+-- =============================================
+-- Migration: Index Job Heartbeat
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Several API replicas may run the index job scheduler.
+--   owner_id / heartbeat_at: Scheduler running a job and its last heartbeat;
+--                            only RUNNING jobs whose heartbeat is stale are requeued
+--   sys_scheduler_lock:      Lease 'index_scheduler' (created by add_sync_scheduler.sql),
+--                            only its holder claims queued jobs
+-- =============================================
+
+ALTER TABLE sys_index_job_run
+ADD COLUMN owner_id VARCHAR(100) DEFAULT NULL COMMENT '运行作业的调度器 (host:pid:token)',
+ADD COLUMN heartbeat_at DATETIME DEFAULT NULL COMMENT '运行中作业的最近心跳时间 (UTC)';
@@ -0,0 +1,16 @@
+-- =============================================
+-- Migration: Index Job Scheduler
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: sys_index_job_run doubles as the persistent indexing job queue.
+--          New statuses: QUEUED (waiting), RUNNING (claimed by the scheduler).
+--          Each mapping can set its own transform worker count.
+-- =============================================
+
+-- Per-mapping transform worker count (NULL = INDEXING_TRANSFORM_WORKERS)
+ALTER TABLE ctx_object_mapping_def
+ADD COLUMN index_workers INT DEFAULT NULL COMMENT '索引作业并发转换线程数 (NULL=默认)';
+
+-- Queue lookups: queued/running jobs per mapping
+CREATE INDEX idx_mapping_status ON sys_index_job_run (mapping_id, status);
@@ -0,0 +1,15 @@
+-- =============================================
+-- Migration: Index Replay Jobs
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Dead letter replays (POST /health/mappings/{id}/dead-letters/replay)
+--          are queued on the index job scheduler instead of running as API
+--          background tasks, so they share its per-mapping dedupe and job limit.
+--   job_kind:   INDEX (index the source table) or REPLAY (replay dead letters)
+--   job_params: REPLAY: {"dead_letter_ids": [...]} (null = every pending entry)
+-- =============================================
+
+ALTER TABLE sys_index_job_run
+ADD COLUMN job_kind VARCHAR(20) NOT NULL DEFAULT 'INDEX' COMMENT '作业类型 (INDEX=索引, REPLAY=死信重放)',
+ADD COLUMN job_params JSON DEFAULT NULL COMMENT '作业参数 (REPLAY: 死信ID列表)';
@@ -0,0 +1,19 @@
+-- =============================================
+-- Migration: Index Shard Checkpoints
+-- MDP Platform V3.1 - Index Health Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Sharded indexing runs (INDEXING_PROCESS_SHARDS > 1) keep their
+--          checkpoints under the run's own job_run_id, one chunk sequence per
+--          shard, so GET /health/jobs/{run_id}/checkpoints and resume see them.
+--   shard_index:  Key range of a sharded run (0 = unsharded)
+--   shard_ranges: Key ranges a run was split into, reused on resume
+-- =============================================
+
+ALTER TABLE sys_index_job_checkpoint
+ADD COLUMN shard_index INT NOT NULL DEFAULT 0 COMMENT '分片序号 (0=未分片)' AFTER job_run_id,
+DROP PRIMARY KEY,
+ADD PRIMARY KEY (job_run_id, shard_index, chunk_seq);
+
+ALTER TABLE sys_index_job_run
+ADD COLUMN shard_ranges JSON DEFAULT NULL COMMENT '分片主键范围 [[下界, 上界], ...] (续跑时复用)';
@@ -0,0 +1,17 @@
+-- =============================================
+-- Migration: Incremental Sync
+-- MDP Platform V3.1 - Connector Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: INCREMENTAL sync jobs read only source rows changed since the last run.
+--   cursor_column:  Source column compared against the watermark (NULL = source primary key)
+--   sync_watermark: Highest cursor value synced so far (NULL = next run loads everything)
+-- Rows are upserted into mdp_raw_store keyed by the source primary key
+-- (source_config.key_column overrides it, e.g. for custom queries).
+-- =============================================
+
+ALTER TABLE sys_sync_job_def
+ADD COLUMN cursor_column VARCHAR(100) DEFAULT NULL COMMENT '增量游标列 (NULL=源表主键)';
+
+ALTER TABLE sys_sync_job_def
+ADD COLUMN sync_watermark VARCHAR(64) DEFAULT NULL COMMENT '已同步的最高游标值';
@@ -0,0 +1,11 @@
+-- =============================================
+-- Migration: Sync Run Slice Progress
+-- MDP Platform V3.1 - Connector Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: Large source tables are extracted in parallel key-range slices.
+--   slice_progress: [{slice, lower, upper, rows, status[, error]}], updated while the run is in progress
+-- =============================================
+
+ALTER TABLE sys_sync_run_log
+ADD COLUMN slice_progress JSON DEFAULT NULL COMMENT '分片抽取进度 (每个分片的范围/行数/状态)';
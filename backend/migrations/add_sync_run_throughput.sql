@@ -0,0 +1,26 @@
+-- ============================================================
+-- Migration: Add Throughput Metrics to Sync Run Logs
+-- MDP Platform V3.1 - Connector Module
+-- Date: 2026-10-17
+-- ============================================================
+-- Purpose: Record how fast each sync run extracted and loaded its rows
+--          (Arrow batch streaming, see app/engine/arrow_batches.py).
+--
+-- Columns:
+--   bytes_affected: Bytes loaded (Arrow buffer size of the batches)
+--   rows_per_sec:   Rows per second of the extract + load phase
+--   bytes_per_sec:  Bytes per second of the extract + load phase
+-- ============================================================
+
+ALTER TABLE sys_sync_run_log
+ADD COLUMN bytes_affected BIGINT NULL COMMENT '加载字节数 (Arrow 缓冲区大小)',
+ADD COLUMN rows_per_sec DOUBLE NULL COMMENT '抽取与加载吞吐 (行/秒)',
+ADD COLUMN bytes_per_sec DOUBLE NULL COMMENT '抽取与加载吞吐 (字节/秒)';
+
+-- ============================================================
+-- Verification Query
+-- ============================================================
+-- SELECT id, job_id, rows_affected, bytes_affected, rows_per_sec, bytes_per_sec
+-- FROM sys_sync_run_log
+-- ORDER BY start_time DESC
+-- LIMIT 10;
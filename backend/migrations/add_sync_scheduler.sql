@@ -0,0 +1,31 @@
+-- =============================================
+-- Migration: Sync Scheduler
+-- MDP Platform V3.1 - Connector Module
+-- Date: 2026-10-17
+-- =============================================
+-- Purpose: SyncJobDef.schedule_cron and PipelineDef.sync_schedule are fired
+--          by the sync scheduler (app/engine/sync_scheduler.py).
+--   next_run_at / next_sync_at: Next fire time (UTC, jitter included; NULL = not planned yet)
+--   sys_scheduler_lock:         Leader lease, only its holder fires schedules
+-- Scheduled runs are logged with triggered_by = 'SCHEDULE'.
+-- =============================================
+
+ALTER TABLE sys_sync_job_def
+ADD COLUMN next_run_at DATETIME DEFAULT NULL COMMENT '下次调度运行时间 (UTC)';
+
+ALTER TABLE sys_pipeline_def
+ADD COLUMN next_sync_at DATETIME DEFAULT NULL COMMENT '下次调度同步时间 (UTC)';
+
+-- Due schedules are looked up by next fire time
+CREATE INDEX idx_sync_job_next_run ON sys_sync_job_def (next_run_at);
+
+-- Running syncs per job / connection (concurrency limits)
+CREATE INDEX idx_sync_run_status ON sys_sync_run_log (status, job_id);
+
+CREATE TABLE IF NOT EXISTS sys_scheduler_lock (
+    name VARCHAR(50) PRIMARY KEY COMMENT '调度器名称',
+    owner_id VARCHAR(100) NOT NULL COMMENT '持有租约的副本 (host:pid:token)',
+    acquired_at DATETIME NOT NULL COMMENT '获得租约时间',
+    expires_at DATETIME NOT NULL COMMENT '租约到期时间'
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+COMMENT='调度器主节点租约表 - 仅持有者触发定时任务';
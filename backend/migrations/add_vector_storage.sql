@@ -0,0 +1,26 @@
+-- ============================================================
+-- Migration: Add Vector Storage Option to Object Type Versions
+-- MDP Platform V3.1 - Vector Search Module
+-- Date: 2026-10-17
+-- ============================================================
+-- Purpose: Choose per object type how its vectors are stored.
+--
+-- Options:
+--   FLOAT32: ChromaDB collection, full precision (default)
+--   FLOAT16: Half precision codes, re-scored at full precision
+--   INT8:    Scalar quantized codes, re-scored at full precision
+--
+-- Switching an existing object type converts its collection on the
+-- next indexing run (see app/core/quantized_vectors.py).
+-- ============================================================
+
+ALTER TABLE meta_object_type_ver
+ADD COLUMN vector_storage VARCHAR(20) NOT NULL DEFAULT 'FLOAT32'
+    COMMENT '向量存储精度 (FLOAT32 / FLOAT16 / INT8)';
+
+-- ============================================================
+-- Verification Query
+-- ============================================================
+-- SELECT id, def_id, version_number, vector_storage
+-- FROM meta_object_type_ver
+-- LIMIT 10;
@@ -0,0 +1,72 @@
+"""
+Run migration script for index job checkpoints.
+MDP Platform V3.1 - Index Health Module
+
+Creates sys_index_job_checkpoint (per-chunk progress of indexing jobs).
+Safe to run more than once.
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+
+# MySQL errors meaning the change is already applied
+ALREADY_APPLIED = (1060, 1061)  # Duplicate column name, duplicate key name
+
+
+def _split_statements(sql_content: str):
+    statements = []
+    current_statement = []
+    for line in sql_content.split('\n'):
+        stripped = line.strip()
+        if not stripped or stripped.startswith('--'):
+            continue
+        current_statement.append(line)
+        if stripped.endswith(';'):
+            statements.append('\n'.join(current_statement))
+            current_statement = []
+    return statements
+
+
+def run_migration():
+    """Execute the migration SQL script."""
+    migration_file = Path(__file__).parent / "migrations" / "add_index_job_checkpoints.sql"
+    statements = _split_statements(migration_file.read_text(encoding="utf-8"))
+    
+    print("Connecting to database...")
+    engine = create_engine(settings.database_url)
+    
+    try:
+        with engine.connect() as conn:
+            for i, stmt in enumerate(statements, 1):
+                print(f"Executing statement {i}/{len(statements)}...")
+                try:
+                    conn.execute(text(stmt))
+                    conn.commit()
+                except OperationalError as e:
+                    if e.orig.args[0] in ALREADY_APPLIED:
+                        print(f"  Already applied, skipped")
+                        conn.rollback()
+                    else:
+                        raise
+        
+        print("Migration completed successfully!")
+        return True
+        
+    except Exception as e:
+        print(f"ERROR: Migration failed: {e}")
+        return False
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("MDP Platform - Index Job Checkpoints Migration")
+    print("=" * 50)
+    run_migration()
+    print("\nDone.")
@@ -0,0 +1,106 @@
+"""
+Tests for adaptive batch sizing of indexing jobs.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import json
+import pickle
+
+from app.engine.batch_sizer import AdaptiveBatchSizer, LIMIT_LATENCY, LIMIT_MEMORY
+from app.engine.indexing_worker import MetricsCollector, _metrics_json
+
+
+def _sizer(**kwargs):
+    options = dict(
+        initial_size=1000, min_size=100, max_size=20000,
+        target_latency_ms=1000, memory_limit_bytes=10 * 1024 * 1024,
+    )
+    options.update(kwargs)
+    return AdaptiveBatchSizer(**options)
+
+
+class TestAdaptiveBatchSizer:
+    """自适应批大小测试"""
+
+    def test_fast_narrow_chunks_grow_gradually(self):
+        """快速的窄行批次逐步增大，每次最多翻倍"""
+        sizer = _sizer()
+        sizes = []
+        for _ in range(6):
+            size = sizer.next_size()
+            sizes.append(size)
+            sizer.record_stage("transform", size, size * 0.01)
+            sizer.record_stage("mysql", size, size * 0.02)
+            sizer.record_memory(size, size * 100)
+
+        assert sizes[:4] == [1000, 2000, 4000, 8000]
+        assert sizer.next_size() == 20000
+        assert sizer.summary()["limited_by"] == LIMIT_LATENCY
+
+    def test_slowest_stage_sets_latency_target(self):
+        """最慢阶段决定批大小"""
+        sizer = _sizer()
+        sizer.next_size()
+        sizer.record_stage("transform", 1000, 100)
+        sizer.record_stage("chroma", 1000, 4000)
+
+        assert sizer.next_size() == 250
+
+    def test_memory_ceiling_shrinks_at_once(self):
+        """宽行（大向量）批次立即缩小到内存上限以内"""
+        sizer = _sizer()
+        sizer.next_size()
+        sizer.record_stage("transform", 1000, 10)
+        sizer.record_memory(1000, 1000 * 40 * 1024)
+
+        assert sizer.next_size() == 256
+        assert sizer.summary()["limited_by"] == LIMIT_MEMORY
+
+    def test_sizes_stay_within_bounds(self):
+        """批大小不超出配置上下限"""
+        sizer = _sizer()
+        sizer.next_size()
+        sizer.record_stage("es", 1000, 1_000_000)
+
+        assert sizer.next_size() == 100
+
+    def test_small_changes_are_ignored(self):
+        """变化小于容差时保持原大小"""
+        sizer = _sizer()
+        sizer.next_size()
+        sizer.record_stage("mysql", 1000, 950)
+
+        assert sizer.next_size() == 1000
+        assert sizer.summary()["adjustments"] == 0
+
+    def test_fixed_size(self):
+        """上下限相同时批大小固定"""
+        sizer = AdaptiveBatchSizer(500, 500, 500, 0, 0)
+        sizer.next_size()
+        sizer.record_stage("mysql", 500, 100000)
+
+        assert sizer.next_size() == 500
+        assert sizer.summary()["adaptive"] is False
+
+    def test_summary_in_job_metrics(self):
+        """选择的批大小写入作业指标"""
+        sizer = _sizer()
+        sizer.next_size()
+        shard = MetricsCollector()
+        shard.record_batch_sizing(sizer.summary())
+
+        total = MetricsCollector()
+        total.merge(pickle.loads(pickle.dumps(shard)))
+
+        assert total.to_dict()["batch_sizing"][0]["sizes"] == [1000]
+
+    def test_job_metrics_serialize_as_json(self):
+        """含批大小汇总的作业指标可序列化为合法 JSON"""
+        sizer = _sizer()
+        sizer.next_size()
+        metrics = MetricsCollector()
+        metrics.record_batch_sizing({**sizer.summary(), "key_range": [None, None]})
+
+        restored = json.loads(_metrics_json(metrics.to_dict()))
+
+        assert restored["batch_sizing"][0]["adaptive"] is True
+        assert restored["batch_sizing"][0]["key_range"] == [None, None]
@@ -0,0 +1,110 @@
+"""
+Tests for idempotent bulk writes.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, event, inspect as sa_inspect, text
+
+from app.engine import bulk_writer
+from app.engine.bulk_writer import (
+    coerce_to_sql_types,
+    ensure_keyed_table,
+    property_sql_types,
+    upsert_dataframe,
+)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_writer, "_keyed_tables", set())
+    monkeypatch.setattr(bulk_writer, "_table_columns", {})
+    engine = create_engine(f"sqlite:///{tmp_path / 'store.db'}")
+    yield engine
+    engine.dispose()
+
+
+class TestBulkWriter:
+    """幂等批量写入测试"""
+
+    def test_creates_keyed_table(self, engine):
+        """新表以键列为主键创建"""
+        df = pd.DataFrame({"id": ["a"], "name": ["x"]})
+        assert ensure_keyed_table(engine, "obj", df, "id") is True
+        assert sa_inspect(engine).get_pk_constraint("obj")["constrained_columns"] == ["id"]
+
+    def test_rewrite_does_not_duplicate(self, engine):
+        """重复写入同一批数据不会产生重复行，并更新已有行"""
+        df = pd.DataFrame({"id": ["a", "b"], "name": ["x", "y"]})
+        upsert_dataframe(engine, "obj", df, "id")
+        upsert_dataframe(engine, "obj", df, "id")
+        upsert_dataframe(engine, "obj", pd.DataFrame({"id": ["b", "c"], "name": ["y2", "z"]}), "id")
+
+        rows = pd.read_sql("SELECT * FROM obj ORDER BY id", engine)
+        assert rows["id"].tolist() == ["a", "b", "c"]
+        assert rows["name"].tolist() == ["x", "y2", "z"]
+
+    def test_legacy_table_without_key_replaces_rows(self, engine):
+        """无主键的旧表退化为先删后插"""
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE legacy (id TEXT, name TEXT)"))
+            conn.execute(text("INSERT INTO legacy VALUES ('a', 'old')"))
+
+        upsert_dataframe(engine, "legacy", pd.DataFrame({"id": ["a", "b"], "name": ["new", "y"]}), "id")
+        upsert_dataframe(engine, "legacy", pd.DataFrame({"id": ["a", "b"], "name": ["new", "y"]}), "id")
+
+        rows = pd.read_sql("SELECT * FROM legacy ORDER BY id", engine)
+        assert rows["name"].tolist() == ["new", "y"]
+
+
+class TestTypedWrites:
+    """按属性数据类型写入测试"""
+
+    def test_ddl_uses_property_types(self, engine):
+        """建表类型来自属性数据类型而非 pandas 推断"""
+        dtype = property_sql_types({"age": "INT", "score": "DOUBLE", "active": "BOOLEAN", "born": "DATE", "tags": "JSON"})
+        df = pd.DataFrame({"id": ["a"], "age": ["42"], "score": ["1.5"], "active": ["true"], "born": ["2020-01-02"], "tags": [["x"]]})
+
+        upsert_dataframe(engine, "obj", df, "id", dtype=dtype)
+
+        columns = {c["name"]: str(c["type"]) for c in sa_inspect(engine).get_columns("obj")}
+        assert columns["age"] == "BIGINT"
+        assert columns["score"].startswith("FLOAT")
+        assert columns["active"] == "BOOLEAN"
+        assert columns["born"] == "DATE"
+        assert columns["tags"] == "TEXT"
+        row = pd.read_sql("SELECT * FROM obj", engine).iloc[0]
+        assert row["age"] == 42 and row["score"] == 1.5 and row["tags"] == '["x"]'
+
+    def test_unconvertible_values_become_null(self):
+        """无法转换的值写为 NULL"""
+        dtype = property_sql_types({"age": "INTEGER", "active": "BOOLEAN"})
+        df = pd.DataFrame({"age": ["7", "abc", None, 2.5], "active": ["yes", "maybe", 0, True]})
+
+        out = coerce_to_sql_types(df, dtype)
+
+        assert out["age"].tolist()[0] == 7 and out["age"].isna().tolist() == [False, True, True, True]
+        assert out["active"].tolist() == [True, None, False, True]
+
+    def test_new_columns_are_added(self, engine):
+        """映射新增属性时自动补列"""
+        upsert_dataframe(engine, "obj", pd.DataFrame({"id": ["a"], "name": ["x"]}), "id")
+        upsert_dataframe(
+            engine, "obj", pd.DataFrame({"id": ["b"], "name": ["y"], "age": [3]}), "id",
+            dtype=property_sql_types({"age": "INT"})
+        )
+
+        rows = pd.read_sql("SELECT * FROM obj ORDER BY id", engine)
+        assert rows["age"].isna().tolist() == [True, False]
+
+    def test_rows_per_statement(self, engine):
+        """按每条语句行数分批写入"""
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: statements.append(stmt))
+        df = pd.DataFrame({"id": [str(i) for i in range(25)], "name": "x"})
+
+        upsert_dataframe(engine, "obj", df, "id", rows_per_statement=10)
+
+        inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+        assert len(inserts) == 3
+        assert pd.read_sql("SELECT COUNT(*) AS n FROM obj", engine)["n"][0] == 25
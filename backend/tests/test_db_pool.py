@@ -0,0 +1,32 @@
+"""
+Tests for the pooled engine registry.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+from sqlalchemy import text
+
+from app.core.db import get_pooled_engine, dispose_pooled_engines
+
+
+class TestPooledEngines:
+    """连接池注册表测试"""
+
+    def test_same_url_shares_engine(self, tmp_path):
+        """相同 URL 复用同一个引擎"""
+        url_a = f"sqlite:///{tmp_path / 'a.db'}"
+        url_b = f"sqlite:///{tmp_path / 'b.db'}"
+        try:
+            engine_a = get_pooled_engine(url_a)
+            assert get_pooled_engine(url_a) is engine_a
+            assert get_pooled_engine(url_b) is not engine_a
+            with engine_a.connect() as conn:
+                assert conn.execute(text("SELECT 1")).scalar() == 1
+        finally:
+            dispose_pooled_engines()
+
+    def test_dispose_clears_registry(self, tmp_path):
+        """关闭后重新创建引擎"""
+        url = f"sqlite:///{tmp_path / 'c.db'}"
+        first = get_pooled_engine(url)
+        dispose_pooled_engines()
+        assert get_pooled_engine(url) is not first
+        dispose_pooled_engines()
@@ -0,0 +1,88 @@
+"""
+Tests for batch embedding encoders.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import numpy as np
+import pytest
+
+from app.core.embedding import (
+    EMBEDDING_TEXT,
+    EmbeddingEncoder,
+    HashEncoder,
+    encode_batched,
+    get_encoder,
+    set_encoder,
+)
+
+
+class _CountingEncoder(HashEncoder):
+    """HashEncoder that records the size of each batch."""
+
+    def __init__(self, dimension):
+        super().__init__(dimension)
+        self.batches = []
+
+    def encode(self, inputs):
+        self.batches.append(len(inputs))
+        return super().encode(inputs)
+
+
+class TestHashEncoder:
+    """哈希编码器测试"""
+
+    def test_deterministic_unit_vectors(self):
+        """相同输入得到相同的单位向量"""
+        matrix, valid = HashEncoder(16).encode(["a", "b", "a"])
+        assert matrix.dtype == np.float32
+        assert valid.all()
+        assert np.allclose(matrix[0], matrix[2])
+        assert not np.allclose(matrix[0], matrix[1])
+        assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0, atol=1e-5)
+
+    def test_blank_inputs_invalid(self):
+        """空输入标记为无效且为零向量"""
+        matrix, valid = HashEncoder(8).encode([None, "", float("nan"), "x"])
+        assert valid.tolist() == [False, False, False, True]
+        assert not matrix[:3].any()
+
+
+class TestEncodeBatched:
+    """微批编码测试"""
+
+    def test_micro_batches_fill_one_matrix(self):
+        """按批次调用编码器并写入同一连续矩阵"""
+        encoder = _CountingEncoder(8)
+        inputs = [f"row-{i}" for i in range(10)]
+
+        matrix, valid = encode_batched(encoder, inputs, batch_size=4)
+
+        assert encoder.batches == [4, 4, 2]
+        assert matrix.shape == (10, 8)
+        assert matrix.flags["C_CONTIGUOUS"]
+        assert valid.all()
+        assert np.allclose(matrix, HashEncoder(8).encode(inputs)[0])
+
+    def test_empty_input(self):
+        """空输入返回空矩阵"""
+        matrix, valid = encode_batched(HashEncoder(8), [], batch_size=4)
+        assert matrix.shape == (0, 8)
+        assert len(valid) == 0
+
+
+class TestEncoderRegistry:
+    """编码器注册表测试"""
+
+    def test_override_and_reset(self):
+        """可以覆盖并重置编码器"""
+        custom = HashEncoder(4)
+        set_encoder(EMBEDDING_TEXT, custom)
+        try:
+            assert get_encoder(EMBEDDING_TEXT) is custom
+        finally:
+            set_encoder(EMBEDDING_TEXT, None)
+        assert get_encoder(EMBEDDING_TEXT) is not custom
+
+    def test_base_encoder_not_implemented(self):
+        """基类不实现编码"""
+        with pytest.raises(NotImplementedError):
+            EmbeddingEncoder(4).encode(["x"])
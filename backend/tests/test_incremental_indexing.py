@@ -0,0 +1,201 @@
+"""
+Tests for incremental indexing (stable instance IDs and watermarks).
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import json
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from app.engine import indexing_worker
+from app.engine.indexing_worker import (
+    MetricsCollector,
+    ErrorSampler,
+    _build_source_filter,
+    _format_watermark,
+    _metrics_json,
+    _prepare_batch,
+    make_instance_id,
+)
+from app.engine.indexing_pipeline import OUTCOME_PARKED, OUTCOME_REPLAYED, OUTCOME_SUCCESS, SinkOutcome
+from app.engine.mapping_plan import compile_mapping_spec
+
+
+def _plan():
+    return compile_mapping_spec({
+        "nodes": [
+            {"id": "s1", "type": "source", "data": {"column": "name"}},
+            {"id": "t1", "type": "transform", "data": {"function": "text_embedding"}},
+            {"id": "p1", "type": "target", "data": {"property": "vec"}},
+            {"id": "p2", "type": "target", "data": {"property": "name"}},
+        ],
+        "edges": [
+            {"source": "s1", "target": "t1"},
+            {"source": "t1", "target": "p1"},
+            {"source": "s1", "target": "p2"},
+        ],
+    })
+
+
+class TestStableInstanceIds:
+    """稳定实例ID测试"""
+
+    def test_known_rows_keep_their_instance_id(self, monkeypatch):
+        """已索引的源行复用原实例ID，新行生成新ID"""
+        monkeypatch.setattr(
+            indexing_worker, "_lookup_instance_ids",
+            lambda object_def_id, source_table, row_ids: {"1": "inst-1"},
+        )
+        df = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "b", None]})
+
+        batch = _prepare_batch(df, _plan(), "obj-1", "m1", "src", MetricsCollector(), ErrorSampler())
+
+        ids = batch.scalar_df["id"].tolist()
+        assert ids[0] == "inst-1"
+        assert len(set(ids)) == 3
+        assert batch.existing_ids == ["inst-1"]
+        assert batch.lineage_df["instance_id"].tolist() == ids
+        # Row 3 has no vector, but it is new, so nothing to clean up
+        assert batch.stale_vector_ids == []
+
+    def test_existing_row_without_vector_is_stale(self, monkeypatch):
+        """已有实例失去向量时需要删除旧向量"""
+        monkeypatch.setattr(
+            indexing_worker, "_lookup_instance_ids",
+            lambda object_def_id, source_table, row_ids: {"3": "inst-3"},
+        )
+        df = pd.DataFrame({"id": [1, 3], "name": ["a", None]})
+
+        batch = _prepare_batch(df, _plan(), "obj-1", "m1", "src", MetricsCollector(), ErrorSampler())
+
+        assert batch.stale_vector_ids == ["inst-3"]
+        assert batch.vector_matrix.shape == (1, len(batch.vector_matrix[0]))
+
+    def test_new_rows_get_deterministic_ids(self, monkeypatch):
+        """新行ID由对象类型和源主键确定，重试时保持一致"""
+        monkeypatch.setattr(indexing_worker, "_lookup_instance_ids", lambda *args: {})
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", "b"]})
+
+        first = _prepare_batch(df, _plan(), "obj-1", "m1", "src", MetricsCollector(), ErrorSampler())
+        retry = _prepare_batch(df, _plan(), "obj-1", "m1", "src", MetricsCollector(), ErrorSampler())
+
+        assert first.scalar_df["id"].tolist() == [make_instance_id("obj-1", "1"), make_instance_id("obj-1", "2")]
+        assert retry.scalar_df["id"].tolist() == first.scalar_df["id"].tolist()
+        assert retry.lineage_df["id"].tolist() == first.lineage_df["id"].tolist()
+        assert make_instance_id("obj-2", "1") != make_instance_id("obj-1", "1")
+
+    def test_duplicate_source_keys_keep_last_row(self, monkeypatch):
+        """同一批次内重复主键只保留最后一行并记录冲突"""
+        monkeypatch.setattr(indexing_worker, "_lookup_instance_ids", lambda *args: {})
+        df = pd.DataFrame({"code": ["x", "y", "x"], "name": ["old", "b", "new"]})
+        metrics = MetricsCollector()
+        sampler = ErrorSampler()
+
+        batch = _prepare_batch(df, _plan(), "obj-1", "m1", "src", metrics, sampler, pk_column="code")
+
+        assert batch.scalar_df["name"].tolist() == ["b", "new"]
+        assert batch.scalar_df["id"].is_unique
+        assert metrics.pk_collisions == 1
+        assert sampler.get_samples()[0]["error_category"] == "SEMANTIC"
+
+
+class TestWatermark:
+    """水位线测试"""
+
+    def test_full_read_has_no_filter(self):
+        """全量模式读取所有行"""
+        assert _build_source_filter("_sync_timestamp", None) == (None, None)
+
+    def test_incremental_read_filters_from_watermark(self):
+        """增量模式读取水位线及以上的行"""
+        where, params = _build_source_filter("_sync_timestamp", "2026-01-01 00:00:00.000000")
+        assert where == "`_sync_timestamp` >= :since"
+        assert params == {"since": "2026-01-01 00:00:00.000000"}
+
+    def test_batch_synced_in_the_watermark_second_is_read(self):
+        """与水位线同一秒提交的同步批次在下次增量索引中被读取"""
+        engine = create_engine("sqlite://")
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE src (id INTEGER PRIMARY KEY, _sync_timestamp TEXT)"))
+            conn.execute(text("INSERT INTO src VALUES (1, '2026-01-01 00:00:00.000000'), (2, '2026-01-01 00:00:05.000000')"))
+        watermark = "2026-01-01 00:00:05.000000"  # Highest value seen by the last run
+
+        # A second sync batch lands in the same second
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO src VALUES (3, '2026-01-01 00:00:05.000000')"))
+        where, params = _build_source_filter("_sync_timestamp", watermark)
+        with engine.connect() as conn:
+            ids = [row[0] for row in conn.execute(text(f"SELECT id FROM src WHERE {where} ORDER BY id"), params)]
+
+        assert ids == [2, 3]
+
+    def test_format_watermark(self):
+        """水位值格式化为可比较的字符串"""
+        assert _format_watermark(pd.Timestamp("2026-01-02 03:04:05.5")) == "2026-01-02 03:04:05.500000"
+        assert _format_watermark(datetime(2026, 1, 2)) == "2026-01-02 00:00:00.000000"
+        assert _format_watermark(np.int64(42)) == "42"
+
+
+class TestShardResults:
+    """分片结果汇总测试"""
+
+    def test_metrics_survive_pickling_and_merge(self):
+        """指标可跨进程传递并累加"""
+        shard = MetricsCollector()
+        shard.record_ai_batch(10.0, 4)
+        shard.record_pk_collision()
+        shard.record_pipeline_timing({"transform": 5.0}, 100.0)
+
+        total = MetricsCollector()
+        total.record_pipeline_timing({"transform": 1.0}, 50.0)
+        total.merge(pickle.loads(pickle.dumps(shard)))
+        total.record_pk_collision()
+
+        assert total.ai_inference_count == 4
+        assert total.pk_collisions == 2
+        assert total.stage_busy_ms == {"transform": 6.0}
+        assert total.wall_ms == 100.0
+
+    def test_sink_outcomes_merge(self):
+        """写入端结果按写入端统计，失败批次留样"""
+        shard = MetricsCollector()
+        shard.record_sink_outcome(0, SinkOutcome("es", OUTCOME_SUCCESS, 2, 12.0, count=10))
+        shard.record_sink_outcome(1, SinkOutcome("es", OUTCOME_PARKED, 3, 30.0, error="timeout"))
+
+        total = MetricsCollector()
+        total.record_sink_outcome(1, SinkOutcome("es", OUTCOME_REPLAYED, 1, 5.0, count=10))
+        total.merge(pickle.loads(pickle.dumps(shard)))
+        outcomes = total.to_dict()["sink_outcomes"]["es"]
+
+        assert outcomes[OUTCOME_SUCCESS] == 1 and outcomes[OUTCOME_PARKED] == 1 and outcomes[OUTCOME_REPLAYED] == 1
+        assert outcomes["attempts"] == 6
+        assert outcomes["max_latency_ms"] == 30.0
+        assert outcomes["retried"] == 1
+        assert [f["chunk_seq"] for f in total.sink_failures] == [1, 0, 1]
+
+    def test_succeeded_sink_outcomes_serialize_as_json(self):
+        """成功（含重试后成功）的写入端结果可序列化为合法 JSON"""
+        metrics = MetricsCollector()
+        metrics.record_sink_outcome(0, SinkOutcome("mysql", OUTCOME_SUCCESS, 1, 8.0, count=10))
+        metrics.record_sink_outcome(1, SinkOutcome("es", OUTCOME_SUCCESS, 2, 12.0, count=10))
+
+        restored = json.loads(_metrics_json(metrics.to_dict()))
+
+        assert restored["sink_outcomes"]["es"]["retried"] == 1
+        assert restored["sink_failures"] == [
+            {"sink": "es", "chunk_seq": 1, "status": OUTCOME_SUCCESS, "attempts": 2, "error": None}
+        ]
+
+    def test_error_samples_merge_up_to_limit(self):
+        """错误样本合并不超过上限"""
+        shard = ErrorSampler()
+        for i in range(3):
+            shard.add_error(str(i), "SEMANTIC", "bad row")
+
+        total = ErrorSampler(max_samples=2)
+        total.merge(pickle.loads(pickle.dumps(shard)))
+
+        assert [s["raw_row_id"] for s in total.get_samples()] == ["0", "1"]
@@ -0,0 +1,177 @@
+"""
+Tests for indexing job checkpoints (resume after failure).
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.engine import index_checkpoint, indexing_worker
+from app.engine.index_checkpoint import (
+    WATERMARK_DATETIME,
+    WATERMARK_INT,
+    CheckpointTracker,
+    resume_point_from,
+    resume_points_by_shard,
+)
+from app.models.observability import IndexJobCheckpoint, IndexJobRun
+
+
+def _checkpoint(seq, committed=True, last_key=None, rows=10, sinks=None, watermark=None, watermark_type=None, shard=0):
+    return {
+        "shard_index": shard,
+        "chunk_seq": seq,
+        "last_key": last_key if last_key is not None else str((seq + 1) * 10),
+        "row_count": rows,
+        "max_watermark": watermark,
+        "watermark_type": watermark_type,
+        "sink_counts": sinks if sinks is not None else {"mysql": rows, "chroma": rows},
+        "is_committed": committed,
+    }
+
+
+class TestResumePoint:
+    """断点续跑位置测试"""
+
+    def test_no_checkpoints_starts_from_beginning(self):
+        """没有检查点时从头开始"""
+        point = resume_point_from([])
+        assert point.next_seq == 0 and point.last_key is None and not point.is_resume
+
+    def test_resumes_after_committed_prefix(self):
+        """从连续已提交分块之后继续，未提交分块重新处理"""
+        checkpoints = [
+            _checkpoint(2, watermark="2026-01-03"),
+            _checkpoint(0, watermark="2026-01-05"),
+            _checkpoint(1, watermark="2026-01-01"),
+            _checkpoint(3, committed=False, sinks={"mysql": 10}),
+            _checkpoint(4),
+        ]
+
+        point = resume_point_from(checkpoints)
+
+        assert point.next_seq == 3
+        assert point.last_key == "30"
+        assert point.rows_done == 30
+        assert point.sink_counts == {"mysql": 30, "chroma": 30}
+        assert point.max_watermark == "2026-01-05"
+
+    def test_watermarks_compare_as_typed_values(self):
+        """整数水位按数值比较，不按字符串比较"""
+        point = resume_point_from([
+            _checkpoint(0, watermark="9", watermark_type=WATERMARK_INT),
+            _checkpoint(1, watermark="10", watermark_type=WATERMARK_INT),
+        ])
+        assert (point.max_watermark, point.watermark_type) == ("10", WATERMARK_INT)
+
+        assert resume_point_from([_checkpoint(0, watermark="9"), _checkpoint(1, watermark="10")]).max_watermark == "10"
+
+        point = resume_point_from([
+            _checkpoint(0, watermark="2026-01-05 00:00:00.000000", watermark_type=WATERMARK_DATETIME),
+            _checkpoint(1, watermark="2026-01-10 00:00:00.000000", watermark_type=WATERMARK_DATETIME),
+        ])
+        assert point.max_watermark == "2026-01-10 00:00:00.000000"
+
+    def test_gap_ends_committed_prefix(self):
+        """序号缺失时停止在缺口之前"""
+        point = resume_point_from([_checkpoint(0), _checkpoint(2)])
+        assert point.next_seq == 1
+
+
+    def test_resume_points_per_shard(self):
+        """分片运行的检查点按分片分别计算续跑位置"""
+        points = resume_points_by_shard([
+            _checkpoint(0, shard=0),
+            _checkpoint(1, shard=0, committed=False),
+            _checkpoint(0, shard=1, last_key="510"),
+            _checkpoint(1, shard=1, last_key="520"),
+        ])
+
+        assert {shard: p.next_seq for shard, p in points.items()} == {0: 1, 1: 2}
+        assert points[1].last_key == "520"
+
+
+class TestCheckpointTracker:
+    """分块提交标记测试"""
+
+    def test_chunk_commits_when_every_sink_wrote_it(self):
+        """所有写入端提交后分块才算提交"""
+        saved = []
+        tracker = CheckpointTracker("job-1", ["mysql", "chroma"], save=lambda c: saved.append(dict(c)))
+
+        tracker.register(0, 10, 10)
+        tracker.commit(0, "mysql", 10)
+        tracker.commit(0, "chroma", 8)
+
+        assert [c["is_committed"] for c in saved] == [False, True]
+        assert saved[-1]["sink_counts"] == {"mysql": 10, "chroma": 8}
+        assert saved[-1]["last_key"] == "10"
+
+    def test_empty_chunk_is_committed(self):
+        """无需写入的分块直接标记为已提交"""
+        saved = []
+        tracker = CheckpointTracker("job-1", ["mysql"], save=saved.append)
+
+        tracker.register(0, None, 5)
+        tracker.complete(0)
+
+        assert saved[0]["is_committed"] is True
+
+    def test_save_failure_does_not_raise(self):
+        """检查点保存失败不影响索引写入"""
+        def broken(checkpoint):
+            raise RuntimeError("table missing")
+
+        tracker = CheckpointTracker("job-1", ["mysql"], save=broken)
+        tracker.register(0, 1, 1)
+        tracker.commit(0, "mysql", 1)
+
+
+class TestShardRanges:
+    """分片主键范围持久化测试"""
+
+    @pytest.fixture
+    def engine(self, tmp_path, monkeypatch):
+        engine = create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+        for model in (IndexJobRun, IndexJobCheckpoint):
+            model.__table__.create(engine)
+        with engine.begin() as conn:
+            for run_id in ("r1", "r2", "r3"):
+                conn.execute(text("""
+                    INSERT INTO sys_index_job_run
+                    (id, mapping_id, object_def_id, start_time, status, rows_processed, rows_indexed, metrics_json)
+                    VALUES (:id, 'm1', 'o1', '2026-10-17 10:00:00', 'FAILED', 0, 0, '{}')
+                """), {"id": run_id})
+        monkeypatch.setattr(index_checkpoint, "get_pooled_engine", lambda url: engine)
+        monkeypatch.setattr(indexing_worker.settings, "indexing_process_shards", 4)
+        yield engine
+        engine.dispose()
+
+    def _task(self):
+        return indexing_worker.IndexTask(
+            mapping_id="m1", object_def_id="o1", source_table="src", mapping_spec={}, pk_column="id"
+        )
+
+    def test_resume_reuses_saved_ranges(self, engine, monkeypatch):
+        """续跑时沿用首次运行保存的分片范围，不重新切分"""
+        monkeypatch.setattr(indexing_worker, "key_range_boundaries", lambda *args, **kwargs: [100, 200])
+        first = indexing_worker._plan_key_ranges(None, self._task(), "r1")
+        assert first == [(None, 100), (100, 200), (200, None)]
+
+        def changed_table(*args, **kwargs):
+            raise AssertionError("shard ranges recomputed on resume")
+
+        monkeypatch.setattr(indexing_worker, "key_range_boundaries", changed_table)
+        assert indexing_worker._plan_key_ranges(None, self._task(), "r1") == first
+
+    def test_unsharded_attempt_resumes_in_process(self, engine, monkeypatch):
+        """首次未分片运行的作业续跑时仍在进程内运行"""
+        monkeypatch.setattr(indexing_worker, "key_range_boundaries", lambda *args, **kwargs: [100])
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO sys_index_job_checkpoint
+                (job_run_id, shard_index, chunk_seq, row_count, sink_counts, is_committed)
+                VALUES ('r2', 0, 0, 10, '{}', 1)
+            """))
+
+        assert indexing_worker._plan_key_ranges(None, self._task(), "r2") == [(None, None)]
+        assert indexing_worker._plan_key_ranges(None, self._task(), "r3") == [(None, 100), (100, None)]
@@ -0,0 +1,198 @@
+"""
+Tests for the indexing dead letter queue.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from app.engine import index_dead_letter, indexing_worker
+from app.engine.index_dead_letter import (
+    STAGE_EMBEDDING,
+    STAGE_TRANSFORM,
+    RowFailure,
+    build_dead_letters,
+    dead_letter_frame,
+    load_dead_letters,
+    mark_replayed,
+    save_dead_letters,
+)
+from app.engine.indexing_worker import ErrorSampler, MetricsCollector, _prepare_batch
+from app.engine.mapping_plan import compile_mapping_spec
+from app.models.observability import DeadLetterStatus, IndexDeadLetter
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+    IndexDeadLetter.__table__.create(engine)
+    monkeypatch.setattr(index_dead_letter, "get_pooled_engine", lambda url: engine)
+    yield engine
+    engine.dispose()
+
+
+def _plan(function="to_uppercase"):
+    return compile_mapping_spec({
+        "nodes": [
+            {"id": "s1", "type": "source", "data": {"column": "name"}},
+            {"id": "t1", "type": "transform", "data": {"function": function}},
+            {"id": "p1", "type": "target", "data": {"property": "label"}},
+        ],
+        "edges": [{"source": "s1", "target": "t1"}, {"source": "t1", "target": "p1"}],
+    })
+
+
+def _failing_upper(func_name, value):
+    if value == "bad":
+        raise ValueError("cannot upper")
+    return str(value).upper()
+
+
+class TestDeadLetterCapture:
+    """失败行进入死信队列测试"""
+
+    def test_transform_failure_is_dead_lettered(self, monkeypatch):
+        """转换失败的行被丢弃，原始行数据进入死信"""
+        monkeypatch.setattr(indexing_worker, "_lookup_instance_ids", lambda *args: {})
+        monkeypatch.setattr(indexing_worker, "apply_column_transform", lambda func_name, series: 1 / 0)
+        monkeypatch.setattr(indexing_worker, "apply_scalar_transform", _failing_upper)
+        df = pd.DataFrame({"id": [1, 2, 3], "name": ["a", "bad", "c"], "score": [1.5, 2.5, None]})
+
+        batch = _prepare_batch(df, _plan(), "obj-1", "m1", "src", MetricsCollector(), ErrorSampler(), pk_column="id")
+
+        assert batch.scalar_df["label"].tolist() == ["A", "C"]
+        assert len(batch.dead_letters) == 1
+        dead = batch.dead_letters[0]
+        assert dead["source_row_id"] == "2" and dead["stage"] == STAGE_TRANSFORM
+        assert "cannot upper" in dead["error_message"]
+        assert dead["row_payload"] == {"id": 2, "name": "bad", "score": 2.5}
+
+    def test_embedding_failure_keeps_row(self, monkeypatch):
+        """向量化失败的行仍写入标量，但进入死信以便重放"""
+        monkeypatch.setattr(indexing_worker, "_lookup_instance_ids", lambda *args: {})
+
+        def fail(*args, **kwargs):
+            raise RuntimeError("model offline")
+        monkeypatch.setattr(indexing_worker, "encode_batched", fail)
+        df = pd.DataFrame({"id": [1, 2], "name": ["a", None]})
+
+        batch = _prepare_batch(df, _plan("text_embedding"), "obj-1", "m1", "src", MetricsCollector(), ErrorSampler())
+
+        assert len(batch.scalar_df) == 2
+        assert [(d["source_row_id"], d["stage"], d["error_category"]) for d in batch.dead_letters] == [
+            ("1", STAGE_EMBEDDING, "AI_INFERENCE")
+        ]
+        assert batch.indexed_row_ids == ["2"]  # Row 1 is indexed without its vector: still pending
+
+    def test_payload_round_trips_to_frame(self):
+        """死信行数据可还原为待重放的分块"""
+        df = pd.DataFrame({"id": [7], "name": ["x"], "born": pd.to_datetime(["2020-01-02"])})
+        failures = {0: RowFailure(STAGE_TRANSFORM, "SEMANTIC", "boom")}
+
+        dead = build_dead_letters(df, df["id"].map(str), failures)
+        frame = dead_letter_frame(dead)
+
+        assert frame[["id", "name"]].to_dict("records") == [{"id": 7, "name": "x"}]
+        assert frame["born"].iloc[0].startswith("2020-01-02")
+
+
+class TestDeadLetterStore:
+    """死信持久化测试"""
+
+    def _dead(self, row_id, message="boom"):
+        return {
+            "source_row_id": row_id,
+            "stage": STAGE_TRANSFORM,
+            "error_category": "SEMANTIC",
+            "error_message": message,
+            "row_payload": {"id": row_id},
+        }
+
+    def test_failing_again_updates_entry(self, engine):
+        """同一行再次失败时更新原条目而不是新增"""
+        save_dead_letters("m1", "obj-1", "src", "run-1", [self._dead("1"), self._dead("2")])
+        save_dead_letters("m1", "obj-1", "src", "run-2", [self._dead("1", "still broken")])
+
+        entries = {e["source_row_id"]: e for e in load_dead_letters("m1")}
+
+        assert set(entries) == {"1", "2"}
+        assert entries["1"]["attempts"] == 2
+        assert entries["1"]["error_message"] == "still broken"
+        assert entries["1"]["row_payload"] == {"id": "1"}
+        assert [e["source_row_id"] for e in load_dead_letters("m1", job_run_id="run-2")] == ["1"]
+
+    def test_replayed_entries_leave_pending(self, engine):
+        """重放成功的条目不再处于待处理状态，再次失败时恢复待处理"""
+        save_dead_letters("m1", "obj-1", "src", "run-1", [self._dead("1"), self._dead("2")])
+        mark_replayed([e["id"] for e in load_dead_letters("m1")])
+
+        assert load_dead_letters("m1") == []
+        assert {e["status"] for e in load_dead_letters("m1", status=None)} == {DeadLetterStatus.REPLAYED.value}
+
+        save_dead_letters("m1", "obj-1", "src", "run-2", [self._dead("2")])
+        assert [e["source_row_id"] for e in load_dead_letters("m1")] == ["2"]
+
+    def test_pages_and_ids(self, engine):
+        """按页或按条目ID读取"""
+        save_dead_letters("m1", "obj-1", "src", "run-1", [self._dead(str(i)) for i in range(5)])
+        save_dead_letters("m2", "obj-1", "src", "run-1", [self._dead("9")])
+        entries = load_dead_letters("m1")
+
+        pages = [load_dead_letters("m1", limit=2, offset=offset) for offset in (0, 2, 4)]
+        assert [e["id"] for page in pages for e in page] == [e["id"] for e in entries]
+        assert [e["id"] for e in load_dead_letters("m1", ids=[entries[3]["id"]])] == [entries[3]["id"]]
+        assert load_dead_letters("m1", ids=[]) == []
+
+
+class TestDeadLetterResolution:
+    """后续运行成功索引后死信自动解决测试"""
+
+    def test_row_indexed_later_is_not_replayed(self, engine, monkeypatch):
+        """行先失败、后续运行成功索引后，重放不再写入旧数据"""
+        monkeypatch.setattr(indexing_worker, "get_pooled_engine", lambda url: engine)
+        monkeypatch.setattr(indexing_worker, "_lookup_instance_ids", lambda *args: {})
+        monkeypatch.setattr(indexing_worker, "apply_column_transform", lambda func_name, series: 1 / 0)
+        monkeypatch.setattr(indexing_worker, "apply_scalar_transform", _failing_upper)
+        written = []
+        monkeypatch.setattr(indexing_worker, "_write_scalar_data", lambda df, *args, **kwargs: written.extend(df["label"]) or len(df))
+        monkeypatch.setattr(indexing_worker, "_write_lineage_data", lambda df, **kwargs: len(df))
+        task = indexing_worker.IndexTask(
+            mapping_id="m1", object_def_id="obj-1", source_table="src", pk_column="id",
+            mapping_spec={
+                "nodes": [
+                    {"id": "s1", "type": "source", "data": {"column": "name"}},
+                    {"id": "t1", "type": "transform", "data": {"function": "to_uppercase"}},
+                    {"id": "p1", "type": "target", "data": {"property": "label"}},
+                ],
+                "edges": [{"source": "s1", "target": "t1"}, {"source": "t1", "target": "p1"}],
+            },
+        )
+
+        def run(names):
+            chunk = pd.DataFrame({"id": [1, 2], "name": names})
+            return indexing_worker._index_range(task, MetricsCollector(), ErrorSampler(), source_chunks=[chunk])
+
+        run(["a", "bad"])
+        assert [e["source_row_id"] for e in load_dead_letters("m1")] == ["2"]
+        run(["a", "newer"])
+        assert load_dead_letters("m1") == []
+        assert [e["status"] for e in load_dead_letters("m1", status=None)] == [DeadLetterStatus.RESOLVED.value]
+
+        @contextmanager
+        def no_session():
+            yield None
+        monkeypatch.setattr(indexing_worker, "get_session_context", no_session)
+        monkeypatch.setattr(indexing_worker.mapping_crud, "get_mapping", lambda session, mapping_id: SimpleNamespace(
+            status="PUBLISHED", object_def_id="obj-1"
+        ))
+        monkeypatch.setattr(indexing_worker, "_make_index_task", lambda mapping: task)
+        monkeypatch.setattr(indexing_worker, "_record_job_run", lambda **kwargs: None)
+        written.clear()
+
+        stats = indexing_worker.replay_dead_letters("m1")
+
+        assert stats["replayed"] == 0 and written == []
+        assert [e["status"] for e in load_dead_letters("m1", status=None)] == [DeadLetterStatus.RESOLVED.value]
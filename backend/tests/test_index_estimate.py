@@ -0,0 +1,110 @@
+"""
+Tests for dry-run cost estimation of indexing jobs.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import pytest
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+
+from app.engine import indexing_worker
+from app.engine.indexing_worker import estimate_indexing_job
+from app.models.context import IndexingCostEstimate
+
+SPEC = {
+    "nodes": [
+        {"id": "s1", "type": "source", "data": {"column": "name"}},
+        {"id": "s2", "type": "source", "data": {"column": "status"}},
+        {"id": "t1", "type": "transform", "data": {"function": "text_embedding"}},
+        {"id": "p1", "type": "target", "data": {"property": "vec"}},
+        {"id": "p2", "type": "target", "data": {"property": "name"}},
+        {"id": "p3", "type": "target", "data": {"property": "status"}},
+    ],
+    "edges": [
+        {"source": "s1", "target": "t1"},
+        {"source": "t1", "target": "p1"},
+        {"source": "s1", "target": "p2"},
+        {"source": "s2", "target": "p3"},
+    ],
+}
+
+
+@pytest.fixture
+def raw_engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'raw.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE src (id INTEGER PRIMARY KEY, name TEXT, status TEXT)"))
+        for i in range(1, 201):
+            conn.execute(text("INSERT INTO src VALUES (:i, :n, :s)"), {"i": i, "n": f"name {i}", "s": "ok"})
+        conn.execute(text("CREATE TABLE empty_src (id INTEGER PRIMARY KEY, name TEXT)"))
+
+    monkeypatch.setattr(indexing_worker, "get_pooled_engine", lambda url: engine)
+    monkeypatch.setattr(indexing_worker, "_lookup_instance_ids", lambda *args: {})
+    monkeypatch.setattr(indexing_worker, "_get_object_type_info", lambda object_def_id: {
+        "api_name": "thing",
+        "display_name": "Thing",
+        "property_configs": [
+            {"api_name": "name", "display_name": "Name", "data_type": "STRING",
+             "is_searchable": True, "is_filterable": False, "is_sortable": False, "is_title": True},
+            {"api_name": "status", "display_name": "Status", "data_type": "STRING",
+             "is_searchable": False, "is_filterable": True, "is_sortable": False, "is_title": False},
+        ],
+        "property_types": {"name": "STRING", "status": "STRING"},
+    })
+    yield engine
+    engine.dispose()
+
+
+class TestDryRunEstimate:
+    """索引任务试运行估算测试"""
+
+    def test_extrapolates_sample_to_table(self, raw_engine):
+        """按样本外推到全表行数与存储"""
+        estimate = estimate_indexing_job("src", SPEC, object_def_id="obj-1", sample_size=50)
+
+        assert estimate["sample_rows"] == 50
+        assert estimate["total_rows"] == 200
+        assert estimate["vector_count"] == 200
+        assert estimate["vector_bytes"] >= 200 * estimate["vector_dimension"] * 4
+        assert estimate["es_document_bytes"] > 0 and estimate["es_bytes"] > 0
+        assert estimate["mysql_bytes"] == int(estimate["mysql_row_bytes"] * 200)
+        assert set(estimate["stage_rows_per_sec"]) == {"read", "transform", "es_document"}
+        assert estimate["bottleneck_stage"] in estimate["stage_rows_per_sec"]
+        assert estimate["estimated_duration_seconds"] >= 0
+        assert IndexingCostEstimate(**estimate).total_rows == 200
+
+    @pytest.mark.parametrize("storage, rescore_bytes_per_dim", [("FLOAT16", 0), ("INT8", 2)])
+    def test_quantized_vector_bytes(self, raw_engine, monkeypatch, storage, rescore_bytes_per_dim):
+        """量化存储按编码、缩放因子、float16 重排副本（仅 INT8）与 IVF 列表估算"""
+        object_type_info = indexing_worker._get_object_type_info("obj-1")
+        monkeypatch.setattr(indexing_worker, "_get_object_type_info", lambda object_def_id: {
+            **object_type_info, "vector_storage": storage,
+        })
+
+        estimate = estimate_indexing_job("src", SPEC, object_def_id="obj-1", sample_size=50)
+
+        dimension = estimate["vector_dimension"]
+        code_bytes = dimension * (2 if storage == "FLOAT16" else 1) + 4
+        row_bytes = code_bytes + rescore_bytes_per_dim * dimension + 4 + 36
+        assert estimate["vector_bytes"] == 200 * row_bytes
+
+    def test_nothing_is_written(self, raw_engine):
+        """试运行不写入任何存储"""
+        tables_before = set(sa_inspect(raw_engine).get_table_names())
+
+        estimate_indexing_job("src", SPEC, sample_size=20)
+
+        assert set(sa_inspect(raw_engine).get_table_names()) == tables_before
+
+    def test_without_object_type_skips_es(self, raw_engine):
+        """未指定对象类型时不估算 ES 文档"""
+        estimate = estimate_indexing_job("src", SPEC, sample_size=20)
+
+        assert estimate["es_bytes"] == 0
+        assert "es_document" not in estimate["stage_rows_per_sec"]
+
+    def test_empty_table(self, raw_engine):
+        """空表估算为零"""
+        estimate = estimate_indexing_job("empty_src", SPEC)
+
+        assert estimate["total_rows"] == 0
+        assert estimate["total_bytes"] == 0
+        assert "Source table is empty" in estimate["warnings"]
@@ -0,0 +1,188 @@
+"""
+Tests for the index job scheduler.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.engine import index_scheduler, sync_scheduler
+from app.engine import indexing_worker
+from app.engine.index_scheduler import IndexJobScheduler, sink_slot
+from app.models.observability import IndexJobRun
+from app.models.system import SchedulerLock
+
+
+class TestSinkSlot:
+    """存储写入并发上限测试"""
+
+    def test_caps_concurrent_writes(self, monkeypatch):
+        """同一存储的并发写入不超过上限"""
+        monkeypatch.setattr(index_scheduler.settings, "index_sink_concurrency_es", 2)
+        monkeypatch.setattr(index_scheduler, "_sink_semaphores", {})
+
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def write():
+            nonlocal active, peak
+            with sink_slot(index_scheduler.STORE_ES):
+                with lock:
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.02)
+                with lock:
+                    active -= 1
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert peak == 2
+
+
+class TestIndexJobScheduler:
+    """索引作业调度器测试"""
+
+    @pytest.fixture
+    def queue(self, monkeypatch):
+        """In-memory stand-in for the sys_index_job_run queue."""
+        jobs = {}  # job_run_id -> [mapping_id, status]
+        lock = threading.Lock()
+
+        def list_ready(limit):
+            with lock:
+                running = {m for m, s in jobs.values() if s == "RUNNING"}
+                ready = [(j, m, "INDEX", None) for j, (m, s) in jobs.items() if s == "QUEUED" and m not in running]
+            return ready[:limit]
+
+        def claim(job_run_id, owner_id=None):
+            with lock:
+                if jobs[job_run_id][1] != "QUEUED":
+                    return False
+                jobs[job_run_id][1] = "RUNNING"
+                return True
+
+        monkeypatch.setattr(index_scheduler, "_list_ready_jobs", list_ready)
+        monkeypatch.setattr(index_scheduler, "_claim_job", claim)
+        monkeypatch.setattr(index_scheduler, "_requeue_stale_jobs", lambda stale_before: 0)
+        monkeypatch.setattr(index_scheduler, "_heartbeat_jobs", lambda owner_id, job_run_ids: None)
+        monkeypatch.setattr(index_scheduler, "_acquire_dispatch_lease", lambda owner_id, lease_seconds: True)
+        return jobs
+
+    def test_respects_max_jobs_and_one_run_per_mapping(self, queue, monkeypatch):
+        """并发作业数受限且同一映射不会并行运行"""
+        for i, mapping_id in enumerate(["m1", "m1", "m2", "m3", "m4"]):
+            queue[f"j{i}"] = [mapping_id, "QUEUED"]
+
+        active = []
+        peak = {"jobs": 0}
+        seen_overlap = []
+        lock = threading.Lock()
+
+        def fake_run(mapping_id, job_run_id=None):
+            with lock:
+                if mapping_id in active:
+                    seen_overlap.append(mapping_id)
+                active.append(mapping_id)
+                peak["jobs"] = max(peak["jobs"], len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(mapping_id)
+                queue[job_run_id][1] = "SUCCESS"
+
+        monkeypatch.setattr(indexing_worker, "run_indexing_job", fake_run)
+
+        scheduler = IndexJobScheduler(max_jobs=2, poll_interval=0.01)
+        scheduler.start()
+        try:
+            deadline = time.time() + 5
+            while time.time() < deadline and any(s != "SUCCESS" for _, s in queue.values()):
+                time.sleep(0.01)
+        finally:
+            scheduler.stop(wait=True)
+
+        assert all(s == "SUCCESS" for _, s in queue.values())
+        assert peak["jobs"] == 2
+        assert seen_overlap == []
+
+
+class TestSchedulerReplicas:
+    """多副本调度测试"""
+
+    @pytest.fixture
+    def engine(self, tmp_path, monkeypatch):
+        engine = create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+        for model in (IndexJobRun, SchedulerLock):
+            model.__table__.create(engine)
+        monkeypatch.setattr(index_scheduler, "get_pooled_engine", lambda url: engine)
+        monkeypatch.setattr(sync_scheduler, "get_pooled_engine", lambda url: engine)
+        yield engine
+        engine.dispose()
+
+    def _add_run(self, engine, job_run_id, owner_id=None, heartbeat_at=None, start_time=None):
+        with engine.begin() as conn:
+            conn.execute(text("""
+                INSERT INTO sys_index_job_run
+                (id, mapping_id, object_def_id, start_time, status, rows_processed, rows_indexed,
+                 metrics_json, owner_id, heartbeat_at)
+                VALUES (:id, :id, 'o1', :start_time, 'RUNNING', 0, 0, '{}', :owner_id, :heartbeat_at)
+            """), {
+                "id": job_run_id,
+                "start_time": start_time or datetime.utcnow(),
+                "owner_id": owner_id,
+                "heartbeat_at": heartbeat_at,
+            })
+
+    def test_requeues_only_jobs_without_heartbeat(self, engine):
+        """仅重新排队心跳过期的运行中作业，其他副本仍在运行的作业保留"""
+        hour_ago = datetime.utcnow() - timedelta(hours=1)
+        self._add_run(engine, "live", owner_id="a", heartbeat_at=hour_ago)
+        self._add_run(engine, "dead", owner_id="b", heartbeat_at=hour_ago)
+        self._add_run(engine, "legacy", start_time=hour_ago)
+
+        index_scheduler._heartbeat_jobs("a", ["live", "dead"])
+        assert index_scheduler._requeue_stale_jobs(datetime.utcnow() - timedelta(minutes=5)) == 2
+
+        with engine.connect() as conn:
+            statuses = dict(conn.execute(text("SELECT id, status FROM sys_index_job_run")).fetchall())
+        assert statuses == {"live": "RUNNING", "dead": "QUEUED", "legacy": "QUEUED"}
+
+    def test_replay_is_queued_behind_mapping_jobs(self, engine, monkeypatch):
+        """死信重放经调度队列运行；映射有排队或运行中的作业时拒绝重放"""
+        monkeypatch.setattr(index_scheduler.settings, "index_scheduler_enabled", False)
+        replays = []
+        monkeypatch.setattr(indexing_worker, "replay_dead_letters", lambda m, ids, run_id: replays.append((m, ids)))
+        self._add_run(engine, "m-busy")
+
+        assert index_scheduler.enqueue_replay_job("m-busy", "o1", ["d1"]) is None
+        job_run_id = index_scheduler.enqueue_replay_job("m1", "o1", ["d1", "d2"])
+        assert index_scheduler.enqueue_replay_job("m1", "o1") is None
+        assert index_scheduler.enqueue_indexing_job("m1", "o1") != job_run_id
+
+        ready = index_scheduler._list_ready_jobs(limit=5)
+        assert ready[0] == (job_run_id, "m1", index_scheduler.JOB_KIND_REPLAY, {"dead_letter_ids": ["d1", "d2"]})
+        IndexJobScheduler(max_jobs=1, poll_interval=1)._run_job(*ready[0])
+        assert replays == [("m1", ["d1", "d2"])]
+
+    def test_only_lease_holder_dispatches(self, engine, monkeypatch):
+        """仅持有调度租约的副本认领排队作业；释放后由其他副本接管"""
+        dispatched = []
+        first = IndexJobScheduler(max_jobs=1, poll_interval=1, owner_id="a")
+        second = IndexJobScheduler(max_jobs=1, poll_interval=1, owner_id="b")
+        monkeypatch.setattr(first, "_dispatch", lambda: dispatched.append("a"))
+        monkeypatch.setattr(second, "_dispatch", lambda: dispatched.append("b"))
+
+        first.tick()
+        second.tick()
+        assert dispatched == ["a"] and first.is_leader and not second.is_leader
+
+        index_scheduler._release_dispatch_lease("a")
+        second.tick()
+        assert dispatched == ["a", "b"]
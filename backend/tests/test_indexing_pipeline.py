@@ -0,0 +1,207 @@
+"""
+Tests for the indexing pipeline.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import threading
+import time
+
+from app.engine.indexing_pipeline import (
+    IndexingPipeline,
+    OUTCOME_FAILED,
+    OUTCOME_PARKED,
+    OUTCOME_REPLAYED,
+    OUTCOME_SUCCESS,
+    STAGE_READ,
+    STAGE_TRANSFORM,
+    SinkPolicy,
+)
+
+
+class TestIndexingPipeline:
+    """流水线索引测试"""
+
+    def test_every_sink_receives_chunks_in_order(self):
+        """每个写入端按源顺序收到全部批次"""
+        received = {"a": [], "b": []}
+
+        def transform(chunk):
+            time.sleep(0.01 * (chunk % 3))  # finish out of order
+            return chunk * 10
+
+        pipeline = IndexingPipeline(
+            transform=transform,
+            sinks={name: (lambda item, name=name: received[name].append(item) or 1) for name in received},
+            transform_workers=3,
+        )
+        result = pipeline.run(range(8))
+
+        assert result.ok
+        assert result.chunks_read == 8
+        assert result.chunks_transformed == 8
+        assert received["a"] == received["b"] == [i * 10 for i in range(8)]
+        assert result.sink_counts == {"a": 8, "b": 8}
+        assert set(result.stage_busy_ms) >= {STAGE_READ, STAGE_TRANSFORM, "a", "b"}
+
+    def test_none_results_are_skipped(self):
+        """转换返回 None 的批次不会写入"""
+        received = []
+        pipeline = IndexingPipeline(
+            transform=lambda chunk: chunk if chunk % 2 else None,
+            sinks={"s": lambda item: received.append(item) or 1},
+        )
+        result = pipeline.run(range(6))
+        assert received == [1, 3, 5]
+        assert result.chunks_transformed == 3
+
+    def test_bounded_queues_apply_backpressure(self):
+        """慢写入端限制读取端的预读数量"""
+        read = []
+        release = threading.Event()
+
+        def chunks():
+            for i in range(50):
+                read.append(i)
+                yield i
+
+        pipeline = IndexingPipeline(
+            transform=lambda chunk: chunk,
+            sinks={"slow": lambda item: release.wait() and 1},
+            transform_workers=1,
+            prefetch_chunks=1,
+            sink_queue_size=1,
+        )
+        runner = threading.Thread(target=pipeline.run, args=(chunks(),))
+        runner.start()
+        time.sleep(0.3)
+        in_flight = len(read)
+        release.set()
+        runner.join(timeout=10)
+
+        # sink (1) + sink queue (1) + transform (2) + read queue (1) + reader (1)
+        assert in_flight <= 6
+        assert len(read) == 50
+
+    def test_sink_failure_stops_pipeline(self):
+        """写入端失败时停止流水线并报告阶段"""
+        def fail(item):
+            raise RuntimeError("sink down")
+
+        pipeline = IndexingPipeline(
+            transform=lambda chunk: chunk,
+            sinks={"ok": lambda item: 1, "bad": fail},
+        )
+        result = pipeline.run(iter(range(1000)))
+
+        assert not result.ok
+        assert result.failed_stage == "bad"
+        assert "sink down" in str(result.error)
+        assert result.chunks_read < 1000
+
+    def test_reader_failure_reported(self):
+        """读取失败时报告 read 阶段"""
+        def chunks():
+            yield 1
+            raise IOError("source gone")
+
+        result = IndexingPipeline(transform=lambda c: c, sinks={"s": lambda item: 1}).run(chunks())
+        assert result.failed_stage == STAGE_READ
+        assert isinstance(result.error, IOError)
+
+
+def _flaky(failures):
+    """Sink that fails the first `failures` calls per item."""
+    calls = {}
+
+    def write(item):
+        calls[item] = calls.get(item, 0) + 1
+        if calls[item] <= failures.get(item, 0):
+            raise RuntimeError(f"write {item} failed")
+        return 1
+    return write
+
+
+class TestSinkIsolation:
+    """写入端失败隔离测试"""
+
+    def _run(self, sinks, policies, chunks=range(5)):
+        outcomes = []
+        pipeline = IndexingPipeline(
+            transform=lambda chunk: chunk,
+            sinks=sinks,
+            sink_policies=policies,
+            on_sink_outcome=lambda item, outcome: outcomes.append((item, outcome)),
+        )
+        return pipeline.run(chunks), outcomes
+
+    def test_retry_then_success(self):
+        """失败后退避重试成功"""
+        result, outcomes = self._run(
+            {"s": _flaky({2: 1})}, {"s": SinkPolicy(backoff_seconds=0.01)}
+        )
+
+        assert result.ok
+        assert result.sink_counts == {"s": 5}
+        retried = [o for item, o in outcomes if item == 2][0]
+        assert retried.status == OUTCOME_SUCCESS and retried.attempts == 2
+
+    def test_parked_write_is_replayed(self):
+        """重试耗尽的写入暂存，流结束后重放成功"""
+        result, outcomes = self._run(
+            {"s": _flaky({1: 2})}, {"s": SinkPolicy(max_attempts=2, backoff_seconds=0.01)}
+        )
+
+        assert result.ok and not result.failed_writes
+        assert [o.status for item, o in outcomes if item == 1] == [OUTCOME_PARKED, OUTCOME_REPLAYED]
+        assert result.sink_counts == {"s": 5}
+
+    def test_failing_sink_does_not_block_others(self):
+        """单个写入端持续失败不影响其它写入端"""
+        received = []
+
+        def down(item):
+            raise RuntimeError("store down")
+
+        result, outcomes = self._run(
+            {"ok": lambda item: received.append(item) or 1, "down": down},
+            {
+                "ok": SinkPolicy(backoff_seconds=0.01),
+                "down": SinkPolicy(max_attempts=1, replay_queue_size=10, circuit_threshold=100),
+            },
+        )
+
+        assert result.ok
+        assert received == list(range(5))
+        assert [item for item, _ in result.failed_writes["down"]] == list(range(5))
+        assert {o.status for item, o in outcomes if o.sink == "down"} == {OUTCOME_PARKED, OUTCOME_FAILED}
+
+    def test_full_replay_queue(self):
+        """暂存队列满时：必需写入端停止流水线，可选写入端丢弃最早的写入"""
+        def down(item):
+            raise RuntimeError("store down")
+
+        policy = dict(max_attempts=1, replay_queue_size=2, circuit_threshold=100)
+        result, _ = self._run({"s": down}, {"s": SinkPolicy(**policy)})
+        assert not result.ok and result.failed_stage == "s"
+
+        result, _ = self._run({"s": down}, {"s": SinkPolicy(required=False, **policy)})
+        assert result.ok
+        assert result.dropped_writes == {"s": 3}
+        assert len(result.failed_writes["s"]) == 2
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        """连续失败后熔断，后续批次不再尝试写入"""
+        calls = []
+
+        def down(item):
+            calls.append(item)
+            raise RuntimeError("store down")
+
+        result, outcomes = self._run(
+            {"s": down},
+            {"s": SinkPolicy(max_attempts=1, circuit_threshold=2, circuit_cooldown_seconds=60)},
+        )
+
+        parked = [o for _, o in outcomes if o.status == OUTCOME_PARKED]
+        assert [o.attempts for o in parked] == [1, 1, 0, 0, 0]
+        assert parked[-1].error == "circuit open"
+        assert len(result.failed_writes["s"]) == 5
@@ -0,0 +1,162 @@
+"""
+Tests for the mapping plan compiler.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import pandas as pd
+import pytest
+
+from app.engine.mapping_plan import (
+    STEP_COLUMN,
+    STEP_TRANSFORM,
+    compile_mapping_spec,
+    compute_spec_hash,
+    get_mapping_plan,
+    clear_plan_cache,
+)
+from app.engine.transforms import (
+    SCALAR_TRANSFORMS,
+    apply_scalar_transform,
+    apply_column_transform,
+)
+
+
+def _spec():
+    return {
+        "nodes": [
+            {"id": "s1", "type": "source", "data": {"column": "name"}},
+            {"id": "s2", "type": "source", "data": {"column": "image_path"}},
+            {"id": "t1", "type": "transform", "data": {"function": "to_uppercase"}},
+            {"id": "t2", "type": "transform", "data": {"function": "image_embedding_clip"}},
+            {"id": "p1", "type": "target", "data": {"property": "name_upper"}},
+            {"id": "p2", "type": "target", "data": {"property": "raw_name"}},
+            {"id": "p3", "type": "target", "data": {"property": "image_vec"}},
+            {"id": "p4", "type": "target", "data": {"property": "orphan"}},
+        ],
+        "edges": [
+            {"source": "s1", "target": "t1"},
+            {"source": "t1", "target": "p1"},
+            {"source": "s1", "target": "p2"},
+            {"source": "s2", "target": "t2"},
+            {"source": "t2", "target": "p3"},
+        ],
+    }
+
+
+class TestCompileMappingSpec:
+    """编译映射规范测试"""
+
+    def test_steps_are_topologically_ordered(self):
+        """每个转换步骤的输入槽位必须先于自身计算"""
+        plan = compile_mapping_spec(_spec())
+        for step in plan.steps:
+            if step.op == STEP_TRANSFORM:
+                assert step.input_slot < step.slot
+
+    def test_shared_source_compiled_once(self):
+        """共享的源节点只读取一次"""
+        plan = compile_mapping_spec(_spec())
+        columns = [s.column for s in plan.steps if s.op == STEP_COLUMN]
+        assert columns.count("name") == 1
+
+    def test_targets_vector_and_file_columns(self):
+        """识别目标属性、向量属性和文件路径列"""
+        plan = compile_mapping_spec(_spec())
+        assert plan.output_columns == ["name_upper", "raw_name", "image_vec", "orphan"]
+        assert plan.vector_properties == {"image_vec"}
+        assert plan.file_path_columns == ["image_path"]
+
+    def test_evaluate_row(self):
+        """按计划执行单行转换"""
+        plan = compile_mapping_spec(_spec())
+
+        def apply(func, value):
+            return f"{func}({value})"
+
+        result = plan.evaluate_row({"name": "alpha", "image_path": "/a.png"}, apply)
+        assert result == {
+            "name_upper": "to_uppercase(alpha)",
+            "raw_name": "alpha",
+            "image_vec": "image_embedding_clip(/a.png)",
+            "orphan": None,
+        }
+
+    def test_cycle_raises(self):
+        """环形图应该报错"""
+        spec = {
+            "nodes": [
+                {"id": "a", "type": "transform", "data": {"function": "concat"}},
+                {"id": "b", "type": "transform", "data": {"function": "concat"}},
+                {"id": "p", "type": "target", "data": {"property": "x"}},
+            ],
+            "edges": [
+                {"source": "a", "target": "b"},
+                {"source": "b", "target": "a"},
+                {"source": "b", "target": "p"},
+            ],
+        }
+        with pytest.raises(ValueError, match="cycle"):
+            compile_mapping_spec(spec)
+
+
+class TestPlanCache:
+    """计划缓存测试"""
+
+    def test_cache_hit_per_mapping_and_hash(self):
+        """相同 mapping_id 和规范哈希复用同一计划"""
+        clear_plan_cache()
+        spec = _spec()
+        assert get_mapping_plan(spec, "m1") is get_mapping_plan(dict(spec), "m1")
+        assert get_mapping_plan(spec, "m1") is not get_mapping_plan(spec, "m2")
+
+    def test_spec_change_recompiles(self):
+        """规范变化后重新编译"""
+        clear_plan_cache()
+        spec = _spec()
+        first = get_mapping_plan(spec, "m1")
+        spec["nodes"].append({"id": "p5", "type": "target", "data": {"property": "extra"}})
+        second = get_mapping_plan(spec, "m1")
+        assert first is not second
+        assert "extra" in second.output_columns
+
+    def test_spec_hash_ignores_key_order(self):
+        """哈希与键顺序无关"""
+        assert compute_spec_hash({"a": 1, "b": 2}) == compute_spec_hash({"b": 2, "a": 1})
+
+
+class TestColumnarTransforms:
+    """列式转换测试"""
+
+    @pytest.mark.parametrize("func_name", SCALAR_TRANSFORMS)
+    def test_columnar_matches_rowwise(self, func_name):
+        """列式结果与逐行结果一致"""
+        series = pd.Series(["Alpha", None, "", "mIxEd", 0, 12, 3.5, True], dtype=object)
+        columnar = apply_column_transform(func_name, series).tolist()
+        rowwise = [apply_scalar_transform(func_name, v) for v in series]
+        assert columnar == rowwise
+
+    def test_blank_values_become_empty_string(self):
+        """空值转换为空字符串"""
+        series = pd.Series(["a", None, float("nan")])
+        assert apply_column_transform("to_uppercase", series).tolist() == ["A", "", ""]
+
+    def test_unknown_transform_raises(self):
+        """未实现列式版本的转换应该报错"""
+        with pytest.raises(ValueError):
+            apply_column_transform("image_embedding_clip", pd.Series(["x"]))
+
+    def test_evaluate_frame_matches_evaluate_row(self):
+        """按列执行计划与按行执行结果一致"""
+        plan = compile_mapping_spec(_spec())
+        df = pd.DataFrame({"name": ["alpha", "beta"], "image_path": ["/a.png", "/b.png"]})
+
+        def apply_value(func, value):
+            return apply_scalar_transform(func, value) if func in SCALAR_TRANSFORMS else f"vec({value})"
+
+        def apply_column(func, series):
+            if func in SCALAR_TRANSFORMS:
+                return apply_column_transform(func, series)
+            return series.map(lambda v: f"vec({v})")
+
+        frame = plan.evaluate_frame(df, apply_column)
+        rows = [plan.evaluate_row(r, apply_value) for r in df.to_dict(orient="records")]
+        assert frame.to_dict(orient="records") == rows
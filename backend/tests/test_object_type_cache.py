@@ -0,0 +1,119 @@
+"""
+Tests for the versioned object type metadata cache.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.engine import object_type_cache
+from app.engine.object_type_cache import (
+    get_object_type_info,
+    get_object_type_info_by_api_name,
+    invalidate_object_type,
+    resolve_facet_fields,
+)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE meta_object_type_def (id TEXT PRIMARY KEY, api_name TEXT, current_version_id TEXT)"))
+        conn.execute(text("CREATE TABLE meta_object_type_ver (id TEXT PRIMARY KEY, def_id TEXT, display_name TEXT, vector_storage TEXT)"))
+        conn.execute(text("CREATE TABLE meta_shared_property_def (id TEXT PRIMARY KEY, api_name TEXT, display_name TEXT, data_type TEXT)"))
+        conn.execute(text("""
+            CREATE TABLE rel_object_ver_property (
+                id INTEGER PRIMARY KEY, object_ver_id TEXT, property_def_id TEXT,
+                local_api_name TEXT, local_data_type TEXT,
+                is_searchable INTEGER DEFAULT 0, is_filterable INTEGER DEFAULT 0,
+                is_sortable INTEGER DEFAULT 0, is_title INTEGER DEFAULT 0
+            )
+        """))
+        conn.execute(text("INSERT INTO meta_object_type_def VALUES ('d1', 'ship', 'v1')"))
+        conn.execute(text("INSERT INTO meta_object_type_ver VALUES ('v1', 'd1', 'Ship', NULL), ('v2', 'd1', 'Ship v2', 'INT8')"))
+        conn.execute(text("INSERT INTO meta_shared_property_def VALUES ('p1', 'status', 'Status', 'STRING')"))
+        conn.execute(text("""
+            INSERT INTO rel_object_ver_property (object_ver_id, property_def_id, local_api_name, local_data_type, is_filterable)
+            VALUES ('v1', 'p1', NULL, NULL, 1), ('v1', NULL, 'tonnage', 'DOUBLE', 0), ('v2', NULL, 'speed', 'INT', 0)
+        """))
+
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, stmt, *args: queries.append(stmt))
+    engine.queries = queries
+
+    monkeypatch.setattr(object_type_cache, "get_pooled_engine", lambda url: engine)
+    monkeypatch.setattr(object_type_cache.settings, "object_type_cache_ttl", 300.0)
+    invalidate_object_type()
+    yield engine
+    invalidate_object_type()
+    engine.dispose()
+
+
+class TestObjectTypeCache:
+    """对象类型元数据缓存测试"""
+
+    def test_info_of_current_version(self, engine):
+        """返回当前版本的属性配置与数据类型"""
+        info = get_object_type_info("d1")
+
+        assert info["version_id"] == "v1"
+        assert info["display_name"] == "Ship"
+        assert [c["api_name"] for c in info["property_configs"]] == ["status"]
+        assert info["property_types"] == {"status": "STRING", "tonnage": "DOUBLE"}
+        assert info["vector_storage"] == "FLOAT32"
+
+    def test_repeated_lookups_hit_cache(self, engine):
+        """TTL 内重复读取不再查询数据库"""
+        get_object_type_info("d1")
+        count = len(engine.queries)
+
+        get_object_type_info("d1")
+        get_object_type_info_by_api_name("ship")
+
+        assert len(engine.queries) == count
+
+    def test_expired_entries_reload(self, engine, monkeypatch):
+        """过期条目重新加载"""
+        monkeypatch.setattr(object_type_cache.settings, "object_type_cache_ttl", 0)
+        get_object_type_info("d1")
+        count = len(engine.queries)
+
+        get_object_type_info("d1")
+
+        assert len(engine.queries) > count
+
+    def test_invalidate_by_version(self, engine):
+        """按版本失效后读取新绑定；其它版本的变更不影响缓存"""
+        get_object_type_info("d1")
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO rel_object_ver_property (object_ver_id, local_api_name, local_data_type) VALUES ('v1', 'name', 'STRING')"))
+
+        invalidate_object_type(object_ver_id="v2")
+        assert "name" not in get_object_type_info("d1")["property_types"]
+
+        invalidate_object_type(object_ver_id="v1")
+        assert get_object_type_info("d1")["property_types"]["name"] == "STRING"
+
+    def test_switching_current_version(self, engine):
+        """切换当前版本后按对象类型失效"""
+        get_object_type_info("d1")
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE meta_object_type_def SET current_version_id = 'v2' WHERE id = 'd1'"))
+
+        invalidate_object_type(object_def_id="d1")
+        info = get_object_type_info("d1")
+
+        assert info["version_id"] == "v2"
+        assert info["property_types"] == {"speed": "INT"}
+        assert info["vector_storage"] == "INT8"
+
+    def test_missing_object_type(self, engine):
+        """不存在的对象类型返回 None 且不缓存"""
+        assert get_object_type_info("nope") is None
+        assert get_object_type_info_by_api_name("nope") is None
+
+    def test_facet_fields_from_filterable_properties(self, engine):
+        """分面字段来自可过滤属性"""
+        assert resolve_facet_fields(["ship"]) == {"properties.status_kwd": "Status"}
+        assert resolve_facet_fields() == {"properties.status_kwd": "Status"}
+        assert resolve_facet_fields(["unknown"]) == {}
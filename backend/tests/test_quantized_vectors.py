@@ -0,0 +1,233 @@
+"""
+Tests for quantized vector collections.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import numpy as np
+import pytest
+
+from app.core import quantized_vectors, vector_store
+from app.core.config import settings
+from app.core.quantized_vectors import (
+    STORAGE_FLOAT16,
+    STORAGE_FLOAT32,
+    STORAGE_INT8,
+    QuantizedCollection,
+    convert_quantized_collection,
+    dequantize,
+    get_quantized_collection,
+    normalize_storage,
+    quantize,
+)
+
+
+@pytest.fixture
+def vectors():
+    rng = np.random.default_rng(7)
+    return rng.standard_normal((500, 64)).astype(np.float32)
+
+
+@pytest.fixture
+def store_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "chroma_db_path", str(tmp_path / "chroma"))
+    monkeypatch.setattr(vector_store, "chroma_client", None)
+    monkeypatch.setattr(quantized_vectors, "_collections", {})
+    yield tmp_path
+    for collection in quantized_vectors._collections.values():
+        collection.close()
+
+
+def _exact_top_k(matrix, query, k):
+    normalized = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    return [str(i) for i in np.argsort(-scores)[:k]]
+
+
+class TestQuantize:
+    """量化编码测试"""
+
+    @pytest.mark.parametrize("storage, tolerance", [(STORAGE_FLOAT16, 1e-3), (STORAGE_INT8, 1 / 127)])
+    def test_round_trip_error_is_bounded(self, vectors, storage, tolerance):
+        """反量化误差不超过编码精度"""
+        codes, scales = quantize(vectors, storage)
+
+        error = np.abs(dequantize(codes, scales) - vectors).max(axis=1)
+        assert np.all(error <= tolerance * np.abs(vectors).max(axis=1) + 1e-6)
+        assert codes.nbytes <= vectors.nbytes // 2
+
+    def test_zero_vector_keeps_nonzero_scale(self):
+        """零向量的缩放因子不为0（0表示空闲槽位）"""
+        _, scales = quantize(np.zeros((1, 4), dtype=np.float32), STORAGE_INT8)
+        assert scales[0] > 0
+
+    def test_normalize_storage(self):
+        """存储选项校验"""
+        assert normalize_storage(None) == STORAGE_FLOAT32
+        assert normalize_storage("int8") == STORAGE_INT8
+        with pytest.raises(ValueError):
+            normalize_storage("BINARY")
+
+
+class TestQuantizedCollection:
+    """量化集合读写与检索测试"""
+
+    @pytest.mark.parametrize("storage", [STORAGE_FLOAT16, STORAGE_INT8])
+    def test_search_matches_exact_ranking(self, tmp_path, vectors, storage):
+        """量化扫描加全精度重排后的前K结果与精确余弦排序一致"""
+        collection = QuantizedCollection(tmp_path / "c", storage=storage, dimension=64)
+        collection.upsert([str(i) for i in range(len(vectors))], vectors)
+
+        query = vectors[3] + 0.1
+        results = collection.search(query, top_k=10)
+
+        assert [doc_id for doc_id, _ in results] == _exact_top_k(vectors, query, 10)
+        distances = [distance for _, distance in results]
+        assert distances == sorted(distances)
+        collection.close()
+
+    def test_float16_keeps_no_rescore_copy(self, tmp_path, vectors):
+        """FLOAT16 集合不保留重排副本，扫描得分即最终得分"""
+        collection = QuantizedCollection(tmp_path / "c", storage=STORAGE_FLOAT16, dimension=64)
+        collection.upsert([str(i) for i in range(len(vectors))], vectors)
+
+        assert collection._rescore is None and not (tmp_path / "c" / "rescore.bin").exists()
+        assert collection.stats()["metadata"]["rescore_bytes"] == 0
+        doc_id, distance = collection.search(vectors[8], top_k=1)[0]
+        assert doc_id == "8" and abs(distance) < 1e-3
+        collection.close()
+
+    def test_upsert_delete_and_slot_reuse(self, tmp_path, vectors):
+        """更新覆盖原槽位，删除后的槽位被复用"""
+        collection = QuantizedCollection(tmp_path / "c", storage=STORAGE_INT8, dimension=64)
+        collection.upsert(["a", "b", "c"], vectors[:3])
+        collection.upsert(["a"], vectors[3:4])
+        assert collection.count() == 3
+
+        assert collection.delete(["b", "missing"]) == 1
+        assert [doc_id for doc_id, _ in collection.search(vectors[1], top_k=3)] != ["b"]
+        collection.upsert(["d"], vectors[4:5])
+
+        assert collection.count() == 3
+        assert collection.search(vectors[4], top_k=1)[0][0] == "d"
+        assert collection.search(vectors[3], top_k=1)[0][0] == "a"
+        assert collection._next_slot == 3
+        collection.close()
+
+    def test_reopen_keeps_vectors(self, tmp_path, vectors):
+        """重新打开集合后向量（float16 重排精度）与元数据保留"""
+        collection = QuantizedCollection(tmp_path / "c", storage=STORAGE_FLOAT16, dimension=64)
+        collection.upsert([str(i) for i in range(100)], vectors[:100])
+        collection.close()
+
+        reopened = QuantizedCollection(tmp_path / "c")
+        ids, matrix = reopened.get(["5", "42"])
+
+        assert (reopened.storage, reopened.dimension, reopened.count()) == (STORAGE_FLOAT16, 64, 100)
+        expected = vectors[[5, 42]] / np.linalg.norm(vectors[[5, 42]], axis=1, keepdims=True)
+        assert ids == ["5", "42"] and np.allclose(matrix, expected, atol=1e-3)
+        reopened.close()
+
+    def test_converts_float32_copy_of_older_collections(self, tmp_path, vectors):
+        """旧版集合的 float32 副本（full.bin）在打开时转为 float16 重排向量"""
+        collection = QuantizedCollection(tmp_path / "c", storage=STORAGE_INT8, dimension=64)
+        collection.upsert(["a", "b"], vectors[:2])
+        collection.close()
+        normalized = vectors[:2] / np.linalg.norm(vectors[:2], axis=1, keepdims=True)
+        full = np.zeros((1024, 64), dtype=np.float32)
+        full[:2] = normalized
+        full.tofile(tmp_path / "c" / "full.bin")
+
+        reopened = QuantizedCollection(tmp_path / "c")
+        assert not (tmp_path / "c" / "full.bin").exists()
+        assert np.allclose(reopened.get(["a", "b"])[1], normalized, atol=1e-3)
+        reopened.close()
+
+    def test_missing_collection_needs_storage(self, tmp_path):
+        """不存在的集合必须给出存储选项与维度才能创建"""
+        with pytest.raises(FileNotFoundError):
+            QuantizedCollection(tmp_path / "missing")
+
+
+class TestVectorStoreRouting:
+    """按对象类型存储选项路由测试"""
+
+    def test_switching_storage_moves_vectors(self, store_root, vectors):
+        """切换存储选项时向量在 Chroma 与量化集合间迁移"""
+        ids = [str(i) for i in range(50)]
+        data = [{"id": doc_id, "vector": vectors[i]} for i, doc_id in enumerate(ids)]
+
+        name = vector_store.ensure_object_collection("obj-1", dimension=64)
+        vector_store.upsert_vectors(name, data)
+        assert get_quantized_collection(name) is None
+
+        vector_store.ensure_object_collection("obj-1", dimension=64, storage=STORAGE_INT8)
+        assert get_quantized_collection(name).count() == 50
+        assert vector_store.search_vectors(name, vectors[7].tolist(), top_k=1)[0]["id"] == "7"
+        assert vector_store.get_collection_stats(name)["metadata"]["vector_storage"] == STORAGE_INT8
+
+        convert_quantized_collection(name, STORAGE_FLOAT16)
+        assert get_quantized_collection(name).storage == STORAGE_FLOAT16
+
+        vector_store.ensure_object_collection("obj-1", dimension=64)
+        assert get_quantized_collection(name) is None
+        assert vector_store.search_vectors(name, vectors[9].tolist(), top_k=1)[0]["id"] == "9"
+
+    def test_quantized_search_rejects_filters(self, store_root, vectors):
+        """量化集合不支持元数据过滤"""
+        name = vector_store.ensure_object_collection("obj-2", dimension=64, storage=STORAGE_FLOAT16)
+        vector_store.upsert_vectors(name, [{"id": "a", "vector": vectors[0]}])
+
+        with pytest.raises(ValueError):
+            vector_store.search_vectors(name, vectors[0].tolist(), filter_expr={"k": "v"})
+        assert vector_store.delete_vectors(name, ["a"]) == 1
+
+
+class TestIvfIndex:
+    """IVF 索引检索测试"""
+
+    @pytest.fixture
+    def indexed(self, tmp_path, vectors, monkeypatch):
+        monkeypatch.setattr(settings, "vector_ivf_min_rows", 100)
+        monkeypatch.setattr(settings, "vector_ivf_lists", 8)
+        collection = QuantizedCollection(tmp_path / "c", storage=STORAGE_INT8, dimension=64)
+        collection.upsert([str(i) for i in range(len(vectors))], vectors)
+        assert collection.build_index()
+        yield collection
+        collection.close()
+
+    def test_probing_every_list_is_exact(self, indexed, vectors, monkeypatch):
+        """探测全部列表时结果与精确排序一致；探测少量列表时只扫描部分编码"""
+        monkeypatch.setattr(settings, "vector_ivf_nprobe", 8)
+        query = vectors[3] + 0.1
+        assert [doc_id for doc_id, _ in indexed.search(query, top_k=10)] == _exact_top_k(vectors, query, 10)
+
+        monkeypatch.setattr(settings, "vector_ivf_nprobe", 2)
+        no_pending = np.empty(0, dtype=np.int64)
+        scanned = indexed._probe(vectors[3] / np.linalg.norm(vectors[3]), indexed._centroids, indexed._inverted, indexed._lists, no_pending)
+        assert 0 < len(scanned) < len(vectors)
+        assert indexed.search(vectors[3], top_k=1)[0][0] == "3"
+        assert indexed.stats()["metadata"]["ivf_lists"] == 8
+
+    def test_writes_after_training_are_searchable(self, indexed, vectors, monkeypatch):
+        """训练后写入的向量在重建倒排列表前后均可检索，删除的向量不再返回"""
+        monkeypatch.setattr(settings, "vector_ivf_nprobe", 1)
+        indexed.upsert(["new", "3"], -vectors[:2])
+        indexed.delete(["4"])
+        assert len(indexed._pending) == 2
+
+        assert indexed.search(-vectors[0], top_k=1)[0][0] == "new"
+        assert indexed.search(-vectors[1], top_k=1)[0][0] == "3"
+        assert "4" not in [doc_id for doc_id, _ in indexed.search(vectors[4], top_k=5)]
+
+        indexed._rebuild_inverted()
+        assert indexed._pending == []
+        assert indexed.search(-vectors[0], top_k=1)[0][0] == "new"
+
+    def test_reopen_keeps_index(self, indexed, tmp_path, vectors):
+        """重新打开集合后沿用已训练的质心与列表"""
+        centroids = indexed._centroids.copy()
+        indexed.close()
+
+        reopened = QuantizedCollection(tmp_path / "c")
+        assert np.array_equal(reopened._centroids, centroids)
+        assert reopened.search(vectors[42], top_k=1)[0][0] == "42"
+        reopened.close()
@@ -0,0 +1,144 @@
+"""
+Tests for the cached source schema explorer.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlmodel import Session
+
+from app.engine import schema_explorer, source_pools
+from app.engine.source_pools import SourcePoolRegistry
+from app.engine.v3 import connector_crud
+from app.models.system import Connection, SyncJobDef
+
+CONFIG = {"host": "db", "port": 3306, "user": "reader", "database": "src.db"}
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    """SQLite source behind the pool registry; records the statements it runs."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'src.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, customer VARCHAR(100) NOT NULL, note TEXT)"))
+        for i in range(5):
+            conn.execute(text(f"CREATE TABLE log_{i} (id INTEGER, payload TEXT)"))
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda c, cur, sql, *args: statements.append(sql))
+    monkeypatch.setattr(source_pools, "_create_source_engine", lambda conn_type, config: engine)
+    registry = SourcePoolRegistry(max_pools=4, idle_seconds=0)
+    monkeypatch.setattr(source_pools, "_registry", registry)
+    monkeypatch.setattr(schema_explorer, "_cache", {})
+    monkeypatch.setattr(schema_explorer, "_load_locks", {})
+    engine.statements = statements
+    yield engine
+    registry.dispose_all()
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+    for model in (Connection, SyncJobDef):
+        model.__table__.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO sys_connection (id, name, conn_type, config_json, status)
+            VALUES ('c1', 'src', 'MYSQL', :config, 'ACTIVE')
+        """), {"config": '{"host": "db", "port": 3306, "user": "reader", "database": "src.db"}'})
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _add_job(session, job_id, table, columns=None):
+    session.connection().execute(text("""
+        INSERT INTO sys_sync_job_def (id, connection_id, name, source_config, target_table, sync_mode, cached_schema, is_enabled)
+        VALUES (:id, 'c1', :id, :source_config, :id, 'FULL_OVERWRITE', :cached_schema, 1)
+    """), {
+        "id": job_id,
+        "source_config": f'{{"table": "{table}"}}',
+        "cached_schema": None if columns is None else f'{{"columns": {columns}}}',
+    })
+    session.commit()
+
+
+class TestSchemaExplorer:
+    """源库结构浏览测试"""
+
+    def test_reads_all_columns_in_one_query(self, source):
+        """整个 schema 的表与字段通过一次查询读取"""
+        result = connector_crud.explore_source("MYSQL", CONFIG, "c1")
+
+        assert result.error is None
+        assert len(source.statements) == 1
+        assert result.total == 6 and result.cached_at is not None
+        orders = next(t for t in result.tables if t.name == "orders")
+        assert orders.columns == [
+            {"name": "id", "type": "INTEGER", "nullable": True},
+            {"name": "customer", "type": "VARCHAR(100)", "nullable": False},
+            {"name": "note", "type": "TEXT", "nullable": True},
+        ]
+
+    def test_cache_ttl_and_refresh(self, source, monkeypatch):
+        """缓存有效期内不再查询源库；refresh 或过期后重新读取"""
+        connector_crud.explore_source("MYSQL", CONFIG, "c1")
+        connector_crud.explore_source("MYSQL", CONFIG, "c1", search="log")
+        assert len(source.statements) == 1
+
+        with source.begin() as conn:
+            conn.execute(text("CREATE TABLE added (id INTEGER)"))
+        source.statements.clear()
+        assert connector_crud.explore_source("MYSQL", CONFIG, "c1", refresh=True).total == 7
+        assert len(source.statements) == 1
+
+        monkeypatch.setattr(schema_explorer.settings, "source_schema_cache_ttl", 0)
+        connector_crud.explore_source("MYSQL", CONFIG, "c1")
+        assert len(source.statements) == 2
+
+    def test_search_and_pagination(self, source):
+        """按表名过滤（不区分大小写）并分页，total 为匹配总数"""
+        page = connector_crud.explore_source("MYSQL", CONFIG, "c1", search="LOG", skip=1, limit=2, include_columns=False)
+
+        assert [t.name for t in page.tables] == ["log_1", "log_2"]
+        assert page.total == 5
+        assert all(t.columns is None for t in page.tables)
+
+    def test_invalidate_drops_connection_cache(self, source):
+        """连接更新或删除后缓存失效"""
+        connector_crud.explore_source("MYSQL", CONFIG, "c1")
+        connector_crud.explore_source("MYSQL", CONFIG, "c2")
+
+        assert schema_explorer.invalidate_schema_cache("c1") == 1
+        assert schema_explorer.peek_source_schema("MYSQL", CONFIG, "c1") is None
+        assert schema_explorer.peek_source_schema("MYSQL", CONFIG, "c2") is not None
+
+    def test_cache_drops_expired_and_oldest_entries(self, source, monkeypatch):
+        """写入缓存时清除过期条目，并在超过上限时淘汰最早加载的条目"""
+        monkeypatch.setattr(schema_explorer.settings, "source_schema_cache_max_entries", 2)
+        for connection_id in ("c1", "c2", "c3"):
+            connector_crud.explore_source("MYSQL", CONFIG, connection_id)
+
+        assert {key[0] for key in schema_explorer._cache} == {"c2", "c3"}
+        assert set(schema_explorer._load_locks) == set(schema_explorer._cache)
+
+        monkeypatch.setattr(schema_explorer.settings, "source_schema_cache_ttl", 0)
+        connector_crud.explore_source("MYSQL", CONFIG, "c4")
+        assert list(schema_explorer._cache) == []
+        assert [key[0] for key in schema_explorer._load_locks] == ["c4"]  # Held by its load while storing
+
+    def test_table_columns_reuse_sync_job_schema(self, source, session):
+        """新建同步作业时复用其他作业的 cached_schema，不查询源库；refresh 后更新作业结构"""
+        conn = session.get(Connection, "c1")
+        _add_job(session, "j1", "orders", '[{"name": "id", "type": "INT", "nullable": false}]')
+
+        columns = schema_explorer.get_table_columns(session, conn, "orders")
+        assert columns == [{"name": "id", "type": "INT", "nullable": False}]
+        assert source.statements == []
+
+        assert [c["name"] for c in schema_explorer.get_table_columns(session, conn, "log_0")] == ["id", "payload"]
+        assert schema_explorer.get_table_columns(session, conn, "missing") is None
+        assert len(source.statements) == 1
+
+        assert schema_explorer.refresh_sync_job_schemas(session, conn) == 1
+        session.expire_all()
+        assert [c["name"] for c in session.get(SyncJobDef, "j1").cached_schema["columns"]] == ["id", "customer", "note"]
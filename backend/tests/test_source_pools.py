@@ -0,0 +1,87 @@
+"""
+Tests for the source connection pool registry.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.engine import source_pools
+from app.engine.source_pools import SourcePoolRegistry, config_hash
+from app.engine.v3 import connector_crud
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Registry whose configs open SQLite files named by config["database"]."""
+    created = []
+
+    def create(conn_type, config):
+        engine = create_engine(f"sqlite:///{tmp_path / config['database']}")
+        created.append(engine)
+        return engine
+
+    monkeypatch.setattr(source_pools, "_create_source_engine", create)
+    registry = SourcePoolRegistry(max_pools=3, idle_seconds=0)
+    monkeypatch.setattr(source_pools, "_registry", registry)
+    yield registry
+    registry.dispose_all()
+
+
+def _config(database="a.db", **extra):
+    return {"host": "db", "port": 3306, "user": "reader", "database": database, **extra}
+
+
+class TestSourcePoolRegistry:
+    """源连接池注册表测试"""
+
+    def test_reuses_engine_per_connection_and_config(self, registry):
+        """同一连接与配置复用引擎；配置变化或未保存配置使用独立连接池"""
+        engine = registry.get("MYSQL", _config(), connection_id="c1")
+
+        assert registry.get("MYSQL", dict(reversed(list(_config().items()))), connection_id="c1") is engine
+        assert registry.get("MYSQL", _config(password="new"), connection_id="c1") is not engine
+        assert registry.get("MYSQL", _config()) is not engine
+        assert config_hash("MYSQL", _config()) != config_hash("POSTGRES", _config())
+        assert len(registry) == 3
+
+    def test_invalidate_disposes_only_that_connection(self, registry):
+        """连接更新或删除时仅释放该连接的连接池"""
+        registry.get("MYSQL", _config("a.db"), connection_id="c1")
+        registry.get("MYSQL", _config("a.db", password="old"), connection_id="c1")
+        other = registry.get("MYSQL", _config("b.db"), connection_id="c2")
+
+        assert source_pools.invalidate_source_pools("c1") == 2
+        assert len(registry) == 1
+        assert registry.get("MYSQL", _config("b.db"), connection_id="c2") is other
+
+    def test_idle_eviction_keeps_pools_in_use(self, registry):
+        """空闲连接池被回收，有借出连接的连接池保留"""
+        busy = registry.get("MYSQL", _config("a.db"), connection_id="c1")
+        registry.get("MYSQL", _config("b.db"), connection_id="c2")
+
+        with busy.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            assert registry.evict_idle(now=time.monotonic() + 1) == 1
+            assert [s["connection_id"] for s in registry.stats()] == ["c1"]
+        assert registry.evict_idle(now=time.monotonic() + 1) == 1
+        assert len(registry) == 0
+
+    def test_max_pools_evicts_least_recently_used(self, registry):
+        """超过连接池上限时回收最久未使用的空闲连接池"""
+        for i in range(3):
+            registry.get("MYSQL", _config(f"{i}.db"), connection_id=f"c{i}")
+        registry.get("MYSQL", _config("0.db"), connection_id="c0")  # c1 is now least recently used
+
+        registry.get("MYSQL", _config("3.db"), connection_id="c3")
+
+        assert sorted(s["connection_id"] for s in registry.stats()) == ["c0", "c2", "c3"]
+
+    def test_failed_test_discards_pool(self, registry):
+        """连接测试失败时不保留该配置的连接池"""
+        result = connector_crud.test_connection("MYSQL", _config("missing/x.db"), "c1")
+        assert not result.success and len(registry) == 0
+
+        assert connector_crud.test_connection("MYSQL", _config(), "c1").success
+        assert len(registry) == 1
@@ -0,0 +1,108 @@
+"""
+Tests for the bounded-memory source reader.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+import itertools
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.engine.source_reader import (
+    get_keyset_column,
+    key_range_boundaries,
+    key_range_filter,
+    keyset_chunks,
+    read_table_chunks,
+    skip_rows,
+    stream_query,
+)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'src.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE with_pk (id INTEGER PRIMARY KEY, name TEXT, score REAL)"))
+        conn.execute(text("CREATE TABLE no_pk (id INTEGER, name TEXT)"))
+        for i in range(1, 26):
+            conn.execute(text("INSERT INTO with_pk VALUES (:i, :n, :s)"), {"i": i * 2, "n": f"n{i}", "s": i / 2})
+            conn.execute(text("INSERT INTO no_pk VALUES (:i, :n)"), {"i": i, "n": f"n{i}"})
+    yield engine
+    engine.dispose()
+
+
+class TestSourceReader:
+    """流式读取测试"""
+
+    def test_keyset_column_detection(self, engine):
+        """识别单列主键"""
+        assert get_keyset_column(engine, "with_pk") == "id"
+        assert get_keyset_column(engine, "no_pk") is None
+
+    def test_keyset_pages_cover_table_in_order(self, engine):
+        """键集分页按主键顺序读取全部行"""
+        chunks = list(keyset_chunks(engine, "with_pk", "id", chunk_size=10))
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        ids = pd.concat(chunks)["id"].tolist()
+        assert ids == sorted(ids) and len(set(ids)) == 25
+
+    def test_keyset_with_filter(self, engine):
+        """键集分页支持额外过滤条件"""
+        chunks = list(keyset_chunks(engine, "with_pk", "id", chunk_size=4, where="score > :min", params={"min": 10}))
+        df = pd.concat(chunks)
+        assert df["score"].min() > 10
+        assert len(df) == 5
+
+    def test_keyset_start_after(self, engine):
+        """从指定主键之后继续读取"""
+        chunks = list(read_table_chunks(engine, "with_pk", chunk_size=10, start_after=20))
+        assert pd.concat(chunks)["id"].min() == 22
+        assert sum(len(c) for c in chunks) == 15
+
+    def test_skip_rows(self, engine):
+        """无主键时跳过已处理的行"""
+        chunks = list(skip_rows(stream_query(engine, "SELECT * FROM no_pk", chunk_size=10), 13))
+        assert [len(c) for c in chunks] == [7, 5]
+        assert chunks[0]["id"].iloc[0] == 14
+
+    def test_stream_query_chunks(self, engine):
+        """服务端游标按块返回"""
+        chunks = list(stream_query(engine, "SELECT * FROM no_pk", chunk_size=10))
+        assert [len(c) for c in chunks] == [10, 10, 5]
+        assert list(chunks[0].columns) == ["id", "name"]
+
+    def test_read_table_chunks_matches_read_sql(self, engine):
+        """两种读取方式与 read_sql 结果一致"""
+        for table in ("with_pk", "no_pk"):
+            expected = pd.read_sql(f"SELECT * FROM {table} ORDER BY id", engine)
+            actual = pd.concat(read_table_chunks(engine, table, chunk_size=7)).sort_values("id").reset_index(drop=True)
+            pd.testing.assert_frame_equal(actual, expected)
+
+    def test_empty_result_yields_nothing(self, engine):
+        """空结果不返回任何块"""
+        assert list(read_table_chunks(engine, "with_pk", where="id < 0")) == []
+
+    def test_key_ranges_partition_table(self, engine):
+        """主键范围分片覆盖全表且互不重叠"""
+        boundaries = key_range_boundaries(engine, "with_pk", "id", parts=4)
+        assert len(boundaries) == 3 and boundaries == sorted(boundaries)
+
+        bounds = [None] + boundaries + [None]
+        seen = []
+        for lower, upper in zip(bounds[:-1], bounds[1:]):
+            where, params = key_range_filter(engine, "id", lower, upper)
+            seen += pd.concat(read_table_chunks(engine, "with_pk", where=where, params=params))["id"].tolist()
+        assert sorted(seen) == list(range(2, 52, 2))
+
+    def test_small_table_is_not_split(self, engine):
+        """行数不足时不分片"""
+        assert key_range_boundaries(engine, "with_pk", "id", parts=4, min_rows_per_part=10) == [24]
+        assert key_range_boundaries(engine, "with_pk", "id", parts=4, min_rows_per_part=100) == []
+
+    def test_chunk_size_callable(self, engine):
+        """每块读取前询问批大小"""
+        for table in ("with_pk", "no_pk"):
+            sizes = itertools.chain([5, 10], itertools.repeat(20))
+            chunks = list(read_table_chunks(engine, table, chunk_size=lambda: next(sizes)))
+            assert [len(c) for c in chunks] == [5, 10, 10]
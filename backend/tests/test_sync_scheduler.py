@@ -0,0 +1,176 @@
+"""
+Tests for cron schedules and the sync scheduler.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import DateTime, create_engine, text
+
+from app.core.cron import CronExpression, validate_cron
+from app.engine import index_scheduler, sync_scheduler, sync_worker
+from app.engine.sync_scheduler import (
+    DECISION_FIRE,
+    DECISION_SKIP,
+    DECISION_WAIT,
+    MISSED_SKIP,
+    SyncScheduler,
+    fire_decision,
+)
+from app.models.context import ObjectMappingDef
+from app.models.pipeline import PipelineDef
+from app.models.system import SchedulerLock, SyncJobDef, SyncRunLog
+
+NOW = datetime(2026, 10, 17, 10, 7, 30)  # Saturday
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'meta.db'}")
+    for model in (SyncJobDef, SyncRunLog, SchedulerLock, PipelineDef, ObjectMappingDef):
+        model.__table__.create(engine)
+    monkeypatch.setattr(sync_scheduler, "get_pooled_engine", lambda url: engine)
+    monkeypatch.setattr(sync_scheduler.settings, "sync_schedule_jitter_seconds", 0)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Started runs; the fake worker leaves run logs RUNNING."""
+    started = []
+    monkeypatch.setattr(sync_worker, "run_sync_job", lambda job_id, run_log_id: started.append(job_id))
+    return started
+
+
+def _add_job(engine, job_id, cron="0 * * * *", connection_id="c1", next_run_at=None):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO sys_sync_job_def
+            (id, connection_id, name, source_config, target_table, sync_mode, schedule_cron, next_run_at, is_enabled)
+            VALUES (:id, :connection_id, :id, '{}', 't', 'FULL_OVERWRITE', :cron, :next_run_at, 1)
+        """), {"id": job_id, "connection_id": connection_id, "cron": cron, "next_run_at": next_run_at})
+
+
+def _next_run(engine, job_id, table="sys_sync_job_def", column="next_run_at"):
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT {column} FROM {table} WHERE id = :id").columns(**{column: DateTime}), {"id": job_id}
+        ).scalar()
+
+
+def _run_logs(engine):
+    with engine.connect() as conn:
+        return [tuple(row) for row in conn.execute(text("SELECT job_id, triggered_by FROM sys_sync_run_log"))]
+
+
+class TestCronExpression:
+    """Cron 表达式解析测试"""
+
+    @pytest.mark.parametrize("expression, expected", [
+        ("*/15 * * * *", datetime(2026, 10, 17, 10, 15)),
+        ("0 2 * * 1-5", datetime(2026, 10, 19, 2, 0)),
+        ("30 6 1,15 * *", datetime(2026, 11, 1, 6, 30)),
+        ("0 0 29 feb *", datetime(2028, 2, 29, 0, 0)),
+        ("0 9 13 * fri", datetime(2026, 10, 23, 9, 0)),
+        ("@daily", datetime(2026, 10, 18, 0, 0)),
+    ])
+    def test_next_after(self, expression, expected):
+        """下次触发时间（日期与星期同时限定时满足其一即可）"""
+        assert CronExpression(expression).next_after(NOW) == expected
+
+    @pytest.mark.parametrize("expression", ["* * *", "61 * * * *", "*/0 * * * *", "0 0 30 2 *", "x * * * *"])
+    def test_invalid_expressions(self, expression):
+        """格式错误或永不触发的表达式被拒绝"""
+        with pytest.raises(ValueError):
+            validate_cron(expression)
+
+    def test_fire_decision(self):
+        """错过的运行：RUN_ONCE 合并补跑一次，SKIP 超过宽限期则跳过"""
+        due = NOW - timedelta(hours=3)
+        assert fire_decision(None, NOW) == DECISION_WAIT
+        assert fire_decision(NOW + timedelta(seconds=1), NOW) == DECISION_WAIT
+        assert fire_decision(due, NOW) == DECISION_FIRE
+        assert fire_decision(due, NOW, MISSED_SKIP, grace_seconds=300) == DECISION_SKIP
+        assert fire_decision(NOW - timedelta(seconds=60), NOW, MISSED_SKIP, grace_seconds=300) == DECISION_FIRE
+
+
+class TestSyncScheduler:
+    """定时同步调度测试"""
+
+    def test_plans_then_fires_once_per_due_time(self, engine, runs):
+        """首次只计算下次时间；到期后触发一次并以 SCHEDULE 记录运行日志"""
+        _add_job(engine, "j1")
+        scheduler = SyncScheduler(poll_interval=1, lease_seconds=60, max_jobs=2)
+
+        assert scheduler.tick(NOW) == []
+        assert _next_run(engine, "j1") == datetime(2026, 10, 17, 11, 0)
+
+        # Missed for hours: one catch-up run, then planned from now
+        late = datetime(2026, 10, 17, 14, 20)
+        assert scheduler.tick(late) == ["j1"]
+        assert runs == ["j1"]
+        assert _next_run(engine, "j1") == datetime(2026, 10, 17, 15, 0)
+        assert _run_logs(engine) == [("j1", "SCHEDULE")]
+
+    def test_skip_policy_drops_late_runs(self, engine, runs, monkeypatch):
+        """SKIP 策略下超过宽限期的运行不补跑"""
+        monkeypatch.setattr(sync_scheduler.settings, "sync_schedule_missed_policy", MISSED_SKIP)
+        _add_job(engine, "j1", next_run_at=datetime(2026, 10, 17, 9, 0))
+
+        assert SyncScheduler(poll_interval=1, lease_seconds=60, max_jobs=2).tick(NOW) == []
+        assert runs == []
+        assert _next_run(engine, "j1") == datetime(2026, 10, 17, 11, 0)
+
+    def test_connection_concurrency_defers_runs(self, engine, runs, monkeypatch):
+        """同一连接的运行数达到上限时，到期作业延后而不丢失"""
+        monkeypatch.setattr(sync_scheduler.settings, "sync_max_concurrent_per_connection", 1)
+        due = datetime(2026, 10, 17, 10, 0)
+        _add_job(engine, "j1", next_run_at=due)
+        _add_job(engine, "j2", next_run_at=due + timedelta(minutes=1))
+        _add_job(engine, "j3", connection_id="c2", next_run_at=due)
+        scheduler = SyncScheduler(poll_interval=1, lease_seconds=60, max_jobs=4)
+
+        assert sorted(scheduler.tick(NOW)) == ["j1", "j3"]
+        assert _next_run(engine, "j2") == due + timedelta(minutes=1)
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE sys_sync_run_log SET status = 'SUCCESS' WHERE job_id = 'j1'"))
+        assert scheduler.tick(NOW) == ["j2"]
+
+    def test_only_the_leader_fires(self, engine, runs):
+        """仅持有租约的副本触发；租约释放或过期后由其他副本接管"""
+        _add_job(engine, "j1", next_run_at=NOW - timedelta(minutes=1))
+        first = SyncScheduler(poll_interval=1, lease_seconds=60, max_jobs=2, owner_id="a")
+        second = SyncScheduler(poll_interval=1, lease_seconds=60, max_jobs=2, owner_id="b")
+
+        assert first.tick(NOW) == ["j1"]
+        assert second.tick(NOW) == [] and not second.is_leader
+
+        sync_scheduler.release_leadership("a")
+        second.tick(NOW)
+        assert second.is_leader
+        assert not sync_scheduler.acquire_leadership("a", 60)
+
+    def test_pipeline_schedule_queues_indexing(self, engine, monkeypatch):
+        """物化管道到期时为对象类型的已发布映射排队索引作业"""
+        queued = []
+        monkeypatch.setattr(index_scheduler, "enqueue_indexing_job", lambda m, o: queued.append((m, o)))
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE meta_object_type_ver (id VARCHAR(36) PRIMARY KEY, def_id VARCHAR(36))"))
+            conn.execute(text("INSERT INTO meta_object_type_ver VALUES ('v1', 'o1')"))
+            conn.execute(text("""
+                INSERT INTO ctx_object_mapping_def
+                (id, object_def_id, source_connection_id, source_table_name, mapping_spec, status, index_mode)
+                VALUES ('m1', 'o1', 'c1', 't', '{}', 'PUBLISHED', 'FULL'),
+                       ('m2', 'o1', 'c1', 't', '{}', 'DRAFT', 'FULL')
+            """))
+            conn.execute(text("""
+                INSERT INTO sys_pipeline_def
+                (id, object_ver_id, dataset_id, mode, sync_schedule, next_sync_at, is_active)
+                VALUES ('p1', 'v1', 'd1', 'MATERIALIZED', '*/5 * * * *', :due, 1)
+            """), {"due": NOW - timedelta(minutes=2)})
+
+        assert SyncScheduler(poll_interval=1, lease_seconds=60, max_jobs=2).tick(NOW) == ["p1"]
+        assert queued == [("m1", "o1")]
+        assert _next_run(engine, "p1", "sys_pipeline_def", "next_sync_at") == datetime(2026, 10, 17, 10, 10)
@@ -0,0 +1,219 @@
+"""
+Tests for the sync worker's Arrow extract / load path.
+MDP Platform V3.1 - Multimodal Data Governance
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+
+from app.core.config import settings
+from app.engine.arrow_batches import SYNC_TIMESTAMP_COLUMN, rows_to_record_batch, standardize_batch
+from app.engine.partitioned_reader import SLICE_DONE, SLICE_FAILED, PartitionedReader, plan_slices
+from app.engine.source_reader import read_table_chunks, split_range_boundaries
+from app.engine.sync_worker import _same_database_server, _sync_mysql_table
+
+
+@pytest.fixture
+def source(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'src.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE Orders (ID INTEGER PRIMARY KEY, Name TEXT, Amount REAL, Paid BOOLEAN)"))
+        for i in range(1, 26):
+            conn.execute(
+                text("INSERT INTO Orders VALUES (:i, :n, :a, :p)"),
+                {"i": i, "n": None if i == 3 else f"o'{i}", "a": i * 1.5, "p": i % 2 == 0},
+            )
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def target(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'raw.db'}")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ontology.db'}")
+    yield engine
+    engine.dispose()
+
+
+class TestArrowBatches:
+    """Arrow 记录批转换测试"""
+
+    def test_rows_become_typed_columns(self):
+        """游标行按列转换为 Arrow 类型，DECIMAL 转为浮点，混合类型转为字符串"""
+        rows = [(1, Decimal("2.50"), "a", 7), (2, None, None, "x")]
+        batch = rows_to_record_batch(rows, ["id", "price", "name", "mixed"])
+
+        assert batch.schema.field("id").type == pa.int64()
+        assert batch.schema.field("price").type == pa.float64()
+        assert batch.schema.field("name").type == pa.string()
+        assert batch.column(3).to_pylist() == ["7", "x"]
+
+    def test_standardize_shares_source_buffers(self):
+        """列名小写与同步时间戳追加不复制源列"""
+        batch = rows_to_record_batch([(1, "a"), (2, "b")], ["ID", "Name"])
+        stamp = datetime(2026, 1, 2, 3, 4, 5)
+
+        standardized = standardize_batch(batch, stamp)
+
+        assert standardized.schema.names == ["id", "name", SYNC_TIMESTAMP_COLUMN]
+        assert standardized.column(1).buffers()[2].address == batch.column(1).buffers()[2].address
+        assert standardized.column(2).to_pylist() == [stamp, stamp]
+
+    def test_reader_builds_record_batches(self, source):
+        """源读取器可直接产出 Arrow 记录批"""
+        batches = list(read_table_chunks(source, "Orders", chunk_size=10, build=rows_to_record_batch))
+        assert [b.num_rows for b in batches] == [10, 10, 5]
+        assert all(isinstance(b, pa.RecordBatch) for b in batches)
+
+
+class TestSyncTable:
+    """同步抽取与加载测试"""
+
+    def test_full_overwrite_loads_all_rows(self, source, target):
+        """全量覆盖同步：行数、列名、类型与空值保持一致"""
+        stats = _sync_mysql_table(source, target, {"table": "Orders"}, "raw_orders", "FULL_OVERWRITE", chunk_size=10)
+
+        df = pd.read_sql("SELECT * FROM raw_orders ORDER BY id", target)
+        assert stats["rows"] == 25 and stats["bytes"] > 0 and stats["watermark"] is None
+        assert list(df.columns) == ["id", "name", "amount", "paid", SYNC_TIMESTAMP_COLUMN]
+        assert df["amount"].tolist() == [i * 1.5 for i in range(1, 26)]
+        assert df["name"].iloc[0] == "o'1" and df["name"].isna().sum() == 1
+        assert df[SYNC_TIMESTAMP_COLUMN].notna().all()
+        column_types = {c["name"]: type(c["type"]).__name__ for c in sa_inspect(target).get_columns("raw_orders")}
+        assert column_types["id"] == "BIGINT" and column_types["name"] == "TEXT"
+
+    def test_overwrite_replaces_table(self, source, target):
+        """全量覆盖重建目标表；无游标列的增量同步同样整表重载"""
+        _sync_mysql_table(source, target, {"table": "Orders"}, "raw_orders", "FULL_OVERWRITE")
+        _sync_mysql_table(source, target, {"table": "Orders"}, "raw_orders", "FULL_OVERWRITE")
+        assert pd.read_sql("SELECT COUNT(*) AS n FROM raw_orders", target)["n"][0] == 25
+
+        _sync_mysql_table(source, target, {"query": "SELECT * FROM Orders WHERE ID <= 5"}, "raw_orders", "INCREMENTAL")
+        assert pd.read_sql("SELECT COUNT(*) AS n FROM raw_orders", target)["n"][0] == 5
+
+    def test_batches_fan_out_to_mirror(self, source, target, mirror):
+        """每个批次同时写入镜像库，无需回读目标库复制"""
+        for _ in range(2):
+            _sync_mysql_table(
+                source, target, {"table": "Orders"}, "raw_orders", "FULL_OVERWRITE", chunk_size=10, mirror_engines=[mirror]
+            )
+
+        raw = pd.read_sql("SELECT * FROM raw_orders ORDER BY id", target)
+        mirrored = pd.read_sql("SELECT * FROM raw_orders ORDER BY id", mirror)
+        assert len(mirrored) == 25
+        pd.testing.assert_frame_equal(raw, mirrored)
+
+    def test_same_server_detection(self):
+        """同一 MySQL 服务器且同一用户时在服务端复制"""
+        raw = create_engine("mysql+pymysql://root:pw@db:3306/mdp_raw_store")
+
+        assert _same_database_server(raw, create_engine("mysql+pymysql://root:pw@db/ontology_raw_data"))
+        assert not _same_database_server(raw, create_engine("mysql+pymysql://root:pw@other:3306/ontology_raw_data"))
+        assert not _same_database_server(raw, create_engine("mysql+pymysql://reader:pw@db:3306/ontology_raw_data"))
+        assert not _same_database_server(create_engine("sqlite://"), create_engine("sqlite://"))
+
+
+class TestIncrementalSync:
+    """基于水位的增量同步测试"""
+
+    def test_primary_key_cursor_reads_only_new_rows(self, source, target, mirror):
+        """以自增主键为游标：首轮全量建表，之后只读取水位之上的新行"""
+        first = _sync_mysql_table(source, target, {"table": "Orders"}, "raw_orders", "INCREMENTAL", mirror_engines=[mirror])
+        assert (first["rows"], first["watermark"], first["replaced"]) == (25, "25", True)
+        assert sa_inspect(target).get_pk_constraint("raw_orders")["constrained_columns"] == ["id"]
+
+        with source.begin() as conn:
+            conn.execute(text("INSERT INTO Orders VALUES (26, 'new', 1.0, 0), (27, 'newer', 2.0, 1)"))
+        second = _sync_mysql_table(
+            source, target, {"table": "Orders"}, "raw_orders", "INCREMENTAL",
+            mirror_engines=[mirror], since=first["watermark"]
+        )
+
+        assert (second["rows"], second["watermark"], second["replaced"]) == (2, "27", False)
+        for engine in (target, mirror):
+            assert pd.read_sql("SELECT COUNT(*) AS n FROM raw_orders", engine)["n"][0] == 27
+
+    def test_updated_at_cursor_upserts_changed_rows(self, tmp_path, target):
+        """以更新时间为游标：变更行按源主键覆盖，不产生重复"""
+        source = create_engine(f"sqlite:///{tmp_path / 'updates.db'}")
+        with source.begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, updated_at TEXT)"))
+            for i in range(1, 11):
+                conn.execute(text("INSERT INTO items VALUES (:i, :n, '2026-01-01 00:00:00')"), {"i": i, "n": f"v{i}"})
+
+        first = _sync_mysql_table(source, target, {"table": "items"}, "raw_items", "INCREMENTAL", cursor_column="updated_at")
+        with source.begin() as conn:
+            conn.execute(text("UPDATE items SET name = 'changed', updated_at = '2026-01-02 00:00:00' WHERE id = 3"))
+        second = _sync_mysql_table(
+            source, target, {"table": "items"}, "raw_items", "INCREMENTAL",
+            cursor_column="updated_at", since=first["watermark"]
+        )
+
+        df = pd.read_sql("SELECT * FROM raw_items ORDER BY id", target)
+        assert second["rows"] == 1 and second["watermark"] == "2026-01-02 00:00:00"
+        assert len(df) == 10 and df.loc[df["id"] == 3, "name"].item() == "changed"
+        source.dispose()
+
+
+class TestParallelSlices:
+    """分片并行抽取测试"""
+
+    def test_range_boundaries(self, source):
+        """按 MIN/MAX 等宽切分，稠密整数键按每片最少行数减少分片"""
+        assert split_range_boundaries(source, "Orders", "ID", 4) == [7, 13, 19]
+        assert split_range_boundaries(source, "Orders", "ID", 4, min_rows_per_part=10) == [13]
+        assert split_range_boundaries(source, "Orders", "ID", 4, where="ID > :m", params={"m": 24}) == []
+
+    def test_slices_cover_every_row_once(self, source):
+        """各分片范围互不重叠且覆盖全部行（含分片列为空的行）"""
+        slices = plan_slices(source, "Orders", "Amount", 3, include_nulls=True)
+        with source.begin() as conn:
+            conn.execute(text("UPDATE Orders SET Amount = NULL WHERE ID = 5"))
+
+        ids = []
+        for slice_ in slices:
+            with source.connect() as conn:
+                ids += [r[0] for r in conn.execute(text(f"SELECT ID FROM Orders WHERE {slice_['where']}"), slice_["params"])]
+        assert len(slices) == 3 and sorted(ids) == list(range(1, 26))
+
+    def test_parallel_sync_loads_all_rows(self, source, target, monkeypatch):
+        """大表按主键分片并行读取，全部行恰好加载一次并报告分片进度"""
+        monkeypatch.setattr(settings, "sync_min_slice_rows", 5)
+        reports = []
+
+        stats = _sync_mysql_table(
+            source, target, {"table": "Orders", "slices": 3}, "raw_orders", "FULL_OVERWRITE",
+            chunk_size=4, on_progress=reports.append
+        )
+
+        df = pd.read_sql("SELECT id FROM raw_orders ORDER BY id", target)
+        assert stats["slices"] == 3 and stats["rows"] == 25
+        assert df["id"].tolist() == list(range(1, 26))
+        assert [p["status"] for p in reports[-1]] == [SLICE_DONE] * 3
+        assert sum(p["rows"] for p in reports[-1]) == 25
+
+    def test_failed_slice_stops_the_read(self, source):
+        """任一分片失败时停止其余分片并向调用方抛出异常"""
+        slices = plan_slices(source, "Orders", "ID", 3)
+
+        def read_slice(slice_):
+            if slice_["slice"] == 1:
+                raise RuntimeError("connection lost")
+            return read_table_chunks(source, "Orders", chunk_size=2, where=slice_["where"], params=slice_["params"])
+
+        reader = PartitionedReader(slices, read_slice, prefetch_chunks=1)
+        with pytest.raises(RuntimeError, match="connection lost"):
+            for _ in reader:
+                pass
+        progress = reader.progress()
+        assert progress[1]["status"] == SLICE_FAILED and progress[1]["error"] == "connection lost"